@@ -7,7 +7,7 @@ from .models.artists.models import (
     ArtistTag, ArtistPhoto, 
 )
 from .models.users.models import (
-    UserBlocking, UserFollow,
+    AccountRemoval, UserBlocking, UserFollow,
     Suspension, Settings, UserType
 )
 
@@ -82,12 +82,22 @@ class SettingsAdmin(admin.ModelAdmin):
     pass
 
 
+class AccountRemovalAdmin(admin.ModelAdmin):
+    # Progress of the removals, they are processed by the process_account_removals command
+    list_display = (
+        'user_id', 'username', 'requested_on', 'step', 'num_deleted_rows',
+        'num_deleted_files', 'last_progress_on', 'finished_on', 'error',
+    )
+    readonly_fields = list_display
+
+
 admin.site.register(User, UserAdmin)
 admin.site.register(UserType, UserTypeAdmin)
 admin.site.register(UserBlocking, UserBlockingAdmin)
 admin.site.register(UserFollow, UserFollowAdmin)
 admin.site.register(Suspension, SuspensionAdmin)
 admin.site.register(Settings, SettingsAdmin)
+admin.site.register(AccountRemoval, AccountRemovalAdmin)
 
 
 ## Artist-related models
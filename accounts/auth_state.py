@@ -0,0 +1,113 @@
+"""
+Auth state of users: the data used by the permission checks(suspension, user type
+flags and graphql_auth status), which otherwise each cost a query.
+
+The state of a user is loaded with a single query, cached across requests and
+kept on the user instance, so that it is loaded at most once per request
+(`request.user` is the same instance during a request). Use `user.auth_state`.
+
+The cache is invalidated when a `Suspension`, `UserType` or `UserStatus` of the user
+is saved or deleted(see `accounts.signals`), and again once the transaction is committed
+since a concurrent request may have cached the previous state meanwhile. The state
+also expires after `AUTH_STATE_CACHE_TIMEOUT` seconds.
+
+The cache should be shared by the workers(eg. redis or memcached): with `LocMemCache`,
+the state is only invalidated in the worker that made the change, other workers
+keep the previous state until it expires.
+"""
+
+import datetime
+from dataclasses import asdict, dataclass
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from accounts.constants import AUTH_STATE_CACHE_TIMEOUT
+
+# Attribute of the user instances holding their state
+INSTANCE_ATTRIBUTE = '_auth_state'
+
+
+@dataclass(frozen=True)
+class AuthState:
+    # End of the latest suspension of the user, if any
+    suspended_until: datetime.datetime = None
+    is_mod: bool = False
+    is_verified: bool = False
+    is_premium: bool = False
+    is_site_agent: bool = False
+    # Whether the account is verified according to graphql_auth
+    status_verified: bool = False
+
+    @property
+    def is_suspended(self):
+        return self.suspended_until is not None and self.suspended_until >= timezone.now()
+
+
+def _get_cache_key(user_id):
+    return f'auth-state-{user_id}'
+
+
+def _load_auth_state(user_id):
+    Suspension = apps.get_model('accounts', 'Suspension')
+
+    # The end of the latest suspension, past suspensions are compared with
+    # the current time when checking so that the state doesn't expire
+    suspended_until = Suspension.objects.filter(
+        suspended_user=OuterRef('pk')
+    ).order_by('-over_on').values('over_on')[:1]
+
+    row = get_user_model().objects.filter(pk=user_id).values(
+        'type__is_mod', 'type__is_verified', 'type__is_premium', 'type__is_site_agent',
+        # Users without status are treated as graphql_auth would create it
+        status_verified=Coalesce('status__verified', 'is_active'),
+        suspended_until=Subquery(suspended_until)
+    ).first()
+
+    if row is None:
+        return AuthState()
+
+    return AuthState(
+        suspended_until=row['suspended_until'],
+        is_mod=bool(row['type__is_mod']),
+        is_verified=bool(row['type__is_verified']),
+        is_premium=bool(row['type__is_premium']),
+        is_site_agent=bool(row['type__is_site_agent']),
+        status_verified=row['status_verified'],
+    )
+
+
+def get_auth_state(user) -> AuthState:
+    """Return the auth state of `user`, from the instance, the cache or the database"""
+    state = getattr(user, INSTANCE_ATTRIBUTE, None)
+    if state is not None:
+        return state
+
+    key = _get_cache_key(user.pk)
+    data = cache.get(key)
+
+    if data is None:
+        state = _load_auth_state(user.pk)
+        cache.set(key, asdict(state), AUTH_STATE_CACHE_TIMEOUT)
+    else:
+        state = AuthState(**data)
+
+    setattr(user, INSTANCE_ATTRIBUTE, state)
+    return state
+
+
+def invalidate_auth_state(user_id, user=None):
+    """
+    Should be called whenever the suspensions, type or status of `user_id` change.
+    `user` is the instance of the user if it is loaded, its state is reset too.
+    """
+    key = _get_cache_key(user_id)
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key))
+
+    if user is not None:
+        user.__dict__.pop(INSTANCE_ATTRIBUTE, None)
@@ -27,3 +27,21 @@ ARTISTS_PHOTOS_UPLOAD_DIR = 'artist_photos/'
 USERS_PROFILE_PICTURES_UPLOAD_DIR = 'profile_pics/'
 USERS_COVER_PHOTOS_UPLOAD_DIR = 'cover_photos/'
 
+
+
+# Users with at most this number of follows(or blocks) have the ids
+# of the users(or artists) they follow(or block) cached.
+# See `accounts.relationships`.
+RELATIONSHIP_CACHE_MAX_SIZE = 5000
+# In seconds
+RELATIONSHIP_CACHE_TIMEOUT = 60 * 60
+
+# Time(in seconds) during which the auth state of a user(suspension, type, status)
+# stays cached, short since a stale state isn't always invalidated(eg. with a cache
+# that isn't shared by the workers). See `accounts.auth_state`.
+AUTH_STATE_CACHE_TIMEOUT = 60
+
+
+# Key of the advisory locks taken on the account removals being processed
+# (see accounts.removal), the second key is the id of the removal
+ACCOUNT_REMOVAL_LOCK_KEY = 7301
@@ -1,4 +1,3 @@
-import base64
 import graphene
 from actstream.actions import follow, unfollow
 from django.conf import settings
@@ -24,6 +23,8 @@ from accounts.models.artists.models import Artist, ArtistPhoto
 from accounts.utils import get_artist_photos_upload_path
 from accounts.validators import validate_artist_photo
 from core.constants import FILE_STORAGE_CLASS
+from core.storage_writer import StorageBatchWriter
+from core.thumbnails import get_placeholder
 from core.utils import get_image_file_thumbnail_extension_and_type
 from .types import ArtistFollowNode
 
@@ -136,7 +137,8 @@ class UploadArtistPhotos(Output, graphene.ClientIDMutation):
         files = graphene.List(Upload, required=True)
     
     filenames = graphene.List(graphene.String)
-    base64_strs = graphene.List(graphene.String)
+    # Low-quality previews of the photos, see core.thumbnails
+    placeholders = graphene.List(graphene.String)
     mimetypes = graphene.List(graphene.String)
 
     @classmethod
@@ -155,10 +157,10 @@ class UploadArtistPhotos(Output, graphene.ClientIDMutation):
             validate_artist_photo(file)
 
         artist = Artist.objects.get(id=int(disambiguate_id(artist_id)))
-        artist_photos = []
+        photo_files = []
 
         # Get thumbnails of files and saved to cache
-        base64_strs, filenames, mimetypes = [], [], []
+        placeholders, filenames, mimetypes = [], [], []
         for file in files:
             # Get file extension and type to use with PIL
             file_extension, ftype = get_image_file_thumbnail_extension_and_type(file)
@@ -178,23 +180,30 @@ class UploadArtistPhotos(Output, graphene.ClientIDMutation):
                 ARTISTS_PHOTOS_UPLOAD_DIR,
                 use_filename
             )
-            saved_filename = STORAGE.save(save_dir, img_file)
-            artist_photos.append(
-                ArtistPhoto(artist=artist, photo=saved_filename, uploaded_by=user)
-            )
+            photo_files.append((save_dir, img_file))
 
             # Update return info
-            base64_strs.append(base64.b64encode(file_bytes).decode('utf-8'))
+            placeholders.append(get_placeholder(image))
             filenames.append(use_filename)
             mimetypes.append(mimetype)
             thumb_file.close()
 
-        # Save photos to artist
-        ArtistPhoto.objects.bulk_create(artist_photos)
+        # Upload the photos concurrently then save them to artist
+        with StorageBatchWriter(STORAGE) as writer:
+            saved_filenames = writer.save_all(photo_files)
+            ArtistPhoto.objects.bulk_create([
+                ArtistPhoto(
+                    artist=artist,
+                    photo=saved_filename,
+                    uploaded_by=user,
+                    placeholder=placeholder
+                )
+                for saved_filename, placeholder in zip(saved_filenames, placeholders)
+            ])
 
         return cls(
             filenames=filenames,
-            base64_strs=base64_strs,
+            placeholders=placeholders,
             mimetypes=mimetypes
         )
 
@@ -1,4 +1,3 @@
-import base64
 import datetime
 import graphene
 import uuid
@@ -26,6 +25,7 @@ from accounts.mixins import SendNewEmailActivationMixin, VerifyNewEmailMixin
 from accounts.models.users.models import Suspension
 from accounts.validators import UserUsernameValidator, validate_profile_and_cover_photo
 from core.constants import FILE_STORAGE_CLASS
+from core.thumbnails import get_placeholder
 from core.utils import get_image_file_thumbnail_extension_and_type
 from posts.utils import get_post_media_upload_path
 from flagging.graphql.types import FlagInstanceNode, FlagReason
@@ -160,7 +160,7 @@ class UpdateProfilePic(Output, graphene.ClientIDMutation):
         file = Upload(required=True)
     
     filename = graphene.String()
-    base64_str = graphene.String()
+    placeholder = graphene.String()
     mimetype = graphene.String()
 
     @classmethod
@@ -201,7 +201,7 @@ class UpdateProfilePic(Output, graphene.ClientIDMutation):
 
         return cls(
             filename=use_filename, 
-            base64_str=base64.b64encode(file_bytes).decode('utf-8'), 
+            placeholder=get_placeholder(image),
             mimetype=mimetype
         )
 
@@ -211,7 +211,7 @@ class UpdateCoverPhoto(Output, graphene.ClientIDMutation):
         file = Upload(required=True)
     
     filename = graphene.String()
-    base64_str = graphene.String()
+    placeholder = graphene.String()
     mimetype = graphene.String()
 
     @classmethod
@@ -252,7 +252,7 @@ class UpdateCoverPhoto(Output, graphene.ClientIDMutation):
 
         return cls(
             filename=use_filename, 
-            base64_str=base64.b64encode(file_bytes).decode('utf-8'), 
+            placeholder=get_placeholder(image),
             mimetype=mimetype
         )
 
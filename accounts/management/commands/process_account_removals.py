@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand
+
+from accounts.removal import process_account_removals
+from posts.constants import MEDIA_DELETION_BATCH_SIZE, POST_DELETION_CHUNK_SIZE
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete the accounts whose removal was requested along with their content. '
+        'Interrupted removals are resumed. Meant to be run every few minutes.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, help='Maximum number of removals to process.')
+        parser.add_argument(
+            '--chunk-size', type=int, default=POST_DELETION_CHUNK_SIZE,
+            help='Number of rows deleted per transaction.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=MEDIA_DELETION_BATCH_SIZE,
+            help='Number of media files deleted per storage request.'
+        )
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        verbosity = options['verbosity']
+
+        def report_progress(removal):
+            if verbosity > 1:
+                self.stdout.write(
+                    f'{removal}: {removal.step}, {removal.num_deleted_rows} rows '
+                    f'and {removal.num_deleted_files} files deleted'
+                )
+
+        removals = process_account_removals(
+            options['limit'],
+            using=options['database'],
+            chunk_size=options['chunk_size'],
+            batch_size=options['batch_size'],
+            on_progress=report_progress
+        )
+
+        for removal in removals:
+            if removal.is_finished:
+                self.stdout.write(self.style.SUCCESS(
+                    f'{removal} finished: {removal.num_deleted_rows} rows '
+                    f'and {removal.num_deleted_files} files deleted'
+                ))
+            else:
+                self.stdout.write(self.style.ERROR(f'{removal} failed at step {removal.step}'))
@@ -12,10 +12,19 @@ from core.utils import get_content_type
 class UserQuerySet(QuerySet):
     def delete(self, really_delete=False):
         if really_delete:
-            return super().delete()
+            # The accounts and their content are deleted in the background,
+            # the users are counted as deleted like with `QuerySet.delete()`
+            num_users = self.request_removal().count()
+            return num_users, {self.model._meta.label: num_users}
         else:
             self.deactivate()
 
+    def request_removal(self):
+        """Deactivate the users and schedule the removal of their accounts, return the removals"""
+        from accounts.removal import request_account_removals
+
+        return request_account_removals(self)
+
     def deactivate(self):
         self.update(is_active=False, deactivated_on=timezone.now())
 
@@ -0,0 +1,34 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0015_auto_20220312_0541'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AccountRemoval',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_id', models.PositiveIntegerField(unique=True)),
+                ('username', models.CharField(max_length=15)),
+                ('requested_on', models.DateTimeField(auto_now_add=True)),
+                ('started_on', models.DateTimeField(blank=True, editable=False, null=True)),
+                ('finished_on', models.DateTimeField(blank=True, editable=False, null=True)),
+                ('step', models.CharField(blank=True, max_length=30)),
+                ('num_deleted_rows', models.PositiveIntegerField(default=0)),
+                ('num_deleted_files', models.PositiveIntegerField(default=0)),
+                ('last_progress_on', models.DateTimeField(blank=True, editable=False, null=True)),
+                ('error', models.TextField(blank=True)),
+            ],
+            options={
+                'db_table': 'accounts"."account_removal',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='accountremoval',
+            index=models.Index(condition=models.Q(('finished_on__isnull', True)), fields=['requested_on'], name='pending_account_removal_idx'),
+        ),
+    ]
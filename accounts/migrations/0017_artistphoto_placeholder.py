@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0016_accountremoval'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='artistphoto',
+            name='placeholder',
+            field=models.TextField(blank=True, editable=False),
+        ),
+    ]
@@ -155,6 +155,8 @@ class ArtistPhoto(models.Model):
 	)
 	photo_width = models.PositiveIntegerField()
 	photo_height = models.PositiveIntegerField()
+	# Base64 encoded low-quality preview, computed at upload(see core.thumbnails)
+	placeholder = models.TextField(blank=True, editable=False)
 	uploaded_by = models.ForeignKey(
 		settings.AUTH_USER_MODEL,
 		db_column='user_id',
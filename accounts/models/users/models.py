@@ -6,10 +6,11 @@ from django.core.validators import FileExtensionValidator
 from django.db import models
 from django.db.models import F, Q
 from django.utils import timezone
-from django.utils.functional import cached_property, classproperty
+from django.utils.functional import classproperty
 from django.utils.translation import gettext_lazy as _
 from easy_thumbnails.fields import ThumbnailerImageField
 
+from accounts.auth_state import get_auth_state
 from accounts.constants import (
     USER_MIN_AGE, USER_MAX_AGE, USERS_COVER_PHOTOS_UPLOAD_DIR, 
     USERS_PROFILE_PICTURES_UPLOAD_DIR, USERNAME_CHANGE_WAIT_PERIOD, 
@@ -260,7 +261,7 @@ class User(AbstractBaseUser, PermissionsMixin, UserOperations, UsesCustomSignal)
 
     @classproperty
     def superuser(cls):
-        return cls.objects.get(superuser=True)
+        return cls.objects.get(is_superuser=True)
 
     @classproperty
     def main_site_account(cls):
@@ -293,17 +294,25 @@ class User(AbstractBaseUser, PermissionsMixin, UserOperations, UsesCustomSignal)
     def verified_users(cls):
         return cls.objects.filter(type__is_verified=True)
 
-    @cached_property
+    @property
+    def auth_state(self):
+        """
+        State used by the permission checks(suspension, type, status).
+        It is cached, so prefer it to querying the related models.
+        """
+        return get_auth_state(self)
+
+    @property
     def is_mod(self):
-        return self.type.is_mod
+        return self.auth_state.is_mod
 
-    @cached_property
+    @property
     def is_verified(self):
-        return self.type.is_verified
+        return self.auth_state.is_verified
 
     @property
     def is_premium(self):
-        return self.type.is_premium
+        return self.auth_state.is_premium
 
     @property
     def status_verified(self):
@@ -311,14 +320,7 @@ class User(AbstractBaseUser, PermissionsMixin, UserOperations, UsesCustomSignal)
         Graphql auth uses a custom model UserStatus to track status of users.
         This property get the status of a user.
         """
-        # Import here to prevent circular import errors
-        from graphql_auth.models import UserStatus
-
-        try:
-            return self.status.verified
-        except AttributeError:
-            status = UserStatus.objects.create(user=self, verified=self.is_active)
-            return status.verified
+        return self.auth_state.status_verified
 
     @property
     def can_change_username(self):
@@ -365,7 +367,7 @@ class User(AbstractBaseUser, PermissionsMixin, UserOperations, UsesCustomSignal)
 
     @property
     def is_suspended(self):
-        return self.suspensions.filter(over_on__gte=timezone.now()).exists()
+        return self.auth_state.is_suspended
 
     @property
     def private_artist_posts(self):
@@ -643,3 +645,37 @@ class Settings(models.Model):
         verbose_name_plural = _('Settings')
 
 
+class AccountRemoval(models.Model):
+    """
+    Job removing the account of a user along with their content, in the background
+    (see accounts.removal). The job outlives the user, so the user isn't a foreign key.
+    """
+    user_id = models.PositiveIntegerField(unique=True)
+    username = models.CharField(max_length=15)
+    requested_on = models.DateTimeField(auto_now_add=True)
+    started_on = models.DateTimeField(null=True, blank=True, editable=False)
+    finished_on = models.DateTimeField(null=True, blank=True, editable=False)
+    # Step being processed, see accounts.removal.STEPS
+    step = models.CharField(max_length=30, blank=True)
+    num_deleted_rows = models.PositiveIntegerField(default=0)
+    num_deleted_files = models.PositiveIntegerField(default=0)
+    last_progress_on = models.DateTimeField(null=True, blank=True, editable=False)
+    # Last error, the job is retried from its current step on the next run
+    error = models.TextField(blank=True)
+
+    def __str__(self):
+        return f'Removal of {self.username}'
+
+    @property
+    def is_finished(self):
+        return self.finished_on is not None
+
+    class Meta:
+        db_table = 'accounts\".\"account_removal'
+        indexes = [
+            models.Index(
+                fields=['requested_on'],
+                name='pending_account_removal_idx',
+                condition=Q(finished_on__isnull=True)
+            ),
+        ]
@@ -6,9 +6,11 @@ from django.db.models import F
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
+from accounts import relationships
 from accounts.constants import USERNAME_CHANGE_WAIT_PERIOD
 from accounts.models.artists.models import ArtistFollow
 from accounts.utils import get_user, get_artist
+from core.counters import counters_maintained_by_signals
 from flagging.models.models import Flag, FlagInstance
 from notifications.models.models import Notification
 from notifications.signals import notify
@@ -20,6 +22,7 @@ from posts.models.non_artist_posts.models import (
     NonArtistPostBookmark, NonArtistPostCommentLike, 
     NonArtistPostDownload, NonArtistPostRating, NonArtistPost
 )
+from posts.deletion import mark_posts_deleted
 from posts.utils import (
     get_artist_post, get_artist_post_comment,
     get_non_artist_post, get_non_artist_post_comment
@@ -102,6 +105,88 @@ class UserOperations:
         else:
             raise TypeError(_('Object should be instance of ArtstPost or NonArtistPost'))
 
+    def get_artist_posts_interactions(self, post_ids) -> dict[int, dict]:
+        """
+        Return the user's interactions(rating, bookmark, download) with each of
+        the artist posts in `post_ids`; see `_get_posts_interactions()`.
+        """
+        return self._get_posts_interactions(
+            post_ids,
+            ArtistPostRating,
+            ArtistPostBookmark,
+            ArtistPostDownload
+        )
+
+    def get_non_artist_posts_interactions(self, post_ids) -> dict[int, dict]:
+        """
+        Return the user's interactions(rating, bookmark, download) with each of
+        the non artist posts in `post_ids`; see `_get_posts_interactions()`.
+        """
+        return self._get_posts_interactions(
+            post_ids,
+            NonArtistPostRating,
+            NonArtistPostBookmark,
+            NonArtistPostDownload
+        )
+
+    def _get_posts_interactions(self, post_ids, rating_model, bookmark_model, download_model):
+        """
+        Get the interactions of the user with a page of posts using one query per
+        relation table rather than one query per post.
+        Returns a dict of the form
+        `{post_id: {'has_rated', 'num_stars', 'has_bookmarked', 'has_downloaded'}}`
+        """
+        post_ids = set(post_ids)
+        if not post_ids:
+            return {}
+
+        stars_given = dict(
+            rating_model.objects.filter(
+                rater=self,
+                post_id__in=post_ids
+            ).values_list('post_id', 'num_stars')
+        )
+        bookmarked_ids = set(
+            bookmark_model.objects.filter(
+                bookmarker=self,
+                post_id__in=post_ids
+            ).values_list('post_id', flat=True)
+        )
+        # A post can be downloaded multiple times by the same user
+        downloaded_ids = set(
+            download_model.objects.filter(
+                downloader=self,
+                post_id__in=post_ids
+            ).values_list('post_id', flat=True).distinct()
+        )
+
+        return {
+            post_id: {
+                'has_rated': post_id in stars_given,
+                'num_stars': stars_given.get(post_id),
+                'has_bookmarked': post_id in bookmarked_ids,
+                'has_downloaded': post_id in downloaded_ids,
+            } for post_id in post_ids
+        }
+
+    def get_liked_artist_post_comment_ids(self, comment_ids) -> set[int]:
+        """Return the ids of the comments in `comment_ids` that the user has liked"""
+        return set(
+            ArtistPostCommentLike.objects.filter(
+                liker=self,
+                comment_id__in=comment_ids
+            ).values_list('comment_id', flat=True)
+        )
+
+    def get_liked_non_artist_post_comment_ids(self, comment_ids) -> set[int]:
+        """Return the ids of the comments in `comment_ids` that the user has liked"""
+        return set(
+            NonArtistPostCommentLike.objects.filter(
+                liker=self,
+                comment_id__in=comment_ids
+            ).values_list('comment_id', flat=True)
+        )
+
     def can_download_post(self, post):
         """
         Returns whether user can download `post`. 
@@ -177,7 +262,7 @@ class UserOperations:
                 _("You can't follow a user that you've blocked")
             )
 
-        follow_obj = UserFollow.objects.create(follower=self, followed=other)
+        follow_obj = UserFollow.objects.create(follower=self, following=other)
 
         self.num_following = F('num_following') + 1
         self.save(update_fields=['num_following'])
@@ -201,7 +286,7 @@ class UserOperations:
 
         other = get_user(other_or_id)
 
-        follow_obj = UserFollow.objects.get(follower=self, followed=other)
+        follow_obj = UserFollow.objects.get(follower=self, following=other)
         follow_obj_id = follow_obj.id
         follow_obj.delete()
 
@@ -214,12 +299,12 @@ class UserOperations:
         return follow_obj_id
 
     def is_following_user(self, other_or_id):
-        other = get_user(other_or_id)
-        return self in other.followers.all()
+        other_id = other_or_id if isinstance(other_or_id, int) else other_or_id.pk
+        return relationships.is_following_user(self.pk, other_id)
 
     def is_following_artist(self, artist_or_id):
-        artist = get_artist(artist_or_id)
-        return self in artist.followers.all()
+        artist_id = artist_or_id if isinstance(artist_or_id, int) else artist_or_id.pk
+        return relationships.is_following_artist(self.pk, artist_id)
     
     def block_user(self, other_or_id):
         from accounts.models.users.models import UserBlocking
@@ -228,7 +313,7 @@ class UserOperations:
         block_obj = UserBlocking.objects.create(blocker=self, blocked=other)
 
         # Unfollow user if user is following user
-        if other in self.following.all():
+        if self.is_following_user(other):
             self.unfollow_user(other)
 
         return block_obj
@@ -245,8 +330,8 @@ class UserOperations:
 
     def has_blocked_user(self, other_or_id):
         """Return `True` if self has blocked other else `False`"""
-        other = get_user(other_or_id)
-        return other in self.blocked_users.all()
+        other_id = other_or_id if isinstance(other_or_id, int) else other_or_id.pk
+        return relationships.has_blocked_user(self.pk, other_id)
 
     # For creating posts and comments, call the corresponding models directly. 
     # Appropriate signals have been attached
@@ -261,28 +346,11 @@ class UserOperations:
                 code='not_permitted'
             )
 
-        post_id = post.id
-        poster = post.poster
-        post.delete()
-
-        if post.is_parent:
-            # Decrement user's post count
-            poster.num_artist_posts = F('num_artist_posts') - 1
-            poster.save(update_fields=['num_artist_posts'])
-        else:
-            parent_post = post.parent
-            poster.num_artist_post_reposts = F('num_artist_post_reposts') - 1
-            poster.save(update_fields=['num_artist_post_reposts'])
-
-            if post.is_simple_repost:
-                parent_post.num_simple_reposts = F('num_simple_reposts') - 1
-                parent_post.save(update_fields=['num_simple_reposts'])
-
-            else:
-                parent_post.num_non_simple_reposts = F('num_non_simple_reposts') - 1
-                parent_post.save(update_fields=['num_non_simple_reposts'])
+        # The post is hidden right away, its comments, ratings... are purged
+        # in the background along with it(see posts.deletion)
+        mark_posts_deleted(ArtistPost, [post.id])
 
-        return post_id
+        return post.id
 
     def delete_non_artist_post(self, post_or_id):
         post = get_non_artist_post(post_or_id)
@@ -294,28 +362,11 @@ class UserOperations:
                 code='not_permitted'
             )
 
-        post_id = post.id
-        poster = post.poster
-        post.delete()
+        # The post is hidden right away, its comments, ratings... are purged
+        # in the background along with it(see posts.deletion)
+        mark_posts_deleted(NonArtistPost, [post.id])
 
-        if post.is_parent:
-            # Decrement user's post count
-            poster.num_non_artist_posts = F('num_non_artist_posts') - 1
-            poster.save(update_fields=['num_non_artist_posts'])
-        else:
-            parent_post = post.parent
-            poster.num_non_artist_post_reposts = F('num_non_artist_post_reposts') - 1
-            poster.save(update_fields=['num_non_artist_post_reposts'])
-
-            if post.is_simple_repost:
-                parent_post.num_simple_reposts = F('num_simple_reposts') - 1
-                parent_post.save(update_fields=['num_simple_reposts'])
-
-            else:
-                parent_post.num_non_simple_reposts = F('num_non_simple_reposts') - 1
-                parent_post.save(update_fields=['num_non_simple_reposts'])
-
-        return post_id
+        return post.id
 
     def delete_artist_post_comment(self, comment_or_id):
         comment = get_artist_post_comment(comment_or_id)
@@ -332,6 +383,10 @@ class UserOperations:
         ancestor, poster, post = comment.ancestor, comment.poster, comment.post_concerned
         comment.delete()
 
+        # In triggers mode, the counters are updated by the database
+        if not counters_maintained_by_signals():
+            return comment_id
+
         # Update parent comment's number of replies
         if parent:
             parent.num_replies = F('num_replies') - 1
@@ -365,6 +420,10 @@ class UserOperations:
         ancestor, poster, post = comment.ancestor, comment.poster, comment.post_concerned
         comment.delete()
 
+        # In triggers mode, the counters are updated by the database
+        if not counters_maintained_by_signals():
+            return comment_id
+
         # Update parent comment's number of replies
         if parent:
             parent.num_replies = F('num_replies') - 1
@@ -375,8 +434,8 @@ class UserOperations:
             post.num_ancestor_comments = F('num_ancestor_comments') - 1
             post.save(update_fields=['num_ancestor_comments'])
 
-            poster.num_ancestor_artist_post_comments = F('num_ancestor_artist_post_comments') - 1
-            poster.save(update_fields=['num_ancestor_artist_post_comments'])
+            poster.num_ancestor_non_artist_post_comments = F('num_ancestor_non_artist_post_comments') - 1
+            poster.save(update_fields=['num_ancestor_non_artist_post_comments'])
         else:
             ancestor.num_child_comments = F('num_child_comments') - 1
             ancestor.save(update_fields=['num_child_comments'])
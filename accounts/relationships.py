@@ -0,0 +1,144 @@
+"""
+Relationship(follow, block) lookups.
+
+Membership checks such as "does user A follow user B" are answered with indexed
+`EXISTS`/`values_list` queries (each relation table has a unique constraint, hence
+an index, on its (source, target) columns) instead of loading whole relation sets.
+
+For users whose relation set is small enough, the sorted ids of the targets are
+cached so that hot paths (feeds, profile pages...) don't even hit the database;
+membership is then tested with a binary search.
+
+The cached ids are invalidated when a relationship is created or deleted(see
+`accounts.signals`), and again once the transaction is committed since a concurrent
+request may have cached the previous ids meanwhile. The cache should be shared by
+the workers, with `LocMemCache` other workers keep the previous ids until they expire.
+"""
+
+from bisect import bisect_left
+from collections import defaultdict
+from django.apps import apps
+from django.core.cache import cache
+from django.db import transaction
+
+from accounts.constants import (
+    RELATIONSHIP_CACHE_MAX_SIZE, RELATIONSHIP_CACHE_TIMEOUT
+)
+
+USER_FOLLOW = 'user-follow'
+ARTIST_FOLLOW = 'artist-follow'
+USER_BLOCKING = 'user-blocking'
+
+# Relationship kind => (model, source field, target field)
+RELATIONSHIPS = {
+    USER_FOLLOW: ('accounts.UserFollow', 'follower', 'following'),
+    ARTIST_FOLLOW: ('accounts.ArtistFollow', 'follower', 'artist'),
+    USER_BLOCKING: ('accounts.UserBlocking', 'blocker', 'blocked'),
+}
+
+# Cached in place of the ids when the relation set is too large to be cached
+_TOO_LARGE = 'too-large'
+
+
+def _get_relationship(kind):
+    model_label, source_field, target_field = RELATIONSHIPS[kind]
+    return apps.get_model(model_label), f'{source_field}_id', f'{target_field}_id'
+
+
+def _get_cache_key(kind, source_id):
+    return f'{kind}-{source_id}-ids'
+
+
+def _get_cached_target_ids(kind, source_id):
+    """
+    Return the sorted list of target ids of `source_id`, or None if the list is
+    too large to be cached.
+    """
+    key = _get_cache_key(kind, source_id)
+    target_ids = cache.get(key)
+
+    if target_ids is None:
+        model, source_column, target_column = _get_relationship(kind)
+
+        # Fetch one more id than the limit to know whether the limit is exceeded
+        target_ids = list(
+            model.objects.filter(**{source_column: source_id})
+            .order_by(target_column)
+            .values_list(target_column, flat=True)[:RELATIONSHIP_CACHE_MAX_SIZE + 1]
+        )
+        if len(target_ids) > RELATIONSHIP_CACHE_MAX_SIZE:
+            target_ids = _TOO_LARGE
+
+        cache.set(key, target_ids, RELATIONSHIP_CACHE_TIMEOUT)
+
+    return None if target_ids == _TOO_LARGE else target_ids
+
+
+def _contains(sorted_ids, id):
+    index = bisect_left(sorted_ids, id)
+    return index < len(sorted_ids) and sorted_ids[index] == id
+
+
+def relationship_exists(kind, source_id, target_id) -> bool:
+    """Return `True` if `source_id` has a relationship of type `kind` with `target_id`"""
+    target_ids = _get_cached_target_ids(kind, source_id)
+
+    if target_ids is not None:
+        return _contains(target_ids, target_id)
+
+    model, source_column, target_column = _get_relationship(kind)
+    return model.objects.filter(
+        **{source_column: source_id, target_column: target_id}
+    ).exists()
+
+
+def get_existing_pairs(kind, pairs) -> set[tuple[int, int]]:
+    """
+    Bulk version of `relationship_exists()`.
+    Given an iterable of (source_id, target_id) pairs, return the set of pairs
+    that have a relationship of type `kind`. Pairs that can't be answered from the
+    cache are checked with a single query.
+    """
+    found, unresolved = set(), defaultdict(set)
+
+    for source_id, target_id in set(pairs):
+        target_ids = _get_cached_target_ids(kind, source_id)
+
+        if target_ids is None:
+            unresolved[source_id].add(target_id)
+        elif _contains(target_ids, target_id):
+            found.add((source_id, target_id))
+
+    if unresolved:
+        model, source_column, target_column = _get_relationship(kind)
+        all_target_ids = set().union(*unresolved.values())
+        rows = model.objects.filter(**{
+            f'{source_column}__in': unresolved.keys(),
+            f'{target_column}__in': all_target_ids,
+        }).values_list(source_column, target_column)
+
+        found.update(
+            (source_id, target_id) for source_id, target_id in rows
+            if target_id in unresolved[source_id]
+        )
+
+    return found
+
+
+def invalidate_relationship_cache(kind, source_id):
+    """Should be called whenever a relationship of `source_id` is created or deleted"""
+    key = _get_cache_key(kind, source_id)
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+def is_following_user(follower_id, user_id) -> bool:
+    return relationship_exists(USER_FOLLOW, follower_id, user_id)
+
+
+def is_following_artist(follower_id, artist_id) -> bool:
+    return relationship_exists(ARTIST_FOLLOW, follower_id, artist_id)
+
+
+def has_blocked_user(blocker_id, user_id) -> bool:
+    return relationship_exists(USER_BLOCKING, blocker_id, user_id)
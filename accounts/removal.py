@@ -0,0 +1,218 @@
+"""
+Removal of user accounts.
+
+`request_account_removal()` deactivates the account right away and records an
+`AccountRemoval` job. `process_account_removals()`(run by the `process_account_removals`
+command) then deletes the account and its content in the background, in bounded
+chunks(see posts.deletion), through the `STEPS`:
+- `mark_posts`: the posts of the user are marked as deleted, which hides them and,
+  in signals mode, adjusts the counters of their parent posts;
+- `posts`: the posts are deleted along with their comments, ratings, media...;
+- `flags`: the flags of the account are deleted;
+- `account`: the rows referencing the user(comments, likes, follows, notifications...)
+  are deleted, then the user. The counters counting these rows(eg. the `num_followers`
+  of the followed users and artists) are decremented in aggregate;
+- `media`: the profile and cover photos and the media directory of the user
+  (`users/user_<id>/`) are deleted from the storage.
+
+Each step is idempotent, so an interrupted job is resumed from its current step
+on the next run. The progress is recorded on the job after each chunk.
+"""
+
+import logging
+import shutil
+import traceback
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils import timezone
+
+from accounts.constants import ACCOUNT_REMOVAL_LOCK_KEY
+from accounts.models.users.models import AccountRemoval
+from core.constants import FILE_STORAGE_CLASS
+from flagging.models.models import Flag
+from posts.constants import MEDIA_DELETION_BATCH_SIZE, POST_DELETION_CHUNK_SIZE
+from posts.deletion import POST_MODELS, PurgeResult, delete_files, delete_rows, mark_posts_deleted
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+STEPS = ['mark_posts', 'posts', 'flags', 'account', 'media']
+
+
+def get_media_directory(user_id):
+    """Directory of the files uploaded by a user, see `posts.utils.get_post_media_upload_path()`"""
+    return f'users/user_{user_id}'
+
+
+def request_account_removal(user):
+    """Deactivate `user` and schedule the removal of their account, return the removal"""
+    user.deactivate()
+    removal, __ = AccountRemoval.objects.get_or_create(
+        user_id=user.pk,
+        defaults={'username': user.username}
+    )
+
+    return removal
+
+
+def request_account_removals(users):
+    """
+    Deactivate the users of the queryset `users` and schedule the removal of their accounts,
+    return the removals.
+    """
+    # Read before deactivating, the queryset may be filtered on the active users
+    rows = list(users.values_list('id', 'username'))
+    user_ids = [user_id for user_id, __ in rows]
+
+    User.objects.filter(pk__in=user_ids).deactivate()
+    AccountRemoval.objects.bulk_create(
+        [AccountRemoval(user_id=user_id, username=username) for user_id, username in rows],
+        ignore_conflicts=True
+    )
+
+    return AccountRemoval.objects.filter(user_id__in=user_ids)
+
+
+class AccountRemover:
+    """Process the steps of an account removal"""
+
+    def __init__(self, removal, chunk_size=POST_DELETION_CHUNK_SIZE,
+                 batch_size=MEDIA_DELETION_BATCH_SIZE, using=DEFAULT_DB_ALIAS, on_progress=None):
+        self.removal = removal
+        self.user_id = removal.user_id
+        self.chunk_size = chunk_size
+        self.batch_size = batch_size
+        self.using = using
+        self.on_progress = on_progress
+        self.result = PurgeResult()
+        # Progress made by the previous runs
+        self.initial_num_rows = removal.num_deleted_rows
+        self.initial_num_files = removal.num_deleted_files
+
+    def run(self):
+        removal = self.removal
+        removal.started_on = removal.started_on or timezone.now()
+        steps = STEPS[STEPS.index(removal.step):] if removal.step else STEPS
+
+        for step in steps:
+            removal.step = step
+            self.save_progress()
+            getattr(self, f'run_{step}')()
+            self.delete_pending_files()
+
+        removal.finished_on = timezone.now()
+        removal.error = ''
+        self.save_progress()
+
+    def save_progress(self, result=None):
+        removal = self.removal
+        removal.num_deleted_rows = self.initial_num_rows + self.result.num_rows
+        removal.num_deleted_files = self.initial_num_files + self.result.num_files
+        removal.last_progress_on = timezone.now()
+        removal.save(using=self.using)
+
+        if self.on_progress:
+            self.on_progress(removal)
+
+    def delete_rows(self, model, column, ids, adjust_counters=True):
+        delete_rows(
+            model, column, ids, self.result, self.chunk_size,
+            adjust_counters=adjust_counters, using=self.using, on_chunk=self.save_progress
+        )
+
+    def delete_pending_files(self):
+        if self.result.pending_files:
+            self.result.num_files += delete_files(self.result.pending_files, self.batch_size)
+            self.result.pending_files = []
+            self.save_progress()
+
+    def run_mark_posts(self):
+        for model in POST_MODELS:
+            while True:
+                post_ids = list(
+                    model.objects.using(self.using)
+                    .filter(poster_id=self.user_id)
+                    .values_list('id', flat=True)[:self.chunk_size]
+                )
+                if not post_ids:
+                    break
+
+                mark_posts_deleted(model, post_ids, self.using)
+
+    def run_posts(self):
+        for model in POST_MODELS:
+            # The counters sourced from the posts were adjusted when they were marked
+            self.delete_rows(
+                model, model._meta.get_field('poster').column, [self.user_id],
+                adjust_counters=False
+            )
+
+    def run_flags(self):
+        flag_ids = list(
+            Flag.objects.using(self.using)
+            .filter(
+                content_type=ContentType.objects.db_manager(self.using).get_for_model(User),
+                object_id=self.user_id
+            )
+            .values_list('id', flat=True)
+        )
+        self.delete_rows(Flag, 'id', flag_ids)
+
+    def run_account(self):
+        # The profile and cover photos are collected from the deleted row
+        self.delete_rows(User, 'id', [self.user_id])
+
+    def run_media(self):
+        storage = FILE_STORAGE_CLASS()
+        directory = get_media_directory(self.user_id)
+
+        if hasattr(storage, 'delete_directory'):
+            storage.delete_directory(directory)
+        elif hasattr(storage, 'path'):
+            # Local storage
+            shutil.rmtree(storage.path(directory), ignore_errors=True)
+
+
+def _try_lock(removal, using):
+    with connections[using].cursor() as cursor:
+        cursor.execute('SELECT pg_try_advisory_lock(%s, %s)', [ACCOUNT_REMOVAL_LOCK_KEY, removal.id])
+        return cursor.fetchone()[0]
+
+
+def _unlock(removal, using):
+    with connections[using].cursor() as cursor:
+        cursor.execute('SELECT pg_advisory_unlock(%s, %s)', [ACCOUNT_REMOVAL_LOCK_KEY, removal.id])
+
+
+def process_account_removals(limit=None, using=DEFAULT_DB_ALIAS, **kwargs):
+    """
+    Process the pending account removals, oldest first. Removals being processed by
+    another worker are skipped. `kwargs` are passed to `AccountRemover`.
+    Return the processed removals.
+    """
+    removals = AccountRemoval.objects.using(using).filter(finished_on__isnull=True).order_by('requested_on')
+    processed = []
+
+    for removal in removals[:limit]:
+        if not _try_lock(removal, using):
+            continue
+
+        try:
+            # The removal may have been finished by another worker in the meantime
+            removal.refresh_from_db()
+            if removal.is_finished:
+                continue
+
+            AccountRemover(removal, using=using, **kwargs).run()
+        except Exception:
+            logger.exception('Account removal of user %s failed at step %s', removal.user_id, removal.step)
+            removal.error = traceback.format_exc()
+            removal.save(using=using, update_fields=['error'])
+        finally:
+            _unlock(removal, using)
+
+        processed.append(removal)
+
+    return processed
@@ -1,11 +1,14 @@
 from django.contrib.auth import get_user_model
-from django.db.models.signals import pre_delete, pre_save
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
 from django.dispatch import receiver
 from django.utils.translation import gettext_lazy as _
 from graphql_auth.models import UserStatus
 from graphql_auth.signals import user_verified
 
-from accounts.models.users.models import Suspension
+from accounts import relationships
+from accounts.auth_state import invalidate_auth_state
+from accounts.models.artists.models import ArtistFollow
+from accounts.models.users.models import Suspension, UserBlocking, UserFollow, UserType
 
 User = get_user_model()
 
@@ -43,3 +46,52 @@ def mark_user_active(sender, user, **kwargs):
     user.is_active = True
     user.save(update_fields=['is_active'])
 
+
+@receiver(post_save, sender=UserFollow)
+@receiver(post_delete, sender=UserFollow)
+def invalidate_user_follows_cache(sender, instance, **kwargs):
+    relationships.invalidate_relationship_cache(
+        relationships.USER_FOLLOW,
+        instance.follower_id
+    )
+
+
+@receiver(post_save, sender=ArtistFollow)
+@receiver(post_delete, sender=ArtistFollow)
+def invalidate_artist_follows_cache(sender, instance, **kwargs):
+    relationships.invalidate_relationship_cache(
+        relationships.ARTIST_FOLLOW,
+        instance.follower_id
+    )
+
+
+@receiver(post_save, sender=UserBlocking)
+@receiver(post_delete, sender=UserBlocking)
+def invalidate_user_blockings_cache(sender, instance, **kwargs):
+    relationships.invalidate_relationship_cache(
+        relationships.USER_BLOCKING,
+        instance.blocker_id
+    )
+
+
+def _get_cached_user(instance, field_name):
+    """Return the user of `instance` if it is already loaded, to avoid a query"""
+    field = instance._meta.get_field(field_name)
+    return getattr(instance, field_name) if field.is_cached(instance) else None
+
+
+@receiver(post_save, sender=Suspension)
+@receiver(post_delete, sender=Suspension)
+def invalidate_suspended_user_auth_state(sender, instance, **kwargs):
+    invalidate_auth_state(
+        instance.suspended_user_id,
+        _get_cached_user(instance, 'suspended_user')
+    )
+
+
+@receiver(post_save, sender=UserType)
+@receiver(post_delete, sender=UserType)
+@receiver(post_save, sender=UserStatus)
+@receiver(post_delete, sender=UserStatus)
+def invalidate_user_auth_state(sender, instance, **kwargs):
+    invalidate_auth_state(instance.user_id, _get_cached_user(instance, 'user'))
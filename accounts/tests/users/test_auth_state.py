@@ -0,0 +1,55 @@
+import datetime
+from dataclasses import asdict
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+
+from accounts.auth_state import AuthState, _get_cache_key
+from accounts.models.users.models import Suspension
+from accounts.tests.users.test_models import TestUtils
+
+User = get_user_model()
+
+
+class AuthStateTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = TestUtils.create_test_user(
+            'user1', 'email1@gmail.com', 'password', 'name name1',
+            datetime.datetime(year=2000, month=3, day=8), 'CM', is_active=True
+        )
+        self.staff = TestUtils.create_test_user(
+            'user2', 'email2@gmail.com', 'password', 'name name2',
+            datetime.datetime(year=2000, month=3, day=8), 'CM', is_active=True, is_staff=True
+        )
+
+    def test_state_is_loaded_once(self):
+        user = User.objects.get(id=self.user.id)
+
+        with self.assertNumQueries(1):
+            self.assertFalse(user.is_mod)
+            self.assertFalse(user.is_premium)
+            self.assertFalse(user.is_suspended)
+            self.assertTrue(user.status_verified)
+
+        # Cached across instances(requests)
+        with self.assertNumQueries(0):
+            self.assertFalse(User(pk=self.user.id).is_mod)
+
+    def test_state_is_invalidated(self):
+        self.assertFalse(self.user.is_suspended)
+        Suspension.objects.create(suspender=self.staff, suspended_user=self.user, reason='spam')
+        self.assertTrue(User.objects.get(id=self.user.id).is_suspended)
+
+        user_type = self.user.type
+        user_type.is_mod = True
+        user_type.save()
+        self.assertTrue(self.user.is_mod)
+
+    def test_state_cached_before_commit_is_invalidated(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Suspension.objects.create(suspender=self.staff, suspended_user=self.user, reason='spam')
+            # A concurrent request caches the state before the suspension is committed
+            cache.set(_get_cache_key(self.user.id), asdict(AuthState()))
+
+        self.assertTrue(User(pk=self.user.id).is_suspended)
@@ -1,8 +1,10 @@
 import datetime
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.test import TestCase
 
+from accounts import relationships
 from accounts.models.artists.models import Artist
 from posts.models.artist_posts.models import ArtistPost
 from posts.models.non_artist_posts.models import NonArtistPost
@@ -82,3 +84,62 @@ class UserAttributesTests(TestCase):
             self.fail("Failed to pin artist post and non artist post")
             
         
+
+
+class UserRelationshipsTests(TestCase):
+    """Test follow and block lookups"""
+
+    def setUp(self):
+        self.user1 = TestUtils.create_test_user(
+            'user1', 'email1@gmail.com', 'password', 'name name1', 
+            datetime.datetime(year=2000, month=3, day=8), 'CM', is_active=True
+        )
+        self.user2 = TestUtils.create_test_user(
+            'user2', 'email2@gmail.com', 'password', 'name name2', 
+            datetime.datetime(year=2000, month=3, day=8), 'CM', is_active=True
+        )
+        self.user3 = TestUtils.create_test_user(
+            'user3', 'email3@gmail.com', 'password', 'name name3', 
+            datetime.datetime(year=2000, month=3, day=8), 'CM', is_active=True
+        )
+
+    def test_follow_lookups_are_updated(self):
+        self.assertFalse(self.user1.is_following_user(self.user2))
+
+        self.user1.follow_user(self.user2)
+        self.assertTrue(self.user1.is_following_user(self.user2))
+        self.assertTrue(self.user1.is_following_user(self.user2.pk))
+        self.assertFalse(self.user2.is_following_user(self.user1))
+
+        self.user1.unfollow_user(self.user2)
+        self.assertFalse(self.user1.is_following_user(self.user2))
+
+    def test_ids_cached_before_commit_are_invalidated(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user1.follow_user(self.user2)
+            # A concurrent request caches the ids before the follow is committed
+            cache.set(relationships._get_cache_key(relationships.USER_FOLLOW, self.user1.pk), [])
+
+        self.assertTrue(self.user1.is_following_user(self.user2))
+
+    def test_blocking_unfollows_user(self):
+        self.user1.follow_user(self.user2)
+        self.user1.block_user(self.user2)
+
+        self.assertTrue(self.user1.has_blocked_user(self.user2))
+        self.assertFalse(self.user1.is_following_user(self.user2))
+
+    def test_get_existing_pairs(self):
+        self.user1.follow_user(self.user2)
+        self.user3.follow_user(self.user1)
+
+        pairs = [
+            (self.user1.pk, self.user2.pk),
+            (self.user1.pk, self.user3.pk),
+            (self.user3.pk, self.user1.pk),
+            (self.user2.pk, self.user3.pk),
+        ]
+        self.assertEqual(
+            relationships.get_existing_pairs(relationships.USER_FOLLOW, pairs),
+            {(self.user1.pk, self.user2.pk), (self.user3.pk, self.user1.pk)}
+        )
@@ -0,0 +1,83 @@
+import datetime
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from accounts.models.users.models import AccountRemoval
+from accounts.removal import process_account_removals, request_account_removal
+from accounts.tests.users.test_models import TestUtils
+from posts.models.artist_posts.models import ArtistPost, ArtistPostComment
+
+User = get_user_model()
+
+
+class AccountRemovalTests(TestCase):
+    def create_user(self, i):
+        return TestUtils.create_test_user(
+            f'user{i}', f'email{i}@gmail.com', 'password', f'name name{i}',
+            datetime.datetime(year=2000, month=3, day=8), 'CM', is_active=True
+        )
+
+    def setUp(self):
+        self.user, self.other = self.create_user(1), self.create_user(2)
+        self.artist = TestUtils.create_artist(
+            'artist name',
+            datetime.datetime(year=1996, month=8, day=8),
+            'US'
+        )
+
+        self.user.follow_user(self.other)
+        self.other.follow_user(self.user)
+        self.user.follow_artist(self.artist)
+
+        post = TestUtils.create_artist_post(self.artist, 'post', self.user)
+        ArtistPostComment.objects.create(body='comment', poster=self.other, post_concerned=post)
+
+        self.other_post = TestUtils.create_artist_post(self.artist, 'other post', self.other)
+        ArtistPostComment.objects.create(body='comment', poster=self.user, post_concerned=self.other_post)
+        self.user.rate_artist_post(self.other_post.id, 3)
+
+    def test_account_and_content_are_removed(self):
+        removal = request_account_removal(self.user)
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.is_active)
+
+        self.assertEqual(process_account_removals(chunk_size=1), [removal])
+        removal.refresh_from_db()
+        self.assertTrue(removal.is_finished)
+        self.assertEqual(removal.step, 'media')
+        self.assertGreater(removal.num_deleted_rows, 0)
+
+        self.assertFalse(User.objects.filter(id=self.user.id).exists())
+        self.assertFalse(ArtistPost.all_objects.filter(poster_id=self.user.id).exists())
+
+        # Counters of the remaining users, posts and artists are adjusted
+        self.other.refresh_from_db()
+        self.other_post.refresh_from_db()
+        self.artist.refresh_from_db()
+        self.assertEqual((self.other.num_followers, self.other.num_following), (0, 0))
+        self.assertEqual(self.other.num_ancestor_artist_post_comments, 0)
+        self.assertEqual((self.other_post.num_ancestor_comments, self.other_post.num_stars), (0, 0))
+        self.assertEqual(self.artist.num_followers, 0)
+
+        # Finished removals aren't processed again
+        self.assertEqual(process_account_removals(), [])
+
+    def test_interrupted_removal_is_resumed(self):
+        removal = request_account_removal(self.user)
+        AccountRemoval.objects.filter(id=removal.id).update(step='account')
+
+        process_account_removals()
+
+        removal.refresh_from_db()
+        self.assertTrue(removal.is_finished)
+        self.assertFalse(User.objects.filter(id=self.user.id).exists())
+
+    def test_removal_of_active_users_queryset(self):
+        users = User.objects.filter(is_active=True, id__in=[self.user.id, self.other.id])
+
+        self.assertEqual(users.delete(really_delete=True), (2, {User._meta.label: 2}))
+        self.assertEqual(
+            set(AccountRemoval.objects.values_list('user_id', flat=True)),
+            {self.user.id, self.other.id}
+        )
+        self.assertFalse(User.objects.filter(id__in=[self.user.id, self.other.id], is_active=True).exists())
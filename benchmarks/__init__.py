@@ -0,0 +1,11 @@
+"""
+Benchmarks of the hot paths(post creation, notification fan-out, feed reads,
+uploads, ...), run with `python manage.py run_benchmarks`.
+
+The benchmarks run against a test database filled by `benchmarks.data` at the
+chosen scale. The latencies(p50/p95) and number of SQL queries of each benchmark
+are compared with the baseline stored in `baseline.json`; the command fails if
+a benchmark issues more queries or is noticeably slower than its baseline, and
+if a benchmark has no baseline. Record a new baseline with `--save-baseline`
+(on the reference machine, latencies depend on the hardware) after an intended change.
+"""
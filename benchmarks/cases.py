@@ -0,0 +1,201 @@
+"""
+The benchmarks. Each one is a function taking the dataset and returning the
+function executing one iteration; it's registered with `@benchmark`.
+GraphQL operations are sent through the test client so that the whole request
+is measured(middlewares, authentication, document cache, ...).
+"""
+
+import itertools
+import json
+from io import BytesIO
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.contrib.auth import get_user_model
+from django.test import Client
+from graphql_jwt.shortcuts import get_token
+from PIL import Image
+
+from core.utils import get_user_cache_keys
+from notifications.models.models import Notification
+from notifications.signals import notify
+from posts.models.artist_posts.models import ArtistPost
+
+User = get_user_model()
+
+BENCHMARKS = {}
+
+FEED_QUERY = '''
+    query Feed($first: Int) {
+        allArtistPosts(first: $first) {
+            edges {
+                node {
+                    pk uuid body createdOn numStars numAncestorComments
+                    viewerHasRated viewerNumStars viewerHasBookmarked
+                    poster { username displayName }
+                    artist { name slug }
+                }
+            }
+        }
+    }
+'''
+
+COMMENT_THREAD_QUERY = '''
+    query Thread($id: ID) {
+        artistPostCommentThread(id: $id) {
+            comment { pk body numLikes viewerHasLiked }
+            replies {
+                comment { pk body numLikes viewerHasLiked }
+                replies { comment { pk body } numHiddenReplies }
+            }
+        }
+    }
+'''
+
+BATCH_ENGAGE_MUTATION = '''
+    mutation BatchEngage($actions: [EngagementActionInput!]!) {
+        batchEngage(input: {actions: $actions}) { numApplied }
+    }
+'''
+
+UPLOAD_IMAGES_MUTATION = '''
+    mutation UploadImages($files: [Upload]!) {
+        uploadPostImages(input: {files: $files}) { filenames }
+    }
+'''
+
+
+def benchmark(name):
+    def decorator(func):
+        BENCHMARKS[name] = func
+        return func
+
+    return decorator
+
+
+class GraphQLClient:
+    """Client sending graphql requests as a given user"""
+
+    def __init__(self, user=None):
+        self.client = Client()
+        self.headers = {'HTTP_AUTHORIZATION': f'JWT {get_token(user)}'} if user else {}
+
+    def execute(self, query, variables=None):
+        response = self.client.post(
+            '/graphql/',
+            json.dumps({'query': query, 'variables': variables or {}}),
+            content_type='application/json',
+            **self.headers
+        )
+        return self._get_data(response)
+
+    def upload(self, query, files):
+        """Send a multipart request(graphql multipart request spec) with `files`"""
+        data = {
+            'operations': json.dumps({'query': query, 'variables': {'files': [None] * len(files)}}),
+            'map': json.dumps({str(i): [f'variables.files.{i}'] for i in range(len(files))}),
+            **{str(i): file for i, file in enumerate(files)},
+        }
+        response = self.client.post('/graphql/', data, **self.headers)
+        return self._get_data(response)
+
+    @staticmethod
+    def _get_data(response):
+        content = response.json()
+        if content.get('errors'):
+            raise AssertionError(f'Benchmark request failed: {content["errors"]}')
+
+        return content['data']
+
+
+def _get_users(dataset):
+    return User.objects.in_bulk(dataset.user_ids)
+
+
+@benchmark('create_artist_post')
+def create_artist_post(dataset):
+    users = itertools.cycle(_get_users(dataset).values())
+    artist_ids = itertools.cycle(dataset.artist_ids)
+
+    def run():
+        ArtistPost.objects.create(
+            artist_id=next(artist_ids),
+            poster=next(users),
+            body='Benchmark post'
+        )
+
+    return run
+
+
+@benchmark('notify_fan_out')
+def notify_fan_out(dataset):
+    """Notify 100 users at once, like when a popular user posts"""
+    users = list(_get_users(dataset).values())
+    sender, recipients = users[0], users[1:101]
+
+    def run():
+        notify.send(
+            sender=sender,
+            recipient=recipients,
+            verb='benchmark',
+            category=Notification.FOLLOW
+        )
+
+    return run
+
+
+@benchmark('feed_read')
+def feed_read(dataset):
+    client = GraphQLClient(User.objects.get(id=dataset.user_ids[0]))
+    return lambda: client.execute(FEED_QUERY, {'first': 20})
+
+
+@benchmark('anonymous_feed_read')
+def anonymous_feed_read(dataset):
+    client = GraphQLClient()
+    return lambda: client.execute(FEED_QUERY, {'first': 20})
+
+
+@benchmark('comment_thread_read')
+def comment_thread_read(dataset):
+    client = GraphQLClient(User.objects.get(id=dataset.user_ids[0]))
+    comment_ids = itertools.cycle(dataset.ancestor_comment_ids[:100])
+
+    return lambda: client.execute(COMMENT_THREAD_QUERY, {'id': next(comment_ids)})
+
+
+@benchmark('batch_engage')
+def batch_engage(dataset):
+    """Like 20 comments and rate 5 posts, each iteration as another user"""
+    users = list(_get_users(dataset).values())[:100]
+    clients = itertools.cycle([GraphQLClient(user) for user in users])
+    actions = [
+        {'kind': 'LIKE_ARTIST_POST_COMMENT', 'targetId': comment_id}
+        for comment_id in dataset.ancestor_comment_ids[:20]
+    ] + [
+        {'kind': 'RATE_ARTIST_POST', 'targetId': post_id, 'numStars': 'FIVE'}
+        for post_id in dataset.post_ids[:5]
+    ]
+
+    return lambda: next(clients).execute(BATCH_ENGAGE_MUTATION, {'actions': actions})
+
+
+@benchmark('upload_post_images')
+def upload_post_images(dataset):
+    user = User.objects.get(id=dataset.user_ids[0])
+    client = GraphQLClient(user)
+    cache_key = get_user_cache_keys(user.username)['photos']
+
+    image_file = BytesIO()
+    Image.new('RGB', (1080, 1080), 'orange').save(image_file, format='PNG')
+    image_bytes = image_file.getvalue()
+
+    def run():
+        # Uploaded photos are kept in the cache until posted, at most 4
+        cache.delete(cache_key)
+        files = [
+            SimpleUploadedFile(f'photo{i}.png', image_bytes, content_type='image/png')
+            for i in range(2)
+        ]
+        client.upload(UPLOAD_IMAGES_MUTATION, files)
+
+    return run
@@ -0,0 +1,207 @@
+"""
+Synthetic data for the benchmarks.
+
+Rows are inserted with `bulk_create`, so `save()`, `clean()` and the signals
+are skipped; the denormalized counters are recomputed afterwards.
+Artists' popularity(followers and posts) follows a Zipf distribution so that
+a few artists concentrate most of the activity, like in production.
+"""
+
+import datetime
+import random
+from dataclasses import dataclass, field
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.utils.text import slugify
+
+from accounts.models.artists.models import Artist, ArtistFollow
+from accounts.models.users.models import UserFollow
+from core.counters import COUNTERS, reconcile_counter
+from posts.models.artist_posts.models import ArtistPost, ArtistPostComment, ArtistPostRating
+
+User = get_user_model()
+
+BATCH_SIZE = 2000
+PASSWORD = 'benchmark-password'
+
+
+@dataclass(frozen=True)
+class DataScale:
+    num_users: int
+    num_artists: int
+    num_posts: int
+    # Averages per user or post
+    num_follows_per_user: int
+    num_artist_follows_per_user: int
+    num_comments_per_post: int
+    num_ratings_per_post: int
+    # Fraction of the comments that are replies to other comments
+    reply_ratio: float = 0.3
+
+
+SCALES = {
+    'small': DataScale(
+        num_users=200, num_artists=20, num_posts=500,
+        num_follows_per_user=10, num_artist_follows_per_user=3,
+        num_comments_per_post=5, num_ratings_per_post=5
+    ),
+    'medium': DataScale(
+        num_users=2000, num_artists=100, num_posts=10000,
+        num_follows_per_user=30, num_artist_follows_per_user=5,
+        num_comments_per_post=10, num_ratings_per_post=10
+    ),
+    'large': DataScale(
+        num_users=20000, num_artists=500, num_posts=100000,
+        num_follows_per_user=50, num_artist_follows_per_user=5,
+        num_comments_per_post=10, num_ratings_per_post=20
+    ),
+}
+
+
+@dataclass
+class Dataset:
+    """Ids of the generated rows"""
+    user_ids: list = field(default_factory=list)
+    artist_ids: list = field(default_factory=list)
+    post_ids: list = field(default_factory=list)
+    ancestor_comment_ids: list = field(default_factory=list)
+    # Posts ordered by number of comments, most commented first
+    popular_post_ids: list = field(default_factory=list)
+
+
+def zipf_weights(n, exponent=1.0):
+    return [1 / rank ** exponent for rank in range(1, n + 1)]
+
+
+def _sample_distinct(rng, population, k, exclude=None):
+    """Return at most `k` distinct items of `population` other than `exclude`"""
+    sample = rng.sample(population, min(k + 1, len(population)))
+    return [item for item in sample if item != exclude][:k]
+
+
+def generate_data(scale: DataScale, seed=0) -> Dataset:
+    rng = random.Random(seed)
+    dataset = Dataset()
+    password = make_password(PASSWORD)
+    birth_date = datetime.date(1995, 1, 1)
+
+    users = User.objects.bulk_create(
+        [
+            User(
+                username=f'bench{i}',
+                email=f'bench{i}@example.com',
+                password=password,
+                display_name=f'Bench User {i}',
+                birth_date=birth_date,
+                country='US',
+                is_active=True
+            )
+            for i in range(scale.num_users)
+        ],
+        batch_size=BATCH_SIZE
+    )
+    dataset.user_ids = [user.id for user in users]
+
+    artists = Artist.objects.bulk_create(
+        [
+            Artist(
+                name=f'Bench Artist {i}',
+                slug=slugify(f'Bench Artist {i}'),
+                birth_date=birth_date,
+                country='US'
+            )
+            for i in range(scale.num_artists)
+        ],
+        batch_size=BATCH_SIZE
+    )
+    dataset.artist_ids = [artist.id for artist in artists]
+    artist_weights = zipf_weights(len(artists))
+
+    UserFollow.objects.bulk_create(
+        [
+            UserFollow(follower_id=user_id, following_id=followed_id)
+            for user_id in dataset.user_ids
+            for followed_id in _sample_distinct(
+                rng, dataset.user_ids, rng.randint(0, 2 * scale.num_follows_per_user), user_id
+            )
+        ],
+        batch_size=BATCH_SIZE
+    )
+
+    artist_follows = set()
+    for user_id in dataset.user_ids:
+        for _ in range(rng.randint(0, 2 * scale.num_artist_follows_per_user)):
+            artist_id = rng.choices(dataset.artist_ids, artist_weights)[0]
+            artist_follows.add((user_id, artist_id))
+
+    ArtistFollow.objects.bulk_create(
+        [ArtistFollow(follower_id=user_id, artist_id=artist_id) for user_id, artist_id in artist_follows],
+        batch_size=BATCH_SIZE
+    )
+
+    posts = ArtistPost.objects.bulk_create(
+        [
+            ArtistPost(
+                artist_id=artist_id,
+                poster_id=rng.choice(dataset.user_ids),
+                body=f'Benchmark post {i}'
+            )
+            for i, artist_id in enumerate(
+                rng.choices(dataset.artist_ids, artist_weights, k=scale.num_posts)
+            )
+        ],
+        batch_size=BATCH_SIZE
+    )
+    dataset.post_ids = [post.id for post in posts]
+    post_weights = zipf_weights(len(posts))
+
+    # Ancestor comments first, then the replies which reference them
+    num_comments = scale.num_posts * scale.num_comments_per_post
+    num_ancestors = max(1, int(num_comments * (1 - scale.reply_ratio)))
+    commented_post_ids = rng.choices(dataset.post_ids, post_weights, k=num_ancestors)
+    ancestors = ArtistPostComment.objects.bulk_create(
+        [
+            ArtistPostComment(
+                body='Benchmark comment',
+                poster_id=rng.choice(dataset.user_ids),
+                post_concerned_id=post_id
+            )
+            for post_id in commented_post_ids
+        ],
+        batch_size=BATCH_SIZE
+    )
+    dataset.ancestor_comment_ids = [comment.id for comment in ancestors]
+
+    ArtistPostComment.objects.bulk_create(
+        [
+            ArtistPostComment(
+                body='Benchmark reply',
+                poster_id=rng.choice(dataset.user_ids),
+                post_concerned_id=ancestor.post_concerned_id,
+                parent_id=ancestor.id,
+                ancestor_id=ancestor.id
+            )
+            for ancestor in rng.choices(ancestors, k=num_comments - num_ancestors)
+        ],
+        batch_size=BATCH_SIZE
+    )
+
+    ArtistPostRating.objects.bulk_create(
+        [
+            ArtistPostRating(post_id=post_id, rater_id=rater_id, num_stars=rng.choice((1, 3, 5)))
+            for post_id in dataset.post_ids
+            for rater_id in _sample_distinct(
+                rng, dataset.user_ids, rng.randint(0, 2 * scale.num_ratings_per_post)
+            )
+        ],
+        batch_size=BATCH_SIZE
+    )
+
+    for counter in COUNTERS:
+        reconcile_counter(counter, chunk_size=10000)
+
+    dataset.popular_post_ids = list(
+        ArtistPost.objects.order_by('-num_ancestor_comments').values_list('id', flat=True)[:100]
+    )
+
+    return dataset
@@ -0,0 +1,541 @@
+"""
+Generation of millions of rows for load and capacity testing.
+
+The rows are written with `COPY ... FROM STDIN` by a pool of processes, which
+skips `save()`, `clean()` and the signals. The ids of the referenced tables
+(users, artists, posts, comments, flags) are reserved upfront by advancing their
+sequences, so that each process knows the ids it can reference without querying
+the database. Popularity is skewed with Zipf distributions: a few users, artists
+and posts get most of the follows, posts, comments and notifications.
+
+Once the rows are written, `fix_up` fills what the signals and `create_user()` would
+have set: the users' types, the flags' creators, counts and states, the artists'
+country tags and all the denormalized counters(see `core.counters`).
+"""
+
+import csv
+import datetime
+import io
+import itertools
+import multiprocessing
+import random
+from bisect import bisect
+from dataclasses import dataclass, field
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection, connections, transaction
+from django.utils import timezone
+from django.utils.text import slugify
+from django_countries import countries
+
+from accounts.models.artists.models import Artist, ArtistFollow, ArtistTag, TaggedArtist
+from accounts.models.users.models import UserFollow, UserType
+from core.counters import COUNTERS, reconcile_counter
+from flagging.models.models import Flag, FlagInstance
+from notifications.models.models import Notification
+from notifications.partitions import ensure_partitions
+from posts.models.artist_posts.models import ArtistPost, ArtistPostComment
+
+User = get_user_model()
+
+COPY_NULL = '\\N'
+# Number of rows per COPY statement
+COPY_CHUNK_SIZE = 50000
+# Number of rows(or of parent rows for follows and flag instances) per task
+TASK_SIZE = 200000
+COUNTRIES = ['US', 'GB', 'FR', 'NG', 'CM', 'JM', 'KR', 'BR']
+NOTIFICATION_CATEGORIES = [
+    Notification.FOLLOW, Notification.RATING, Notification.COMMENT_LIKE,
+]
+# Timestamps are spread over this period
+PERIOD = datetime.timedelta(days=365)
+
+
+@dataclass
+class LoadDataCounts:
+    users: int = 200000
+    artists: int = 5000
+    artist_posts: int = 1000000
+    artist_post_comments: int = 4000000
+    user_follows: int = 2000000
+    artist_follows: int = 1000000
+    notifications: int = 1500000
+    flags: int = 20000
+    flag_instances: int = 100000
+    # Fraction of the comments that are replies
+    reply_ratio: float = 0.3
+    zipf_exponent: float = 1.0
+
+
+class ZipfSampler:
+    """Sample ids in [start, start + n) the first ones being the most frequent"""
+
+    def __init__(self, start, n, exponent):
+        self.start = start
+        self.cum_weights = list(itertools.accumulate(1 / rank ** exponent for rank in range(1, n + 1)))
+        self.total = self.cum_weights[-1]
+
+    def sample(self, rng):
+        return self.start + bisect(self.cum_weights, rng.random() * self.total)
+
+    def sample_distinct(self, rng, k, exclude=None):
+        ids = set()
+        # Bounded number of draws, popular ids are drawn several times
+        for _ in range(3 * k):
+            if len(ids) >= k:
+                break
+            id = self.sample(rng)
+            if id != exclude:
+                ids.add(id)
+
+        return ids
+
+
+class CopyWriter:
+    """
+    Write rows of `model` with COPY. Rows are tuples of the values of `fields`
+    (attribute names); the other fields take their default value.
+    """
+
+    def __init__(self, model, fields):
+        self.fields = fields
+        now = timezone.now()
+        columns, producers = [], []
+
+        for model_field in model._meta.concrete_fields:
+            if model_field.attname in fields:
+                index = fields.index(model_field.attname)
+                producers.append(lambda row, index=index: row[index])
+            elif model_field.primary_key:
+                # Let the sequence assign it
+                continue
+            elif getattr(model_field, 'auto_now', False) or getattr(model_field, 'auto_now_add', False):
+                producers.append(lambda row: now)
+            elif model_field.has_default():
+                if callable(model_field.default):
+                    producers.append(lambda row, model_field=model_field: model_field.get_default())
+                else:
+                    default = model_field.get_default()
+                    producers.append(lambda row, default=default: default)
+            elif model_field.null:
+                producers.append(lambda row: None)
+            elif model_field.blank and model_field.empty_strings_allowed:
+                producers.append(lambda row: '')
+            else:
+                raise ValueError(f'No value for the required field {model._meta.label}.{model_field.name}')
+
+            columns.append(connection.ops.quote_name(model_field.column))
+
+        self.producers = producers
+        self.sql = (
+            f'COPY {connection.ops.quote_name(model._meta.db_table)} ({", ".join(columns)}) '
+            f"FROM STDIN WITH (FORMAT csv, NULL '{COPY_NULL}')"
+        )
+
+    @staticmethod
+    def format_value(value):
+        if value is None:
+            return COPY_NULL
+        if isinstance(value, bool):
+            return 't' if value else 'f'
+        if isinstance(value, (datetime.date, datetime.datetime)):
+            return value.isoformat()
+
+        return str(value)
+
+    def copy(self, cursor, rows):
+        """Write `rows`(iterable) in chunks, return the number of rows written"""
+        num_rows = 0
+        rows = iter(rows)
+
+        while True:
+            chunk = list(itertools.islice(rows, COPY_CHUNK_SIZE))
+            if not chunk:
+                return num_rows
+
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            for row in chunk:
+                writer.writerow([self.format_value(produce(row)) for produce in self.producers])
+
+            buffer.seek(0)
+            cursor.copy_expert(self.sql, buffer)
+            num_rows += len(chunk)
+
+
+@dataclass
+class LoadPlan:
+    counts: LoadDataCounts
+    seed: int = 0
+    # Model label => first reserved id
+    starts: dict = field(default_factory=dict)
+    user_content_type_id: int = None
+    post_content_type_id: int = None
+    disable_triggers: bool = False
+    password: str = None
+    now: datetime.datetime = None
+
+    def __post_init__(self):
+        exponent = self.counts.zipf_exponent
+        self.users = ZipfSampler(self.starts['accounts.User'], self.counts.users, exponent)
+        self.artists = ZipfSampler(self.starts['accounts.Artist'], self.counts.artists, exponent)
+        self.posts = ZipfSampler(self.starts['posts.ArtistPost'], self.counts.artist_posts, exponent)
+
+    def random_timestamp(self, rng, after=None):
+        start = after or self.now - PERIOD
+        return start + (self.now - start) * rng.random()
+
+
+def reserve_ids(model, n, using='default'):
+    """
+    Advance the sequence of `model` by `n` and return the first reserved id.
+    Rows inserted concurrently by the application get ids after the reserved ones.
+    """
+    table = connection.ops.quote_name(model._meta.db_table)
+
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            f"SELECT setval(pg_get_serial_sequence(%s, 'id'), "
+            f"GREATEST(nextval(pg_get_serial_sequence(%s, 'id')), "
+            f"(SELECT COALESCE(MAX(id), 0) FROM {table}) + 1) + %s - 1)",
+            [table, table, n]
+        )
+        end = cursor.fetchone()[0]
+
+    return end - n + 1
+
+
+## Row generators, each yields the rows of a task
+
+def generate_users(plan, rng, start, count):
+    for id in range(start, start + count):
+        yield (
+            id, f'load{id}', f'load{id}@example.com', plan.password, f'Load User {id}',
+            datetime.date(rng.randint(1960, 2005), rng.randint(1, 12), rng.randint(1, 28)),
+            rng.choice(COUNTRIES), True, plan.random_timestamp(rng)
+        )
+
+
+def generate_artists(plan, rng, start, count):
+    for id in range(start, start + count):
+        name = f'Load Artist {id}'
+        yield (
+            id, name, slugify(name),
+            datetime.date(rng.randint(1950, 2000), rng.randint(1, 12), rng.randint(1, 28)),
+            rng.choice(COUNTRIES), plan.random_timestamp(rng)
+        )
+
+
+def generate_artist_posts(plan, rng, start, count):
+    for id in range(start, start + count):
+        yield (
+            id, plan.artists.sample(rng), plan.users.sample(rng),
+            f'Load post {id}', plan.random_timestamp(rng)
+        )
+
+
+def generate_artist_post_comments(plan, rng, start, count):
+    # (id, post id, created on) of the ancestor comments of this task
+    ancestors = []
+
+    for id in range(start, start + count):
+        poster_id = plan.users.sample(rng)
+
+        if ancestors and rng.random() < plan.counts.reply_ratio:
+            ancestor_id, post_id, ancestor_created_on = rng.choice(ancestors)
+            yield (
+                id, post_id, poster_id, f'Load reply {id}', ancestor_id, ancestor_id, None,
+                plan.random_timestamp(rng, after=ancestor_created_on)
+            )
+        else:
+            post_id, created_on = plan.posts.sample(rng), plan.random_timestamp(rng)
+            ancestors.append((id, post_id, created_on))
+            yield (id, post_id, poster_id, f'Load comment {id}', None, None, 0, created_on)
+
+
+def generate_user_follows(plan, rng, start, count):
+    """Follows of the users whose ids are in [start, start + count)"""
+    average = plan.counts.user_follows / plan.counts.users
+
+    for follower_id in range(start, start + count):
+        k = rng.randint(0, round(2 * average))
+        for following_id in plan.users.sample_distinct(rng, k, exclude=follower_id):
+            yield (follower_id, following_id, plan.random_timestamp(rng))
+
+
+def generate_artist_follows(plan, rng, start, count):
+    """Artist follows of the users whose ids are in [start, start + count)"""
+    average = plan.counts.artist_follows / plan.counts.users
+
+    for follower_id in range(start, start + count):
+        k = rng.randint(0, round(2 * average))
+        for artist_id in plan.artists.sample_distinct(rng, k):
+            yield (follower_id, artist_id, plan.random_timestamp(rng))
+
+
+def generate_notifications(plan, rng, start, count):
+    for _ in range(count):
+        yield (
+            plan.users.sample(rng), plan.user_content_type_id, plan.users.sample(rng),
+            'load notification', rng.choice(NOTIFICATION_CATEGORIES),
+            plan.post_content_type_id, plan.posts.sample(rng),
+            plan.random_timestamp(rng), rng.random() < 0.3
+        )
+
+
+def generate_flags(plan, rng, start, count):
+    """The flagged posts are the most popular ones, the i-th flag is on the i-th post"""
+    post_start = plan.starts['posts.ArtistPost']
+    flag_start = plan.starts['flagging.Flag']
+
+    for id in range(start, start + count):
+        # State and count are set by `fix_up`
+        yield (id, plan.post_content_type_id, post_start + id - flag_start, Flag.State.UNFLAGGED.value, 0)
+
+
+def generate_flag_instances(plan, rng, start, count):
+    """Instances of the flags whose ids are in [start, start + count)"""
+    average = plan.counts.flag_instances / plan.counts.flags
+    reasons = FlagInstance.reason_values
+
+    for flag_id in range(start, start + count):
+        k = rng.randint(1, max(1, round(2 * average) - 1))
+        for user_id in plan.users.sample_distinct(rng, k):
+            yield (flag_id, user_id, rng.choice(reasons), plan.random_timestamp(rng))
+
+
+@dataclass(frozen=True)
+class TableSpec:
+    model: type
+    fields: tuple
+    generate: object
+    # Name of the count giving the number of rows, or the number of parent rows
+    count: str
+    # Model whose ids the tasks iterate over, None for plain row offsets
+    id_model: str = None
+
+
+TABLES = {
+    'users': TableSpec(
+        User,
+        ('id', 'username', 'email', 'password', 'display_name', 'birth_date', 'country', 'is_active', 'joined_on'),
+        generate_users, 'users', 'accounts.User'
+    ),
+    'artists': TableSpec(
+        Artist, ('id', 'name', 'slug', 'birth_date', 'country', 'added_on'),
+        generate_artists, 'artists', 'accounts.Artist'
+    ),
+    'artist_posts': TableSpec(
+        ArtistPost, ('id', 'artist_id', 'poster_id', 'body', 'created_on'),
+        generate_artist_posts, 'artist_posts', 'posts.ArtistPost'
+    ),
+    'artist_post_comments': TableSpec(
+        ArtistPostComment,
+        ('id', 'post_concerned_id', 'poster_id', 'body', 'parent_id', 'ancestor_id', 'num_child_comments', 'created_on'),
+        generate_artist_post_comments, 'artist_post_comments', 'posts.ArtistPostComment'
+    ),
+    'user_follows': TableSpec(
+        UserFollow, ('follower_id', 'following_id', 'followed_on'),
+        generate_user_follows, 'users', 'accounts.User'
+    ),
+    'artist_follows': TableSpec(
+        ArtistFollow, ('follower_id', 'artist_id', 'followed_on'),
+        generate_artist_follows, 'users', 'accounts.User'
+    ),
+    'notifications': TableSpec(
+        Notification,
+        (
+            'recipient_id', 'actor_content_type_id', 'actor_object_id', 'verb', 'category',
+            'target_content_type_id', 'target_object_id', 'timestamp', 'unread'
+        ),
+        generate_notifications, 'notifications'
+    ),
+    'flags': TableSpec(
+        Flag, ('id', 'content_type_id', 'object_id', 'state', 'count'),
+        generate_flags, 'flags', 'flagging.Flag'
+    ),
+    'flag_instances': TableSpec(
+        FlagInstance, ('flag_id', 'user_id', 'reason', 'flagged_on'),
+        generate_flag_instances, 'flags', 'flagging.Flag'
+    ),
+}
+
+# Tables of a stage only reference tables of the previous stages
+STAGES = [
+    ['users', 'artists'],
+    ['artist_posts', 'user_follows', 'artist_follows'],
+    ['artist_post_comments', 'notifications', 'flags'],
+    ['flag_instances'],
+]
+
+# Models whose ids are reserved => count
+RESERVED_ID_MODELS = {
+    User: 'users',
+    Artist: 'artists',
+    ArtistPost: 'artist_posts',
+    ArtistPostComment: 'artist_post_comments',
+    Flag: 'flags',
+}
+
+# Plan of the running generation, inherited by the worker processes
+_plan = None
+
+
+def get_tasks(plan, table_name):
+    spec = TABLES[table_name]
+    total = getattr(plan.counts, spec.count)
+    start = plan.starts[spec.id_model] if spec.id_model else 0
+
+    return [
+        (table_name, task_start, min(TASK_SIZE, start + total - task_start))
+        for task_start in range(start, start + total, TASK_SIZE)
+    ]
+
+
+def run_task(task):
+    """Write the rows of a task, executed in a worker process"""
+    table_name, start, count = task
+    spec = TABLES[table_name]
+    rng = random.Random(f'{_plan.seed}-{table_name}-{start}')
+    writer = CopyWriter(spec.model, spec.fields)
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute('SET LOCAL synchronous_commit TO OFF')
+        if _plan.disable_triggers:
+            # Skips the foreign key checks and counter triggers, requires a superuser
+            cursor.execute('SET LOCAL session_replication_role TO replica')
+
+        num_rows = writer.copy(cursor, spec.generate(_plan, rng, start, count))
+
+    return table_name, num_rows
+
+
+def make_plan(counts: LoadDataCounts, seed=0, disable_triggers=False) -> LoadPlan:
+    for name in ('users', 'artists', 'artist_posts'):
+        if getattr(counts, name) <= 0:
+            raise ValueError(f'At least one row of {name} is required')
+    if counts.flags > counts.artist_posts:
+        raise ValueError('There can be at most one flag per post')
+
+    now = timezone.now()
+    # Notifications are spread over the period, their partitions must exist
+    ensure_partitions(since=now - PERIOD)
+
+    return LoadPlan(
+        counts=counts,
+        seed=seed,
+        starts={
+            model._meta.label: reserve_ids(model, getattr(counts, name))
+            for model, name in RESERVED_ID_MODELS.items()
+        },
+        user_content_type_id=ContentType.objects.get_for_model(User).id,
+        post_content_type_id=ContentType.objects.get_for_model(ArtistPost).id,
+        disable_triggers=disable_triggers,
+        password=make_password(None),
+        now=now
+    )
+
+
+def generate_load_data(plan: LoadPlan, num_workers, log=print) -> dict[str, int]:
+    """Write the rows of `plan` with `num_workers` processes, return the number of rows per table"""
+    global _plan
+    _plan = plan
+    totals = dict.fromkeys(TABLES, 0)
+
+    # Connections can't be shared with the forked workers
+    connections.close_all()
+    context = multiprocessing.get_context('fork')
+
+    with context.Pool(num_workers) as pool:
+        for stage in STAGES:
+            tasks = [task for table_name in stage for task in get_tasks(plan, table_name)]
+
+            for table_name, num_rows in pool.imap_unordered(run_task, tasks):
+                totals[table_name] += num_rows
+                log(f'{table_name}: {totals[table_name]} rows')
+
+    return totals
+
+
+def _get_table(model):
+    return connection.ops.quote_name(model._meta.db_table)
+
+
+def _get_column(model, field_name):
+    return connection.ops.quote_name(model._meta.get_field(field_name).column)
+
+
+def fix_up(plan: LoadPlan, log=print):
+    """Set the values that the signals and `save()` would have set"""
+    flag_start = plan.starts['flagging.Flag']
+    flag_end = flag_start + plan.counts.flags - 1
+    flag_table, instance_table = _get_table(Flag), _get_table(FlagInstance)
+
+    with connection.cursor() as cursor:
+        # Users are created with their type, which the permission checks read
+        log('Creating users types')
+        user_start = plan.starts['accounts.User']
+        type_columns = ['is_mod', 'is_verified', 'is_premium', 'is_site_agent']
+        # Django doesn't set database defaults
+        cursor.execute(
+            f'''
+            INSERT INTO {_get_table(UserType)}
+                ({_get_column(UserType, 'user')}, {', '.join(type_columns)})
+            SELECT id, {', '.join(['FALSE'] * len(type_columns))} FROM {_get_table(User)}
+            WHERE id BETWEEN %s AND %s
+            ON CONFLICT DO NOTHING
+            ''',
+            [user_start, user_start + plan.counts.users - 1]
+        )
+
+        log('Setting flags creators, counts and states')
+        cursor.execute(
+            f'''
+            UPDATE {flag_table} f SET creator_id = p.{_get_column(ArtistPost, 'poster')}
+            FROM {_get_table(ArtistPost)} p
+            WHERE f.id BETWEEN %s AND %s AND p.id = f.object_id
+            ''',
+            [flag_start, flag_end]
+        )
+        cursor.execute(
+            f'''
+            UPDATE {flag_table} f
+            SET count = c.count,
+                state = CASE WHEN c.count >= %s THEN %s ELSE %s END
+            FROM (
+                SELECT flag_id, COUNT(*) AS count FROM {instance_table}
+                WHERE flag_id BETWEEN %s AND %s
+                GROUP BY flag_id
+            ) c
+            WHERE f.id = c.flag_id
+            ''',
+            [
+                settings.CONTENT_IS_FLAGGED_COUNT, Flag.State.FLAGGED.value,
+                Flag.State.UNFLAGGED.value, flag_start, flag_end
+            ]
+        )
+
+        # Artists are tagged with their country when saved
+        log('Tagging artists')
+        artist_start = plan.starts['accounts.Artist']
+        for code in COUNTRIES:
+            tag, _ = ArtistTag.objects.get_or_create(name=countries.name(code))
+            cursor.execute(
+                f'''
+                INSERT INTO {_get_table(TaggedArtist)}
+                    ({_get_column(TaggedArtist, 'content_object')}, {_get_column(TaggedArtist, 'tag')})
+                SELECT id, %s FROM {_get_table(Artist)}
+                WHERE country = %s AND id BETWEEN %s AND %s
+                ''',
+                [tag.id, code, artist_start, artist_start + plan.counts.artists - 1]
+            )
+
+    for counter in COUNTERS:
+        log(f'Reconciling {counter.name}')
+        reconcile_counter(counter, chunk_size=50000)
+
+    with connection.cursor() as cursor:
+        for model in [UserType, *(spec.model for spec in TABLES.values())]:
+            cursor.execute(f'ANALYZE {_get_table(model)}')
@@ -0,0 +1,114 @@
+"""Measurement of the benchmarks and comparison with the baseline"""
+
+import json
+import statistics
+import time
+from contextlib import ExitStack
+from dataclasses import asdict, dataclass
+from django.db import connections
+
+# A benchmark is slower than its baseline if its p95 exceeds the baseline's by
+# more than this fraction and by more than NOISE_FLOOR_MS.
+DEFAULT_TOLERANCE = 0.25
+NOISE_FLOOR_MS = 1
+
+
+@dataclass
+class BenchmarkResult:
+    p50_ms: float
+    p95_ms: float
+    # Median number of SQL queries per iteration
+    queries: int
+
+
+class QueryCounter:
+    """Count the SQL queries executed on all the connections"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def measure(func, iterations, warmup=3) -> BenchmarkResult:
+    """Run `func` `warmup` times then measure `iterations` runs"""
+    for _ in range(warmup):
+        func()
+
+    durations, query_counts = [], []
+    for _ in range(iterations):
+        counter = QueryCounter()
+
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+
+            start = time.perf_counter()
+            func()
+            durations.append((time.perf_counter() - start) * 1000)
+
+        query_counts.append(counter.count)
+
+    durations.sort()
+    return BenchmarkResult(
+        p50_ms=round(statistics.median(durations), 3),
+        p95_ms=round(percentile(durations, 0.95), 3),
+        queries=round(statistics.median(query_counts))
+    )
+
+
+def load_baseline(path, scale) -> dict[str, BenchmarkResult]:
+    """Return the baseline results of `scale`, an empty dict if there are none"""
+    try:
+        with open(path) as file:
+            baselines = json.load(file)
+    except FileNotFoundError:
+        return {}
+
+    return {
+        name: BenchmarkResult(**result)
+        for name, result in baselines.get(scale, {}).items()
+    }
+
+
+def save_baseline(path, scale, results: dict[str, BenchmarkResult]):
+    """Store `results` as the baseline of `scale`, keeping the other benchmarks and scales"""
+    try:
+        with open(path) as file:
+            baselines = json.load(file)
+    except FileNotFoundError:
+        baselines = {}
+
+    baselines.setdefault(scale, {}).update({name: asdict(result) for name, result in results.items()})
+
+    with open(path, 'w') as file:
+        json.dump(baselines, file, indent=2, sort_keys=True)
+        file.write('\n')
+
+
+def get_regressions(results, baseline, tolerance=DEFAULT_TOLERANCE) -> list[str]:
+    """Return the description of each regression of `results` compared to `baseline`"""
+    regressions = []
+
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+
+        if result.queries > base.queries:
+            regressions.append(f'{name}: {result.queries} queries instead of {base.queries}')
+
+        max_p95 = base.p95_ms * (1 + tolerance)
+        if result.p95_ms > max_p95 and result.p95_ms - base.p95_ms > NOISE_FLOOR_MS:
+            regressions.append(
+                f'{name}: p95 is {result.p95_ms:.1f}ms, baseline is {base.p95_ms:.1f}ms'
+            )
+
+    return regressions
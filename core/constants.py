@@ -23,6 +23,36 @@ GENDERS = (
 FILE_STORAGE_CLASS = import_string(settings.DEFAULT_FILE_STORAGE)
 
 
+## Counters reconciliation (see core.counters)
+# Number of rows(ids) updated per transaction
+COUNTER_RECONCILIATION_CHUNK_SIZE = 1000
+# Maximum time(in seconds) to wait for the lock of the rows of a chunk
+COUNTER_RECONCILIATION_LOCK_TIMEOUT = 2
+
+
+## Content-addressed media store (see core.media)
+# Directory of the stored files, these never change so they can be cached forever
+MEDIA_STORE_DIR = 'cas'
+# Number of released files deleted per request(when the storage supports bulk deletion)
+MEDIA_STORE_DELETION_BATCH_SIZE = 1000
+
+
+## Concurrent storage writes (see core.storage_writer)
+# Maximum number of files written at the same time
+STORAGE_WRITE_MAX_WORKERS = 8
+# Number of retries of the writes failing with a transient error(eg. a timeout)
+STORAGE_WRITE_MAX_RETRIES = 3
+# Delay(in seconds) before the first retry, doubled for each retry
+STORAGE_WRITE_RETRY_DELAY = 0.2
+
+
+## Photo thumbnails (see core.thumbnails)
+# Aliases of settings.THUMBNAIL_ALIASES precomputed when photos are uploaded
+PHOTO_VARIANTS = ['thumb', 'sm_thumb']
+# Maximum width and height of the placeholders returned with photos
+PHOTO_PLACEHOLDER_SIZE = 16
+
+
 
 ## SESSION KEYS FORMAT
 
@@ -46,5 +76,10 @@ FILE_STORAGE_CLASS = import_string(settings.DEFAULT_FILE_STORAGE)
 # This dict contains video that has been uploaded but not yet posted under a post
 #
 #
+# `{user.username}-video-upload` which is a dict with the state of the resumable upload
+# of a video by the user(see posts.uploads). Once complete, the video is staged as
+# `{user.username}-unposted-video`.
+#
+#
 #
 
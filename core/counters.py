@@ -0,0 +1,414 @@
+"""
+Registry of the denormalized counters(num_... fields) of the project.
+
+A counter is the number of rows of a source table that reference a row of the
+counted table, eg. `ArtistPost.num_ancestor_comments` is the number of
+artist post comments(with no ancestor) whose `artist_post_concerned_id` is the post.
+
+The counters in `TRIGGER_COUNTERS` are maintained either in python (signals and
+`UserOperations.delete_*`) or by Postgres triggers, depending on
+`settings.COUNTER_MAINTENANCE_MODE`. The triggers are created by the migrations
+of this app and enabled or disabled after each migration according to that setting.
+
+All the counters(`COUNTERS`) can be checked with `manage.py check_counters` and
+repaired with `manage.py reconcile_counters`.
+"""
+
+import time
+from dataclasses import dataclass
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connection, connections, transaction
+
+from core.constants import (
+    COUNTER_RECONCILIATION_CHUNK_SIZE, COUNTER_RECONCILIATION_LOCK_TIMEOUT
+)
+
+SIGNALS_MODE = 'signals'
+TRIGGERS_MODE = 'triggers'
+COUNTER_MAINTENANCE_MODES = [SIGNALS_MODE, TRIGGERS_MODE]
+
+
+@dataclass(frozen=True)
+class Counter:
+    # Table and column of the counter, tables are of the form 'schema.table'
+    table: str
+    column: str
+    # Table whose rows are counted and its column referencing `table`
+    source_table: str
+    source_column: str
+    # Only source rows satisfying `condition_column condition` are counted,
+    # eg ('ancestor_comment_id', 'IS NULL')
+    condition_column: str = None
+    condition: str = None
+    # Source rows whose `soft_delete_column` is set(eg. posts marked as deleted,
+    # see posts.deletion) aren't counted
+    soft_delete_column: str = None
+    # Only rows of `table` satisfying this condition hold the counter
+    # (the counter is null for the other rows)
+    table_condition: str = None
+    # Aggregate computing the counter from the source rows
+    aggregate: str = 'COUNT(*)'
+
+    @property
+    def name(self):
+        return f"{self.table.split('.')[1]}_{self.column}"
+
+    @property
+    def trigger_name(self):
+        return f'counter_{self.name}'
+
+    def source_condition_sql(self, row):
+        """Return the counting condition applied to the source row `row`"""
+        conditions = []
+        if self.condition_column is not None:
+            conditions.append(f'{row}.{self.condition_column} {self.condition}')
+        if self.soft_delete_column is not None:
+            conditions.append(f'{row}.{self.soft_delete_column} IS NULL')
+
+        return ' AND '.join(conditions) or 'TRUE'
+
+
+def quote_table(table):
+    return '.'.join(f'"{part}"' for part in table.split('.'))
+
+
+def _get_post_counters(post_table, comment_table, post_column):
+    """
+    Counters of a type of post(artist posts or non artist posts),
+    `post_table` is the name of the posts table without the schema.
+    """
+    return [
+        Counter(
+            f'posts.{post_table}', 'num_ancestor_comments',
+            f'posts.{comment_table}', post_column,
+            'ancestor_comment_id', 'IS NULL'
+        ),
+        Counter(
+            f'posts.{post_table}', 'num_simple_reposts',
+            f'posts.{post_table}', 'parent_post_id',
+            'is_simple_repost', 'IS TRUE',
+            soft_delete_column='deleted_on'
+        ),
+        Counter(
+            f'posts.{post_table}', 'num_non_simple_reposts',
+            f'posts.{post_table}', 'parent_post_id',
+            'is_simple_repost', 'IS FALSE',
+            soft_delete_column='deleted_on'
+        ),
+        Counter(
+            f'posts.{comment_table}', 'num_replies',
+            f'posts.{comment_table}', 'parent_comment_id'
+        ),
+        Counter(
+            f'posts.{comment_table}', 'num_child_comments',
+            f'posts.{comment_table}', 'ancestor_comment_id',
+            table_condition='ancestor_comment_id IS NULL'
+        ),
+        # Parent posts have `is_simple_repost` set to null
+        Counter(
+            'accounts.user', f'num_{post_table}s',
+            f'posts.{post_table}', 'user_id',
+            'is_simple_repost', 'IS NULL',
+            soft_delete_column='deleted_on'
+        ),
+        Counter(
+            'accounts.user', f'num_{post_table}_reposts',
+            f'posts.{post_table}', 'user_id',
+            'is_simple_repost', 'IS NOT NULL',
+            soft_delete_column='deleted_on'
+        ),
+        Counter(
+            'accounts.user', f'num_ancestor_{post_table}_comments',
+            f'posts.{comment_table}', 'user_id',
+            'ancestor_comment_id', 'IS NULL'
+        ),
+    ]
+
+
+# Counters that are maintained by triggers in triggers mode
+TRIGGER_COUNTERS = [
+    *_get_post_counters('artist_post', 'artist_post_comment', 'artist_post_concerned_id'),
+    *_get_post_counters(
+        'non_artist_post',
+        'non_artist_post_comment',
+        'non_artist_post_concerned_id'
+    ),
+]
+
+
+def _get_post_interaction_counters(post_table, post_column):
+    """Counters of the interactions(ratings, likes...) with a type of post"""
+    comment_table = f'{post_table}_comment'
+
+    return [
+        Counter(
+            f'posts.{post_table}', 'num_stars',
+            f'posts.{post_table}_rating', post_column,
+            aggregate='SUM(num_stars)'
+        ),
+        Counter(
+            f'posts.{post_table}', 'num_bookmarks',
+            f'posts.{post_table}_bookmark', post_column
+        ),
+        Counter(
+            f'posts.{post_table}', 'num_downloads',
+            f'posts.{post_table}_download', post_column
+        ),
+        Counter(
+            f'posts.{comment_table}', 'num_likes',
+            f'posts.{comment_table}_like', f'{comment_table}_id'
+        ),
+    ]
+
+
+# All the counters, used to check and reconcile counters
+COUNTERS = [
+    *TRIGGER_COUNTERS,
+    *_get_post_interaction_counters('artist_post', 'artist_post_id'),
+    *_get_post_interaction_counters('non_artist_post', 'non_artist_post_id'),
+    Counter('accounts.user', 'num_followers', 'accounts.user_follow', 'followed_user_id'),
+    Counter('accounts.user', 'num_following', 'accounts.user_follow', 'follower_user_id'),
+    Counter('accounts.artist', 'num_followers', 'accounts.artist_follow', 'artist_id'),
+    Counter('flagging.flag', 'count', 'flagging.flag_instance', 'flag_id'),
+]
+
+
+def get_counter(name) -> Counter:
+    """Return the counter whose name is `name`, eg. 'artist_post_num_stars'"""
+    for counter in COUNTERS:
+        if counter.name == name:
+            return counter
+
+    raise KeyError(name)
+
+
+def get_counter_maintenance_mode():
+    mode = settings.COUNTER_MAINTENANCE_MODE
+
+    if mode not in COUNTER_MAINTENANCE_MODES:
+        raise ValueError(
+            f'COUNTER_MAINTENANCE_MODE should be one of {COUNTER_MAINTENANCE_MODES}, got {mode!r}'
+        )
+
+    return mode
+
+
+def counters_maintained_by_signals():
+    """
+    Return `True` if the counters in `TRIGGER_COUNTERS` should be updated in python.
+    Use this to guard the updates of those counters.
+    """
+    return get_counter_maintenance_mode() == SIGNALS_MODE
+
+
+def get_create_trigger_sql(counter: Counter):
+    """
+    Return the sql that creates the trigger(and its function) maintaining `counter`.
+    The counter is updated on insertion, deletion and on update of the
+    referencing or condition column of a source row.
+    """
+    schema = counter.table.split('.')[0]
+    table, source_table = quote_table(counter.table), quote_table(counter.source_table)
+    column, fk = counter.column, counter.source_column
+    old_condition = counter.source_condition_sql('OLD')
+    new_condition = counter.source_condition_sql('NEW')
+    update_columns = ', '.join(filter(None, [fk, counter.condition_column, counter.soft_delete_column]))
+
+    return f'''
+CREATE OR REPLACE FUNCTION "{schema}"."{counter.trigger_name}"() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.{fk} IS NOT DISTINCT FROM NEW.{fk}
+            AND ({old_condition}) = ({new_condition}) THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.{fk} IS NOT NULL AND {old_condition} THEN
+        UPDATE {table} SET {column} = GREATEST(COALESCE({column}, 0) - 1, 0)
+        WHERE id = OLD.{fk};
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.{fk} IS NOT NULL AND {new_condition} THEN
+        UPDATE {table} SET {column} = COALESCE({column}, 0) + 1
+        WHERE id = NEW.{fk};
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS {counter.trigger_name} ON {source_table};
+CREATE TRIGGER {counter.trigger_name}
+    AFTER INSERT OR DELETE OR UPDATE OF {update_columns} ON {source_table}
+    FOR EACH ROW EXECUTE FUNCTION "{schema}"."{counter.trigger_name}"();
+'''
+
+
+def get_drop_trigger_sql(counter: Counter):
+    schema = counter.table.split('.')[0]
+
+    return f'''
+DROP TRIGGER IF EXISTS {counter.trigger_name} ON {quote_table(counter.source_table)};
+DROP FUNCTION IF EXISTS "{schema}"."{counter.trigger_name}"();
+'''
+
+
+def get_triggers_state(using=None) -> dict[str, bool]:
+    """Return a dict mapping the name of each counter trigger to whether it is enabled"""
+    with (connections[using] if using else connection).cursor() as cursor:
+        cursor.execute(
+            'SELECT tgname, tgenabled != %s FROM pg_trigger WHERE tgname = ANY(%s)',
+            ['D', [counter.trigger_name for counter in TRIGGER_COUNTERS]]
+        )
+        return dict(cursor.fetchall())
+
+
+def sync_triggers_state(using=None):
+    """
+    Enable the counter triggers in triggers mode, else disable them.
+    Returns the names of the triggers that were altered.
+    """
+    return _set_triggers_state(get_counter_maintenance_mode() == TRIGGERS_MODE, using)
+
+
+def disable_triggers(using=None):
+    """
+    Disable the counter triggers whatever the mode, eg. during bulk loads whose
+    counters are reconciled afterwards. Restore them with `sync_triggers_state()`.
+    """
+    return _set_triggers_state(False, using)
+
+
+def _set_triggers_state(enable, using=None):
+    # Only the triggers whose state differs are altered since `ALTER TABLE` locks the table
+    triggers_state = get_triggers_state(using)
+    altered = []
+
+    with (connections[using] if using else connection).cursor() as cursor:
+        for counter in TRIGGER_COUNTERS:
+            enabled = triggers_state.get(counter.trigger_name)
+
+            # Trigger isn't installed(migrations not yet applied) or is in the right state
+            if enabled is None or enabled == enable:
+                continue
+
+            cursor.execute(
+                f'ALTER TABLE {quote_table(counter.source_table)} '
+                f'{"ENABLE" if enable else "DISABLE"} TRIGGER {counter.trigger_name}'
+            )
+            altered.append(counter.trigger_name)
+
+    return altered
+
+
+def _get_actual_values_sql(counter: Counter, id_range=False):
+    """
+    Return the sql selecting `(id, actual value)` of the rows of `counter.table`.
+    If `id_range` is `True`, only rows with ids between the parameters
+    `%(start_id)s` and `%(end_id)s` are selected.
+    """
+    range_condition = 'BETWEEN %(start_id)s AND %(end_id)s' if id_range else 'IS NOT NULL'
+    table_condition = f'AND t.{counter.table_condition}' if counter.table_condition else ''
+
+    return f'''
+SELECT t.id, COALESCE(s.num, 0) AS actual
+FROM {quote_table(counter.table)} t
+LEFT JOIN (
+    SELECT src.{counter.source_column} AS ref_id, {counter.aggregate} AS num
+    FROM {quote_table(counter.source_table)} src
+    WHERE {counter.source_condition_sql('src')} 
+        AND src.{counter.source_column} {range_condition}
+    GROUP BY src.{counter.source_column}
+) s ON s.ref_id = t.id
+WHERE t.id {range_condition} {table_condition}
+'''
+
+
+def get_counter_mismatches_sql(counter: Counter, limit=None):
+    """
+    Return the sql selecting `(id, stored value, actual value)` of the rows of
+    `counter.table` whose counter is wrong.
+    """
+    sql = f'''
+SELECT t.id, t.{counter.column}, a.actual
+FROM {quote_table(counter.table)} t
+JOIN ({_get_actual_values_sql(counter)}) a ON a.id = t.id
+WHERE t.{counter.column} IS DISTINCT FROM a.actual
+ORDER BY t.id
+'''
+    if limit:
+        sql += f'LIMIT {int(limit)}\n'
+
+    return sql
+
+
+def reconcile_counter(
+    counter: Counter,
+    chunk_size=COUNTER_RECONCILIATION_CHUNK_SIZE,
+    dry_run=False,
+    lock_timeout=COUNTER_RECONCILIATION_LOCK_TIMEOUT,
+    pause=0,
+    using=None
+):
+    """
+    Recompute `counter` for all the rows of its table and fix the wrong values.
+
+    The table is processed in chunks of `chunk_size` ids, each in a short transaction
+    that first locks the rows of the chunk(waiting at most `lock_timeout`) so that
+    concurrent increments can't be lost, then fixes them with a single set-based
+    `UPDATE ... FROM`. Chunks whose rows can't be locked in time are skipped.
+    `pause` is the number of seconds to wait between chunks to lower the load.
+
+    Returns a tuple `(number of drifted rows, number of skipped chunks)`.
+    In dry run mode, the drifted rows are only counted.
+    """
+    db = using or DEFAULT_DB_ALIAS
+    table, column = quote_table(counter.table), counter.column
+    actual_values_sql = _get_actual_values_sql(counter, id_range=True)
+    num_drifted, num_skipped = 0, 0
+
+    with connections[db].cursor() as cursor:
+        cursor.execute(f'SELECT MIN(id), MAX(id) FROM {table}')
+        min_id, max_id = cursor.fetchone()
+
+    if min_id is None:
+        return 0, 0
+
+    for start_id in range(min_id, max_id + 1, chunk_size):
+        params = {'start_id': start_id, 'end_id': start_id + chunk_size - 1}
+
+        try:
+            with transaction.atomic(using=db), connections[db].cursor() as cursor:
+                if dry_run:
+                    cursor.execute(
+                        f'''
+                        SELECT COUNT(*) FROM {table} t
+                        JOIN ({actual_values_sql}) a ON a.id = t.id
+                        WHERE t.{column} IS DISTINCT FROM a.actual
+                        ''',
+                        params
+                    )
+                    num_drifted += cursor.fetchone()[0]
+                else:
+                    cursor.execute('SET LOCAL lock_timeout = %s', [f'{int(lock_timeout * 1000)}ms'])
+                    cursor.execute(
+                        f'SELECT id FROM {table} WHERE id BETWEEN %(start_id)s AND %(end_id)s FOR UPDATE',
+                        params
+                    )
+                    cursor.execute(
+                        f'''
+                        UPDATE {table} t SET {column} = a.actual
+                        FROM ({actual_values_sql}) a
+                        WHERE a.id = t.id AND t.{column} IS DISTINCT FROM a.actual
+                        ''',
+                        params
+                    )
+                    num_drifted += cursor.rowcount
+        except OperationalError:
+            # Lock timeout, the rows are being updated. The chunk will be
+            # reconciled next time.
+            num_skipped += 1
+
+        if pause:
+            time.sleep(pause)
+
+    return num_drifted, num_skipped
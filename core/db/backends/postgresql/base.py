@@ -0,0 +1,139 @@
+"""
+PostgreSQL backend whose connections come from a process wide pool(see `core.db.pool`).
+
+Pooling is configured per alias with the `POOL` key of the database settings,
+see `DEFAULT_POOL_SETTINGS`. Closing a connection(at the end of a request,
+or after `CONN_MAX_AGE`) returns it to the pool.
+Since the schema aliases only differ by their `search_path`, they share a pool
+by default(`SHARED`): the search path is set when a connection is checked out,
+so that a request using several aliases reuses the same physical connections
+instead of opening a set of connections per alias.
+"""
+
+import re
+import psycopg2.extensions
+import psycopg2.extras
+from django.db import DEFAULT_DB_ALIAS
+from django.db.backends.postgresql import base
+
+from core.db.pool import DEFAULT_POOL_SETTINGS, ConnectionPool, get_pool
+from .creation import DatabaseCreation
+
+SEARCH_PATH_OPTION_RE = re.compile(r'-c\s*search_path=(\S+)')
+
+
+class PostgresConnectionPool(ConnectionPool):
+    def is_alive(self, connection):
+        return (
+            not connection.closed
+            and connection.info.transaction_status != psycopg2.extensions.TRANSACTION_STATUS_UNKNOWN
+        )
+
+    def ping(self, connection):
+        connection.autocommit = True
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+
+    def reset(self, connection):
+        if connection.info.transaction_status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+            connection.rollback()
+
+        # DISCARD can't run in a transaction block
+        connection.autocommit = True
+        with connection.cursor() as cursor:
+            cursor.execute('DISCARD ALL')
+
+
+def split_search_path(conn_params):
+    """Return the connection parameters without the search path option, and the search path"""
+    options = conn_params.get('options', '')
+    match = SEARCH_PATH_OPTION_RE.search(options)
+    if not match:
+        return conn_params, None
+
+    conn_params = dict(conn_params)
+    options = SEARCH_PATH_OPTION_RE.sub('', options).strip()
+    if options:
+        conn_params['options'] = options
+    else:
+        del conn_params['options']
+
+    return conn_params, match.group(1).split(',')
+
+
+def get_pool_settings(settings_dict):
+    return {**DEFAULT_POOL_SETTINGS, **(settings_dict.get('POOL') or {})}
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    creation_class = DatabaseCreation
+
+    def __init__(self, settings_dict, alias=DEFAULT_DB_ALIAS):
+        super().__init__(settings_dict, alias)
+        self.pool_settings = get_pool_settings(settings_dict)
+        # Pool of the current connection, `None` if it isn't pooled
+        self.pool = None
+
+    def get_pool(self, conn_params, isolation_level):
+        pool_settings = self.pool_settings
+        key = (
+            conn_params.get('database'),
+            repr(sorted(conn_params.items())),
+            isolation_level,
+        )
+
+        def connect():
+            connection = base.Database.connect(**conn_params)
+            if isolation_level is not None and isolation_level != connection.isolation_level:
+                connection.set_session(isolation_level=isolation_level)
+            # Same as django, json fields are decoded by the fields
+            psycopg2.extras.register_default_jsonb(conn_or_curs=connection, loads=lambda x: x)
+            return connection
+
+        return get_pool(key, lambda: PostgresConnectionPool(
+            connect,
+            max_size=pool_settings['MAX_SIZE'],
+            max_idle=pool_settings['MAX_IDLE'],
+            timeout=pool_settings['TIMEOUT'],
+            max_lifetime=pool_settings['MAX_LIFETIME'],
+            health_check_interval=pool_settings['HEALTH_CHECK_INTERVAL'],
+            reset_on_return=pool_settings['RESET_ON_RETURN'],
+        ))
+
+    def get_new_connection(self, conn_params):
+        if not self.pool_settings['ENABLED']:
+            return super().get_new_connection(conn_params)
+
+        search_path = None
+        if self.pool_settings['SHARED']:
+            conn_params, search_path = split_search_path(conn_params)
+
+        isolation_level = self.settings_dict['OPTIONS'].get('isolation_level')
+        pool = self.get_pool(conn_params, isolation_level)
+        connection = pool.checkout()
+
+        try:
+            if search_path:
+                connection.autocommit = True
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        'SET search_path TO ' +
+                        ', '.join(self.ops.quote_name(schema) for schema in search_path)
+                    )
+        except Exception:
+            pool.checkin(connection, discard=True)
+            raise
+
+        self.pool = pool
+        self.isolation_level = connection.isolation_level if isolation_level is None else isolation_level
+        return connection
+
+    def _close(self):
+        if self.pool is None or self.connection is None:
+            return super()._close()
+
+        pool, self.pool = self.pool, None
+        with self.wrap_database_errors:
+            # Closed in a transaction, django keeps a reference to the connection
+            # until the transaction is rolled back so it can't be reused.
+            pool.checkin(self.connection, discard=self.in_atomic_block)
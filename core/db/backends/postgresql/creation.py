@@ -0,0 +1,13 @@
+from django.db import connections
+from django.db.backends.postgresql.creation import DatabaseCreation as PostgresDatabaseCreation
+
+from core.db.pool import close_pools
+
+
+class DatabaseCreation(PostgresDatabaseCreation):
+    def _destroy_test_db(self, test_database_name, verbosity):
+        # Pooled connections to the test database, including those of the other
+        # aliases of the database, would prevent dropping it.
+        connections.close_all()
+        close_pools(lambda key: key[0] == test_database_name)
+        super()._destroy_test_db(test_database_name, verbosity)
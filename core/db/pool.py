@@ -0,0 +1,274 @@
+"""
+Process wide pools of database connections, used by the
+`core.db.backends.postgresql` backend.
+
+Django opens a connection per alias and closes it at the end of each request
+(or after `CONN_MAX_AGE`), connecting to postgres costs a few milliseconds
+(a process is forked by the server for each connection, plus TLS and authentication).
+Pooled connections are returned to the pool instead of being closed, and handed
+to the next request that needs one.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from django.db.utils import OperationalError
+
+DEFAULT_POOL_SETTINGS = {
+    'ENABLED': True,
+    # Maximum number of connections of a pool, in use or idle
+    'MAX_SIZE': 20,
+    # Maximum number of idle connections kept open, the others are closed when returned
+    'MAX_IDLE': 5,
+    # Seconds to wait for a connection when the pool is full
+    'TIMEOUT': 10,
+    # Connections are closed after this number of seconds, so that the server
+    # can release the memory they hold. `None` to keep them forever.
+    'MAX_LIFETIME': 30 * 60,
+    # Connections idle for more than this number of seconds are checked with
+    # `SELECT 1` before being handed out, 0 to always check them.
+    'HEALTH_CHECK_INTERVAL': 30,
+    # Whether the aliases that only differ by their `search_path` share a pool,
+    # the search path being set when a connection is checked out.
+    'SHARED': True,
+    # Whether to discard the session state(settings, temporary tables, cursors, ...)
+    # of connections returned to the pool.
+    'RESET_ON_RETURN': True,
+}
+
+
+class PoolTimeout(OperationalError):
+    pass
+
+
+class PooledConnection:
+    def __init__(self, connection):
+        self.connection = connection
+        self.created_on = self.returned_on = time.monotonic()
+
+
+class ConnectionPool:
+    """
+    Thread safe pool of at most `max_size` connections created with `connect()`.
+    Subclasses define how connections are checked(`is_alive()`, `ping()`)
+    and cleaned when returned(`reset()`).
+    """
+
+    def __init__(
+        self,
+        connect,
+        max_size=DEFAULT_POOL_SETTINGS['MAX_SIZE'],
+        max_idle=DEFAULT_POOL_SETTINGS['MAX_IDLE'],
+        timeout=DEFAULT_POOL_SETTINGS['TIMEOUT'],
+        max_lifetime=DEFAULT_POOL_SETTINGS['MAX_LIFETIME'],
+        health_check_interval=DEFAULT_POOL_SETTINGS['HEALTH_CHECK_INTERVAL'],
+        reset_on_return=DEFAULT_POOL_SETTINGS['RESET_ON_RETURN'],
+    ):
+        self.connect = connect
+        self.max_size = max_size
+        self.max_idle = max_idle
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.health_check_interval = health_check_interval
+        self.reset_on_return = reset_on_return
+
+        self.closed = False
+        self._idle = deque()
+        # id of checked out connection => PooledConnection
+        self._in_use = {}
+        self._condition = threading.Condition()
+        # Number of connections opened(idle or in use) or being opened
+        self._size = 0
+        self._num_waiting = 0
+        self.num_created = 0
+
+    def is_alive(self, connection):
+        return True
+
+    def ping(self, connection):
+        """Run a trivial query on the connection, raise an exception if it fails"""
+
+    def reset(self, connection):
+        """Make the connection ready for the next user, raise an exception if it fails"""
+
+    def close_connection(self, connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def _discard(self, pooled):
+        self.close_connection(pooled.connection)
+
+        with self._condition:
+            self._size -= 1
+            self._condition.notify()
+
+    def _is_expired(self, pooled):
+        return (
+            self.max_lifetime is not None
+            and time.monotonic() - pooled.created_on >= self.max_lifetime
+        )
+
+    def _is_healthy(self, pooled):
+        if not self.is_alive(pooled.connection) or self._is_expired(pooled):
+            return False
+
+        if time.monotonic() - pooled.returned_on < self.health_check_interval:
+            return True
+
+        try:
+            self.ping(pooled.connection)
+        except Exception:
+            return False
+
+        return True
+
+    def _acquire(self, deadline):
+        """Return an idle connection, or `None` if a new connection may be opened"""
+        with self._condition:
+            while True:
+                if self.closed:
+                    raise OperationalError('The connection pool is closed.')
+
+                if self._idle:
+                    # Most recently used first, the others can expire
+                    return self._idle.pop()
+
+                if self._size < self.max_size:
+                    self._size += 1
+                    return None
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolTimeout(
+                        f'No database connection available after {self.timeout}s '
+                        f'({self.max_size} connections in use).'
+                    )
+
+                self._num_waiting += 1
+                try:
+                    self._condition.wait(remaining)
+                finally:
+                    self._num_waiting -= 1
+
+    def checkout(self):
+        deadline = time.monotonic() + self.timeout
+
+        while True:
+            pooled = self._acquire(deadline)
+
+            if pooled is None:
+                try:
+                    pooled = PooledConnection(self.connect())
+                except BaseException:
+                    with self._condition:
+                        self._size -= 1
+                        self._condition.notify()
+                    raise
+
+                self.num_created += 1
+                break
+
+            if self._is_healthy(pooled):
+                break
+
+            self._discard(pooled)
+
+        with self._condition:
+            self._in_use[id(pooled.connection)] = pooled
+
+        return pooled.connection
+
+    def checkin(self, connection, discard=False):
+        with self._condition:
+            pooled = self._in_use.pop(id(connection), None)
+
+        if pooled is None:
+            # Not from this pool(eg. it was closed since)
+            self.close_connection(connection)
+            return
+
+        if not discard and self.is_alive(connection) and not self._is_expired(pooled):
+            try:
+                if self.reset_on_return:
+                    self.reset(connection)
+            except Exception:
+                discard = True
+        else:
+            discard = True
+
+        if not discard:
+            with self._condition:
+                if not self.closed and len(self._idle) < self.max_idle:
+                    pooled.returned_on = time.monotonic()
+                    self._idle.append(pooled)
+                    self._condition.notify()
+                    return
+
+        self._discard(pooled)
+
+    def close(self):
+        """Close the idle connections, those in use are closed when returned"""
+        with self._condition:
+            self.closed = True
+            idle, self._idle = self._idle, deque()
+            self._condition.notify_all()
+
+        for pooled in idle:
+            self._discard(pooled)
+
+    def get_stats(self):
+        with self._condition:
+            return {
+                'size': self._size,
+                'idle': len(self._idle),
+                'in_use': len(self._in_use),
+                'waiting': self._num_waiting,
+                'created': self.num_created,
+            }
+
+
+_pools = {}
+# Pools inherited from the parent process after a fork. Their connections belong to
+# the parent, they are kept referenced so that they don't get closed by the child.
+_inherited_pools = []
+_pools_pid = os.getpid()
+_pools_lock = threading.Lock()
+
+
+def get_pool(key, pool_factory):
+    """Return the pool of this process identified by `key`, creating it with `pool_factory()`"""
+    global _pools, _pools_pid
+
+    with _pools_lock:
+        if _pools_pid != os.getpid():
+            _inherited_pools.extend(_pools.values())
+            _pools, _pools_pid = {}, os.getpid()
+
+        pool = _pools.get(key)
+        if pool is None or pool.closed:
+            pool = _pools[key] = pool_factory()
+
+        return pool
+
+
+def close_pools(predicate=None):
+    """Close the pools of this process(those whose key matches `predicate` if given)"""
+    with _pools_lock:
+        if _pools_pid != os.getpid():
+            return
+
+        keys = [key for key in _pools if predicate is None or predicate(key)]
+        pools = [_pools.pop(key) for key in keys]
+
+    for pool in pools:
+        pool.close()
+
+
+def get_pools_stats():
+    with _pools_lock:
+        pools = list(_pools.items()) if _pools_pid == os.getpid() else []
+
+    return {key: pool.get_stats() for key, pool in pools}
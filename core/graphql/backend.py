@@ -0,0 +1,79 @@
+"""Graphql backend caching parsed and validated documents"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import partial
+from graphql.backend import GraphQLCoreBackend, GraphQLDocument
+from graphql.backend.core import execute_and_validate
+from graphql.execution import execute
+from graphql.language.base import parse
+from graphql.validation import validate
+
+from core.instrumentation import record_cache_hit
+
+
+def get_query_hash(query: str) -> str:
+    return hashlib.sha256(query.encode('utf-8')).hexdigest()
+
+
+class CachedDocumentBackend(GraphQLCoreBackend):
+    """
+    Backend keeping the documents of the last `max_size` distinct queries.
+    A query is parsed and validated against the schema the first time it is seen;
+    next executions of the same query skip both steps.
+    Invalid queries aren't cached.
+    """
+
+    def __init__(self, max_size=1000, executor=None):
+        super().__init__(executor=executor)
+        self.max_size = max_size
+        self._documents = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def document_from_string(self, schema, document_string):
+        # Documents(ast) passed directly aren't cached
+        if not isinstance(document_string, str) or not self.max_size:
+            return super().document_from_string(schema, document_string)
+
+        key = (id(schema), get_query_hash(document_string))
+
+        with self._lock:
+            document = self._documents.get(key)
+            if document is not None:
+                self._documents.move_to_end(key)
+                self.hits += 1
+                record_cache_hit()
+                return document
+            self.misses += 1
+
+        document_ast = parse(document_string)
+        if validate(schema, document_ast):
+            # Let the executor return the validation errors
+            return GraphQLDocument(
+                schema=schema,
+                document_string=document_string,
+                document_ast=document_ast,
+                execute=partial(execute_and_validate, schema, document_ast, **self.execute_params)
+            )
+
+        document = GraphQLDocument(
+            schema=schema,
+            document_string=document_string,
+            document_ast=document_ast,
+            execute=partial(execute, schema, document_ast, **self.execute_params)
+        )
+
+        with self._lock:
+            self._documents[key] = document
+            if len(self._documents) > self.max_size:
+                self._documents.popitem(last=False)
+
+        return document
+
+    def clear(self):
+        with self._lock:
+            self._documents.clear()
+            self.hits = self.misses = 0
@@ -0,0 +1,154 @@
+"""
+Static cost analysis of graphql queries.
+
+The cost of a query is estimated from its AST before it is executed:
+- each object field(field with a selection set) costs its weight, by default 1;
+  scalar fields are free;
+- the cost of the fields under a connection(or list) field is multiplied by the
+  number of items requested, that is its `first`/`last` argument, or by the
+  maximum page size if it is omitted.
+
+The depth of a query is its number of nested object fields, relay's `edges`
+and `node` fields aren't counted.
+"""
+
+from dataclasses import dataclass
+from django.conf import settings
+from graphql.language import ast
+
+# Fields that only wrap the items of a connection
+CONNECTION_WRAPPER_FIELDS = {'edges', 'node'}
+PAGINATION_ARGUMENTS = {'first', 'last'}
+
+DEFAULT_QUERY_COST_SETTINGS = {
+    # Queries costing more than this are rejected
+    'MAX_COST': 10000,
+    'MAX_DEPTH': 10,
+    # Weight of object fields that aren't in 'FIELD_COSTS'
+    'DEFAULT_FIELD_COST': 1,
+    # Weights per field name(as named in the schema, so camel cased)
+    'FIELD_COSTS': {},
+    # Each client(user or IP address) can spend at most 'THROTTLE_BUDGET' cost points
+    # per 'THROTTLE_PERIOD' seconds. Set 'THROTTLE_BUDGET' to None to disable throttling.
+    'THROTTLE_BUDGET': 200000,
+    'THROTTLE_PERIOD': 60,
+    # Number of proxies in front of the app that append the client address to the
+    # X-Forwarded-For header. If 0, the header(set by the clients) is ignored and
+    # the address of anonymous clients is REMOTE_ADDR.
+    'NUM_TRUSTED_PROXIES': 0,
+}
+
+
+def get_query_cost_settings():
+    return {**DEFAULT_QUERY_COST_SETTINGS, **getattr(settings, 'GRAPHQL_QUERY_COST', {})}
+
+
+@dataclass
+class QueryCost:
+    cost: int = 0
+    depth: int = 0
+
+
+class QueryCostAnalyzer:
+    def __init__(self, fragments, variables, field_costs=None, default_field_cost=1, max_page_size=100):
+        """
+        `fragments` maps fragment names to their definitions(`info.fragments`) and
+        `variables` maps variable names to their values(`info.variable_values`).
+        """
+        self.fragments = fragments or {}
+        self.variables = variables or {}
+        self.field_costs = field_costs or {}
+        self.default_field_cost = default_field_cost
+        self.max_page_size = max_page_size
+
+    def analyze(self, operation: ast.OperationDefinition) -> QueryCost:
+        result = QueryCost()
+        result.cost = self._get_selection_set_cost(operation.selection_set, 1, 0, result, set())
+        return result
+
+    def _get_argument_value(self, field: ast.Field, name):
+        for argument in field.arguments or []:
+            if argument.name.value != name:
+                continue
+
+            value = argument.value
+            if isinstance(value, ast.Variable):
+                return self.variables.get(value.name.value)
+            if isinstance(value, ast.IntValue):
+                return int(value.value)
+
+        return None
+
+    def _get_page_size(self, field: ast.Field):
+        """
+        Return the number of items requested by a connection field, `None` if the
+        field is not a connection.
+        """
+        sizes = [
+            self._get_argument_value(field, argument)
+            for argument in PAGINATION_ARGUMENTS
+        ]
+        sizes = [size for size in sizes if size is not None]
+
+        if sizes:
+            return max(0, min(max(sizes), self.max_page_size))
+
+        is_connection = any(
+            isinstance(selection, ast.Field) and selection.name.value == 'edges'
+            for selection in field.selection_set.selections
+        )
+        return self.max_page_size if is_connection else None
+
+    def _get_selection_set_cost(self, selection_set, multiplier, depth, result, visited_fragments):
+        cost = 0
+
+        for selection in selection_set.selections:
+            if isinstance(selection, ast.FragmentSpread):
+                name = selection.name.value
+                # Fragments can't be cyclic in valid queries, but queries are analyzed
+                # before being validated.
+                if name in visited_fragments or name not in self.fragments:
+                    continue
+
+                cost += self._get_selection_set_cost(
+                    self.fragments[name].selection_set, multiplier, depth,
+                    result, visited_fragments | {name}
+                )
+            elif isinstance(selection, ast.InlineFragment):
+                cost += self._get_selection_set_cost(
+                    selection.selection_set, multiplier, depth, result, visited_fragments
+                )
+            elif selection.selection_set is not None:
+                name = selection.name.value
+
+                # Introspection fields
+                if name.startswith('__'):
+                    continue
+
+                field_depth = depth
+                if name not in CONNECTION_WRAPPER_FIELDS:
+                    field_depth += 1
+                    result.depth = max(result.depth, field_depth)
+                    cost += multiplier * self.field_costs.get(name, self.default_field_cost)
+
+                page_size = self._get_page_size(selection)
+                child_multiplier = multiplier * page_size if page_size is not None else multiplier
+                cost += self._get_selection_set_cost(
+                    selection.selection_set, child_multiplier, field_depth,
+                    result, visited_fragments
+                )
+
+        return cost
+
+
+def get_operation_cost(info) -> QueryCost:
+    """Return the cost of the operation being executed"""
+    cost_settings = get_query_cost_settings()
+    analyzer = QueryCostAnalyzer(
+        info.fragments,
+        info.variable_values,
+        field_costs=cost_settings['FIELD_COSTS'],
+        default_field_cost=cost_settings['DEFAULT_FIELD_COST'],
+        max_page_size=settings.GRAPHENE.get('RELAY_CONNECTION_MAX_LIMIT', 100)
+    )
+    return analyzer.analyze(info.operation)
@@ -0,0 +1,23 @@
+"""Helpers to use dataloaders(batch loading) in the graphql api"""
+
+
+def get_loader(info, loader_class, *args):
+    """
+    Return the instance of `loader_class` (initialized with `args`) bound to the
+    current request, creating it if needed.
+
+    Dataloaders cache the values they load, so a loader should live for just
+    one request; that's why it is stored on the request(`info.context`).
+    """
+    context = info.context
+    loaders = getattr(context, '_dataloaders', None)
+
+    if loaders is None:
+        loaders = {}
+        context._dataloaders = loaders
+
+    key = (loader_class, *args)
+    if key not in loaders:
+        loaders[key] = loader_class(*args)
+
+    return loaders[key]
@@ -0,0 +1,126 @@
+"""Graphene middlewares, see settings.GRAPHENE['MIDDLEWARE']"""
+
+import logging
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from graphql import GraphQLError
+
+from core.instrumentation import get_current_recorder
+from .cost import get_operation_cost, get_query_cost_settings
+
+logger = logging.getLogger(__name__)
+
+
+def get_client_key(request):
+    """Return a key identifying the client making `request`, used for throttling"""
+    user = getattr(request, 'user', None)
+
+    if user is not None and user.is_authenticated:
+        return f'user-{user.pk}'
+
+    ip = request.META.get('REMOTE_ADDR')
+    num_proxies = get_query_cost_settings()['NUM_TRUSTED_PROXIES']
+
+    if num_proxies:
+        # The leftmost addresses are set by the client, only the address appended
+        # by the farthest trusted proxy can be relied on
+        forwarded_for = [
+            address.strip() for address in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',')
+            if address.strip()
+        ]
+        if len(forwarded_for) >= num_proxies:
+            ip = forwarded_for[-num_proxies]
+
+    return f'ip-{ip}'
+
+
+class QueryCostMiddleware:
+    """
+    Estimate the cost of each operation before it is executed and reject it if it
+    is too deep, too expensive or if the client has spent its budget.
+    The result is stored on the request as `request.query_cost`.
+    """
+
+    def resolve(self, next, root, info, **args):
+        # Only the root fields are checked; the analysis is done once per operation
+        if root is None:
+            error = self._check_operation(info)
+            if error:
+                raise error
+
+        return next(root, info, **args)
+
+    def _check_operation(self, info):
+        request = info.context
+
+        if not hasattr(request, 'query_cost'):
+            cost_settings = get_query_cost_settings()
+            request.query_cost = get_operation_cost(info)
+            request.query_cost_error = self._get_error(request, request.query_cost, cost_settings)
+
+            logger.info(
+                'graphql operation %s: cost=%s depth=%s rejected=%s',
+                info.operation.name.value if info.operation.name else '<anonymous>',
+                request.query_cost.cost,
+                request.query_cost.depth,
+                request.query_cost_error is not None
+            )
+
+        return request.query_cost_error
+
+    def _get_error(self, request, query_cost, cost_settings):
+        if query_cost.depth > cost_settings['MAX_DEPTH']:
+            return GraphQLError(
+                _('Query is too deep, maximum depth is %(max_depth)s')
+                % {'max_depth': cost_settings['MAX_DEPTH']},
+                extensions={'code': 'query_too_deep', 'depth': query_cost.depth}
+            )
+
+        if query_cost.cost > cost_settings['MAX_COST']:
+            return GraphQLError(
+                _('Query is too expensive, maximum cost is %(max_cost)s')
+                % {'max_cost': cost_settings['MAX_COST']},
+                extensions={'code': 'query_too_expensive', 'cost': query_cost.cost}
+            )
+
+        budget = cost_settings['THROTTLE_BUDGET']
+        if budget is not None:
+            key = f'{get_client_key(request)}-query-cost'
+            # Start a new period if the key has expired
+            cache.add(key, 0, cost_settings['THROTTLE_PERIOD'])
+
+            try:
+                spent = cache.incr(key, query_cost.cost)
+            except ValueError:
+                # Key expired between add and incr
+                cache.set(key, query_cost.cost, cost_settings['THROTTLE_PERIOD'])
+                spent = query_cost.cost
+
+            if spent > budget:
+                return GraphQLError(
+                    _('Too many requests, try again later'),
+                    extensions={'code': 'throttled', 'retry_after': cost_settings['THROTTLE_PERIOD']}
+                )
+
+        return None
+
+
+class InstrumentationMiddleware:
+    """
+    Record the time, SQL queries and cache hits of each resolver of the sampled
+    operations, see `core.instrumentation`.
+    Only the synchronous part of the resolvers is measured; the work of dataloaders
+    is attributed to the resolvers that trigger the batch.
+    """
+
+    def resolve(self, next, root, info, **args):
+        recorder = get_current_recorder()
+
+        if recorder is None:
+            return next(root, info, **args)
+
+        if root is None and info.operation.name:
+            recorder.operation_name = info.operation.name.value
+
+        with recorder.resolver(f'{info.parent_type.name}.{info.field_name}'):
+            return next(root, info, **args)
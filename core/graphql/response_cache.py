@@ -0,0 +1,294 @@
+"""
+Cache of whole graphql responses for anonymous read queries.
+
+Only queries whose root fields are all listed in `GRAPHQL_RESPONSE_CACHE['FIELDS']`
+are cached, since the response of these fields doesn't depend on the viewer once
+the viewer is anonymous. Each field has a time to live which is the maximum time
+its cached response can be stale; a response lives as long as its shortest
+root field TTL.
+
+Responses are also invalidated by tags: while a cacheable query is executed,
+`ResponseCacheTagMiddleware` records a tag such as `artist:<id>` for each model
+instance that is resolved, and the root fields add their configured collection
+tags(eg. `artist` for `allArtists`). Each tag has a version number stored in the
+cache; saving or deleting an instance bumps the versions of its tags
+(see `core.signals`), which makes the responses stored with older versions stale.
+The collection tag is only bumped when an instance is created or deleted, or when
+one of its `COLLECTION_FIELDS` changes; other updates(eg. of the counters) only
+bump the instance tag.
+"""
+
+import hashlib
+import json
+from django.conf import settings
+from django.core.cache import cache
+from django.db import models
+from graphql.language import ast
+from graphql.language.printer import print_ast
+from graphql_jwt.settings import jwt_settings
+from promise import is_thenable
+
+ANONYMOUS_SCOPE = 'anonymous'
+STATS_KEYS = {
+    'hits': 'response-cache-hits',
+    'misses': 'response-cache-misses',
+    'stale': 'response-cache-stale',
+}
+
+# Models whose instances are tagged, model => tag prefix
+TAGGED_MODELS = {
+    'accounts.Artist': 'artist',
+    'accounts.User': 'user',
+    'posts.ArtistPost': 'artist_post',
+    'posts.ArtistPostComment': 'artist_post_comment',
+    'posts.NonArtistPost': 'non_artist_post',
+    'posts.NonArtistPostComment': 'non_artist_post_comment',
+}
+
+
+# Fields whose change moves instances in or out of the cached lists or reorders them,
+# model => attnames. The counters aren't included, lists filtered or ordered by
+# counters are stale for at most the TTL of their fields.
+COLLECTION_FIELDS = {
+    'accounts.Artist': ['name', 'gender', 'country'],
+    'accounts.User': ['username', 'is_active'],
+    'posts.ArtistPost': ['artist_id', 'poster_id', 'parent_id', 'is_private', 'created_on', 'deleted_on'],
+    'posts.ArtistPostComment': ['post_concerned_id', 'parent_id', 'ancestor_id', 'created_on'],
+    'posts.NonArtistPost': ['poster_id', 'parent_id', 'is_private', 'created_on', 'deleted_on'],
+    'posts.NonArtistPostComment': ['post_concerned_id', 'parent_id', 'ancestor_id', 'created_on'],
+}
+
+# Attribute of the instances holding the values of their collection fields when loaded
+COLLECTION_VALUES_ATTRIBUTE = '_collection_values'
+
+
+def get_response_cache_settings():
+    return {
+        'ENABLED': True,
+        # Root field => (ttl in seconds, collection tags)
+        'FIELDS': {},
+        **getattr(settings, 'GRAPHQL_RESPONSE_CACHE', {})
+    }
+
+
+def _get_model_label(instance):
+    # Proxy models(eg. ArtistParentPost) share the tags of their concrete model
+    if instance._meta.proxy:
+        return instance._meta.concrete_model._meta.label
+    return instance._meta.label
+
+
+def get_instance_tag(instance):
+    """Return the tag of a model instance, `None` if its model isn't tagged"""
+    prefix = TAGGED_MODELS.get(_get_model_label(instance))
+    return f'{prefix}:{instance.pk}' if prefix else None
+
+
+def _get_collection_values(instance):
+    # Deferred fields aren't loaded
+    return {
+        attname: instance.__dict__.get(attname)
+        for attname in COLLECTION_FIELDS.get(_get_model_label(instance), [])
+    }
+
+
+def remember_collection_values(instance):
+    """Keep the values of the collection fields of `instance`, to tell whether they change"""
+    instance.__dict__[COLLECTION_VALUES_ATTRIBUTE] = _get_collection_values(instance)
+
+
+def collection_fields_changed(instance, update_fields=None) -> bool:
+    """Return `True` if a collection field of the saved `instance` may have changed"""
+    attnames = COLLECTION_FIELDS.get(_get_model_label(instance), [])
+
+    if update_fields is not None:
+        fields = [instance._meta.get_field(name) for name in update_fields]
+        return any(field.attname in attnames for field in fields)
+
+    previous_values = instance.__dict__.get(COLLECTION_VALUES_ATTRIBUTE)
+    if previous_values is None:
+        return True
+
+    return previous_values != _get_collection_values(instance)
+
+
+def _get_tag_version_key(tag):
+    return f'response-cache-tag-{tag}'
+
+
+def get_tag_versions(tags) -> dict:
+    keys = {_get_tag_version_key(tag): tag for tag in tags}
+    versions = cache.get_many(keys.keys())
+    return {tag: versions.get(key, 0) for key, tag in keys.items()}
+
+
+def bump_tags(*tags):
+    """Invalidate the cached responses having any of `tags`"""
+    for tag in tags:
+        key = _get_tag_version_key(tag)
+        # Versions must outlive the responses that reference them
+        if not cache.add(key, 1, None):
+            try:
+                cache.incr(key)
+            except ValueError:
+                cache.set(key, 1, None)
+
+
+def bump_instance_tags(instance, collection=True):
+    """
+    Invalidate the cached responses containing `instance`, and those containing
+    its collection if `collection` is `True`.
+    """
+    tag = get_instance_tag(instance)
+
+    if tag and collection:
+        bump_tags(tag, tag.split(':')[0])
+    elif tag:
+        bump_tags(tag)
+
+
+def _increment_stat(name):
+    key = STATS_KEYS[name]
+
+    if not cache.add(key, 1, None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, None)
+
+
+def get_response_cache_stats() -> dict:
+    values = cache.get_many(STATS_KEYS.values())
+    stats = {name: values.get(key, 0) for name, key in STATS_KEYS.items()}
+    lookups = stats['hits'] + stats['misses'] + stats['stale']
+    stats['hit_rate'] = stats['hits'] / lookups if lookups else 0
+
+    return stats
+
+
+def is_anonymous_request(request):
+    if request.META.get('HTTP_AUTHORIZATION'):
+        return False
+    if jwt_settings.JWT_COOKIE_NAME in request.COOKIES:
+        return False
+
+    user = getattr(request, 'user', None)
+    return user is None or not user.is_authenticated
+
+
+class CacheableQuery:
+    """A request whose response can be cached"""
+
+    def __init__(self, key, ttl, tags):
+        self.key = key
+        self.ttl = ttl
+        # Tags of the response, filled during the execution
+        self.tags = set(tags)
+
+    def get(self):
+        """Return the cached `(response, status code)`, `None` if there is none or it is stale"""
+        entry = cache.get(self.key)
+
+        if entry is None:
+            _increment_stat('misses')
+            return None
+
+        if get_tag_versions(entry['tags'].keys()) != entry['tags']:
+            _increment_stat('stale')
+            return None
+
+        _increment_stat('hits')
+        return entry['response'], entry['status_code']
+
+    def set(self, response, status_code, tag_versions):
+        """
+        Cache the response. `tag_versions` should be the versions of the tags
+        read before the execution so that invalidations that happened during
+        the execution make the response stale.
+        """
+        versions = {**get_tag_versions(self.tags - tag_versions.keys()), **tag_versions}
+        cache.set(
+            self.key,
+            {'response': response, 'status_code': status_code, 'tags': versions},
+            self.ttl
+        )
+
+
+def get_cacheable_query(request, document_ast, variables, operation_name):
+    """
+    Return a `CacheableQuery` if the response to the query can be cached,
+    otherwise return `None`.
+    """
+    cache_settings = get_response_cache_settings()
+
+    if not cache_settings['ENABLED'] or not is_anonymous_request(request):
+        return None
+
+    operations = [
+        definition for definition in document_ast.definitions
+        if isinstance(definition, ast.OperationDefinition)
+        and (
+            operation_name is None
+            or (definition.name and definition.name.value == operation_name)
+        )
+    ]
+    if len(operations) != 1 or operations[0].operation != 'query':
+        return None
+
+    ttls, tags = [], set()
+    for selection in operations[0].selection_set.selections:
+        # Fragments at the root aren't analyzed, don't cache such queries
+        if not isinstance(selection, ast.Field):
+            return None
+
+        # __typename
+        if selection.name.value.startswith('__'):
+            continue
+
+        field_config = cache_settings['FIELDS'].get(selection.name.value)
+        if field_config is None:
+            return None
+
+        ttl, field_tags = field_config
+        ttls.append(ttl)
+        tags.update(field_tags)
+
+    if not ttls:
+        return None
+
+    # print_ast normalizes the query's formatting
+    key_data = json.dumps(
+        [print_ast(document_ast), variables or {}, operation_name, ANONYMOUS_SCOPE],
+        sort_keys=True,
+        default=str
+    )
+    key = f"graphql-response-{hashlib.sha256(key_data.encode('utf-8')).hexdigest()}"
+
+    return CacheableQuery(key, min(ttls), tags)
+
+
+class ResponseCacheTagMiddleware:
+    """Record the tags of the model instances resolved by a cacheable query"""
+
+    def resolve(self, next, root, info, **args):
+        result = next(root, info, **args)
+        cacheable_query = getattr(info.context, 'cacheable_query', None)
+
+        if cacheable_query is None:
+            return result
+
+        if is_thenable(result):
+            return result.then(lambda value: self._tag(cacheable_query, value))
+
+        return self._tag(cacheable_query, result)
+
+    def _tag(self, cacheable_query, value):
+        values = value if isinstance(value, (list, tuple)) else [value]
+
+        for item in values:
+            if isinstance(item, models.Model):
+                tag = get_instance_tag(item)
+                if tag:
+                    cacheable_query.tags.add(tag)
+
+        return value
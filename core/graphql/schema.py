@@ -14,6 +14,8 @@ from accounts.graphql.users.mutations import (
     DeactivateAccount, ReactivateAccount, UserLogout,
     ToggleIsMod, MarkUserVerified, UpdateProfilePic, UpdateCoverPhoto
 )
+from flagging.graphql.mutations import ClaimModerationItems, ReleaseModerationItems
+from flagging.graphql.queries import ModerationQuery
 from posts.graphql.artist_posts.mutations import (
     CreateArtistPost, DeleteArtistPost, RepostArtistPost, 
     RecordArtistPostDownload, BookmarkArtistPost, RemoveArtistPostBookmark, 
@@ -31,8 +33,10 @@ from posts.graphql.artist_posts.queries import (
 from posts.graphql.common.mutations import (
     DeleteImagesMutation, MultipleImageUploadMutation,
     VideoUploadMutation, DeleteUploadedVideoMutation,
-    AudioUploadMutation
+    AudioUploadMutation, BatchEngage, InitVideoUploadMutation,
+    AppendVideoChunkMutation, CompleteVideoUploadMutation
 )
+from posts.graphql.common.queries import VideoUploadQuery
 from posts.graphql.non_artist_posts.queries import (
     NonArtistPostQuery, 
 )
@@ -42,7 +46,7 @@ from posts.graphql.non_artist_posts.queries import (
 class Query(
     UserQuery, MeQuery, ArtistQuery, 
     ArtistPostQuery, ArtistPostCommentQuery,
-    NonArtistPostQuery, 
+    NonArtistPostQuery, ModerationQuery, VideoUploadQuery,
     graphene.ObjectType
 ):
     debug = graphene.Field(DjangoDebug, name='_debug')
@@ -57,7 +61,11 @@ class Mutation(AuthRelayMutation, graphene.ObjectType):
     delete_post_images = DeleteImagesMutation.Field()
     upload_post_audio = AudioUploadMutation.Field()
     upload_post_video = VideoUploadMutation.Field()
+    init_post_video_upload = InitVideoUploadMutation.Field()
+    append_post_video_chunk = AppendVideoChunkMutation.Field()
+    complete_post_video_upload = CompleteVideoUploadMutation.Field()
     delete_post_video = DeleteUploadedVideoMutation.Field()
+    batch_engage = BatchEngage.Field()
 
     ## Extra user mutations
     patch_user = PatchUser.Field()
@@ -118,6 +126,10 @@ class Mutation(AuthRelayMutation, graphene.ObjectType):
     unpin_pinned_artist_post_comment = UnpinPinnedArtistPostComment.Field()
     delete_flagged_artist_post_comment = DeleteFlaggedArtistPostComment.Field()
 
+    ## Moderation mutations
+    claim_moderation_items = ClaimModerationItems.Field()
+    release_moderation_items = ReleaseModerationItems.Field()
+
 
 schema = graphene.Schema(query=Query, mutation=Mutation)
 
@@ -0,0 +1,183 @@
+import json
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponseBadRequest
+from graphene_django.views import HttpError
+from graphene_file_upload.django import FileUploadGraphQLView
+from graphql import GraphQLError
+from graphql.execution import ExecutionResult
+
+from core.instrumentation import instrument_operation, record_cache_hit
+from core.routers import use_replica
+from .backend import CachedDocumentBackend, get_query_hash
+from .response_cache import get_cacheable_query, get_tag_versions
+
+# Shared by all the views so that documents are cached across requests
+document_backend = CachedDocumentBackend(max_size=settings.GRAPHQL_DOCUMENT_CACHE_SIZE)
+
+
+def get_persisted_query_cache_key(query_hash):
+    return f'persisted-query-{query_hash}'
+
+
+def get_invalid_persisted_query_error(message):
+    return GraphQLError(message, extensions={'code': 'PERSISTED_QUERY_INVALID'})
+
+
+class PersistedQueryGraphQLView(FileUploadGraphQLView):
+    """
+    Graphql view supporting automatic persisted queries(Apollo's protocol) and
+    caching the responses of anonymous read queries(see `.response_cache`).
+
+    The client sends the sha256 hash of the query in
+    `extensions.persistedQuery.sha256Hash` without the query. If the hash is unknown,
+    a `PersistedQueryNotFound` error is returned and the client sends the query
+    along with its hash; the query is then stored and later requests only need the hash.
+    """
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('backend', document_backend)
+        super().__init__(*args, **kwargs)
+
+    @staticmethod
+    def get_persisted_query_hash(request, data):
+        """Return the hash of the persisted query sent, raise a `GraphQLError` if it is invalid"""
+        extensions = request.GET.get('extensions') or data.get('extensions')
+
+        if not extensions:
+            return None
+
+        if isinstance(extensions, str):
+            try:
+                extensions = json.loads(extensions)
+            except ValueError:
+                raise HttpError(HttpResponseBadRequest('Extensions are invalid JSON.'))
+
+        if not isinstance(extensions, dict):
+            raise get_invalid_persisted_query_error('extensions should be an object')
+
+        persisted_query = extensions.get('persistedQuery') or {}
+        if not isinstance(persisted_query, dict):
+            raise get_invalid_persisted_query_error('persistedQuery should be an object')
+
+        query_hash = persisted_query.get('sha256Hash')
+        if query_hash is not None and not isinstance(query_hash, str):
+            raise get_invalid_persisted_query_error('sha256Hash should be a string')
+
+        return query_hash
+
+    def get_persisted_query(self, request, data):
+        """Return the persisted query whose hash was sent, if it is known"""
+        try:
+            query_hash = self.get_persisted_query_hash(request, data)
+        except GraphQLError:
+            # The error will be returned on execution
+            return None
+
+        return cache.get(get_persisted_query_cache_key(query_hash)) if query_hash else None
+
+    def get_cacheable_query(self, request, data):
+        query, variables, operation_name, _ = self.get_graphql_params(request, data)
+        query = query or self.get_persisted_query(request, data)
+
+        if not query:
+            return None
+
+        try:
+            document = self.get_backend(request).document_from_string(self.schema, query)
+        except Exception:
+            # Invalid query, the error will be returned on execution
+            return None
+
+        return get_cacheable_query(request, document.document_ast, variables, operation_name)
+
+    def get_response(self, request, data, show_graphiql=False):
+        operation_name = self.get_graphql_params(request, data)[2]
+
+        # The name is replaced by the one in the query once it's executed
+        with instrument_operation(operation_name):
+            return self._get_response(request, data, show_graphiql)
+
+    def _get_response(self, request, data, show_graphiql=False):
+        cacheable_query = self.get_cacheable_query(request, data)
+
+        if cacheable_query is None:
+            return super().get_response(request, data, show_graphiql)
+
+        cached_response = cacheable_query.get()
+        if cached_response is not None:
+            record_cache_hit()
+            return cached_response
+
+        # Versions of the collection tags before execution, so that a concurrent
+        # invalidation makes the response stale.
+        tag_versions = get_tag_versions(cacheable_query.tags)
+
+        # Lets ResponseCacheTagMiddleware record the tags of the response
+        request.cacheable_query = cacheable_query
+        try:
+            result, status_code = super().get_response(request, data, show_graphiql)
+        finally:
+            request.cacheable_query = None
+
+        if status_code == 200 and result and not request.graphql_has_errors:
+            cacheable_query.set(result, status_code, tag_versions)
+
+        return result, status_code
+
+    def execute_graphql_request(
+        self, request, data, query, variables, operation_name, show_graphiql=False
+    ):
+        result = self._execute_graphql_request(
+            request, data, query, variables, operation_name, show_graphiql
+        )
+        request.graphql_has_errors = bool(result and result.errors)
+
+        return result
+
+    def _execute_graphql_request(
+        self, request, data, query, variables, operation_name, show_graphiql=False
+    ):
+        try:
+            query_hash = self.get_persisted_query_hash(request, data)
+        except GraphQLError as error:
+            return ExecutionResult(errors=[error], invalid=True)
+
+        if query_hash:
+            key = get_persisted_query_cache_key(query_hash)
+
+            if query:
+                if get_query_hash(query) != query_hash:
+                    return ExecutionResult(
+                        errors=[GraphQLError(
+                            'provided sha does not match query',
+                            extensions={'code': 'PERSISTED_QUERY_HASH_MISMATCH'}
+                        )],
+                        invalid=True
+                    )
+                cache.set(key, query, settings.GRAPHQL_PERSISTED_QUERY_TIMEOUT)
+            else:
+                query = cache.get(key)
+
+                if query is None:
+                    return ExecutionResult(errors=[GraphQLError(
+                        'PersistedQueryNotFound',
+                        extensions={'code': 'PERSISTED_QUERY_NOT_FOUND'}
+                    )])
+
+        # Queries can read from a replica, mutations use the primary
+        with use_replica(self.get_operation_type(request, query, operation_name) == 'query'):
+            return super().execute_graphql_request(
+                request, data, query, variables, operation_name, show_graphiql
+            )
+
+    def get_operation_type(self, request, query, operation_name):
+        if not query:
+            return None
+
+        try:
+            document = self.get_backend(request).document_from_string(self.schema, query)
+            return document.get_operation_type(operation_name)
+        except Exception:
+            # Invalid query, the error will be returned on execution
+            return None
@@ -0,0 +1,301 @@
+"""
+Low overhead instrumentation of graphql operations.
+
+A sample of the operations(see `INSTRUMENTATION['SAMPLE_RATE']`) is recorded:
+the wall time, number and duration of SQL queries and number of cache hits of
+the operation and of each resolver(`ParentType.field`). SQL queries are
+captured with `connection.execute_wrapper` and attributed to the resolver
+being executed, see `core.graphql.middleware.InstrumentationMiddleware`.
+
+Each process aggregates the recorded data in memory and regularly merges it
+into the cache so that the metrics of all the processes can be exported(as
+Prometheus text by `core.views.metrics`) and inspected with the
+`top_offenders` command. Operations slower than `SLOW_OPERATION_MS` are logged.
+"""
+
+import logging
+import os
+import random
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+METRICS_CACHE_KEY = 'instrumentation-metrics'
+METRICS_LOCK_KEY = 'instrumentation-metrics-lock'
+# Fields of each aggregated entry
+STAT_FIELDS = ('count', 'time', 'max_time', 'sql_count', 'sql_time', 'cache_hits', 'errors')
+
+DEFAULT_INSTRUMENTATION_SETTINGS = {
+    'ENABLED': True,
+    # Fraction of the operations that are recorded
+    'SAMPLE_RATE': 0.05,
+    # Operations slower than this(in milliseconds) are logged
+    'SLOW_OPERATION_MS': 1000,
+    # Minimum time(in seconds) between two merges of a process' data into the cache
+    'FLUSH_INTERVAL': 30,
+    # Requests to the metrics endpoint must send this token as
+    # `Authorization: Bearer <token>`, unless they are made by a staff user.
+    'METRICS_TOKEN': None,
+}
+
+_current_recorder = ContextVar('instrumentation_recorder', default=None)
+
+
+def get_instrumentation_settings():
+    return {**DEFAULT_INSTRUMENTATION_SETTINGS, **getattr(settings, 'INSTRUMENTATION', {})}
+
+
+def _new_stats():
+    return dict.fromkeys(STAT_FIELDS, 0)
+
+
+def _add_stats(stats, other):
+    for field in STAT_FIELDS:
+        if field == 'max_time':
+            stats[field] = max(stats[field], other[field])
+        else:
+            stats[field] += other[field]
+
+
+class OperationRecorder:
+    """Data recorded during the execution of an operation"""
+
+    def __init__(self, operation_name, sampled):
+        self.operation_name = operation_name
+        self.sampled = sampled
+        self.stats = _new_stats()
+        # Resolver => stats
+        self.resolvers = {}
+        # Stack of the resolvers being executed, SQL queries are attributed to the last one
+        self._resolver_stack = []
+
+    def _get_resolver_stats(self, resolver):
+        stats = self.resolvers.get(resolver)
+        if stats is None:
+            stats = self.resolvers[resolver] = _new_stats()
+
+        return stats
+
+    @contextmanager
+    def resolver(self, name):
+        self._resolver_stack.append(name)
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self._get_resolver_stats(name)['errors'] += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            self._resolver_stack.pop()
+
+            stats = self._get_resolver_stats(name)
+            stats['count'] += 1
+            stats['time'] += elapsed
+            stats['max_time'] = max(stats['max_time'], elapsed)
+
+    def record_query(self, elapsed):
+        self.stats['sql_count'] += 1
+        self.stats['sql_time'] += elapsed
+
+        if self._resolver_stack:
+            stats = self._get_resolver_stats(self._resolver_stack[-1])
+            stats['sql_count'] += 1
+            stats['sql_time'] += elapsed
+
+    def record_cache_hit(self):
+        self.stats['cache_hits'] += 1
+
+        if self._resolver_stack:
+            self._get_resolver_stats(self._resolver_stack[-1])['cache_hits'] += 1
+
+    def sql_wrapper(self, execute, sql, params, many, context):
+        """Execute wrapper recording the duration of each query"""
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.record_query(time.perf_counter() - start)
+
+
+def get_current_recorder():
+    """Return the recorder of the sampled operation being executed, if any"""
+    recorder = _current_recorder.get()
+    return recorder if recorder is not None and recorder.sampled else None
+
+
+def record_cache_hit():
+    recorder = get_current_recorder()
+    if recorder is not None:
+        recorder.record_cache_hit()
+
+
+@contextmanager
+def instrument_operation(operation_name=None):
+    """
+    Record the operation executed in this block. Yield the recorder, whose
+    `operation_name` can be set during the execution(eg. once the query is parsed).
+    """
+    instrumentation_settings = get_instrumentation_settings()
+    if not instrumentation_settings['ENABLED']:
+        yield None
+        return
+
+    sampled = random.random() < instrumentation_settings['SAMPLE_RATE']
+    recorder = OperationRecorder(operation_name, sampled)
+    token = _current_recorder.set(recorder)
+    start = time.perf_counter()
+
+    try:
+        with ExitStack() as stack:
+            if sampled:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(recorder.sql_wrapper))
+            yield recorder
+    except Exception:
+        recorder.stats['errors'] += 1
+        raise
+    finally:
+        _current_recorder.reset(token)
+        elapsed = time.perf_counter() - start
+        recorder.stats['count'] = 1
+        recorder.stats['time'] = recorder.stats['max_time'] = elapsed
+
+        if elapsed * 1000 >= instrumentation_settings['SLOW_OPERATION_MS']:
+            _log_slow_operation(recorder)
+
+        if sampled:
+            aggregates.add(recorder)
+            aggregates.flush_if_due(instrumentation_settings['FLUSH_INTERVAL'])
+
+
+def _log_slow_operation(recorder):
+    stats = recorder.stats
+    slowest_resolvers = sorted(
+        recorder.resolvers.items(), key=lambda item: item[1]['time'], reverse=True
+    )[:5]
+
+    logger.warning(
+        'slow graphql operation %s: time=%.1fms sql_count=%s sql_time=%.1fms '
+        'cache_hits=%s sampled=%s slowest resolvers=%s',
+        recorder.operation_name or '<anonymous>',
+        stats['time'] * 1000,
+        stats['sql_count'],
+        stats['sql_time'] * 1000,
+        stats['cache_hits'],
+        recorder.sampled,
+        ', '.join(
+            f"{name}({resolver_stats['time'] * 1000:.1f}ms, {resolver_stats['sql_count']} queries)"
+            for name, resolver_stats in slowest_resolvers
+        )
+    )
+
+
+class Aggregates:
+    """Data of the sampled operations of this process not yet merged into the cache"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._reset()
+
+    def _reset(self):
+        self.operations = {}
+        self.resolvers = {}
+
+    def add(self, recorder: OperationRecorder):
+        name = recorder.operation_name or '<anonymous>'
+
+        with self._lock:
+            _add_stats(self.operations.setdefault(name, _new_stats()), recorder.stats)
+
+            for resolver, stats in recorder.resolvers.items():
+                _add_stats(self.resolvers.setdefault(resolver, _new_stats()), stats)
+
+    def flush_if_due(self, interval):
+        if time.monotonic() - self._last_flush >= interval:
+            self.flush()
+
+    def flush(self):
+        """
+        Merge the data into the cache. If another process is merging its data,
+        the data is kept and merged on the next flush.
+        """
+        # Processes are serialized with a lock in the cache
+        if not cache.add(METRICS_LOCK_KEY, os.getpid(), 10):
+            return False
+
+        try:
+            with self._lock:
+                operations, resolvers = self.operations, self.resolvers
+                self._reset()
+                self._last_flush = time.monotonic()
+
+            metrics = get_metrics()
+            for key, entries in (('operations', operations), ('resolvers', resolvers)):
+                for name, stats in entries.items():
+                    _add_stats(metrics[key].setdefault(name, _new_stats()), stats)
+
+            cache.set(METRICS_CACHE_KEY, metrics, None)
+        finally:
+            cache.delete(METRICS_LOCK_KEY)
+
+        return True
+
+
+aggregates = Aggregates()
+
+
+def get_metrics() -> dict:
+    """Return the metrics merged by all the processes"""
+    return cache.get(METRICS_CACHE_KEY) or {'operations': {}, 'resolvers': {}}
+
+
+def reset_metrics():
+    cache.delete(METRICS_CACHE_KEY)
+
+
+def get_top_offenders(entries: dict, sort_by='sql_count', limit=10) -> list:
+    """Return the `limit` (name, stats) of `entries` having the highest `sort_by`"""
+    return sorted(entries.items(), key=lambda item: item[1][sort_by], reverse=True)[:limit]
+
+
+def _escape_label(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def render_prometheus(metrics) -> str:
+    """Return the metrics in Prometheus' text exposition format"""
+    lines = []
+    definitions = (
+        ('operations', 'graphql_operation', 'operation'),
+        ('resolvers', 'graphql_resolver', 'field'),
+    )
+    samples = (
+        ('executions_total', 'count', 'counter', 'Number of executions'),
+        ('duration_seconds_total', 'time', 'counter', 'Total wall time'),
+        ('duration_seconds_max', 'max_time', 'gauge', 'Maximum wall time'),
+        ('sql_queries_total', 'sql_count', 'counter', 'Number of SQL queries'),
+        ('sql_duration_seconds_total', 'sql_time', 'counter', 'Time spent in SQL queries'),
+        ('cache_hits_total', 'cache_hits', 'counter', 'Number of cache hits'),
+        ('errors_total', 'errors', 'counter', 'Number of failed executions'),
+    )
+
+    for key, prefix, label in definitions:
+        entries = metrics[key]
+
+        for suffix, field, metric_type, description in samples:
+            name = f'{prefix}_{suffix}'
+            lines.append(f'# HELP {name} {description} of the sampled {key}')
+            lines.append(f'# TYPE {name} {metric_type}')
+
+            for entry_name, stats in sorted(entries.items()):
+                lines.append(f'{name}{{{label}="{_escape_label(entry_name)}"}} {stats[field]}')
+
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,65 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from benchmarks.runner import measure
+from core.db.backends.postgresql.base import DatabaseWrapper
+from core.db.pool import get_pools_stats
+
+# Aliases used by a typical request(eg. reading a post and the notifications of the viewer)
+DEFAULT_ALIASES = ['accounts', 'posts', 'notifications']
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure the connection overhead of a request using several database aliases: '
+        'with a new connection per alias(no pooling), with pooled connections and with '
+        'persistent connections, which is the floor.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'aliases', nargs='*', metavar='alias',
+            help=f'Aliases used by each request, default: {", ".join(DEFAULT_ALIASES)}.'
+        )
+        parser.add_argument('--iterations', type=int, default=200)
+
+    def handle(self, *args, **options):
+        aliases = options['aliases'] or DEFAULT_ALIASES
+        unknown_aliases = set(aliases) - set(settings.DATABASES)
+        if unknown_aliases:
+            raise CommandError(f'Unknown aliases: {", ".join(sorted(unknown_aliases))}')
+
+        if not all(isinstance(connections[alias], DatabaseWrapper) for alias in aliases):
+            raise CommandError('The aliases should use the core.db.backends.postgresql engine.')
+
+        iterations = options['iterations']
+        results = {
+            'unpooled': measure(lambda: self.run_request(aliases, pooled=False), iterations),
+            'pooled': measure(lambda: self.run_request(aliases, pooled=True), iterations),
+            'persistent': measure(lambda: self.run_request(aliases, close=False), iterations),
+        }
+        for alias in aliases:
+            connections[alias].close()
+
+        for name, result in results.items():
+            self.stdout.write(f'{name}: p50={result.p50_ms:.3f}ms p95={result.p95_ms:.3f}ms')
+
+        self.stdout.write(
+            f'pooling saves {results["unpooled"].p50_ms - results["pooled"].p50_ms:.3f}ms per request'
+        )
+        for key, stats in get_pools_stats().items():
+            self.stdout.write(f'pool of {key[0]}: {stats}')
+
+    def run_request(self, aliases, pooled=True, close=True):
+        for alias in aliases:
+            connection = connections[alias]
+            connection.pool_settings = {**connection.pool_settings, 'ENABLED': pooled}
+
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+
+        # Like django does at the end of requests
+        if close:
+            for alias in aliases:
+                connections[alias].close()
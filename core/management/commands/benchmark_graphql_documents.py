@@ -0,0 +1,62 @@
+from django.core.management.base import BaseCommand
+from graphene_django.settings import graphene_settings
+from graphql.language.base import parse
+from graphql.utils.introspection_query import introspection_query
+from graphql.validation import validate
+
+from benchmarks.runner import measure
+from core.graphql.backend import CachedDocumentBackend
+
+SAMPLE_QUERIES = {
+    'artist_posts': '''
+        query ArtistPosts($first: Int) {
+            allArtistPosts(first: $first) {
+                edges {
+                    node {
+                        pk uuid body createdOn numStars numAncestorComments
+                        viewerHasRated viewerHasBookmarked
+                        poster { username displayName }
+                        artist { name slug }
+                        photos { edges { node { url } } }
+                    }
+                }
+            }
+        }
+    ''',
+    'comment_thread': '''
+        query Thread($id: ID) {
+            artistPostCommentThread(id: $id) {
+                comment { pk body numLikes viewerHasLiked }
+                replies {
+                    comment { pk body }
+                    replies { comment { pk body } numHiddenReplies }
+                }
+            }
+        }
+    ''',
+    'introspection': introspection_query,
+}
+
+
+class Command(BaseCommand):
+    help = 'Measure the time spent parsing and validating queries with and without the document cache.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=200)
+
+    def handle(self, *args, **options):
+        schema = graphene_settings.SCHEMA
+        iterations = options['iterations']
+
+        for name, query in SAMPLE_QUERIES.items():
+            uncached = measure(lambda: validate(schema, parse(query)), iterations)
+
+            backend = CachedDocumentBackend(max_size=10)
+            backend.document_from_string(schema, query)
+            cached = measure(lambda: backend.document_from_string(schema, query), iterations)
+
+            self.stdout.write(
+                f'{name}: uncached p50={uncached.p50_ms:.3f}ms p95={uncached.p95_ms:.3f}ms | '
+                f'cached p50={cached.p50_ms:.3f}ms p95={cached.p95_ms:.3f}ms | '
+                f'speedup x{uncached.p50_ms / max(cached.p50_ms, 1e-6):.0f}'
+            )
@@ -0,0 +1,112 @@
+import time
+import uuid
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand, CommandError
+
+from storages.backends.s3boto3 import S3Boto3Storage
+
+from benchmarks.runner import measure
+from core.storage_writer import StorageBatchWriter
+
+BUCKET_NAME = 'benchmark'
+MOTO_PORT = 5055
+
+
+class DelayedS3Storage(S3Boto3Storage):
+    """S3 storage delaying each request by `latency` seconds"""
+
+    def __init__(self, latency, **settings):
+        super().__init__(**settings)
+        self.latency = latency
+
+    @property
+    def connection(self):
+        # The connections are per thread, the delay is added to each of them
+        connection = super().connection
+        if not getattr(connection, 'is_delayed', False):
+            connection.meta.client.meta.events.register(
+                'before-send.s3.*', lambda **kwargs: time.sleep(self.latency)
+            )
+            connection.is_delayed = True
+
+        return connection
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure the time taken to write the photos of a post to an S3-compatible storage, '
+        'one by one and with a StorageBatchWriter. A moto server is started unless '
+        '--endpoint-url is given(eg. of a minio server), and each request is delayed '
+        'by --latency to simulate the latency of S3.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--endpoint-url', help='Url of an S3-compatible server with a "benchmark" bucket.')
+        parser.add_argument('--latency', type=int, default=50, help='Delay of each request, in milliseconds.')
+        parser.add_argument('--files', type=int, default=4, help='Number of files written per iteration.')
+        parser.add_argument('--file-size', type=int, default=200, help='Size of the files, in kilobytes.')
+        parser.add_argument('--max-workers', type=int, default=None)
+        parser.add_argument('--iterations', type=int, default=20)
+
+    def handle(self, *args, **options):
+        server = None
+        endpoint_url = options['endpoint_url']
+
+        if not endpoint_url:
+            try:
+                from moto.server import ThreadedMotoServer
+            except ImportError:
+                raise CommandError('Install moto[server] or pass the --endpoint-url of an S3-compatible server.')
+
+            server = ThreadedMotoServer(port=MOTO_PORT, verbose=False)
+            server.start()
+            endpoint_url = f'http://127.0.0.1:{MOTO_PORT}'
+
+        try:
+            storage = self.get_storage(endpoint_url, options['latency'] / 1000, create_bucket=server is not None)
+            content = b'0' * options['file_size'] * 1024
+            writer_kwargs = {'max_workers': options['max_workers']} if options['max_workers'] else {}
+
+            def write_serially():
+                for _ in range(options['files']):
+                    storage.save(f'serial/{uuid.uuid4()}.png', ContentFile(content))
+
+            def write_concurrently():
+                with StorageBatchWriter(storage, **writer_kwargs) as writer:
+                    writer.save_all([
+                        (f'batch/{uuid.uuid4()}.png', ContentFile(content))
+                        for _ in range(options['files'])
+                    ])
+
+            results = {
+                'serial': measure(write_serially, options['iterations']),
+                'batch': measure(write_concurrently, options['iterations']),
+            }
+        finally:
+            if server:
+                server.stop()
+
+        for name, result in results.items():
+            self.stdout.write(f'{name}: p50={result.p50_ms:.3f}ms p95={result.p95_ms:.3f}ms')
+
+        self.stdout.write(
+            f'the batch writer saves {results["serial"].p50_ms - results["batch"].p50_ms:.3f}ms '
+            f'per {options["files"]} files'
+        )
+
+    def get_storage(self, endpoint_url, latency, create_bucket):
+        storage = DelayedS3Storage(
+            latency,
+            bucket_name=BUCKET_NAME,
+            endpoint_url=endpoint_url,
+            access_key='benchmark',
+            secret_key='benchmark',
+            region_name='us-east-1',
+            location='',
+            file_overwrite=True,
+            querystring_auth=False,
+        )
+        if create_bucket:
+            storage.connection.meta.client.create_bucket(Bucket=BUCKET_NAME)
+
+        return storage
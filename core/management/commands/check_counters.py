@@ -0,0 +1,65 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from core.counters import (
+    COUNTERS, TRIGGER_COUNTERS, TRIGGERS_MODE,
+    get_counter_maintenance_mode, get_counter_mismatches_sql, get_triggers_state
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare the stored denormalized counters with their actual values and '
+        'verify that the counter triggers match COUNTER_MAINTENANCE_MODE.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--samples', type=int, default=5,
+            help='Number of wrong rows to display per counter.'
+        )
+
+    def handle(self, *args, **options):
+        mode = get_counter_maintenance_mode()
+        triggers_state = get_triggers_state()
+        num_errors = 0
+
+        self.stdout.write(f'Counter maintenance mode: {mode}')
+
+        for counter in TRIGGER_COUNTERS:
+            enabled = triggers_state.get(counter.trigger_name)
+            if enabled is None:
+                self.stdout.write(self.style.WARNING(
+                    f'Trigger {counter.trigger_name} is not installed'
+                ))
+            elif enabled != (mode == TRIGGERS_MODE):
+                num_errors += 1
+                self.stdout.write(self.style.ERROR(
+                    f'Trigger {counter.trigger_name} is '
+                    f'{"enabled" if enabled else "disabled"} in {mode} mode'
+                ))
+
+        with connection.cursor() as cursor:
+            for counter in COUNTERS:
+                mismatches_sql = get_counter_mismatches_sql(counter)
+                cursor.execute(f'SELECT COUNT(*) FROM ({mismatches_sql}) mismatches')
+                num_mismatches = cursor.fetchone()[0]
+
+                if not num_mismatches:
+                    self.stdout.write(f'{counter.name}: OK')
+                    continue
+
+                num_errors += 1
+                cursor.execute(get_counter_mismatches_sql(counter, limit=options['samples']))
+                samples = ', '.join(
+                    f'id={id} stored={stored} actual={actual}' 
+                    for id, stored, actual in cursor.fetchall()
+                )
+                self.stdout.write(self.style.ERROR(
+                    f'{counter.name}: {num_mismatches} wrong row(s), eg. {samples}'
+                ))
+
+        if num_errors:
+            raise CommandError(f'{num_errors} counter problem(s) found')
+
+        self.stdout.write(self.style.SUCCESS('All counters are consistent'))
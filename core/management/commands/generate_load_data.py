@@ -0,0 +1,78 @@
+import os
+import time
+from dataclasses import fields, replace
+from django.core.management.base import BaseCommand, CommandError
+
+from benchmarks.load_data import LoadDataCounts, fix_up, generate_load_data, make_plan
+from core.counters import disable_triggers, sync_triggers_state
+
+COUNT_FIELDS = [
+    count_field.name for count_field in fields(LoadDataCounts)
+    if count_field.type is int
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Write millions of synthetic rows(users, artists, posts, comments, follows, '
+        'notifications, flags) with COPY using several processes, then fix the '
+        'denormalized counters. Meant for load testing databases, never run it in production.'
+    )
+
+    def add_arguments(self, parser):
+        defaults = LoadDataCounts()
+
+        for name in COUNT_FIELDS:
+            parser.add_argument(
+                f'--{name.replace("_", "-")}', type=int, default=getattr(defaults, name),
+                help=f'Number of {name.replace("_", " ")}(default {getattr(defaults, name)}).'
+            )
+
+        parser.add_argument(
+            '--scale', type=float, default=1,
+            help='Multiply all the numbers of rows by this factor.'
+        )
+        parser.add_argument('--reply-ratio', type=float, default=defaults.reply_ratio)
+        parser.add_argument('--zipf-exponent', type=float, default=defaults.zipf_exponent)
+        parser.add_argument('--workers', type=int, default=os.cpu_count())
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--disable-triggers', action='store_true',
+            help=(
+                'Skip foreign key checks and triggers while writing (session_replication_role), '
+                'requires a superuser. The counter triggers are disabled during the load anyway.'
+            )
+        )
+
+    def handle(self, *args, **options):
+        counts = replace(
+            LoadDataCounts(),
+            reply_ratio=options['reply_ratio'],
+            zipf_exponent=options['zipf_exponent'],
+            **{name: round(options[name] * options['scale']) for name in COUNT_FIELDS}
+        )
+
+        try:
+            plan = make_plan(counts, options['seed'], options['disable_triggers'])
+        except ValueError as err:
+            raise CommandError(err)
+
+        # The counters are reconciled by `fix_up`, in triggers mode the triggers would
+        # make the workers wait for each other on the locks of the popular rows
+        disable_triggers()
+        start = time.monotonic()
+
+        try:
+            totals = generate_load_data(plan, options['workers'], log=self.log)
+            self.stdout.write(self.style.SUCCESS(
+                f'Wrote {sum(totals.values())} rows in {time.monotonic() - start:.0f}s'
+            ))
+
+            fix_up(plan, log=self.log)
+        finally:
+            sync_triggers_state()
+
+        self.stdout.write(self.style.SUCCESS(f'Done in {time.monotonic() - start:.0f}s'))
+
+    def log(self, message):
+        self.stdout.write(message)
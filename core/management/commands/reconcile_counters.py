@@ -0,0 +1,77 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.constants import (
+    COUNTER_RECONCILIATION_CHUNK_SIZE, COUNTER_RECONCILIATION_LOCK_TIMEOUT
+)
+from core.counters import COUNTERS, get_counter, reconcile_counter
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute the denormalized counters(num_... fields) and fix the ones that drifted. '
+        'Rows are processed in small chunks so the command can run along with live traffic.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'counters', nargs='*',
+            help=(
+                'Names of the counters to reconcile, eg. artist_post_num_stars. '
+                'All the counters are reconciled by default.'
+            )
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=COUNTER_RECONCILIATION_CHUNK_SIZE,
+            help='Number of ids processed per transaction.'
+        )
+        parser.add_argument(
+            '--lock-timeout', type=float, default=COUNTER_RECONCILIATION_LOCK_TIMEOUT,
+            help='Seconds to wait for the row locks of a chunk before skipping it.'
+        )
+        parser.add_argument(
+            '--pause', type=float, default=0,
+            help='Seconds to wait between chunks.'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Only count the rows that drifted, without fixing them.'
+        )
+        parser.add_argument('--database', default=None)
+
+    def handle(self, *args, **options):
+        try:
+            counters = [get_counter(name) for name in options['counters']] or COUNTERS
+        except KeyError as e:
+            raise CommandError(
+                f'Unknown counter {e}. Valid counters are: '
+                f'{", ".join(counter.name for counter in COUNTERS)}'
+            )
+
+        total_drifted, total_skipped = 0, 0
+
+        for counter in counters:
+            num_drifted, num_skipped = reconcile_counter(
+                counter,
+                chunk_size=options['chunk_size'],
+                dry_run=options['dry_run'],
+                lock_timeout=options['lock_timeout'],
+                pause=options['pause'],
+                using=options['database']
+            )
+            total_drifted += num_drifted
+            total_skipped += num_skipped
+
+            message = f'{counter.name}: {num_drifted} drifted row(s)'
+            if num_skipped:
+                message += f', {num_skipped} locked chunk(s) skipped'
+            self.stdout.write(message)
+
+        action = 'found' if options['dry_run'] else 'fixed'
+        self.stdout.write(self.style.SUCCESS(
+            f'{total_drifted} drifted row(s) {action} in {len(counters)} counter(s)'
+        ))
+
+        if total_skipped:
+            self.stdout.write(self.style.WARNING(
+                f'{total_skipped} chunk(s) were skipped due to lock timeouts, rerun the command'
+            ))
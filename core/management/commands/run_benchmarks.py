@@ -0,0 +1,102 @@
+import os
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import get_runner, override_settings
+
+from benchmarks.cases import BENCHMARKS
+from benchmarks.data import SCALES, generate_data
+from benchmarks.runner import (
+    DEFAULT_TOLERANCE, get_regressions, load_baseline, measure, save_baseline
+)
+
+DEFAULT_BASELINE_PATH = os.path.join(settings.BASE_DIR, 'benchmarks', 'baseline.json')
+
+
+class Command(BaseCommand):
+    help = (
+        'Run the benchmarks of the hot paths against a test database filled with synthetic '
+        'data and compare their latencies and number of queries with the baseline. '
+        'Exits with an error if there is a regression or no baseline to compare with.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'benchmarks', nargs='*', metavar='benchmark',
+            help=f'Benchmarks to run, all by default. Choices: {", ".join(BENCHMARKS)}.'
+        )
+        parser.add_argument('--scale', choices=SCALES, default='small')
+        parser.add_argument('--iterations', type=int, default=30)
+        parser.add_argument('--warmup', type=int, default=3)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--baseline', default=DEFAULT_BASELINE_PATH)
+        parser.add_argument(
+            '--tolerance', type=float, default=DEFAULT_TOLERANCE,
+            help='Allowed slowdown of the p95 latency, as a fraction of the baseline.'
+        )
+        parser.add_argument(
+            '--save-baseline', action='store_true',
+            help='Store the results as the new baseline instead of comparing them.'
+        )
+
+    def handle(self, *args, **options):
+        names = options['benchmarks'] or list(BENCHMARKS)
+        unknown_names = set(names) - BENCHMARKS.keys()
+        if unknown_names:
+            raise CommandError(f'Unknown benchmarks: {", ".join(sorted(unknown_names))}')
+
+        # Checked before the run, there's nothing to compare with otherwise
+        if not options['save_baseline']:
+            baseline = load_baseline(options['baseline'], options['scale'])
+            missing_names = [name for name in names if name not in baseline]
+            if missing_names:
+                raise CommandError(
+                    f'No baseline for {", ".join(missing_names)} at scale {options["scale"]}, '
+                    f'run with --save-baseline to record one'
+                )
+
+        runner = get_runner(settings)(verbosity=0, interactive=False)
+
+        runner.setup_test_environment()
+        old_config = runner.setup_databases()
+
+        try:
+            # Throttling and sampling would distort the measures
+            with override_settings(
+                GRAPHQL_QUERY_COST={**getattr(settings, 'GRAPHQL_QUERY_COST', {}), 'THROTTLE_BUDGET': None},
+                INSTRUMENTATION={**getattr(settings, 'INSTRUMENTATION', {}), 'ENABLED': False},
+            ):
+                results = self.run_benchmarks(names, options)
+        finally:
+            runner.teardown_databases(old_config)
+            runner.teardown_test_environment()
+
+        if options['save_baseline']:
+            save_baseline(options['baseline'], options['scale'], results)
+            self.stdout.write(self.style.SUCCESS(f'Baseline saved to {options["baseline"]}'))
+            return
+
+        regressions = get_regressions(results, baseline, options['tolerance'])
+        for regression in regressions:
+            self.stdout.write(self.style.ERROR(regression))
+
+        if regressions:
+            raise CommandError(f'{len(regressions)} regression(s)')
+
+        self.stdout.write(self.style.SUCCESS('No regression'))
+
+    def run_benchmarks(self, names, options):
+        self.stdout.write(f'Generating {options["scale"]} dataset...')
+        dataset = generate_data(SCALES[options['scale']], options['seed'])
+        results = {}
+
+        for name in names:
+            run = BENCHMARKS[name](dataset)
+            result = measure(run, options['iterations'], options['warmup'])
+            results[name] = result
+
+            self.stdout.write(
+                f'{name}: p50={result.p50_ms:.2f}ms p95={result.p95_ms:.2f}ms '
+                f'queries={result.queries}'
+            )
+
+        return results
@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+
+from core.instrumentation import STAT_FIELDS, get_metrics, get_top_offenders, reset_metrics
+
+
+class Command(BaseCommand):
+    help = (
+        'Display the graphql operations and resolvers issuing the most SQL queries '
+        '(or taking the most time) among the sampled operations.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sort-by', choices=STAT_FIELDS, default='sql_count',
+            help='Statistic used to rank the operations and resolvers.'
+        )
+        parser.add_argument(
+            '--limit', type=int, default=10,
+            help='Number of operations and resolvers to display.'
+        )
+        parser.add_argument(
+            '--reset', action='store_true',
+            help='Delete the collected metrics after displaying them.'
+        )
+
+    def handle(self, *args, **options):
+        metrics = get_metrics()
+
+        for key in ('operations', 'resolvers'):
+            self.stdout.write(self.style.MIGRATE_HEADING(f'Top {key} by {options["sort_by"]}'))
+            offenders = get_top_offenders(metrics[key], options['sort_by'], options['limit'])
+
+            if not offenders:
+                self.stdout.write('  No data')
+                continue
+
+            for name, stats in offenders:
+                count = stats['count'] or 1
+                self.stdout.write(
+                    f'  {name}: {stats["count"]} executions, '
+                    f'{stats["time"] / count * 1000:.1f}ms avg ({stats["max_time"] * 1000:.1f}ms max), '
+                    f'{stats["sql_count"] / count:.1f} queries avg, '
+                    f'{stats["sql_time"] / count * 1000:.1f}ms in SQL avg, '
+                    f'{stats["cache_hits"]} cache hits, {stats["errors"]} errors'
+                )
+
+        if options['reset']:
+            reset_metrics()
@@ -0,0 +1,191 @@
+"""
+Content-addressed media store.
+
+Uploaded files are stored once per content: `store_media()` names the file after
+the SHA-256 of its content(`cas/<ab>/<cd>/<sha256>.<ext>`), writes it if it isn't
+in the storage yet and increments the reference count of its `MediaBlob`.
+`store_media_batch()` stores several files, written concurrently.
+The returned name is saved on the row as usual(eg. `ArtistPostPhoto.photo`).
+Variants of the file(eg. thumbnails, see core.thumbnails) can be stored along with it.
+When rows are deleted, `release_media()` decrements the counts of their files and
+deletes the files that aren't referenced anymore.
+
+Stored files never change, so their url is computed from the name and
+`settings.MEDIA_CDN_URL`(or `MEDIA_URL`) without any storage call(`get_media_url()`),
+and they can be cached forever. The directory should be publicly readable.
+
+Works with the file system storage and the S3 storage(or an S3-compatible
+stand-in, see `AWS_S3_ENDPOINT_URL`).
+
+The row of a blob is locked from the upsert until the end of the transaction, so
+the file of a blob is never written and deleted concurrently: a file missing after
+an interrupted upload or deletion is written again by the next upload.
+"""
+
+import hashlib
+import json
+import os
+from collections import Counter
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.utils.encoding import filepath_to_uri
+from urllib.parse import urljoin
+
+from core.constants import FILE_STORAGE_CLASS, MEDIA_STORE_DELETION_BATCH_SIZE, MEDIA_STORE_DIR
+from core.models import MediaBlob
+
+
+def is_stored_media(name):
+    """Whether the file `name` is in the content-addressed store"""
+    return bool(name) and name.startswith(MEDIA_STORE_DIR + '/')
+
+
+def get_media_name(sha256, extension=''):
+    # The hash is split into directories to keep them small on file systems
+    return f'{MEDIA_STORE_DIR}/{sha256[:2]}/{sha256[2:4]}/{sha256}{extension}'
+
+
+def get_media_url(name):
+    """Url of the stored file `name`, the storage isn't queried"""
+    # `MEDIA_URL` is read from the settings so that the script prefix is added if it's relative
+    return urljoin(settings.MEDIA_CDN_URL or settings.MEDIA_URL, filepath_to_uri(name))
+
+
+def get_file_hash(content):
+    sha256 = hashlib.sha256()
+    for chunk in content.chunks():
+        sha256.update(chunk)
+
+    content.seek(0)
+    return sha256.hexdigest()
+
+
+def _get_table():
+    return connections[router.db_for_write(MediaBlob)].ops.quote_name(MediaBlob._meta.db_table)
+
+
+def _add_reference(cursor, sha256, content, filename):
+    extension = os.path.splitext(filename)[1].lower()
+
+    # If the content is already stored(even with another extension), its name is returned
+    cursor.execute(
+        f'INSERT INTO {_get_table()} (sha256, name, size, ref_count, created_on) '
+        f'VALUES (%s, %s, %s, 1, now()) '
+        f'ON CONFLICT (sha256) DO UPDATE SET ref_count = {_get_table()}.ref_count + 1 '
+        f'RETURNING name',
+        [sha256, get_media_name(sha256, extension), content.size]
+    )
+    return cursor.fetchone()[0]
+
+
+def _write_file(name, content, create_variants, writer):
+    """Write the file `name` if it's missing, return the names of its variants"""
+    storage = writer.storage if writer else FILE_STORAGE_CLASS()
+    if storage.exists(name):
+        return None
+
+    save = writer.save if writer else storage.save
+    saved_name = save(name, content)
+    if saved_name != name:
+        raise RuntimeError(f'Media {name} was stored as {saved_name}')
+
+    if not create_variants:
+        return []
+
+    content.seek(0)
+    return create_variants(name, content, save)
+
+
+def store_media(content, filename, create_variants=None):
+    """
+    Store the file `content`(a django `File`) and return its name in the storage.
+    `filename` is the original name of the file, only its extension is used.
+    Each call adds a reference to the file which should be released with
+    `release_media()` when the referencing row is deleted.
+
+    `create_variants(name, content, save)` is called when the file is written and
+    should store the files derived from it(eg. thumbnails) with `save(name, content)`
+    and return their names.
+    """
+    return store_media_batch([(content, filename)], create_variants)[0]
+
+
+def store_media_batch(files, create_variants=None, writer=None):
+    """
+    Store the files `files`, a list of (content, filename), like `store_media()`
+    and return their names. The files are written concurrently by `writer`
+    (a `core.storage_writer.StorageBatchWriter`) if given.
+    """
+    hashes = [get_file_hash(content) for content, __ in files]
+    using = router.db_for_write(MediaBlob)
+    names = [None] * len(files)
+
+    with transaction.atomic(using=using), connections[using].cursor() as cursor:
+        # The rows are locked in the same order by all the batches to avoid deadlocks
+        for i in sorted(range(len(files)), key=lambda i: hashes[i]):
+            names[i] = _add_reference(cursor, hashes[i], *files[i])
+
+        # A content may be in the batch several times
+        contents = {name: files[i][0] for i, name in enumerate(names)}
+
+        def write(name):
+            return _write_file(name, contents[name], create_variants, writer)
+
+        results = writer.map(write, contents) if writer else [write(name) for name in contents]
+
+        for name, variant_names in zip(contents, results):
+            if variant_names is not None:
+                cursor.execute(
+                    f'UPDATE {_get_table()} SET variant_names = %s WHERE name = %s',
+                    [json.dumps(variant_names), name]
+                )
+
+    return names
+
+
+def _delete_files(storage, names, batch_size):
+    bulk_delete = getattr(storage, 'bulk_delete', None)
+
+    for start in range(0, len(names), batch_size):
+        batch = names[start:start + batch_size]
+        if bulk_delete:
+            bulk_delete(batch)
+        else:
+            for name in batch:
+                storage.delete(name)
+
+
+def release_media(names, batch_size=MEDIA_STORE_DELETION_BATCH_SIZE):
+    """
+    Release a reference to each of the stored files `names`(a name may be repeated),
+    and delete the files that aren't referenced anymore. Return the number of deleted files.
+    """
+    counts = Counter(name for name in names if is_stored_media(name))
+    if not counts:
+        return 0
+
+    using = router.db_for_write(MediaBlob)
+    table = _get_table()
+
+    with transaction.atomic(using=using), connections[using].cursor() as cursor:
+        cursor.execute(
+            f'UPDATE {table} SET ref_count = GREATEST({table}.ref_count - released.count, 0) '
+            f'FROM unnest(%s::text[], %s::int[]) AS released(name, count) '
+            f'WHERE {table}.name = released.name',
+            [list(counts), list(counts.values())]
+        )
+        cursor.execute(
+            f'DELETE FROM {table} WHERE name = ANY(%s) AND ref_count = 0 RETURNING name, variant_names',
+            [list(counts)]
+        )
+        rows = cursor.fetchall()
+
+        # The files are deleted while the rows are locked so that they can't be
+        # stored again in the meantime; if this fails, nothing is released
+        _delete_files(
+            FILE_STORAGE_CLASS(),
+            [file_name for name, variant_names in rows for file_name in [name, *variant_names]],
+            batch_size
+        )
+
+    return len(rows)
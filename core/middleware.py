@@ -0,0 +1,29 @@
+from core.routers import get_replica_routing_settings, routing_state
+
+
+class PrimaryPinMiddleware:
+    """
+    Give each request its own routing state(see `core.routers`) and pin the client
+    to the primary database for a short time after a request that wrote, using a
+    cookie, so that its next reads see its writes.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        routing_settings = get_replica_routing_settings()
+        cookie_name = routing_settings['PIN_COOKIE_NAME']
+
+        with routing_state(pinned=cookie_name in request.COOKIES) as state:
+            response = self.get_response(request)
+
+        if state.wrote:
+            response.set_cookie(
+                cookie_name, '1',
+                max_age=routing_settings['PIN_SECONDS'],
+                httponly=True,
+                samesite='Lax'
+            )
+
+        return response
@@ -0,0 +1,576 @@
+# Triggers maintaining the counters in `core.counters.TRIGGER_COUNTERS`.
+# They are created disabled; they are enabled after migrating if
+# settings.COUNTER_MAINTENANCE_MODE is 'triggers' (see core.signals).
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0015_auto_20220312_0541'),
+        ('posts', '0015_comment_thread_indexes'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql="""
+CREATE OR REPLACE FUNCTION "posts"."counter_artist_post_num_ancestor_comments"() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.artist_post_concerned_id IS NOT DISTINCT FROM NEW.artist_post_concerned_id
+            AND (OLD.ancestor_comment_id IS NULL) = (NEW.ancestor_comment_id IS NULL) THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.artist_post_concerned_id IS NOT NULL AND OLD.ancestor_comment_id IS NULL THEN
+        UPDATE "posts"."artist_post" SET num_ancestor_comments = GREATEST(COALESCE(num_ancestor_comments, 0) - 1, 0)
+        WHERE id = OLD.artist_post_concerned_id;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.artist_post_concerned_id IS NOT NULL AND NEW.ancestor_comment_id IS NULL THEN
+        UPDATE "posts"."artist_post" SET num_ancestor_comments = COALESCE(num_ancestor_comments, 0) + 1
+        WHERE id = NEW.artist_post_concerned_id;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS counter_artist_post_num_ancestor_comments ON "posts"."artist_post_comment";
+CREATE TRIGGER counter_artist_post_num_ancestor_comments
+    AFTER INSERT OR DELETE OR UPDATE OF artist_post_concerned_id, ancestor_comment_id ON "posts"."artist_post_comment"
+    FOR EACH ROW EXECUTE FUNCTION "posts"."counter_artist_post_num_ancestor_comments"();
+
+ALTER TABLE "posts"."artist_post_comment" DISABLE TRIGGER counter_artist_post_num_ancestor_comments;
+""",
+            reverse_sql="""
+DROP TRIGGER IF EXISTS counter_artist_post_num_ancestor_comments ON "posts"."artist_post_comment";
+DROP FUNCTION IF EXISTS "posts"."counter_artist_post_num_ancestor_comments"();
+"""
+        ),
+        migrations.RunSQL(
+            sql="""
+CREATE OR REPLACE FUNCTION "posts"."counter_artist_post_num_simple_reposts"() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.parent_post_id IS NOT DISTINCT FROM NEW.parent_post_id
+            AND (OLD.is_simple_repost IS TRUE) = (NEW.is_simple_repost IS TRUE) THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.parent_post_id IS NOT NULL AND OLD.is_simple_repost IS TRUE THEN
+        UPDATE "posts"."artist_post" SET num_simple_reposts = GREATEST(COALESCE(num_simple_reposts, 0) - 1, 0)
+        WHERE id = OLD.parent_post_id;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.parent_post_id IS NOT NULL AND NEW.is_simple_repost IS TRUE THEN
+        UPDATE "posts"."artist_post" SET num_simple_reposts = COALESCE(num_simple_reposts, 0) + 1
+        WHERE id = NEW.parent_post_id;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS counter_artist_post_num_simple_reposts ON "posts"."artist_post";
+CREATE TRIGGER counter_artist_post_num_simple_reposts
+    AFTER INSERT OR DELETE OR UPDATE OF parent_post_id, is_simple_repost ON "posts"."artist_post"
+    FOR EACH ROW EXECUTE FUNCTION "posts"."counter_artist_post_num_simple_reposts"();
+
+ALTER TABLE "posts"."artist_post" DISABLE TRIGGER counter_artist_post_num_simple_reposts;
+""",
+            reverse_sql="""
+DROP TRIGGER IF EXISTS counter_artist_post_num_simple_reposts ON "posts"."artist_post";
+DROP FUNCTION IF EXISTS "posts"."counter_artist_post_num_simple_reposts"();
+"""
+        ),
+        migrations.RunSQL(
+            sql="""
+CREATE OR REPLACE FUNCTION "posts"."counter_artist_post_num_non_simple_reposts"() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.parent_post_id IS NOT DISTINCT FROM NEW.parent_post_id
+            AND (OLD.is_simple_repost IS FALSE) = (NEW.is_simple_repost IS FALSE) THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.parent_post_id IS NOT NULL AND OLD.is_simple_repost IS FALSE THEN
+        UPDATE "posts"."artist_post" SET num_non_simple_reposts = GREATEST(COALESCE(num_non_simple_reposts, 0) - 1, 0)
+        WHERE id = OLD.parent_post_id;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.parent_post_id IS NOT NULL AND NEW.is_simple_repost IS FALSE THEN
+        UPDATE "posts"."artist_post" SET num_non_simple_reposts = COALESCE(num_non_simple_reposts, 0) + 1
+        WHERE id = NEW.parent_post_id;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS counter_artist_post_num_non_simple_reposts ON "posts"."artist_post";
+CREATE TRIGGER counter_artist_post_num_non_simple_reposts
+    AFTER INSERT OR DELETE OR UPDATE OF parent_post_id, is_simple_repost ON "posts"."artist_post"
+    FOR EACH ROW EXECUTE FUNCTION "posts"."counter_artist_post_num_non_simple_reposts"();
+
+ALTER TABLE "posts"."artist_post" DISABLE TRIGGER counter_artist_post_num_non_simple_reposts;
+""",
+            reverse_sql="""
+DROP TRIGGER IF EXISTS counter_artist_post_num_non_simple_reposts ON "posts"."artist_post";
+DROP FUNCTION IF EXISTS "posts"."counter_artist_post_num_non_simple_reposts"();
+"""
+        ),
+        migrations.RunSQL(
+            sql="""
+CREATE OR REPLACE FUNCTION "posts"."counter_artist_post_comment_num_replies"() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.parent_comment_id IS NOT DISTINCT FROM NEW.parent_comment_id
+            AND (TRUE) = (TRUE) THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.parent_comment_id IS NOT NULL AND TRUE THEN
+        UPDATE "posts"."artist_post_comment" SET num_replies = GREATEST(COALESCE(num_replies, 0) - 1, 0)
+        WHERE id = OLD.parent_comment_id;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.parent_comment_id IS NOT NULL AND TRUE THEN
+        UPDATE "posts"."artist_post_comment" SET num_replies = COALESCE(num_replies, 0) + 1
+        WHERE id = NEW.parent_comment_id;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS counter_artist_post_comment_num_replies ON "posts"."artist_post_comment";
+CREATE TRIGGER counter_artist_post_comment_num_replies
+    AFTER INSERT OR DELETE OR UPDATE OF parent_comment_id ON "posts"."artist_post_comment"
+    FOR EACH ROW EXECUTE FUNCTION "posts"."counter_artist_post_comment_num_replies"();
+
+ALTER TABLE "posts"."artist_post_comment" DISABLE TRIGGER counter_artist_post_comment_num_replies;
+""",
+            reverse_sql="""
+DROP TRIGGER IF EXISTS counter_artist_post_comment_num_replies ON "posts"."artist_post_comment";
+DROP FUNCTION IF EXISTS "posts"."counter_artist_post_comment_num_replies"();
+"""
+        ),
+        migrations.RunSQL(
+            sql="""
+CREATE OR REPLACE FUNCTION "posts"."counter_artist_post_comment_num_child_comments"() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.ancestor_comment_id IS NOT DISTINCT FROM NEW.ancestor_comment_id
+            AND (TRUE) = (TRUE) THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.ancestor_comment_id IS NOT NULL AND TRUE THEN
+        UPDATE "posts"."artist_post_comment" SET num_child_comments = GREATEST(COALESCE(num_child_comments, 0) - 1, 0)
+        WHERE id = OLD.ancestor_comment_id;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.ancestor_comment_id IS NOT NULL AND TRUE THEN
+        UPDATE "posts"."artist_post_comment" SET num_child_comments = COALESCE(num_child_comments, 0) + 1
+        WHERE id = NEW.ancestor_comment_id;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS counter_artist_post_comment_num_child_comments ON "posts"."artist_post_comment";
+CREATE TRIGGER counter_artist_post_comment_num_child_comments
+    AFTER INSERT OR DELETE OR UPDATE OF ancestor_comment_id ON "posts"."artist_post_comment"
+    FOR EACH ROW EXECUTE FUNCTION "posts"."counter_artist_post_comment_num_child_comments"();
+
+ALTER TABLE "posts"."artist_post_comment" DISABLE TRIGGER counter_artist_post_comment_num_child_comments;
+""",
+            reverse_sql="""
+DROP TRIGGER IF EXISTS counter_artist_post_comment_num_child_comments ON "posts"."artist_post_comment";
+DROP FUNCTION IF EXISTS "posts"."counter_artist_post_comment_num_child_comments"();
+"""
+        ),
+        migrations.RunSQL(
+            sql="""
+CREATE OR REPLACE FUNCTION "accounts"."counter_user_num_artist_posts"() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.user_id IS NOT DISTINCT FROM NEW.user_id
+            AND (OLD.is_simple_repost IS NULL) = (NEW.is_simple_repost IS NULL) THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.user_id IS NOT NULL AND OLD.is_simple_repost IS NULL THEN
+        UPDATE "accounts"."user" SET num_artist_posts = GREATEST(COALESCE(num_artist_posts, 0) - 1, 0)
+        WHERE id = OLD.user_id;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.user_id IS NOT NULL AND NEW.is_simple_repost IS NULL THEN
+        UPDATE "accounts"."user" SET num_artist_posts = COALESCE(num_artist_posts, 0) + 1
+        WHERE id = NEW.user_id;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS counter_user_num_artist_posts ON "posts"."artist_post";
+CREATE TRIGGER counter_user_num_artist_posts
+    AFTER INSERT OR DELETE OR UPDATE OF user_id, is_simple_repost ON "posts"."artist_post"
+    FOR EACH ROW EXECUTE FUNCTION "accounts"."counter_user_num_artist_posts"();
+
+ALTER TABLE "posts"."artist_post" DISABLE TRIGGER counter_user_num_artist_posts;
+""",
+            reverse_sql="""
+DROP TRIGGER IF EXISTS counter_user_num_artist_posts ON "posts"."artist_post";
+DROP FUNCTION IF EXISTS "accounts"."counter_user_num_artist_posts"();
+"""
+        ),
+        migrations.RunSQL(
+            sql="""
+CREATE OR REPLACE FUNCTION "accounts"."counter_user_num_artist_post_reposts"() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.user_id IS NOT DISTINCT FROM NEW.user_id
+            AND (OLD.is_simple_repost IS NOT NULL) = (NEW.is_simple_repost IS NOT NULL) THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.user_id IS NOT NULL AND OLD.is_simple_repost IS NOT NULL THEN
+        UPDATE "accounts"."user" SET num_artist_post_reposts = GREATEST(COALESCE(num_artist_post_reposts, 0) - 1, 0)
+        WHERE id = OLD.user_id;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.user_id IS NOT NULL AND NEW.is_simple_repost IS NOT NULL THEN
+        UPDATE "accounts"."user" SET num_artist_post_reposts = COALESCE(num_artist_post_reposts, 0) + 1
+        WHERE id = NEW.user_id;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS counter_user_num_artist_post_reposts ON "posts"."artist_post";
+CREATE TRIGGER counter_user_num_artist_post_reposts
+    AFTER INSERT OR DELETE OR UPDATE OF user_id, is_simple_repost ON "posts"."artist_post"
+    FOR EACH ROW EXECUTE FUNCTION "accounts"."counter_user_num_artist_post_reposts"();
+
+ALTER TABLE "posts"."artist_post" DISABLE TRIGGER counter_user_num_artist_post_reposts;
+""",
+            reverse_sql="""
+DROP TRIGGER IF EXISTS counter_user_num_artist_post_reposts ON "posts"."artist_post";
+DROP FUNCTION IF EXISTS "accounts"."counter_user_num_artist_post_reposts"();
+"""
+        ),
+        migrations.RunSQL(
+            sql="""
+CREATE OR REPLACE FUNCTION "accounts"."counter_user_num_ancestor_artist_post_comments"() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.user_id IS NOT DISTINCT FROM NEW.user_id
+            AND (OLD.ancestor_comment_id IS NULL) = (NEW.ancestor_comment_id IS NULL) THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.user_id IS NOT NULL AND OLD.ancestor_comment_id IS NULL THEN
+        UPDATE "accounts"."user" SET num_ancestor_artist_post_comments = GREATEST(COALESCE(num_ancestor_artist_post_comments, 0) - 1, 0)
+        WHERE id = OLD.user_id;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.user_id IS NOT NULL AND NEW.ancestor_comment_id IS NULL THEN
+        UPDATE "accounts"."user" SET num_ancestor_artist_post_comments = COALESCE(num_ancestor_artist_post_comments, 0) + 1
+        WHERE id = NEW.user_id;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS counter_user_num_ancestor_artist_post_comments ON "posts"."artist_post_comment";
+CREATE TRIGGER counter_user_num_ancestor_artist_post_comments
+    AFTER INSERT OR DELETE OR UPDATE OF user_id, ancestor_comment_id ON "posts"."artist_post_comment"
+    FOR EACH ROW EXECUTE FUNCTION "accounts"."counter_user_num_ancestor_artist_post_comments"();
+
+ALTER TABLE "posts"."artist_post_comment" DISABLE TRIGGER counter_user_num_ancestor_artist_post_comments;
+""",
+            reverse_sql="""
+DROP TRIGGER IF EXISTS counter_user_num_ancestor_artist_post_comments ON "posts"."artist_post_comment";
+DROP FUNCTION IF EXISTS "accounts"."counter_user_num_ancestor_artist_post_comments"();
+"""
+        ),
+        migrations.RunSQL(
+            sql="""
+CREATE OR REPLACE FUNCTION "posts"."counter_non_artist_post_num_ancestor_comments"() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.non_artist_post_concerned_id IS NOT DISTINCT FROM NEW.non_artist_post_concerned_id
+            AND (OLD.ancestor_comment_id IS NULL) = (NEW.ancestor_comment_id IS NULL) THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.non_artist_post_concerned_id IS NOT NULL AND OLD.ancestor_comment_id IS NULL THEN
+        UPDATE "posts"."non_artist_post" SET num_ancestor_comments = GREATEST(COALESCE(num_ancestor_comments, 0) - 1, 0)
+        WHERE id = OLD.non_artist_post_concerned_id;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.non_artist_post_concerned_id IS NOT NULL AND NEW.ancestor_comment_id IS NULL THEN
+        UPDATE "posts"."non_artist_post" SET num_ancestor_comments = COALESCE(num_ancestor_comments, 0) + 1
+        WHERE id = NEW.non_artist_post_concerned_id;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS counter_non_artist_post_num_ancestor_comments ON "posts"."non_artist_post_comment";
+CREATE TRIGGER counter_non_artist_post_num_ancestor_comments
+    AFTER INSERT OR DELETE OR UPDATE OF non_artist_post_concerned_id, ancestor_comment_id ON "posts"."non_artist_post_comment"
+    FOR EACH ROW EXECUTE FUNCTION "posts"."counter_non_artist_post_num_ancestor_comments"();
+
+ALTER TABLE "posts"."non_artist_post_comment" DISABLE TRIGGER counter_non_artist_post_num_ancestor_comments;
+""",
+            reverse_sql="""
+DROP TRIGGER IF EXISTS counter_non_artist_post_num_ancestor_comments ON "posts"."non_artist_post_comment";
+DROP FUNCTION IF EXISTS "posts"."counter_non_artist_post_num_ancestor_comments"();
+"""
+        ),
+        migrations.RunSQL(
+            sql="""
+CREATE OR REPLACE FUNCTION "posts"."counter_non_artist_post_num_simple_reposts"() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.parent_post_id IS NOT DISTINCT FROM NEW.parent_post_id
+            AND (OLD.is_simple_repost IS TRUE) = (NEW.is_simple_repost IS TRUE) THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.parent_post_id IS NOT NULL AND OLD.is_simple_repost IS TRUE THEN
+        UPDATE "posts"."non_artist_post" SET num_simple_reposts = GREATEST(COALESCE(num_simple_reposts, 0) - 1, 0)
+        WHERE id = OLD.parent_post_id;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.parent_post_id IS NOT NULL AND NEW.is_simple_repost IS TRUE THEN
+        UPDATE "posts"."non_artist_post" SET num_simple_reposts = COALESCE(num_simple_reposts, 0) + 1
+        WHERE id = NEW.parent_post_id;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS counter_non_artist_post_num_simple_reposts ON "posts"."non_artist_post";
+CREATE TRIGGER counter_non_artist_post_num_simple_reposts
+    AFTER INSERT OR DELETE OR UPDATE OF parent_post_id, is_simple_repost ON "posts"."non_artist_post"
+    FOR EACH ROW EXECUTE FUNCTION "posts"."counter_non_artist_post_num_simple_reposts"();
+
+ALTER TABLE "posts"."non_artist_post" DISABLE TRIGGER counter_non_artist_post_num_simple_reposts;
+""",
+            reverse_sql="""
+DROP TRIGGER IF EXISTS counter_non_artist_post_num_simple_reposts ON "posts"."non_artist_post";
+DROP FUNCTION IF EXISTS "posts"."counter_non_artist_post_num_simple_reposts"();
+"""
+        ),
+        migrations.RunSQL(
+            sql="""
+CREATE OR REPLACE FUNCTION "posts"."counter_non_artist_post_num_non_simple_reposts"() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.parent_post_id IS NOT DISTINCT FROM NEW.parent_post_id
+            AND (OLD.is_simple_repost IS FALSE) = (NEW.is_simple_repost IS FALSE) THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.parent_post_id IS NOT NULL AND OLD.is_simple_repost IS FALSE THEN
+        UPDATE "posts"."non_artist_post" SET num_non_simple_reposts = GREATEST(COALESCE(num_non_simple_reposts, 0) - 1, 0)
+        WHERE id = OLD.parent_post_id;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.parent_post_id IS NOT NULL AND NEW.is_simple_repost IS FALSE THEN
+        UPDATE "posts"."non_artist_post" SET num_non_simple_reposts = COALESCE(num_non_simple_reposts, 0) + 1
+        WHERE id = NEW.parent_post_id;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS counter_non_artist_post_num_non_simple_reposts ON "posts"."non_artist_post";
+CREATE TRIGGER counter_non_artist_post_num_non_simple_reposts
+    AFTER INSERT OR DELETE OR UPDATE OF parent_post_id, is_simple_repost ON "posts"."non_artist_post"
+    FOR EACH ROW EXECUTE FUNCTION "posts"."counter_non_artist_post_num_non_simple_reposts"();
+
+ALTER TABLE "posts"."non_artist_post" DISABLE TRIGGER counter_non_artist_post_num_non_simple_reposts;
+""",
+            reverse_sql="""
+DROP TRIGGER IF EXISTS counter_non_artist_post_num_non_simple_reposts ON "posts"."non_artist_post";
+DROP FUNCTION IF EXISTS "posts"."counter_non_artist_post_num_non_simple_reposts"();
+"""
+        ),
+        migrations.RunSQL(
+            sql="""
+CREATE OR REPLACE FUNCTION "posts"."counter_non_artist_post_comment_num_replies"() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.parent_comment_id IS NOT DISTINCT FROM NEW.parent_comment_id
+            AND (TRUE) = (TRUE) THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.parent_comment_id IS NOT NULL AND TRUE THEN
+        UPDATE "posts"."non_artist_post_comment" SET num_replies = GREATEST(COALESCE(num_replies, 0) - 1, 0)
+        WHERE id = OLD.parent_comment_id;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.parent_comment_id IS NOT NULL AND TRUE THEN
+        UPDATE "posts"."non_artist_post_comment" SET num_replies = COALESCE(num_replies, 0) + 1
+        WHERE id = NEW.parent_comment_id;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS counter_non_artist_post_comment_num_replies ON "posts"."non_artist_post_comment";
+CREATE TRIGGER counter_non_artist_post_comment_num_replies
+    AFTER INSERT OR DELETE OR UPDATE OF parent_comment_id ON "posts"."non_artist_post_comment"
+    FOR EACH ROW EXECUTE FUNCTION "posts"."counter_non_artist_post_comment_num_replies"();
+
+ALTER TABLE "posts"."non_artist_post_comment" DISABLE TRIGGER counter_non_artist_post_comment_num_replies;
+""",
+            reverse_sql="""
+DROP TRIGGER IF EXISTS counter_non_artist_post_comment_num_replies ON "posts"."non_artist_post_comment";
+DROP FUNCTION IF EXISTS "posts"."counter_non_artist_post_comment_num_replies"();
+"""
+        ),
+        migrations.RunSQL(
+            sql="""
+CREATE OR REPLACE FUNCTION "posts"."counter_non_artist_post_comment_num_child_comments"() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.ancestor_comment_id IS NOT DISTINCT FROM NEW.ancestor_comment_id
+            AND (TRUE) = (TRUE) THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.ancestor_comment_id IS NOT NULL AND TRUE THEN
+        UPDATE "posts"."non_artist_post_comment" SET num_child_comments = GREATEST(COALESCE(num_child_comments, 0) - 1, 0)
+        WHERE id = OLD.ancestor_comment_id;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.ancestor_comment_id IS NOT NULL AND TRUE THEN
+        UPDATE "posts"."non_artist_post_comment" SET num_child_comments = COALESCE(num_child_comments, 0) + 1
+        WHERE id = NEW.ancestor_comment_id;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS counter_non_artist_post_comment_num_child_comments ON "posts"."non_artist_post_comment";
+CREATE TRIGGER counter_non_artist_post_comment_num_child_comments
+    AFTER INSERT OR DELETE OR UPDATE OF ancestor_comment_id ON "posts"."non_artist_post_comment"
+    FOR EACH ROW EXECUTE FUNCTION "posts"."counter_non_artist_post_comment_num_child_comments"();
+
+ALTER TABLE "posts"."non_artist_post_comment" DISABLE TRIGGER counter_non_artist_post_comment_num_child_comments;
+""",
+            reverse_sql="""
+DROP TRIGGER IF EXISTS counter_non_artist_post_comment_num_child_comments ON "posts"."non_artist_post_comment";
+DROP FUNCTION IF EXISTS "posts"."counter_non_artist_post_comment_num_child_comments"();
+"""
+        ),
+        migrations.RunSQL(
+            sql="""
+CREATE OR REPLACE FUNCTION "accounts"."counter_user_num_non_artist_posts"() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.user_id IS NOT DISTINCT FROM NEW.user_id
+            AND (OLD.is_simple_repost IS NULL) = (NEW.is_simple_repost IS NULL) THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.user_id IS NOT NULL AND OLD.is_simple_repost IS NULL THEN
+        UPDATE "accounts"."user" SET num_non_artist_posts = GREATEST(COALESCE(num_non_artist_posts, 0) - 1, 0)
+        WHERE id = OLD.user_id;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.user_id IS NOT NULL AND NEW.is_simple_repost IS NULL THEN
+        UPDATE "accounts"."user" SET num_non_artist_posts = COALESCE(num_non_artist_posts, 0) + 1
+        WHERE id = NEW.user_id;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS counter_user_num_non_artist_posts ON "posts"."non_artist_post";
+CREATE TRIGGER counter_user_num_non_artist_posts
+    AFTER INSERT OR DELETE OR UPDATE OF user_id, is_simple_repost ON "posts"."non_artist_post"
+    FOR EACH ROW EXECUTE FUNCTION "accounts"."counter_user_num_non_artist_posts"();
+
+ALTER TABLE "posts"."non_artist_post" DISABLE TRIGGER counter_user_num_non_artist_posts;
+""",
+            reverse_sql="""
+DROP TRIGGER IF EXISTS counter_user_num_non_artist_posts ON "posts"."non_artist_post";
+DROP FUNCTION IF EXISTS "accounts"."counter_user_num_non_artist_posts"();
+"""
+        ),
+        migrations.RunSQL(
+            sql="""
+CREATE OR REPLACE FUNCTION "accounts"."counter_user_num_non_artist_post_reposts"() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.user_id IS NOT DISTINCT FROM NEW.user_id
+            AND (OLD.is_simple_repost IS NOT NULL) = (NEW.is_simple_repost IS NOT NULL) THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.user_id IS NOT NULL AND OLD.is_simple_repost IS NOT NULL THEN
+        UPDATE "accounts"."user" SET num_non_artist_post_reposts = GREATEST(COALESCE(num_non_artist_post_reposts, 0) - 1, 0)
+        WHERE id = OLD.user_id;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.user_id IS NOT NULL AND NEW.is_simple_repost IS NOT NULL THEN
+        UPDATE "accounts"."user" SET num_non_artist_post_reposts = COALESCE(num_non_artist_post_reposts, 0) + 1
+        WHERE id = NEW.user_id;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS counter_user_num_non_artist_post_reposts ON "posts"."non_artist_post";
+CREATE TRIGGER counter_user_num_non_artist_post_reposts
+    AFTER INSERT OR DELETE OR UPDATE OF user_id, is_simple_repost ON "posts"."non_artist_post"
+    FOR EACH ROW EXECUTE FUNCTION "accounts"."counter_user_num_non_artist_post_reposts"();
+
+ALTER TABLE "posts"."non_artist_post" DISABLE TRIGGER counter_user_num_non_artist_post_reposts;
+""",
+            reverse_sql="""
+DROP TRIGGER IF EXISTS counter_user_num_non_artist_post_reposts ON "posts"."non_artist_post";
+DROP FUNCTION IF EXISTS "accounts"."counter_user_num_non_artist_post_reposts"();
+"""
+        ),
+        migrations.RunSQL(
+            sql="""
+CREATE OR REPLACE FUNCTION "accounts"."counter_user_num_ancestor_non_artist_post_comments"() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.user_id IS NOT DISTINCT FROM NEW.user_id
+            AND (OLD.ancestor_comment_id IS NULL) = (NEW.ancestor_comment_id IS NULL) THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.user_id IS NOT NULL AND OLD.ancestor_comment_id IS NULL THEN
+        UPDATE "accounts"."user" SET num_ancestor_non_artist_post_comments = GREATEST(COALESCE(num_ancestor_non_artist_post_comments, 0) - 1, 0)
+        WHERE id = OLD.user_id;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.user_id IS NOT NULL AND NEW.ancestor_comment_id IS NULL THEN
+        UPDATE "accounts"."user" SET num_ancestor_non_artist_post_comments = COALESCE(num_ancestor_non_artist_post_comments, 0) + 1
+        WHERE id = NEW.user_id;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS counter_user_num_ancestor_non_artist_post_comments ON "posts"."non_artist_post_comment";
+CREATE TRIGGER counter_user_num_ancestor_non_artist_post_comments
+    AFTER INSERT OR DELETE OR UPDATE OF user_id, ancestor_comment_id ON "posts"."non_artist_post_comment"
+    FOR EACH ROW EXECUTE FUNCTION "accounts"."counter_user_num_ancestor_non_artist_post_comments"();
+
+ALTER TABLE "posts"."non_artist_post_comment" DISABLE TRIGGER counter_user_num_ancestor_non_artist_post_comments;
+""",
+            reverse_sql="""
+DROP TRIGGER IF EXISTS counter_user_num_ancestor_non_artist_post_comments ON "posts"."non_artist_post_comment";
+DROP FUNCTION IF EXISTS "accounts"."counter_user_num_ancestor_non_artist_post_comments"();
+"""
+        ),
+    ]
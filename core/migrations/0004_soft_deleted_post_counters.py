@@ -0,0 +1,497 @@
+# Triggers of the counters sourced from the posts, recreated so that the posts
+# marked as deleted(`deleted_on`) aren't counted (see core.counters.Counter.soft_delete_column).
+# In triggers mode, the posts already marked as deleted are still counted,
+# run `manage.py reconcile_counters` after migrating.
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_mediablob_variant_names'),
+        ('posts', '0016_post_deleted_on'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql="""
+CREATE OR REPLACE FUNCTION "posts"."counter_artist_post_num_simple_reposts"() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.parent_post_id IS NOT DISTINCT FROM NEW.parent_post_id
+            AND (OLD.is_simple_repost IS TRUE AND OLD.deleted_on IS NULL) = (NEW.is_simple_repost IS TRUE AND NEW.deleted_on IS NULL) THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.parent_post_id IS NOT NULL AND OLD.is_simple_repost IS TRUE AND OLD.deleted_on IS NULL THEN
+        UPDATE "posts"."artist_post" SET num_simple_reposts = GREATEST(COALESCE(num_simple_reposts, 0) - 1, 0)
+        WHERE id = OLD.parent_post_id;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.parent_post_id IS NOT NULL AND NEW.is_simple_repost IS TRUE AND NEW.deleted_on IS NULL THEN
+        UPDATE "posts"."artist_post" SET num_simple_reposts = COALESCE(num_simple_reposts, 0) + 1
+        WHERE id = NEW.parent_post_id;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS counter_artist_post_num_simple_reposts ON "posts"."artist_post";
+CREATE TRIGGER counter_artist_post_num_simple_reposts
+    AFTER INSERT OR DELETE OR UPDATE OF parent_post_id, is_simple_repost, deleted_on ON "posts"."artist_post"
+    FOR EACH ROW EXECUTE FUNCTION "posts"."counter_artist_post_num_simple_reposts"();
+
+ALTER TABLE "posts"."artist_post" DISABLE TRIGGER counter_artist_post_num_simple_reposts;
+""",
+            reverse_sql="""
+CREATE OR REPLACE FUNCTION "posts"."counter_artist_post_num_simple_reposts"() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.parent_post_id IS NOT DISTINCT FROM NEW.parent_post_id
+            AND (OLD.is_simple_repost IS TRUE) = (NEW.is_simple_repost IS TRUE) THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.parent_post_id IS NOT NULL AND OLD.is_simple_repost IS TRUE THEN
+        UPDATE "posts"."artist_post" SET num_simple_reposts = GREATEST(COALESCE(num_simple_reposts, 0) - 1, 0)
+        WHERE id = OLD.parent_post_id;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.parent_post_id IS NOT NULL AND NEW.is_simple_repost IS TRUE THEN
+        UPDATE "posts"."artist_post" SET num_simple_reposts = COALESCE(num_simple_reposts, 0) + 1
+        WHERE id = NEW.parent_post_id;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS counter_artist_post_num_simple_reposts ON "posts"."artist_post";
+CREATE TRIGGER counter_artist_post_num_simple_reposts
+    AFTER INSERT OR DELETE OR UPDATE OF parent_post_id, is_simple_repost ON "posts"."artist_post"
+    FOR EACH ROW EXECUTE FUNCTION "posts"."counter_artist_post_num_simple_reposts"();
+
+ALTER TABLE "posts"."artist_post" DISABLE TRIGGER counter_artist_post_num_simple_reposts;
+"""
+        ),
+        migrations.RunSQL(
+            sql="""
+CREATE OR REPLACE FUNCTION "posts"."counter_artist_post_num_non_simple_reposts"() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.parent_post_id IS NOT DISTINCT FROM NEW.parent_post_id
+            AND (OLD.is_simple_repost IS FALSE AND OLD.deleted_on IS NULL) = (NEW.is_simple_repost IS FALSE AND NEW.deleted_on IS NULL) THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.parent_post_id IS NOT NULL AND OLD.is_simple_repost IS FALSE AND OLD.deleted_on IS NULL THEN
+        UPDATE "posts"."artist_post" SET num_non_simple_reposts = GREATEST(COALESCE(num_non_simple_reposts, 0) - 1, 0)
+        WHERE id = OLD.parent_post_id;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.parent_post_id IS NOT NULL AND NEW.is_simple_repost IS FALSE AND NEW.deleted_on IS NULL THEN
+        UPDATE "posts"."artist_post" SET num_non_simple_reposts = COALESCE(num_non_simple_reposts, 0) + 1
+        WHERE id = NEW.parent_post_id;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS counter_artist_post_num_non_simple_reposts ON "posts"."artist_post";
+CREATE TRIGGER counter_artist_post_num_non_simple_reposts
+    AFTER INSERT OR DELETE OR UPDATE OF parent_post_id, is_simple_repost, deleted_on ON "posts"."artist_post"
+    FOR EACH ROW EXECUTE FUNCTION "posts"."counter_artist_post_num_non_simple_reposts"();
+
+ALTER TABLE "posts"."artist_post" DISABLE TRIGGER counter_artist_post_num_non_simple_reposts;
+""",
+            reverse_sql="""
+CREATE OR REPLACE FUNCTION "posts"."counter_artist_post_num_non_simple_reposts"() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.parent_post_id IS NOT DISTINCT FROM NEW.parent_post_id
+            AND (OLD.is_simple_repost IS FALSE) = (NEW.is_simple_repost IS FALSE) THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.parent_post_id IS NOT NULL AND OLD.is_simple_repost IS FALSE THEN
+        UPDATE "posts"."artist_post" SET num_non_simple_reposts = GREATEST(COALESCE(num_non_simple_reposts, 0) - 1, 0)
+        WHERE id = OLD.parent_post_id;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.parent_post_id IS NOT NULL AND NEW.is_simple_repost IS FALSE THEN
+        UPDATE "posts"."artist_post" SET num_non_simple_reposts = COALESCE(num_non_simple_reposts, 0) + 1
+        WHERE id = NEW.parent_post_id;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS counter_artist_post_num_non_simple_reposts ON "posts"."artist_post";
+CREATE TRIGGER counter_artist_post_num_non_simple_reposts
+    AFTER INSERT OR DELETE OR UPDATE OF parent_post_id, is_simple_repost ON "posts"."artist_post"
+    FOR EACH ROW EXECUTE FUNCTION "posts"."counter_artist_post_num_non_simple_reposts"();
+
+ALTER TABLE "posts"."artist_post" DISABLE TRIGGER counter_artist_post_num_non_simple_reposts;
+"""
+        ),
+        migrations.RunSQL(
+            sql="""
+CREATE OR REPLACE FUNCTION "accounts"."counter_user_num_artist_posts"() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.user_id IS NOT DISTINCT FROM NEW.user_id
+            AND (OLD.is_simple_repost IS NULL AND OLD.deleted_on IS NULL) = (NEW.is_simple_repost IS NULL AND NEW.deleted_on IS NULL) THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.user_id IS NOT NULL AND OLD.is_simple_repost IS NULL AND OLD.deleted_on IS NULL THEN
+        UPDATE "accounts"."user" SET num_artist_posts = GREATEST(COALESCE(num_artist_posts, 0) - 1, 0)
+        WHERE id = OLD.user_id;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.user_id IS NOT NULL AND NEW.is_simple_repost IS NULL AND NEW.deleted_on IS NULL THEN
+        UPDATE "accounts"."user" SET num_artist_posts = COALESCE(num_artist_posts, 0) + 1
+        WHERE id = NEW.user_id;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS counter_user_num_artist_posts ON "posts"."artist_post";
+CREATE TRIGGER counter_user_num_artist_posts
+    AFTER INSERT OR DELETE OR UPDATE OF user_id, is_simple_repost, deleted_on ON "posts"."artist_post"
+    FOR EACH ROW EXECUTE FUNCTION "accounts"."counter_user_num_artist_posts"();
+
+ALTER TABLE "posts"."artist_post" DISABLE TRIGGER counter_user_num_artist_posts;
+""",
+            reverse_sql="""
+CREATE OR REPLACE FUNCTION "accounts"."counter_user_num_artist_posts"() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.user_id IS NOT DISTINCT FROM NEW.user_id
+            AND (OLD.is_simple_repost IS NULL) = (NEW.is_simple_repost IS NULL) THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.user_id IS NOT NULL AND OLD.is_simple_repost IS NULL THEN
+        UPDATE "accounts"."user" SET num_artist_posts = GREATEST(COALESCE(num_artist_posts, 0) - 1, 0)
+        WHERE id = OLD.user_id;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.user_id IS NOT NULL AND NEW.is_simple_repost IS NULL THEN
+        UPDATE "accounts"."user" SET num_artist_posts = COALESCE(num_artist_posts, 0) + 1
+        WHERE id = NEW.user_id;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS counter_user_num_artist_posts ON "posts"."artist_post";
+CREATE TRIGGER counter_user_num_artist_posts
+    AFTER INSERT OR DELETE OR UPDATE OF user_id, is_simple_repost ON "posts"."artist_post"
+    FOR EACH ROW EXECUTE FUNCTION "accounts"."counter_user_num_artist_posts"();
+
+ALTER TABLE "posts"."artist_post" DISABLE TRIGGER counter_user_num_artist_posts;
+"""
+        ),
+        migrations.RunSQL(
+            sql="""
+CREATE OR REPLACE FUNCTION "accounts"."counter_user_num_artist_post_reposts"() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.user_id IS NOT DISTINCT FROM NEW.user_id
+            AND (OLD.is_simple_repost IS NOT NULL AND OLD.deleted_on IS NULL) = (NEW.is_simple_repost IS NOT NULL AND NEW.deleted_on IS NULL) THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.user_id IS NOT NULL AND OLD.is_simple_repost IS NOT NULL AND OLD.deleted_on IS NULL THEN
+        UPDATE "accounts"."user" SET num_artist_post_reposts = GREATEST(COALESCE(num_artist_post_reposts, 0) - 1, 0)
+        WHERE id = OLD.user_id;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.user_id IS NOT NULL AND NEW.is_simple_repost IS NOT NULL AND NEW.deleted_on IS NULL THEN
+        UPDATE "accounts"."user" SET num_artist_post_reposts = COALESCE(num_artist_post_reposts, 0) + 1
+        WHERE id = NEW.user_id;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS counter_user_num_artist_post_reposts ON "posts"."artist_post";
+CREATE TRIGGER counter_user_num_artist_post_reposts
+    AFTER INSERT OR DELETE OR UPDATE OF user_id, is_simple_repost, deleted_on ON "posts"."artist_post"
+    FOR EACH ROW EXECUTE FUNCTION "accounts"."counter_user_num_artist_post_reposts"();
+
+ALTER TABLE "posts"."artist_post" DISABLE TRIGGER counter_user_num_artist_post_reposts;
+""",
+            reverse_sql="""
+CREATE OR REPLACE FUNCTION "accounts"."counter_user_num_artist_post_reposts"() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.user_id IS NOT DISTINCT FROM NEW.user_id
+            AND (OLD.is_simple_repost IS NOT NULL) = (NEW.is_simple_repost IS NOT NULL) THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.user_id IS NOT NULL AND OLD.is_simple_repost IS NOT NULL THEN
+        UPDATE "accounts"."user" SET num_artist_post_reposts = GREATEST(COALESCE(num_artist_post_reposts, 0) - 1, 0)
+        WHERE id = OLD.user_id;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.user_id IS NOT NULL AND NEW.is_simple_repost IS NOT NULL THEN
+        UPDATE "accounts"."user" SET num_artist_post_reposts = COALESCE(num_artist_post_reposts, 0) + 1
+        WHERE id = NEW.user_id;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS counter_user_num_artist_post_reposts ON "posts"."artist_post";
+CREATE TRIGGER counter_user_num_artist_post_reposts
+    AFTER INSERT OR DELETE OR UPDATE OF user_id, is_simple_repost ON "posts"."artist_post"
+    FOR EACH ROW EXECUTE FUNCTION "accounts"."counter_user_num_artist_post_reposts"();
+
+ALTER TABLE "posts"."artist_post" DISABLE TRIGGER counter_user_num_artist_post_reposts;
+"""
+        ),
+        migrations.RunSQL(
+            sql="""
+CREATE OR REPLACE FUNCTION "posts"."counter_non_artist_post_num_simple_reposts"() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.parent_post_id IS NOT DISTINCT FROM NEW.parent_post_id
+            AND (OLD.is_simple_repost IS TRUE AND OLD.deleted_on IS NULL) = (NEW.is_simple_repost IS TRUE AND NEW.deleted_on IS NULL) THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.parent_post_id IS NOT NULL AND OLD.is_simple_repost IS TRUE AND OLD.deleted_on IS NULL THEN
+        UPDATE "posts"."non_artist_post" SET num_simple_reposts = GREATEST(COALESCE(num_simple_reposts, 0) - 1, 0)
+        WHERE id = OLD.parent_post_id;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.parent_post_id IS NOT NULL AND NEW.is_simple_repost IS TRUE AND NEW.deleted_on IS NULL THEN
+        UPDATE "posts"."non_artist_post" SET num_simple_reposts = COALESCE(num_simple_reposts, 0) + 1
+        WHERE id = NEW.parent_post_id;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS counter_non_artist_post_num_simple_reposts ON "posts"."non_artist_post";
+CREATE TRIGGER counter_non_artist_post_num_simple_reposts
+    AFTER INSERT OR DELETE OR UPDATE OF parent_post_id, is_simple_repost, deleted_on ON "posts"."non_artist_post"
+    FOR EACH ROW EXECUTE FUNCTION "posts"."counter_non_artist_post_num_simple_reposts"();
+
+ALTER TABLE "posts"."non_artist_post" DISABLE TRIGGER counter_non_artist_post_num_simple_reposts;
+""",
+            reverse_sql="""
+CREATE OR REPLACE FUNCTION "posts"."counter_non_artist_post_num_simple_reposts"() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.parent_post_id IS NOT DISTINCT FROM NEW.parent_post_id
+            AND (OLD.is_simple_repost IS TRUE) = (NEW.is_simple_repost IS TRUE) THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.parent_post_id IS NOT NULL AND OLD.is_simple_repost IS TRUE THEN
+        UPDATE "posts"."non_artist_post" SET num_simple_reposts = GREATEST(COALESCE(num_simple_reposts, 0) - 1, 0)
+        WHERE id = OLD.parent_post_id;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.parent_post_id IS NOT NULL AND NEW.is_simple_repost IS TRUE THEN
+        UPDATE "posts"."non_artist_post" SET num_simple_reposts = COALESCE(num_simple_reposts, 0) + 1
+        WHERE id = NEW.parent_post_id;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS counter_non_artist_post_num_simple_reposts ON "posts"."non_artist_post";
+CREATE TRIGGER counter_non_artist_post_num_simple_reposts
+    AFTER INSERT OR DELETE OR UPDATE OF parent_post_id, is_simple_repost ON "posts"."non_artist_post"
+    FOR EACH ROW EXECUTE FUNCTION "posts"."counter_non_artist_post_num_simple_reposts"();
+
+ALTER TABLE "posts"."non_artist_post" DISABLE TRIGGER counter_non_artist_post_num_simple_reposts;
+"""
+        ),
+        migrations.RunSQL(
+            sql="""
+CREATE OR REPLACE FUNCTION "posts"."counter_non_artist_post_num_non_simple_reposts"() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.parent_post_id IS NOT DISTINCT FROM NEW.parent_post_id
+            AND (OLD.is_simple_repost IS FALSE AND OLD.deleted_on IS NULL) = (NEW.is_simple_repost IS FALSE AND NEW.deleted_on IS NULL) THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.parent_post_id IS NOT NULL AND OLD.is_simple_repost IS FALSE AND OLD.deleted_on IS NULL THEN
+        UPDATE "posts"."non_artist_post" SET num_non_simple_reposts = GREATEST(COALESCE(num_non_simple_reposts, 0) - 1, 0)
+        WHERE id = OLD.parent_post_id;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.parent_post_id IS NOT NULL AND NEW.is_simple_repost IS FALSE AND NEW.deleted_on IS NULL THEN
+        UPDATE "posts"."non_artist_post" SET num_non_simple_reposts = COALESCE(num_non_simple_reposts, 0) + 1
+        WHERE id = NEW.parent_post_id;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS counter_non_artist_post_num_non_simple_reposts ON "posts"."non_artist_post";
+CREATE TRIGGER counter_non_artist_post_num_non_simple_reposts
+    AFTER INSERT OR DELETE OR UPDATE OF parent_post_id, is_simple_repost, deleted_on ON "posts"."non_artist_post"
+    FOR EACH ROW EXECUTE FUNCTION "posts"."counter_non_artist_post_num_non_simple_reposts"();
+
+ALTER TABLE "posts"."non_artist_post" DISABLE TRIGGER counter_non_artist_post_num_non_simple_reposts;
+""",
+            reverse_sql="""
+CREATE OR REPLACE FUNCTION "posts"."counter_non_artist_post_num_non_simple_reposts"() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.parent_post_id IS NOT DISTINCT FROM NEW.parent_post_id
+            AND (OLD.is_simple_repost IS FALSE) = (NEW.is_simple_repost IS FALSE) THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.parent_post_id IS NOT NULL AND OLD.is_simple_repost IS FALSE THEN
+        UPDATE "posts"."non_artist_post" SET num_non_simple_reposts = GREATEST(COALESCE(num_non_simple_reposts, 0) - 1, 0)
+        WHERE id = OLD.parent_post_id;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.parent_post_id IS NOT NULL AND NEW.is_simple_repost IS FALSE THEN
+        UPDATE "posts"."non_artist_post" SET num_non_simple_reposts = COALESCE(num_non_simple_reposts, 0) + 1
+        WHERE id = NEW.parent_post_id;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS counter_non_artist_post_num_non_simple_reposts ON "posts"."non_artist_post";
+CREATE TRIGGER counter_non_artist_post_num_non_simple_reposts
+    AFTER INSERT OR DELETE OR UPDATE OF parent_post_id, is_simple_repost ON "posts"."non_artist_post"
+    FOR EACH ROW EXECUTE FUNCTION "posts"."counter_non_artist_post_num_non_simple_reposts"();
+
+ALTER TABLE "posts"."non_artist_post" DISABLE TRIGGER counter_non_artist_post_num_non_simple_reposts;
+"""
+        ),
+        migrations.RunSQL(
+            sql="""
+CREATE OR REPLACE FUNCTION "accounts"."counter_user_num_non_artist_posts"() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.user_id IS NOT DISTINCT FROM NEW.user_id
+            AND (OLD.is_simple_repost IS NULL AND OLD.deleted_on IS NULL) = (NEW.is_simple_repost IS NULL AND NEW.deleted_on IS NULL) THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.user_id IS NOT NULL AND OLD.is_simple_repost IS NULL AND OLD.deleted_on IS NULL THEN
+        UPDATE "accounts"."user" SET num_non_artist_posts = GREATEST(COALESCE(num_non_artist_posts, 0) - 1, 0)
+        WHERE id = OLD.user_id;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.user_id IS NOT NULL AND NEW.is_simple_repost IS NULL AND NEW.deleted_on IS NULL THEN
+        UPDATE "accounts"."user" SET num_non_artist_posts = COALESCE(num_non_artist_posts, 0) + 1
+        WHERE id = NEW.user_id;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS counter_user_num_non_artist_posts ON "posts"."non_artist_post";
+CREATE TRIGGER counter_user_num_non_artist_posts
+    AFTER INSERT OR DELETE OR UPDATE OF user_id, is_simple_repost, deleted_on ON "posts"."non_artist_post"
+    FOR EACH ROW EXECUTE FUNCTION "accounts"."counter_user_num_non_artist_posts"();
+
+ALTER TABLE "posts"."non_artist_post" DISABLE TRIGGER counter_user_num_non_artist_posts;
+""",
+            reverse_sql="""
+CREATE OR REPLACE FUNCTION "accounts"."counter_user_num_non_artist_posts"() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.user_id IS NOT DISTINCT FROM NEW.user_id
+            AND (OLD.is_simple_repost IS NULL) = (NEW.is_simple_repost IS NULL) THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.user_id IS NOT NULL AND OLD.is_simple_repost IS NULL THEN
+        UPDATE "accounts"."user" SET num_non_artist_posts = GREATEST(COALESCE(num_non_artist_posts, 0) - 1, 0)
+        WHERE id = OLD.user_id;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.user_id IS NOT NULL AND NEW.is_simple_repost IS NULL THEN
+        UPDATE "accounts"."user" SET num_non_artist_posts = COALESCE(num_non_artist_posts, 0) + 1
+        WHERE id = NEW.user_id;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS counter_user_num_non_artist_posts ON "posts"."non_artist_post";
+CREATE TRIGGER counter_user_num_non_artist_posts
+    AFTER INSERT OR DELETE OR UPDATE OF user_id, is_simple_repost ON "posts"."non_artist_post"
+    FOR EACH ROW EXECUTE FUNCTION "accounts"."counter_user_num_non_artist_posts"();
+
+ALTER TABLE "posts"."non_artist_post" DISABLE TRIGGER counter_user_num_non_artist_posts;
+"""
+        ),
+        migrations.RunSQL(
+            sql="""
+CREATE OR REPLACE FUNCTION "accounts"."counter_user_num_non_artist_post_reposts"() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.user_id IS NOT DISTINCT FROM NEW.user_id
+            AND (OLD.is_simple_repost IS NOT NULL AND OLD.deleted_on IS NULL) = (NEW.is_simple_repost IS NOT NULL AND NEW.deleted_on IS NULL) THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.user_id IS NOT NULL AND OLD.is_simple_repost IS NOT NULL AND OLD.deleted_on IS NULL THEN
+        UPDATE "accounts"."user" SET num_non_artist_post_reposts = GREATEST(COALESCE(num_non_artist_post_reposts, 0) - 1, 0)
+        WHERE id = OLD.user_id;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.user_id IS NOT NULL AND NEW.is_simple_repost IS NOT NULL AND NEW.deleted_on IS NULL THEN
+        UPDATE "accounts"."user" SET num_non_artist_post_reposts = COALESCE(num_non_artist_post_reposts, 0) + 1
+        WHERE id = NEW.user_id;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS counter_user_num_non_artist_post_reposts ON "posts"."non_artist_post";
+CREATE TRIGGER counter_user_num_non_artist_post_reposts
+    AFTER INSERT OR DELETE OR UPDATE OF user_id, is_simple_repost, deleted_on ON "posts"."non_artist_post"
+    FOR EACH ROW EXECUTE FUNCTION "accounts"."counter_user_num_non_artist_post_reposts"();
+
+ALTER TABLE "posts"."non_artist_post" DISABLE TRIGGER counter_user_num_non_artist_post_reposts;
+""",
+            reverse_sql="""
+CREATE OR REPLACE FUNCTION "accounts"."counter_user_num_non_artist_post_reposts"() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.user_id IS NOT DISTINCT FROM NEW.user_id
+            AND (OLD.is_simple_repost IS NOT NULL) = (NEW.is_simple_repost IS NOT NULL) THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.user_id IS NOT NULL AND OLD.is_simple_repost IS NOT NULL THEN
+        UPDATE "accounts"."user" SET num_non_artist_post_reposts = GREATEST(COALESCE(num_non_artist_post_reposts, 0) - 1, 0)
+        WHERE id = OLD.user_id;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.user_id IS NOT NULL AND NEW.is_simple_repost IS NOT NULL THEN
+        UPDATE "accounts"."user" SET num_non_artist_post_reposts = COALESCE(num_non_artist_post_reposts, 0) + 1
+        WHERE id = NEW.user_id;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS counter_user_num_non_artist_post_reposts ON "posts"."non_artist_post";
+CREATE TRIGGER counter_user_num_non_artist_post_reposts
+    AFTER INSERT OR DELETE OR UPDATE OF user_id, is_simple_repost ON "posts"."non_artist_post"
+    FOR EACH ROW EXECUTE FUNCTION "accounts"."counter_user_num_non_artist_post_reposts"();
+
+ALTER TABLE "posts"."non_artist_post" DISABLE TRIGGER counter_user_num_non_artist_post_reposts;
+"""
+        ),
+    ]
@@ -1,10 +1,15 @@
 """Contains project-wide utilities"""
 
-import base64
 import graphene
 from graphene_django.converter import convert_django_field
 from taggit.managers import TaggableManager
 
+from core.constants import PHOTO_VARIANTS
+from core.thumbnails import get_photo_url
+
+# Sizes of the photo thumbnails, see core.thumbnails
+PhotoSize = graphene.Enum('PhotoSize', [(alias.upper(), alias) for alias in PHOTO_VARIANTS])
+
 
 class UsesCustomSignal:
     """
@@ -25,17 +30,14 @@ class GraphenePKMixin:
 class GraphenePhotoMixin:
     """
     Used with DjangoObjectTypes that represent a photo model.
-    Used to query base64 string and url
+    Used to query the url of the photo or of one of its thumbnails; the model's
+    `placeholder` can be shown while the photo loads.
     """
-    base64_str = graphene.String()
-    url = graphene.String()
+    url = graphene.String(size=PhotoSize())
 
-    def resolve_base64_str(root, info):
+    def resolve_url(root, info, size=None):
         # root is the model object type that is in context
-        return base64.b64encode(root.photo.read()).decode('utf-8')
-
-    def resolve_url(root, info):
-        return root.photo.url
+        return get_photo_url(root.photo, size)
 
 
 class GrapheneVideoMixin:
@@ -1,3 +1,24 @@
 from django.db import models
 
-# Create your models here.
+
+class MediaBlob(models.Model):
+    """
+    A file of the content-addressed media store(see core.media), shared by all
+    the rows referencing the same content. The file is deleted with the blob once
+    it isn't referenced anymore.
+    """
+    sha256 = models.CharField(max_length=64, unique=True)
+    # Name of the file in the storage, derived from the hash
+    name = models.CharField(max_length=255, unique=True)
+    size = models.PositiveBigIntegerField()
+    # Number of rows referencing the file
+    ref_count = models.PositiveIntegerField(default=0)
+    # Files derived from the file(eg. thumbnails), deleted along with it
+    variant_names = models.JSONField(default=list)
+    created_on = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.name
+
+    class Meta:
+        db_table = 'django\".\"media_blob'
@@ -0,0 +1,168 @@
+"""
+Routing of read queries to the read replicas(`settings.DATABASE_REPLICAS`).
+
+Reads only go to a replica inside `use_replica()` blocks, that is during
+graphql query operations(not mutations) and the views decorated with
+`replica_reads`; everything else, including all writes, goes to the primary.
+Reads also go to the primary:
+- once the current request has written, or inside a transaction;
+- for a short time after a client wrote(`PIN_SECONDS`), so that clients see their
+  own writes despite the replication lag, see `core.middleware.PrimaryPinMiddleware`;
+- if the replica lags behind by more than `MAX_LAG` seconds.
+"""
+
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+DEFAULT_REPLICA_ROUTING_SETTINGS = {
+    # Reads of a client go to the primary for this number of seconds after it wrote
+    'PIN_SECONDS': 10,
+    'PIN_COOKIE_NAME': 'primary_pin',
+    # Replicas lagging more than this(in seconds) aren't used
+    'MAX_LAG': 5,
+    # The lag of each replica is measured at most once per interval(in seconds)
+    'LAG_CHECK_INTERVAL': 2,
+}
+
+
+class RoutingState:
+    """Routing state of the current request"""
+
+    def __init__(self, pinned=False):
+        # Whether the client wrote recently
+        self.pinned = pinned
+        self.use_replica = False
+        self.wrote = False
+
+
+_routing_state = ContextVar('routing_state', default=None)
+# Replica alias => (lag in seconds, time of the measure)
+_replica_lags = {}
+
+
+def get_replica_routing_settings():
+    return {**DEFAULT_REPLICA_ROUTING_SETTINGS, **getattr(settings, 'REPLICA_ROUTING', {})}
+
+
+def get_routing_state():
+    state = _routing_state.get()
+    if state is None:
+        state = RoutingState()
+        _routing_state.set(state)
+
+    return state
+
+
+@contextmanager
+def routing_state(pinned=False):
+    """Use a new routing state in this block(eg. for a request)"""
+    state = RoutingState(pinned)
+    token = _routing_state.set(state)
+    try:
+        yield state
+    finally:
+        _routing_state.reset(token)
+
+
+@contextmanager
+def use_replica(enabled=True):
+    """Allow the reads of this block to go to a replica"""
+    state = get_routing_state()
+    previous, state.use_replica = state.use_replica, enabled
+    try:
+        yield
+    finally:
+        state.use_replica = previous
+
+
+def replica_reads(view):
+    """Decorator allowing the reads of a view to go to a replica"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        with use_replica():
+            return view(*args, **kwargs)
+
+    return wrapper
+
+
+def get_replica_lag(alias):
+    """Return the replication lag(in seconds) of a replica, `None` if it is unreachable"""
+    routing_settings = get_replica_routing_settings()
+    lag, measured_on = _replica_lags.get(alias, (None, 0))
+
+    if time.monotonic() - measured_on < routing_settings['LAG_CHECK_INTERVAL']:
+        return lag
+
+    try:
+        with connections[alias].cursor() as cursor:
+            # The replay timestamp doesn't change when the primary is idle,
+            # a replica which has replayed all it received isn't lagging.
+            cursor.execute(
+                '''
+                SELECT CASE
+                    WHEN NOT pg_is_in_recovery() THEN 0
+                    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+                    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+                END
+                '''
+            )
+            lag = float(cursor.fetchone()[0])
+    except DatabaseError:
+        lag = None
+
+    _replica_lags[alias] = (lag, time.monotonic())
+    return lag
+
+
+class ReplicaRouter:
+    def __init__(self, primary=DEFAULT_DB_ALIAS, replicas=None):
+        self.primary = primary
+        self.replicas = list(
+            getattr(settings, 'DATABASE_REPLICAS', []) if replicas is None else replicas
+        )
+
+    def get_available_replicas(self):
+        max_lag = get_replica_routing_settings()['MAX_LAG']
+        return [
+            alias for alias in self.replicas
+            if (lag := get_replica_lag(alias)) is not None and lag <= max_lag
+        ]
+
+    def db_for_read(self, model, **hints):
+        state = get_routing_state()
+
+        if (
+            not self.replicas
+            or not state.use_replica
+            or state.pinned
+            or state.wrote
+            or connections[self.primary].in_atomic_block
+        ):
+            return self.primary
+
+        replicas = self.get_available_replicas()
+        return random.choice(replicas) if replicas else self.primary
+
+    def db_for_write(self, model, **hints):
+        get_routing_state().wrote = True
+        return self.primary
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas contain the same data as the primary
+        databases = {self.primary, *self.replicas}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get the schema changes through replication
+        if db in self.replicas:
+            return False
+
+        return None
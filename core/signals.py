@@ -0,0 +1,36 @@
+from django.apps import apps
+from django.db.models.signals import post_delete, post_init, post_migrate, post_save
+from django.dispatch import receiver
+
+from core.counters import sync_triggers_state
+from core.graphql.response_cache import (
+    TAGGED_MODELS, bump_instance_tags, collection_fields_changed, remember_collection_values
+)
+
+
+@receiver(post_migrate)
+def sync_counter_triggers(sender, app_config, using, **kwargs):
+    """Enable or disable the counter triggers according to COUNTER_MAINTENANCE_MODE"""
+    # post_migrate is sent once per app, the triggers only need to be synced once
+    if app_config.name != 'core':
+        return
+
+    sync_triggers_state(using)
+
+
+def track_collection_fields(sender, instance, **kwargs):
+    remember_collection_values(instance)
+
+
+def invalidate_cached_responses(sender, instance, created=True, update_fields=None, **kwargs):
+    # `created` is missing on post_delete, deleted instances leave their collection
+    bump_instance_tags(instance, collection=created or collection_fields_changed(instance, update_fields))
+    remember_collection_values(instance)
+
+
+# Invalidate the cached graphql responses containing an instance when it changes
+for model_label in TAGGED_MODELS:
+    model = apps.get_model(model_label)
+    post_init.connect(track_collection_fields, sender=model)
+    post_save.connect(invalidate_cached_responses, sender=model)
+    post_delete.connect(invalidate_cached_responses, sender=model)
@@ -0,0 +1,156 @@
+"""
+Concurrent writes to the storage.
+
+On S3 each write is an HTTP request, so writing the photos of a post one by one
+adds up their latencies. `StorageBatchWriter` writes them concurrently, with a
+bounded number of threads, and retries the writes failing with transient errors.
+
+The writer is used as a context manager around the database writes referencing
+the files; the block is atomic and if it fails, the files written by the writer
+are deleted before the database writes are rolled back:
+
+    with StorageBatchWriter() as writer:
+        names = writer.save_all([(name, content), ...])
+        ArtistPhoto.objects.bulk_create([ArtistPhoto(photo=name, ...) for name in names])
+
+A failure after the block, eg. of an enclosing transaction, isn't covered.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from core.constants import (
+    FILE_STORAGE_CLASS, STORAGE_WRITE_MAX_RETRIES,
+    STORAGE_WRITE_MAX_WORKERS, STORAGE_WRITE_RETRY_DELAY
+)
+
+try:
+    from botocore.exceptions import ClientError, ConnectionError as BotoConnectionError, HTTPClientError
+except ImportError:
+    ClientError = BotoConnectionError = HTTPClientError = None
+
+logger = logging.getLogger(__name__)
+
+# Error codes of S3 worth retrying
+TRANSIENT_S3_ERROR_CODES = {
+    'InternalError', 'RequestTimeout', 'ServiceUnavailable', 'SlowDown', 'Throttling'
+}
+
+
+def is_transient_error(err):
+    """Whether the storage write failing with `err` may succeed if retried"""
+    if isinstance(err, (ConnectionError, TimeoutError)):
+        return True
+
+    if BotoConnectionError and isinstance(err, (BotoConnectionError, HTTPClientError)):
+        # Connection failures and timeouts
+        return True
+
+    if ClientError and isinstance(err, ClientError):
+        error = err.response.get('Error', {})
+        status = err.response.get('ResponseMetadata', {}).get('HTTPStatusCode') or 0
+        return error.get('Code') in TRANSIENT_S3_ERROR_CODES or status >= 500
+
+    return False
+
+
+class StorageBatchWriter:
+    """Write files to `storage` concurrently, `max_workers` at most at a time"""
+
+    def __init__(self, storage=None, max_workers=STORAGE_WRITE_MAX_WORKERS,
+                 max_retries=STORAGE_WRITE_MAX_RETRIES, retry_delay=STORAGE_WRITE_RETRY_DELAY,
+                 using=DEFAULT_DB_ALIAS):
+        self.storage = storage or FILE_STORAGE_CLASS()
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.using = using
+        # Names of the files written, deleted if the block fails
+        self.written_names = []
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        self._atomic = transaction.atomic(using=self.using)
+        self._atomic.__enter__()
+        self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix='storage-writer')
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._executor.shutdown()
+
+        if exc_type is not None:
+            # Deleted while the rows written in the block are still locked
+            self.delete_written()
+            return self._atomic.__exit__(exc_type, exc_value, traceback)
+
+        try:
+            return self._atomic.__exit__(None, None, None)
+        except Exception:
+            self.delete_written()
+            raise
+
+    def track(self, names):
+        """Record the files `names`, written by other means, to delete them if the block fails"""
+        with self._lock:
+            self.written_names.extend(names)
+
+    def save(self, name, content):
+        """Write `content` as `name`, retrying transient failures. Return the name of the file"""
+        for attempt in range(self.max_retries + 1):
+            content.seek(0)
+
+            try:
+                saved_name = self.storage.save(name, content)
+            except Exception as err:
+                if attempt == self.max_retries or not is_transient_error(err):
+                    raise
+
+                logger.warning('Retrying the write of %s after error: %s', name, err)
+                time.sleep(self.retry_delay * 2 ** attempt)
+            else:
+                self.track([saved_name])
+                return saved_name
+
+    def map(self, func, items):
+        """
+        Call `func` on each item of `items` concurrently and return the results, in order.
+        If calls fail, the first error is raised once all calls are done.
+        """
+        futures = [self._executor.submit(func, item) for item in items]
+        wait(futures)
+
+        return [future.result() for future in futures]
+
+    def save_all(self, files):
+        """
+        Write the files `files`, a list of (name, content), return their names.
+        Files with the same name are written one after the other, so that the storage
+        gives them distinct names.
+        """
+        names = [None] * len(files)
+        pending = list(enumerate(files))
+
+        while pending:
+            batch, next_pending, batch_names = [], [], set()
+            for i, file in pending:
+                (next_pending if file[0] in batch_names else batch).append((i, file))
+                batch_names.add(file[0])
+
+            for (i, __), name in zip(batch, self.map(lambda item: self.save(*item[1]), batch)):
+                names[i] = name
+
+            pending = next_pending
+
+        return names
+
+    def delete_written(self):
+        for name in self.written_names:
+            try:
+                self.storage.delete(name)
+            except Exception:
+                logger.exception('Could not delete %s after a failed write', name)
+
+        self.written_names = []
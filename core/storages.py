@@ -1,5 +1,6 @@
 from django.conf import settings
 from storages.backends.s3boto3 import S3Boto3Storage
+from storages.utils import clean_name
 
 
 class StaticStorage(S3Boto3Storage):
@@ -16,6 +17,29 @@ class PublicMediaStorage(S3Boto3Storage):
     # eg. Don't overwite files since some users may have files with the same name.
     file_overwrite = False
 
+    def get_object_parameters(self, name):
+        from core.constants import MEDIA_STORE_DIR
+
+        # `name` is the key of the file, the location included
+        params = super().get_object_parameters(name)
+        if name.startswith(self._normalize_name(MEDIA_STORE_DIR) + '/'):
+            # Content-addressed files never change(see core.media)
+            params['CacheControl'] = 'public, max-age=31536000, immutable'
+
+        return params
+
+    def bulk_delete(self, names):
+        """Delete the files `names`(at most 1000) in a single request"""
+        self.bucket.delete_objects(Delete={
+            'Objects': [{'Key': self._normalize_name(clean_name(name))} for name in names],
+            'Quiet': True
+        })
+
+    def delete_directory(self, path):
+        """Delete all the files under the directory `path`, by batches of 1000"""
+        prefix = self._normalize_name(clean_name(path)).rstrip('/') + '/'
+        self.bucket.objects.filter(Prefix=prefix).delete()
+
 
 # class PrivateMediaStorage(S3Boto3Storage):
 #     """To handle private media files"""
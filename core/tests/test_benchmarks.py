@@ -0,0 +1,23 @@
+from django.test import SimpleTestCase
+
+from benchmarks.runner import BenchmarkResult, get_regressions
+
+
+class BenchmarkRegressionTests(SimpleTestCase):
+    def test_more_queries_and_slower_p95_are_regressions(self):
+        baseline = {
+            'feed_read': BenchmarkResult(p50_ms=10, p95_ms=20, queries=5),
+            'notify_fan_out': BenchmarkResult(p50_ms=10, p95_ms=20, queries=1),
+        }
+        results = {
+            'feed_read': BenchmarkResult(p50_ms=10, p95_ms=24, queries=6),
+            'notify_fan_out': BenchmarkResult(p50_ms=15, p95_ms=30, queries=1),
+            # Not in the baseline
+            'batch_engage': BenchmarkResult(p50_ms=10, p95_ms=20, queries=5),
+        }
+
+        regressions = get_regressions(results, baseline, tolerance=0.25)
+
+        self.assertEqual(len(regressions), 2)
+        self.assertTrue(regressions[0].startswith('feed_read: 6 queries'))
+        self.assertTrue(regressions[1].startswith('notify_fan_out: p95'))
@@ -0,0 +1,85 @@
+import time
+from django.test import SimpleTestCase
+
+from core.db.backends.postgresql.base import split_search_path
+from core.db.pool import ConnectionPool, PoolTimeout
+
+
+class FakeConnection:
+    def __init__(self):
+        self.alive = True
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class FakePool(ConnectionPool):
+    def is_alive(self, connection):
+        return not connection.closed
+
+    def ping(self, connection):
+        if not connection.alive:
+            raise ConnectionError
+
+
+class ConnectionPoolTests(SimpleTestCase):
+    def make_pool(self, **kwargs):
+        return FakePool(FakeConnection, **{'timeout': 0.01, **kwargs})
+
+    def test_returned_connections_are_reused(self):
+        pool = self.make_pool()
+        connection = pool.checkout()
+        pool.checkin(connection)
+
+        self.assertIs(pool.checkout(), connection)
+        self.assertEqual(pool.get_stats()['created'], 1)
+
+    def test_size_is_limited(self):
+        pool = self.make_pool(max_size=2)
+        pool.checkout()
+        connection = pool.checkout()
+
+        with self.assertRaises(PoolTimeout):
+            pool.checkout()
+
+        pool.checkin(connection)
+        self.assertIs(pool.checkout(), connection)
+
+    def test_extra_idle_connections_are_closed(self):
+        pool = self.make_pool(max_idle=1)
+        first, second = pool.checkout(), pool.checkout()
+        pool.checkin(first)
+        pool.checkin(second)
+
+        self.assertFalse(first.closed)
+        self.assertTrue(second.closed)
+        self.assertEqual(pool.get_stats()['size'], 1)
+
+    def test_unhealthy_connections_are_replaced(self):
+        pool = self.make_pool(health_check_interval=0)
+        connection = pool.checkout()
+        pool.checkin(connection)
+        connection.alive = False
+
+        replacement = pool.checkout()
+        self.assertIsNot(replacement, connection)
+        self.assertTrue(connection.closed)
+        self.assertEqual(pool.get_stats()['size'], 1)
+
+    def test_expired_connections_are_replaced(self):
+        pool = self.make_pool(max_lifetime=0.01)
+        connection = pool.checkout()
+        pool.checkin(connection)
+        time.sleep(0.02)
+
+        self.assertIsNot(pool.checkout(), connection)
+        self.assertTrue(connection.closed)
+
+    def test_search_path_is_split_from_options(self):
+        conn_params, search_path = split_search_path({
+            'database': 'rml', 'options': '-c search_path=posts,public -c statement_timeout=5000'
+        })
+
+        self.assertEqual(search_path, ['posts', 'public'])
+        self.assertEqual(conn_params, {'database': 'rml', 'options': '-c statement_timeout=5000'})
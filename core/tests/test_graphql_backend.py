@@ -0,0 +1,53 @@
+import json
+from django.test import RequestFactory, SimpleTestCase
+from graphene_django.settings import graphene_settings
+
+from core.graphql.backend import CachedDocumentBackend
+from core.graphql.views import PersistedQueryGraphQLView
+
+QUERY = '{ allArtistPosts(first: 2) { edges { node { pk } } } }'
+
+
+class CachedDocumentBackendTests(SimpleTestCase):
+    def test_documents_are_cached(self):
+        backend = CachedDocumentBackend(max_size=1)
+        schema = graphene_settings.SCHEMA
+
+        document = backend.document_from_string(schema, QUERY)
+        self.assertIs(backend.document_from_string(schema, QUERY), document)
+        self.assertEqual((backend.hits, backend.misses), (1, 1))
+
+    def test_least_recently_used_document_is_evicted(self):
+        backend = CachedDocumentBackend(max_size=1)
+        schema = graphene_settings.SCHEMA
+
+        document = backend.document_from_string(schema, QUERY)
+        backend.document_from_string(schema, '{ allArtistPosts { edges { node { uuid } } } }')
+        self.assertIsNot(backend.document_from_string(schema, QUERY), document)
+
+    def test_invalid_documents_are_not_cached(self):
+        backend = CachedDocumentBackend()
+        schema = graphene_settings.SCHEMA
+        query = '{ unknownField }'
+
+        result = backend.document_from_string(schema, query).execute()
+        self.assertTrue(result.invalid)
+        backend.document_from_string(schema, query)
+        self.assertEqual(backend.misses, 2)
+
+
+class PersistedQueryTests(SimpleTestCase):
+    def post(self, data):
+        view = PersistedQueryGraphQLView.as_view(schema=graphene_settings.SCHEMA)
+        request = RequestFactory().post('/graphql/', json.dumps(data), content_type='application/json')
+        return view(request)
+
+    def test_invalid_extensions_are_rejected(self):
+        for extensions in [1, {'persistedQuery': 'hash'}, {'persistedQuery': {'sha256Hash': 1}}]:
+            response = self.post({'extensions': extensions})
+
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(
+                json.loads(response.content)['errors'][0]['extensions']['code'],
+                'PERSISTED_QUERY_INVALID'
+            )
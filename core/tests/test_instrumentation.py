@@ -0,0 +1,49 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from core.instrumentation import (
+    aggregates, get_metrics, instrument_operation, record_cache_hit, render_prometheus
+)
+
+SAMPLE_ALL = {'ENABLED': True, 'SAMPLE_RATE': 1, 'FLUSH_INTERVAL': 0}
+
+
+class InstrumentationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        aggregates.flush()
+
+    def execute_query(self):
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+
+    @override_settings(INSTRUMENTATION=SAMPLE_ALL)
+    def test_queries_are_attributed_to_resolvers(self):
+        with instrument_operation('GetPosts') as recorder:
+            self.execute_query()
+            with recorder.resolver('Query.allArtistPosts'):
+                self.execute_query()
+                self.execute_query()
+                record_cache_hit()
+
+        self.assertEqual(recorder.stats['sql_count'], 3)
+        self.assertEqual(recorder.stats['cache_hits'], 1)
+        resolver_stats = recorder.resolvers['Query.allArtistPosts']
+        self.assertEqual(resolver_stats['count'], 1)
+        self.assertEqual(resolver_stats['sql_count'], 2)
+
+        metrics = get_metrics()
+        self.assertEqual(metrics['operations']['GetPosts']['sql_count'], 3)
+        self.assertIn(
+            'graphql_resolver_sql_queries_total{field="Query.allArtistPosts"} 2',
+            render_prometheus(metrics)
+        )
+
+    @override_settings(INSTRUMENTATION={**SAMPLE_ALL, 'SAMPLE_RATE': 0})
+    def test_unsampled_operations_are_not_recorded(self):
+        with instrument_operation('GetPosts') as recorder:
+            self.execute_query()
+
+        self.assertEqual(recorder.stats['sql_count'], 0)
+        self.assertEqual(get_metrics()['operations'], {})
@@ -0,0 +1,39 @@
+import tempfile
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+
+from core.constants import FILE_STORAGE_CLASS
+from core.media import get_media_url, release_media, store_media
+from core.models import MediaBlob
+
+
+@override_settings(
+    MEDIA_ROOT=tempfile.mkdtemp(),
+    MEDIA_CDN_URL='https://cdn.example.com/media/'
+)
+class MediaStoreTests(TestCase):
+    def test_identical_files_are_stored_once(self):
+        name = store_media(ContentFile(b'meme'), 'meme.PNG')
+        self.assertEqual(store_media(ContentFile(b'meme'), 'copy.png'), name)
+        self.assertNotEqual(store_media(ContentFile(b'other meme'), 'meme.png'), name)
+
+        self.assertTrue(name.endswith('.png'))
+        self.assertEqual(MediaBlob.objects.get(name=name).ref_count, 2)
+        self.assertEqual(get_media_url(name), f'https://cdn.example.com/media/{name}')
+
+    def test_files_are_deleted_once_unreferenced(self):
+        storage = FILE_STORAGE_CLASS()
+        name = store_media(ContentFile(b'meme'), 'meme.png')
+        store_media(ContentFile(b'meme'), 'meme.png')
+
+        self.assertEqual(release_media([name]), 0)
+        self.assertTrue(storage.exists(name))
+
+        # Names of files that aren't stored are ignored
+        self.assertEqual(release_media([name, 'users/user_1/photo.png']), 1)
+        self.assertFalse(storage.exists(name))
+        self.assertFalse(MediaBlob.objects.filter(name=name).exists())
+
+    @override_settings(MEDIA_CDN_URL=None, MEDIA_URL='media/')
+    def test_urls_default_to_media_url(self):
+        self.assertEqual(get_media_url('cas/ab/cd/meme.png'), '/media/cas/ab/cd/meme.png')
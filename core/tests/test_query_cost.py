@@ -0,0 +1,74 @@
+from django.contrib.auth.models import AnonymousUser
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from graphql import parse
+from graphql.language import ast
+
+from core.graphql.cost import QueryCostAnalyzer
+from core.graphql.middleware import get_client_key
+
+
+class QueryCostAnalyzerTests(SimpleTestCase):
+    def analyze(self, query, variables=None, **kwargs):
+        document = parse(query)
+        operation = next(
+            definition for definition in document.definitions
+            if isinstance(definition, ast.OperationDefinition)
+        )
+        fragments = {
+            definition.name.value: definition for definition in document.definitions
+            if isinstance(definition, ast.FragmentDefinition)
+        }
+        return QueryCostAnalyzer(fragments, variables, **kwargs).analyze(operation)
+
+    def test_connection_sizes_multiply_cost(self):
+        result = self.analyze('''
+            query($first: Int) {
+                allArtistPosts(first: $first) {
+                    edges { node { body poster { username } } }
+                }
+            }
+        ''', variables={'first': 10})
+
+        # allArtistPosts + 10 posters
+        self.assertEqual(result.cost, 11)
+        # edges and node don't count
+        self.assertEqual(result.depth, 2)
+
+    def test_page_size_is_bounded(self):
+        result = self.analyze('''
+            {
+                allArtistPosts(first: 10000) {
+                    edges { node { poster { username } } }
+                }
+            }
+        ''', max_page_size=100)
+
+        self.assertEqual(result.cost, 101)
+
+    def test_fragments_and_field_costs(self):
+        result = self.analyze('''
+            { artistPost(id: 1) { ...PostFields } }
+            fragment PostFields on ArtistPostNode { poster { username } }
+        ''', field_costs={'artistPost': 3})
+
+        self.assertEqual(result.cost, 4)
+        self.assertEqual(result.depth, 2)
+
+
+class ClientKeyTests(SimpleTestCase):
+    def get_key(self, forwarded_for):
+        request = RequestFactory().post(
+            '/graphql', HTTP_X_FORWARDED_FOR=forwarded_for, REMOTE_ADDR='10.0.0.2'
+        )
+        request.user = AnonymousUser()
+        return get_client_key(request)
+
+    @override_settings(GRAPHQL_QUERY_COST={'NUM_TRUSTED_PROXIES': 0})
+    def test_forwarded_for_is_ignored_without_proxies(self):
+        self.assertEqual(self.get_key('1.2.3.4'), 'ip-10.0.0.2')
+
+    @override_settings(GRAPHQL_QUERY_COST={'NUM_TRUSTED_PROXIES': 1})
+    def test_address_appended_by_proxy_is_used(self):
+        # The first address is spoofed by the client
+        self.assertEqual(self.get_key('1.2.3.4, 5.6.7.8'), 'ip-5.6.7.8')
+        self.assertEqual(self.get_key(''), 'ip-10.0.0.2')
@@ -0,0 +1,68 @@
+from django.core.cache import cache
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from graphql import parse
+
+from accounts.models.artists.models import Artist
+from core.graphql.response_cache import bump_tags, collection_fields_changed, get_cacheable_query
+
+RESPONSE_CACHE_SETTINGS = {
+    'ENABLED': True,
+    'FIELDS': {
+        'artist': (60, []),
+        'allArtists': (30, ['artist']),
+    },
+}
+
+
+@override_settings(GRAPHQL_RESPONSE_CACHE=RESPONSE_CACHE_SETTINGS)
+class ResponseCacheTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.request = RequestFactory().post('/graphql/')
+
+    def get_cacheable_query(self, query, request=None, variables=None):
+        return get_cacheable_query(request or self.request, parse(query), variables, None)
+
+    def test_only_allowed_anonymous_queries_are_cacheable(self):
+        self.assertIsNotNone(self.get_cacheable_query('{ artist(slug: "a") { name } }'))
+        self.assertIsNone(self.get_cacheable_query('{ me { username } }'))
+        self.assertIsNone(
+            self.get_cacheable_query('mutation { followArtist(input: {}) { clientMutationId } }')
+        )
+
+        authed_request = RequestFactory().post('/graphql/', HTTP_AUTHORIZATION='JWT token')
+        self.assertIsNone(self.get_cacheable_query('{ artist { name } }', authed_request))
+
+    def test_ttl_is_the_shortest_field_ttl(self):
+        cacheable_query = self.get_cacheable_query('{ artist { name } allArtists { edges { node { name } } } }')
+
+        self.assertEqual(cacheable_query.ttl, 30)
+        self.assertEqual(cacheable_query.tags, {'artist'})
+
+    def test_key_ignores_formatting_but_not_variables(self):
+        key = self.get_cacheable_query('{ artist { name } }').key
+
+        self.assertEqual(self.get_cacheable_query('{\n  artist {\n name }\n}').key, key)
+        self.assertNotEqual(
+            self.get_cacheable_query('{ artist { name } }', variables={'id': 1}).key,
+            key
+        )
+
+    def test_bumping_a_tag_makes_response_stale(self):
+        cacheable_query = self.get_cacheable_query('{ artist { name } }')
+        cacheable_query.tags.add('artist:1')
+        cacheable_query.set('{"data": {}}', 200, {})
+
+        self.assertEqual(cacheable_query.get(), ('{"data": {}}', 200))
+        bump_tags('artist:1')
+        self.assertIsNone(cacheable_query.get())
+
+    def test_only_collection_fields_change_collection(self):
+        artist = Artist(pk=1, name='artist name')
+
+        self.assertFalse(collection_fields_changed(artist, ['num_followers']))
+        self.assertTrue(collection_fields_changed(artist, ['name']))
+        self.assertFalse(collection_fields_changed(artist))
+
+        artist.name = 'new name'
+        self.assertTrue(collection_fields_changed(artist))
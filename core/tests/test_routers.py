@@ -0,0 +1,54 @@
+import time
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase
+
+from core import routers
+from core.middleware import PrimaryPinMiddleware
+from core.routers import ReplicaRouter, routing_state, use_replica
+
+
+class ReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        self.router = ReplicaRouter(replicas=['replica'])
+        # Stand-in for the replica: its lag was just measured
+        self.set_replica_lag(0)
+
+    def tearDown(self):
+        routers._replica_lags.clear()
+
+    def set_replica_lag(self, lag):
+        routers._replica_lags['replica'] = (lag, time.monotonic())
+
+    def test_only_reads_in_replica_blocks_go_to_replicas(self):
+        with routing_state():
+            self.assertEqual(self.router.db_for_read(None), 'default')
+
+            with use_replica():
+                self.assertEqual(self.router.db_for_read(None), 'replica')
+                self.assertEqual(self.router.db_for_write(None), 'default')
+
+    def test_reads_after_a_write_go_to_the_primary(self):
+        with routing_state(), use_replica():
+            self.router.db_for_write(None)
+            self.assertEqual(self.router.db_for_read(None), 'default')
+
+        with routing_state(pinned=True), use_replica():
+            self.assertEqual(self.router.db_for_read(None), 'default')
+
+    def test_lagging_replicas_arent_used(self):
+        self.set_replica_lag(60)
+
+        with routing_state(), use_replica():
+            self.assertEqual(self.router.db_for_read(None), 'default')
+
+    def test_client_is_pinned_after_writing(self):
+        def write(request):
+            self.router.db_for_write(None)
+            return HttpResponse()
+
+        request = RequestFactory().post('/graphql/')
+        response = PrimaryPinMiddleware(write)(request)
+        self.assertIn('primary_pin', response.cookies)
+
+        response = PrimaryPinMiddleware(lambda request: HttpResponse())(request)
+        self.assertNotIn('primary_pin', response.cookies)
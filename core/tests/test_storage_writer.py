@@ -0,0 +1,47 @@
+import tempfile
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.test import TestCase
+
+from core.models import MediaBlob
+from core.storage_writer import StorageBatchWriter
+
+
+class FlakyStorage(FileSystemStorage):
+    """Storage failing the first write of each file with a transient error"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.failed_names = set()
+
+    def _save(self, name, content):
+        if name not in self.failed_names:
+            self.failed_names.add(name)
+            raise ConnectionError('Connection reset')
+
+        return super()._save(name, content)
+
+
+class StorageBatchWriterTests(TestCase):
+    def setUp(self):
+        self.storage = FlakyStorage(location=tempfile.mkdtemp())
+
+    def test_files_are_written_with_retries(self):
+        files = [(f'photos/photo{i % 3}.png', ContentFile(b'photo')) for i in range(6)]
+
+        with StorageBatchWriter(self.storage, max_workers=4, retry_delay=0) as writer:
+            names = writer.save_all(files)
+
+        # Files with the same name get distinct names
+        self.assertEqual(len(set(names)), 6)
+        self.assertTrue(all(self.storage.exists(name) for name in names))
+
+    def test_files_are_deleted_if_the_block_fails(self):
+        with self.assertRaises(ValueError):
+            with StorageBatchWriter(self.storage, retry_delay=0) as writer:
+                names = writer.save_all([('photo.png', ContentFile(b'photo'))])
+                MediaBlob.objects.create(sha256='0' * 64, name=names[0], size=5)
+                raise ValueError
+
+        self.assertFalse(self.storage.exists(names[0]))
+        self.assertFalse(MediaBlob.objects.exists())
@@ -0,0 +1,42 @@
+import base64
+import tempfile
+from django.core.files.base import ContentFile
+from django.db.models.fields.files import FieldFile
+from django.test import TestCase, override_settings
+from io import BytesIO
+from PIL import Image
+
+from core.constants import FILE_STORAGE_CLASS, PHOTO_PLACEHOLDER_SIZE, PHOTO_VARIANTS
+from core.media import release_media, store_media
+from core.thumbnails import create_photo_variants, get_photo_url, get_placeholder, get_variant_name
+
+
+def create_image(size=(1000, 600)):
+    image_file = BytesIO()
+    Image.new('RGB', size, 'red').save(image_file, format='PNG')
+    return ContentFile(image_file.getvalue())
+
+
+@override_settings(
+    MEDIA_ROOT=tempfile.mkdtemp(),
+    MEDIA_CDN_URL='https://cdn.example.com/media/'
+)
+class PhotoThumbnailTests(TestCase):
+    def test_variants_are_stored_and_deleted_with_the_photo(self):
+        storage = FILE_STORAGE_CLASS()
+        name = store_media(create_image(), 'photo.png', create_photo_variants)
+
+        for alias in PHOTO_VARIANTS:
+            variant_name = get_variant_name(name, alias)
+            self.assertTrue(storage.exists(variant_name))
+            self.assertEqual(
+                get_photo_url(FieldFile(None, None, name), alias),
+                f'https://cdn.example.com/media/{variant_name}'
+            )
+
+        release_media([name])
+        self.assertFalse(any(storage.exists(get_variant_name(name, alias)) for alias in PHOTO_VARIANTS))
+
+    def test_placeholder_is_tiny(self):
+        placeholder = Image.open(BytesIO(base64.b64decode(get_placeholder(Image.open(create_image())))))
+        self.assertLessEqual(max(placeholder.size), PHOTO_PLACEHOLDER_SIZE)
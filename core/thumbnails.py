@@ -0,0 +1,77 @@
+"""
+Thumbnails of the photos.
+
+The thumbnails of the `PHOTO_VARIANTS` aliases(see `settings.THUMBNAIL_ALIASES`) are
+computed once, when a photo is stored(`create_photo_variants()`), and named after it
+so that their urls are computed without storage calls(`get_photo_url()`).
+Photos stored before the content-addressed store(see core.media) fall back to
+easy_thumbnails, which generates the thumbnails on the first request.
+
+Instead of inlining photos, the responses include a tiny low-quality preview of
+each photo(`get_placeholder()`), computed at upload, shown while the photo loads.
+"""
+
+import base64
+import os
+from django.conf import settings
+from django.core.files.base import ContentFile
+from io import BytesIO
+from PIL import Image
+
+from core.constants import FILE_STORAGE_CLASS, PHOTO_PLACEHOLDER_SIZE, PHOTO_VARIANTS
+from core.media import get_media_url, is_stored_media
+
+THUMBNAIL_ALIASES = settings.THUMBNAIL_ALIASES['']
+
+
+def get_variant_name(name, alias):
+    root, extension = os.path.splitext(name)
+    return f'{root}.{alias}{extension}'
+
+
+def create_photo_variants(name, content, save=None):
+    """
+    Store the thumbnails of the photo `name` of content `content`, return their names.
+    Used as the `create_variants` of `core.media.store_media()`, `save(name, content)`
+    writes a file.
+    """
+    storage = FILE_STORAGE_CLASS()
+    save = save or storage.save
+    image = Image.open(content)
+    image_format = image.format
+    variant_names = []
+
+    for alias in PHOTO_VARIANTS:
+        variant_name = get_variant_name(name, alias)
+        if not storage.exists(variant_name):
+            # Photos aren't enlarged, a variant may be the same size as the photo
+            thumb = image.copy()
+            thumb.thumbnail(THUMBNAIL_ALIASES[alias]['size'], Image.ANTIALIAS)
+            thumb_file = BytesIO()
+            thumb.save(thumb_file, format=image_format)
+            save(variant_name, ContentFile(thumb_file.getvalue()))
+
+        variant_names.append(variant_name)
+
+    return variant_names
+
+
+def get_photo_url(photo, size=None):
+    """
+    Url of the photo file `photo`(a `ThumbnailerImageField` value), or of its
+    thumbnail `size`(one of `PHOTO_VARIANTS`).
+    """
+    if is_stored_media(photo.name):
+        return get_media_url(get_variant_name(photo.name, size) if size else photo.name)
+
+    return photo[size].url if size else photo.url
+
+
+def get_placeholder(image):
+    """Base64 encoded jpeg preview of the PIL `image`, a few hundred bytes"""
+    preview = image.convert('RGB')
+    preview.thumbnail((PHOTO_PLACEHOLDER_SIZE, PHOTO_PLACEHOLDER_SIZE))
+    preview_file = BytesIO()
+    preview.save(preview_file, format='JPEG', quality=40)
+
+    return base64.b64encode(preview_file.getvalue()).decode('utf-8')
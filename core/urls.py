@@ -1,15 +1,19 @@
 
 from django.urls import path
 from django.views.decorators.csrf import csrf_exempt
-from graphene_file_upload.django import FileUploadGraphQLView
 from graphql_jwt.decorators import jwt_cookie
 
+from core.graphql.views import PersistedQueryGraphQLView
+from core.views import metrics
+
 
 urlpatterns = [
 	# Using this jwt_cookie decorator, we no longer need to pass the Authorization
 	# header to the request; a cookie will be automatically used to store the
 	# authed user's token.
 	# path('graphql/', jwt_cookie(FileUploadGraphQLView.as_view(graphiql=True))),
-	path('graphql/', jwt_cookie(csrf_exempt(FileUploadGraphQLView.as_view(graphiql=True)))),
+	path('graphql/', jwt_cookie(csrf_exempt(PersistedQueryGraphQLView.as_view(graphiql=True)))),
+	# Prometheus metrics, see core.instrumentation
+	path('metrics/', metrics),
 ]
 
@@ -3,7 +3,7 @@ import ffmpeg
 import os
 from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
-from django.core.files.uploadedfile import TemporaryUploadedFile, InMemoryUploadedFile
+from django.core.files.uploadedfile import InMemoryUploadedFile
 from django.utils.translation import gettext_lazy as _
 from graphene_django_cud.util import disambiguate_id
 from graphql import GraphQLError
@@ -25,7 +25,8 @@ def get_file_path(file):
     Get file path of file object or uploaded file. If `uploaded_file` is in 
     memory(InMemoryUploadedFile), save it to a temporary folder and return that path.
     """
-    if isinstance(file, TemporaryUploadedFile):
+    # Uploaded files already on disk, eg. TemporaryUploadedFiles
+    if hasattr(file, 'temporary_file_path'):
         print("temporary uploaded file")
         path = file.temporary_file_path()
     elif isinstance(file, InMemoryUploadedFile):
@@ -97,10 +98,12 @@ def get_user_cache_keys(username: str):
     """
     cache_photos_key = f'{username}-unposted-photos'
     cache_video_key = f'{username}-unposted-video'
+    cache_video_upload_key = f'{username}-video-upload'
     
     return {
         'photos': cache_photos_key,
-        'video': cache_video_key
+        'video': cache_video_key,
+        'video_upload': cache_video_upload_key
     }
 
 
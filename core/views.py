@@ -1,3 +1,21 @@
-from django.shortcuts import render
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.http import require_GET
 
-# Create your views here.
+from core.instrumentation import get_instrumentation_settings, get_metrics, render_prometheus
+
+
+@require_GET
+def metrics(request):
+	"""Export the metrics of the graphql operations in Prometheus' text format"""
+	token = get_instrumentation_settings()['METRICS_TOKEN']
+	authorization = request.META.get('HTTP_AUTHORIZATION', '')
+	has_valid_token = token and constant_time_compare(authorization, f'Bearer {token}')
+
+	if not has_valid_token and not request.user.is_staff:
+		return HttpResponseForbidden()
+
+	return HttpResponse(
+		render_prometheus(get_metrics()),
+		content_type='text/plain; version=0.0.4; charset=utf-8'
+	)
@@ -1,3 +1,4 @@
+import datetime
 from django.conf import settings
 from django.utils.translation import gettext_lazy as _
 
@@ -21,4 +22,13 @@ AUTO_DELETE_FLAGS_COUNT = settings.AUTO_DELETE_FLAGS_COUNT
 # Currently = 4
 AUTO_SUSPEND_USER_ACCOUNT_FLAGS_COUNT = settings.AUTO_SUSPEND_USER_ACCOUNT_FLAGS_COUNT
 
+# Number of flags whose state is recomputed per statement when
+# CONTENT_IS_FLAGGED_COUNT changes
+FLAG_STATES_CHUNK_SIZE = 10000
 
+# Moderators review the flagged content they claim from the moderation queue
+# during this time, after which it goes back to the queue
+MODERATION_CLAIM_DURATION = datetime.timedelta(minutes=15)
+MAX_MODERATION_CLAIM_SIZE = 20
+# Flags of this period count in the velocity of a flag
+FLAG_VELOCITY_PERIOD = datetime.timedelta(hours=24)
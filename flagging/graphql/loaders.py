@@ -0,0 +1,24 @@
+from collections import defaultdict
+from django.contrib.contenttypes.models import ContentType
+from promise import Promise
+from promise.dataloader import DataLoader
+
+
+class FlaggedObjectLoader(DataLoader):
+    """
+    Load flagged objects from their `(content type id, object id)`.
+    The objects resolved in a request are fetched with one query per content type.
+    """
+
+    def batch_load_fn(self, keys):
+        object_ids = defaultdict(set)
+        for content_type_id, object_id in keys:
+            object_ids[content_type_id].add(object_id)
+
+        objects = {}
+        for content_type_id, ids in object_ids.items():
+            model = ContentType.objects.get_for_id(content_type_id).model_class()
+            for obj in model.objects.filter(id__in=ids):
+                objects[content_type_id, obj.id] = obj
+
+        return Promise.resolve([objects.get(key) for key in keys])
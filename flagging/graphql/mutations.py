@@ -0,0 +1,54 @@
+import graphene
+from django.utils.translation import gettext_lazy as _
+from graphene_django_cud.util import disambiguate_id
+from graphql import GraphQLError
+from graphql_auth.bases import Output
+from graphql_auth.decorators import login_required
+
+from flagging import moderation
+from flagging.constants import MAX_MODERATION_CLAIM_SIZE
+from .types import ModerationQueueItemNode
+
+
+def check_is_mod(user):
+    if not user.is_mod:
+        raise GraphQLError(
+            _("Only moderators can review flagged content"),
+            extensions={'code': 'not_permitted'}
+        )
+
+
+class ClaimModerationItems(Output, graphene.ClientIDMutation):
+    """
+    Claim the items of the moderation queue with the highest priority,
+    other moderators won't get them until they are released or the claim expires.
+    """
+
+    class Input:
+        count = graphene.Int(default_value=MAX_MODERATION_CLAIM_SIZE)
+
+    items = graphene.List(ModerationQueueItemNode)
+
+    @classmethod
+    @login_required
+    def mutate_and_get_payload(cls, root, info, count):
+        user = info.context.user
+        check_is_mod(user)
+
+        return cls(items=moderation.claim(user, count))
+
+
+class ReleaseModerationItems(Output, graphene.ClientIDMutation):
+    class Input:
+        flag_ids = graphene.List(graphene.ID, required=True)
+
+    num_released = graphene.Int()
+
+    @classmethod
+    @login_required
+    def mutate_and_get_payload(cls, root, info, flag_ids):
+        user = info.context.user
+        check_is_mod(user)
+
+        flag_ids = [int(disambiguate_id(flag_id)) for flag_id in flag_ids]
+        return cls(num_released=moderation.release(user, flag_ids))
@@ -0,0 +1,34 @@
+import graphene
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from graphene_django import DjangoConnectionField
+from graphql import GraphQLError
+from graphql_auth.decorators import login_required
+
+from flagging.moderation import get_queue
+from .types import ModerationQueueItemNode
+
+
+class ModerationQuery(graphene.ObjectType):
+    moderation_queue = DjangoConnectionField(
+        ModerationQueueItemNode,
+        claimed_by_me=graphene.Boolean(default_value=False)
+    )
+
+    @classmethod
+    @login_required
+    def resolve_moderation_queue(cls, root, info, claimed_by_me, **kwargs):
+        """Flagged content to review, by priority. Items claimed by other moderators are excluded."""
+        user = info.context.user
+
+        if not user.is_mod:
+            raise GraphQLError(
+                _("Only moderators can view the moderation queue"),
+                extensions={'code': 'not_permitted'}
+            )
+
+        queue = get_queue(moderator=user)
+        if claimed_by_me:
+            queue = queue.filter(claimed_by=user, claim_expires_on__gt=timezone.now())
+
+        return queue
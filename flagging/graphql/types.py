@@ -1,8 +1,12 @@
 import graphene
 from graphene_django import DjangoObjectType
 
+from core.graphql.loaders import get_loader
 from core.mixins import GraphenePKMixin
 from flagging.models.models import Flag, FlagInstance
+from posts.graphql.artist_posts.types import ArtistPostCommentNode, ArtistPostNode
+from posts.graphql.non_artist_posts.queries import NonArtistPostNode
+from .loaders import FlaggedObjectLoader
 
 
 FlagReason = graphene.Enum.from_enum(FlagInstance.FlagReason)
@@ -20,3 +24,25 @@ class FlagInstanceNode(GraphenePKMixin, DjangoObjectType):
         interfaces = [graphene.relay.Node, ]
 
 
+class FlaggedContent(graphene.Union):
+    class Meta:
+        types = (ArtistPostNode, ArtistPostCommentNode, NonArtistPostNode)
+
+
+class ModerationQueueItemNode(GraphenePKMixin, DjangoObjectType):
+    """Flagged content of the moderation queue(see flagging.moderation)"""
+
+    # Annotations of `flagging.moderation.get_queue()`
+    velocity = graphene.Int()
+    poster_num_flagged = graphene.Int()
+    content = graphene.Field(FlaggedContent)
+
+    class Meta:
+        model = Flag
+        fields = ('id', 'count', 'creator', 'claimed_by', 'claim_expires_on')
+        interfaces = [graphene.relay.Node, ]
+        # FlagNode is the type of the flag fields of other types
+        skip_registry = True
+
+    def resolve_content(root, info):
+        return get_loader(info, FlaggedObjectLoader).load((root.content_type_id, root.object_id))
@@ -1,9 +1,11 @@
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
-from django.db import IntegrityError, models
+from django.db import IntegrityError, connections, models, router, transaction
 from django.utils.translation import gettext_lazy as _
  
 from core.utils import get_content_type
+from .constants import CONTENT_IS_FLAGGED_COUNT, FLAG_STATES_CHUNK_SIZE
+from .models.operations import get_state_sql
 
 
 class FlagManager(models.Manager):
@@ -37,6 +39,43 @@ class FlagManager(models.Manager):
         """
         return model_obj.flags.filter(user=user).exists()
 
+    def recompute_states(
+        self, 
+        threshold=CONTENT_IS_FLAGGED_COUNT, 
+        chunk_size=FLAG_STATES_CHUNK_SIZE, 
+        using=None
+    ):
+        """
+        Recompute the state of all the flags from their count, with an `UPDATE`
+        per chunk of `chunk_size` ids, each in its own short transaction.
+        Returns the number of updated flags.
+        """
+        db = using or router.db_for_write(self.model)
+        connection = connections[db]
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        state_sql, params = get_state_sql(self.model.State, 'count', threshold)
+        num_updated = 0
+
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT MIN(id), MAX(id) FROM {table}')
+            min_id, max_id = cursor.fetchone()
+
+        if min_id is None:
+            return 0
+
+        for start_id in range(min_id, max_id + 1, chunk_size):
+            with transaction.atomic(using=db), connection.cursor() as cursor:
+                cursor.execute(
+                    f'''
+                    UPDATE {table} SET state = {state_sql}
+                    WHERE id BETWEEN %(start_id)s AND %(end_id)s AND state <> {state_sql}
+                    ''',
+                    {**params, 'start_id': start_id, 'end_id': start_id + chunk_size - 1}
+                )
+                num_updated += cursor.rowcount
+
+        return num_updated
+
 
 class FlagInstanceManager(models.Manager):
     def _clean_reason(self, reason):
@@ -0,0 +1,22 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('flagging', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FlagSetting',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('value', models.IntegerField()),
+            ],
+            options={
+                'db_table': 'flagging"."flag_setting',
+            },
+        ),
+    ]
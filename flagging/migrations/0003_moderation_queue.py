@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('flagging', '0002_flagsetting'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='flag',
+            name='claim_expires_on',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='flag',
+            name='claimed_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='claimed_flags', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='flag',
+            index=models.Index(condition=models.Q(('state', 2)), fields=['claim_expires_on'], name='flag_moderation_queue_idx'),
+        ),
+    ]
@@ -54,6 +54,14 @@ class Flag(models.Model, FlagOperations):
         on_delete=models.SET_NULL
     )
     count = models.PositiveIntegerField(default=0)
+    # Moderator reviewing the flagged content until `claim_expires_on`, see flagging.moderation
+    claimed_by = models.ForeignKey(
+        User, 
+        null=True, blank=True, 
+        related_name='claimed_flags', 
+        on_delete=models.SET_NULL
+    )
+    claim_expires_on = models.DateTimeField(null=True, blank=True)
 
     objects = FlagManager()
 
@@ -70,6 +78,14 @@ class Flag(models.Model, FlagOperations):
     class Meta:
         db_table = 'flagging\".\"flag'
         verbose_name = _('Flag')
+        indexes = [
+            models.Index(
+                # Moderation queue, only FLAGGED(2) flags are reviewed
+                fields=['claim_expires_on'],
+                name='flag_moderation_queue_idx',
+                condition=models.Q(state=2)
+            )
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=['content_type', 'object_id'],
@@ -144,3 +160,17 @@ class FlagInstance(models.Model):
         verbose_name = _('Flag Instance')
         verbose_name_plural = _('Flag Instances')
 
+
+class FlagSetting(models.Model):
+    """
+    Value of a flagging setting as last applied to the flags, so that the flags
+    are only updated when the setting changes(see `flagging.signals.adjust_flagged_content`).
+    """
+    name = models.CharField(max_length=50, unique=True)
+    value = models.IntegerField()
+
+    def __str__(self):
+        return f'{self.name}={self.value}'
+
+    class Meta:
+        db_table = 'flagging\".\"flag_setting'
@@ -1,22 +1,70 @@
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import connection
 from django.utils.translation import gettext_lazy as _
 
 from ..constants import CONTENT_IS_FLAGGED_COUNT
 
 
+def get_state_sql(State, count_sql, threshold=CONTENT_IS_FLAGGED_COUNT):
+    """
+    Return the SQL expression(and its params) of the state of a flag having
+    `count_sql` flags: moderator decisions are kept, other flags are FLAGGED
+    from `threshold` flags and UNFLAGGED below.
+    """
+    sql = f'''
+        CASE
+            WHEN state IN (%(rejected)s, %(resolved)s) THEN state
+            WHEN {count_sql} < %(threshold)s THEN %(unflagged)s
+            WHEN state = %(unflagged)s THEN %(flagged)s
+            ELSE state
+        END
+    '''
+    params = {
+        'threshold': threshold,
+        'rejected': State.REJECTED.value,
+        'resolved': State.RESOLVED.value,
+        'unflagged': State.UNFLAGGED.value,
+        'flagged': State.FLAGGED.value,
+    }
+    return sql, params
+
+
 class FlagOperations:
     """Mixin for operations on the Flag model"""
     
+    def update_count(self, delta):
+        """
+        Add `delta` to the count and update the state accordingly in a single statement.
+        Concurrent updates are serialized by the row lock, so each of them gets
+        a distinct count and threshold transitions are seen by exactly one of them.
+        Return the new count, or `None` if the flag no longer exists.
+        """
+        table = connection.ops.quote_name(self._meta.db_table)
+        state_sql, params = get_state_sql(self.State, 'count + %(delta)s')
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'''
+                UPDATE {table}
+                SET count = GREATEST(count + %(delta)s, 0), state = {state_sql}
+                WHERE id = %(id)s
+                RETURNING count, state
+                ''',
+                {**params, 'delta': delta, 'id': self.pk}
+            )
+            row = cursor.fetchone()
+
+        if row is None:
+            return None
+
+        self.count, self.state = row
+        return self.count
+
     def increase_count(self):
-        self.refresh_from_db()
-        self.count = models.F('count') + 1
-        self.save(update_fields=['count'])
+        return self.update_count(1)
 
     def decrease_count(self):
-        self.refresh_from_db()
-        self.count = models.F('count') - 1
-        self.save(update_fields=['count'])
+        return self.update_count(-1)
 
     def get_clean_state(self, state):
         """Get integral value representation of state"""
@@ -61,20 +109,9 @@ class FlagOperations:
         else:
             self.state = state
         self.moderator = moderator
-        self.save()
+        # Not the count, it may have been changed by concurrent flaggers
+        self.save(update_fields=['state', 'moderator'])
 
     def toggle_flagged_state(self):
-        """Modify flag state if object if flagged (count is `CONTENT_IS_FLAGGED_COUNT`)"""
-        self.refresh_from_db()
-        field = 'state'
-        
-        if self.count == CONTENT_IS_FLAGGED_COUNT and (
-            getattr(self, field) not in [self.State.RESOLVED.value, self.State.REJECTED.value]
-        ):
-            setattr(self, field, self.State.FLAGGED.value)
-        else:
-            setattr(self, field, self.State.UNFLAGGED.value)
-
-        self.save(update_fields=[field])
-
-
+        """Update the state from the count (FLAGGED from `CONTENT_IS_FLAGGED_COUNT` flags)"""
+        self.update_count(0)
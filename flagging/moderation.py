@@ -0,0 +1,93 @@
+"""
+Moderation queue: the FLAGGED posts and comments awaiting a decision of the moderators.
+
+Moderators claim items of the queue for `MODERATION_CLAIM_DURATION` so that they
+don't review the same content. Claims lock the flags with `SELECT ... FOR UPDATE
+SKIP LOCKED`, so concurrent moderators get distinct items without waiting for each other.
+
+Items are prioritized by:
+- velocity: the number of flags received during the last `FLAG_VELOCITY_PERIOD`;
+- reputation of the poster: posters with more flagged content come first.
+"""
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import models, transaction
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from posts.models.artist_posts.models import ArtistPost, ArtistPostComment
+from posts.models.non_artist_posts.models import NonArtistPost
+from .constants import FLAG_VELOCITY_PERIOD, MAX_MODERATION_CLAIM_SIZE, MODERATION_CLAIM_DURATION
+from .models.models import Flag, FlagInstance
+
+# Non artist post comments can't be flagged through the api yet
+MODERATED_MODELS = [ArtistPost, ArtistPostComment, NonArtistPost]
+
+
+def get_queue(moderator=None, now=None):
+    """
+    Return the FLAGGED flags of posts and comments ordered by priority, annotated
+    with their `velocity` and the number of flagged contents of their poster(`poster_num_flagged`).
+    If `moderator` is given, only the items available to the moderator(unclaimed or claimed by them) are returned.
+    """
+    now = now or timezone.now()
+    State = Flag.State
+    content_types = ContentType.objects.get_for_models(*MODERATED_MODELS).values()
+
+    velocity = FlagInstance.objects.filter(
+        flag=OuterRef('pk'),
+        flagged_on__gte=now - FLAG_VELOCITY_PERIOD
+    ).order_by().values('flag').annotate(count=Count('id')).values('count')
+    poster_num_flagged = Flag.objects.filter(
+        creator=OuterRef('creator'),
+        state__in=[State.FLAGGED.value, State.NOTIFIED.value]
+    ).order_by().values('creator').annotate(count=Count('id')).values('count')
+
+    queue = Flag.objects.filter(
+        state=State.FLAGGED.value,
+        content_type__in=content_types
+    ).annotate(
+        velocity=Coalesce(Subquery(velocity, output_field=models.IntegerField()), 0),
+        poster_num_flagged=Coalesce(Subquery(poster_num_flagged, output_field=models.IntegerField()), 0)
+    ).order_by('-velocity', '-poster_num_flagged', 'id')
+
+    if moderator is not None:
+        queue = queue.filter(get_unclaimed_q(now) | Q(claimed_by=moderator))
+
+    return queue
+
+
+def get_unclaimed_q(now):
+    return Q(claim_expires_on__isnull=True) | Q(claim_expires_on__lte=now)
+
+
+def claim(moderator, count=MAX_MODERATION_CLAIM_SIZE):
+    """
+    Claim the `count` items of the queue with the highest priority that aren't claimed,
+    and return them. Items being claimed by other moderators are skipped.
+    """
+    now = timezone.now()
+    count = max(0, min(count, MAX_MODERATION_CLAIM_SIZE))
+
+    with transaction.atomic():
+        flag_ids = list(
+            get_queue(now=now)
+            .filter(get_unclaimed_q(now))
+            .select_for_update(skip_locked=True, of=('self', ))
+            .values_list('id', flat=True)[:count]
+        )
+        Flag.objects.filter(id__in=flag_ids).update(
+            claimed_by=moderator,
+            claim_expires_on=now + MODERATION_CLAIM_DURATION
+        )
+
+    return get_queue(now=now).filter(id__in=flag_ids)
+
+
+def release(moderator, flag_ids):
+    """Put back the items claimed by `moderator` in the queue, return the number of released items"""
+    return Flag.objects.filter(id__in=flag_ids, claimed_by=moderator).update(
+        claimed_by=None,
+        claim_expires_on=None
+    )
@@ -2,14 +2,18 @@ import datetime
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Permission, Group
 from django.contrib.contenttypes.models import ContentType
+from django.db import DEFAULT_DB_ALIAS
 from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from django.utils.translation import gettext_lazy as _
 
 from accounts.models.users.models import Suspension
-from flagging.models.models import Flag, FlagInstance
+from flagging.models.models import Flag, FlagInstance, FlagSetting
 from notifications.models.models import Notification
 from notifications.signals import notify
+from posts.deletion import mark_posts_deleted
+from posts.models.artist_posts.models import ArtistPost
+from posts.models.non_artist_posts.models import NonArtistPost
 from .constants import (
 	CONTENT_IS_FLAGGED_COUNT, AUTO_DELETE_FLAGS_COUNT, 
 	USER_IS_FLAGGED_COUNT, AUTO_SUSPEND_USER_ACCOUNT_FLAGS_COUNT
@@ -23,10 +27,13 @@ def flagged(sender, instance, created, **kwargs):
 	"""Increase flag count in the flag model after creating an instance"""
 	if created:    
 		flag = instance.flag
-		flag.increase_count()
-		flag.toggle_flagged_state()
+		# Count as seen by this flagger, so that each threshold is reached by only one flagger
+		flag_count = flag.increase_count()
+		if flag_count is None:
+			# Flag deleted meanwhile, with the flagged content
+			return
 
-		flag_count, content_object = flag.count, flag.content_object
+		content_object = flag.content_object
 		object_is_user = isinstance(content_object, User)
 		object_has_poster_id = hasattr(content_object, 'poster_id')
 
@@ -36,9 +43,9 @@ def flagged(sender, instance, created, **kwargs):
 			poster = post.poster
 
 			# If post is considered FLAGGED,
-			# notify user, tell him one of his posts has been flagged
-			# notify moderators so they can take desired action; 
-			# delete the post or absolve it.
+			# notify user, tell him one of his posts has been flagged.
+			# Moderators find it in the moderation queue(see flagging.moderation)
+			# where they can take desired action; delete the post or absolve it.
 			if flag_count == CONTENT_IS_FLAGGED_COUNT: 
 				# Notify poster
 				notify.send(
@@ -57,25 +64,16 @@ def flagged(sender, instance, created, **kwargs):
 					level=Notification.WARNING
 				)
 
-				# Notify moderators
-				notify.send(
-					sender=User.site_services_account, 
-					recipient=User.moderators, 
-					verb=_(
-						"This content has been FLAGGED. You can delete it if you find it "
-						"inappropriate or absolve it if you find it appropriate."
-					),
-					target=post,
-					action_object=instance,
-					category=Notification.REPORTED
-				)
-
 			# If post wasn't deleted and number of flags reaches auto deletion threshold,
 			# delete post.
 			if flag_count == AUTO_DELETE_FLAGS_COUNT:
-				# Delete flag object and corresponding post
+				# Delete flag object and corresponding post.
+				# Posts are marked as deleted and purged in the background(see posts.deletion)
 				flag.delete()
-				post.delete()
+				if isinstance(post, (ArtistPost, NonArtistPost)):
+					mark_posts_deleted(type(post), [post.pk])
+				else:
+					post.delete()
 
 				# Notify poster that his post has been deleted
 				# no `target` here since post has been deleted..
@@ -122,9 +120,8 @@ def flagged(sender, instance, created, **kwargs):
 @receiver(post_delete, sender=FlagInstance)
 def unflagged(sender, instance, **kwargs):
 	"""Decrease flag count in the flag model after deleting an instance"""
-	flag = instance.flag
-	flag.decrease_count()
-	flag.toggle_flagged_state()
+	# The flag may have been deleted, along with its instances
+	Flag(pk=instance.flag_id).decrease_count()
 
 
 # The following signals are registered in flagging.__init__'s ready method.
@@ -140,7 +137,19 @@ def create_permission_groups(sender, **kwargs):
 	moderator_group.permissions.add(delete_flagged_perm)
 
 
-def adjust_flagged_content(sender, **kwargs):
-	"""Adjust flag state perhaps after changing CONTENT_IS_FLAGGED_COUNT"""
-	for flag in Flag.objects.all():
-		flag.toggle_flagged_state()
+def adjust_flagged_content(sender, using=DEFAULT_DB_ALIAS, **kwargs):
+	"""
+	Recompute the flags states if CONTENT_IS_FLAGGED_COUNT changed since the last migration.
+	The threshold last applied is stored as a FlagSetting.
+	"""
+	setting_name = 'CONTENT_IS_FLAGGED_COUNT'
+	applied_setting = FlagSetting.objects.using(using).filter(name=setting_name).first()
+
+	if applied_setting and applied_setting.value == CONTENT_IS_FLAGGED_COUNT:
+		return
+
+	Flag.objects.recompute_states(threshold=CONTENT_IS_FLAGGED_COUNT, using=using)
+	FlagSetting.objects.using(using).update_or_create(
+		name=setting_name,
+		defaults={'value': CONTENT_IS_FLAGGED_COUNT}
+	)
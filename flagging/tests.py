@@ -1,3 +1,168 @@
-from django.test import TestCase
+import datetime
+import threading
+from django.db import connections
+from django.test import TestCase, TransactionTestCase
 
-# Create your tests here.
+from accounts.tests.users.test_models import TestUtils
+from flagging.constants import AUTO_DELETE_FLAGS_COUNT, CONTENT_IS_FLAGGED_COUNT
+from flagging.models.models import Flag, FlagInstance, FlagSetting
+from flagging import moderation
+from flagging.signals import adjust_flagged_content
+from notifications.models.models import Notification
+
+
+class ConcurrentFlaggingTests(TransactionTestCase):
+    def create_user(self, i, **extra_fields):
+        return TestUtils.create_test_user(
+            f'user{i}', f'email{i}@gmail.com', 'password', f'name name{i}',
+            datetime.datetime(year=2000, month=3, day=8), 'CM', is_active=True, **extra_fields
+        )
+
+    def setUp(self):
+        # Sends the notifications
+        self.create_user(0, is_superuser=True)
+        self.poster = self.create_user(1)
+        artist = TestUtils.create_artist(
+            'artist name',
+            datetime.datetime(year=1996, month=8, day=8),
+            'US'
+        )
+        self.post = TestUtils.create_artist_post(artist, 'This is an artist post', self.poster)
+        # Past the FLAGGED threshold, below the deletion one
+        num_flaggers = min(CONTENT_IS_FLAGGED_COUNT + 2, AUTO_DELETE_FLAGS_COUNT - 1)
+        self.flaggers = [self.create_user(i) for i in range(2, num_flaggers + 2)]
+
+    def test_flagged_threshold_is_reached_once(self):
+        flag = Flag.objects.get_flag(self.post)
+        barrier = threading.Barrier(len(self.flaggers))
+        errors = []
+
+        def flag_post(user):
+            try:
+                barrier.wait()
+                FlagInstance.objects.create_flag(user, flag, FlagInstance.FlagReason.SPAM.value)
+            except Exception as err:
+                errors.append(err)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=flag_post, args=(user,)) for user in self.flaggers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        flag.refresh_from_db()
+        self.assertEqual(flag.count, len(self.flaggers))
+        self.assertEqual(flag.state, Flag.State.FLAGGED.value)
+        self.assertEqual(
+            Notification.objects.filter(recipient=self.poster, category=Notification.FLAG).count(), 1
+        )
+
+    def test_unflagging_updates_the_state(self):
+        flag = Flag.objects.get_flag(self.post)
+        for user in self.flaggers[:CONTENT_IS_FLAGGED_COUNT]:
+            FlagInstance.objects.create_flag(user, flag, FlagInstance.FlagReason.SPAM.value)
+
+        FlagInstance.objects.delete_flag(self.flaggers[0], flag)
+        flag.refresh_from_db()
+        self.assertEqual(flag.count, CONTENT_IS_FLAGGED_COUNT - 1)
+        self.assertEqual(flag.state, Flag.State.UNFLAGGED.value)
+
+
+class FlagStatesTests(TestCase):
+    def setUp(self):
+        poster = TestUtils.create_test_user(
+            'user1', 'email1@gmail.com', 'password', 'name name1',
+            datetime.datetime(year=2000, month=3, day=8), 'CM', is_active=True
+        )
+        artist = TestUtils.create_artist(
+            'artist name',
+            datetime.datetime(year=1996, month=8, day=8),
+            'US'
+        )
+        self.flags = [
+            Flag.objects.get_flag(TestUtils.create_artist_post(artist, f'post {i}', poster))
+            for i in range(3)
+        ]
+
+    def set_flag(self, flag, count, state):
+        Flag.objects.filter(id=flag.id).update(count=count, state=state.value)
+
+    def test_states_are_recomputed_from_counts(self):
+        State = Flag.State
+        self.set_flag(self.flags[0], 5, State.UNFLAGGED)
+        self.set_flag(self.flags[1], 1, State.FLAGGED)
+        self.set_flag(self.flags[2], 5, State.REJECTED)
+
+        self.assertEqual(Flag.objects.recompute_states(threshold=3, chunk_size=1), 2)
+        self.assertEqual(
+            [Flag.objects.get(id=flag.id).state for flag in self.flags],
+            [State.FLAGGED.value, State.UNFLAGGED.value, State.REJECTED.value]
+        )
+
+    def test_states_are_only_adjusted_when_the_threshold_changes(self):
+        FlagSetting.objects.update_or_create(
+            name='CONTENT_IS_FLAGGED_COUNT', defaults={'value': CONTENT_IS_FLAGGED_COUNT}
+        )
+        self.set_flag(self.flags[0], CONTENT_IS_FLAGGED_COUNT, Flag.State.UNFLAGGED)
+
+        adjust_flagged_content(sender=None)
+        self.assertEqual(Flag.objects.get(id=self.flags[0].id).state, Flag.State.UNFLAGGED.value)
+
+        FlagSetting.objects.filter(name='CONTENT_IS_FLAGGED_COUNT').update(value=0)
+        adjust_flagged_content(sender=None)
+        self.assertEqual(Flag.objects.get(id=self.flags[0].id).state, Flag.State.FLAGGED.value)
+        self.assertEqual(FlagSetting.objects.get().value, CONTENT_IS_FLAGGED_COUNT)
+
+
+class ModerationQueueTests(TestCase):
+    def create_user(self, i, **extra_fields):
+        return TestUtils.create_test_user(
+            f'user{i}', f'email{i}@gmail.com', 'password', f'name name{i}',
+            datetime.datetime(year=2000, month=3, day=8), 'CM', is_active=True, **extra_fields
+        )
+
+    def setUp(self):
+        poster = self.create_user(0)
+        self.moderators = [self.create_user(1), self.create_user(2)]
+        artist = TestUtils.create_artist(
+            'artist name',
+            datetime.datetime(year=1996, month=8, day=8),
+            'US'
+        )
+        posts = [TestUtils.create_artist_post(artist, f'post {i}', poster) for i in range(2)]
+        self.flags = [Flag.objects.get_flag(post) for post in posts]
+
+        # The first post gets flagged faster
+        for i, flag in enumerate(self.flags):
+            for user in [self.create_user(10 * i + j) for j in range(3, 5 - i)]:
+                FlagInstance.objects.create(flag=flag, user=user)
+
+        Flag.objects.filter(id__in=[flag.id for flag in self.flags]).update(
+            state=Flag.State.FLAGGED.value
+        )
+
+    def get_ids(self, queue):
+        return [flag.id for flag in queue]
+
+    def test_queue_is_ordered_by_velocity(self):
+        queue = moderation.get_queue()
+        self.assertEqual(self.get_ids(queue), [flag.id for flag in self.flags])
+        self.assertEqual([flag.velocity for flag in queue], [2, 1])
+
+    def test_claimed_items_are_skipped(self):
+        first_moderator, second_moderator = self.moderators
+
+        self.assertEqual(self.get_ids(moderation.claim(first_moderator, 1)), [self.flags[0].id])
+        self.assertEqual(self.get_ids(moderation.claim(second_moderator, 5)), [self.flags[1].id])
+        self.assertEqual(
+            self.get_ids(moderation.get_queue(moderator=second_moderator)), [self.flags[1].id]
+        )
+
+        self.assertEqual(moderation.release(first_moderator, [self.flags[0].id]), 1)
+        self.assertEqual(
+            self.get_ids(moderation.get_queue(moderator=second_moderator)),
+            [flag.id for flag in self.flags]
+        )
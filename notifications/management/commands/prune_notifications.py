@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand
+
+from notifications import settings as notifications_settings
+from notifications.partitions import (
+    archive_partition, drop_partition, ensure_partitions, get_expired_partitions,
+    get_missing_partition_months, get_partition_name
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Create the upcoming monthly partitions of the notifications table and drop '
+        'the partitions older than the retention period, optionally archiving them '
+        'to gzipped JSON lines first. Meant to be run daily.'
+    )
+
+    def add_arguments(self, parser):
+        config = notifications_settings.get_config()
+
+        parser.add_argument(
+            '--retention-months', type=int, default=config['RETENTION_MONTHS'],
+            help='Keep the notifications of this number of past months, besides the current one.'
+        )
+        parser.add_argument(
+            '--archive-dir',
+            help='Directory where partitions are archived before being dropped.'
+        )
+        parser.add_argument('--database', default='default')
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Only display the partitions that would be created or dropped.'
+        )
+
+    def handle(self, *args, **options):
+        using = options['database']
+        expired_partitions = get_expired_partitions(options['retention_months'], using)
+
+        if options['dry_run']:
+            for month in get_missing_partition_months(using=using):
+                self.stdout.write(f'Would create {get_partition_name(month)}')
+            for name in expired_partitions:
+                self.stdout.write(f'Would drop {name}')
+            return
+
+        for name in ensure_partitions(using=using):
+            self.stdout.write(f'Created {name}')
+
+        for name in expired_partitions:
+            if options['archive_dir']:
+                path = archive_partition(name, options['archive_dir'], using)
+                self.stdout.write(f'Archived {name} to {path}')
+
+            drop_partition(name, using)
+            self.stdout.write(self.style.SUCCESS(f'Dropped {name}'))
@@ -0,0 +1,117 @@
+# Partition the notifications table by month of `timestamp`(see notifications.partitions).
+# The primary key of a partitioned table has to include the partition key,
+# so it becomes (id, timestamp); ids are still unique since they come from the sequence.
+
+from django.conf import settings
+from django.db import migrations, models
+
+from notifications.partitions import DEFAULT_PARTITION_NAME, ensure_partitions
+
+# Indexes of the table, they are created on each partition
+INDEXES = {
+    'notif_timestamp_desc_idx': '("timestamp" DESC)',
+    'notif_recipient_unread_ts_idx': '("recipient_id", "unread", "timestamp" DESC)',
+    'notif_unread_and_emailed_idx': '("unread", "emailed")',
+    'notif_actor_content_type_idx': '("actor_content_type_id")',
+    'notif_target_content_type_idx': '("target_content_type_id")',
+    'notif_action_object_content_type_idx': '("action_object_content_type_id")',
+}
+
+
+def get_foreign_keys(apps, qn):
+    user_table = qn(apps.get_model(settings.AUTH_USER_MODEL)._meta.db_table)
+    content_type_table = qn(apps.get_model('contenttypes', 'ContentType')._meta.db_table)
+
+    return {
+        'notif_recipient_fk': f'("recipient_id") REFERENCES {user_table} ("id")',
+        'notif_actor_content_type_fk': f'("actor_content_type_id") REFERENCES {content_type_table} ("id")',
+        'notif_target_content_type_fk': f'("target_content_type_id") REFERENCES {content_type_table} ("id")',
+        'notif_action_object_content_type_fk':
+            f'("action_object_content_type_id") REFERENCES {content_type_table} ("id")',
+    }
+
+
+def replace_table(apps, schema_editor, partitioned):
+    """Replace the notifications table by a partitioned one, or the opposite"""
+    qn = schema_editor.quote_name
+    schema = 'notifications'
+    table, old_table = f'{qn(schema)}.{qn("notification")}', f'{qn(schema)}.{qn("notification_old")}'
+
+    with schema_editor.connection.cursor() as cursor:
+        # Index names are unique per schema, drop those of the old table
+        cursor.execute(f'ALTER TABLE {table} RENAME TO "notification_old"')
+        cursor.execute(f'ALTER TABLE {old_table} DROP CONSTRAINT "notification_pkey"')
+        for name in ['notif_timestamp_desc_idx', 'notif_recipient_and_unread_idx', *INDEXES]:
+            cursor.execute(f'DROP INDEX IF EXISTS {qn(schema)}.{qn(name)}')
+
+        cursor.execute(
+            f'CREATE TABLE {table} (LIKE {old_table} INCLUDING DEFAULTS)' +
+            (' PARTITION BY RANGE ("timestamp")' if partitioned else '')
+        )
+        cursor.execute(f'ALTER SEQUENCE {qn(schema)}."notification_id_seq" OWNED BY {table}."id"')
+        cursor.execute(
+            f'ALTER TABLE {table} ADD CONSTRAINT "notification_pkey" PRIMARY KEY ' +
+            ('("id", "timestamp")' if partitioned else '("id")')
+        )
+        for name, definition in get_foreign_keys(apps, qn).items():
+            cursor.execute(
+                f'ALTER TABLE {table} ADD CONSTRAINT {qn(name)} FOREIGN KEY {definition} '
+                f'DEFERRABLE INITIALLY DEFERRED'
+            )
+
+        indexes = dict(INDEXES)
+        if not partitioned:
+            del indexes['notif_recipient_unread_ts_idx']
+            indexes['notif_recipient_and_unread_idx'] = '("recipient_id", "unread")'
+
+        for name, columns in indexes.items():
+            cursor.execute(f'CREATE INDEX {qn(name)} ON {table} {columns}')
+
+        if partitioned:
+            cursor.execute(
+                f'CREATE TABLE {qn(schema)}.{qn(DEFAULT_PARTITION_NAME)} PARTITION OF {table} DEFAULT'
+            )
+            cursor.execute(f'SELECT MIN("timestamp") FROM {old_table}')
+            oldest = cursor.fetchone()[0]
+            ensure_partitions(since=oldest, using=schema_editor.connection.alias)
+
+        cursor.execute(f'INSERT INTO {table} SELECT * FROM {old_table}')
+        cursor.execute(f'DROP TABLE {old_table}')
+
+
+def partition_table(apps, schema_editor):
+    replace_table(apps, schema_editor, partitioned=True)
+
+
+def unpartition_table(apps, schema_editor):
+    replace_table(apps, schema_editor, partitioned=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('notifications', '0002_alter_notification_category'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(partition_table, unpartition_table),
+            ],
+            state_operations=[
+                migrations.RemoveIndex(
+                    model_name='notification',
+                    name='notif_recipient_and_unread_idx',
+                ),
+                migrations.AddIndex(
+                    model_name='notification',
+                    index=models.Index(
+                        fields=['recipient', 'unread', '-timestamp'],
+                        name='notif_recipient_unread_ts_idx'
+                    ),
+                ),
+            ],
+        ),
+    ]
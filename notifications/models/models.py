@@ -274,9 +274,10 @@ class Notification(models.Model, NotificationOperations):
                 name='notif_timestamp_desc_idx'
             ),
             models.Index(
-                # Speed up notifications count query
-                fields=['recipient', 'unread'],
-                name='notif_recipient_and_unread_idx'
+                # Speed up notifications list and count queries.
+                # The table is partitioned by month, see notifications.partitions
+                fields=['recipient', 'unread', '-timestamp'],
+                name='notif_recipient_unread_ts_idx'
             ),
             models.Index(
                 fields=['unread', 'emailed'],
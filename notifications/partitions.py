@@ -0,0 +1,187 @@
+"""
+Monthly partitions of the notifications table.
+
+The table is partitioned by range of `timestamp`, with a partition per month
+(`notification_pYYYY_MM`) and a default partition catching the other rows.
+Partitions are created ahead of time by `ensure_partitions()` (run by the
+`prune_notifications` command), and old partitions are dropped as a whole,
+optionally after being archived, rather than deleting their rows one by one.
+"""
+
+import datetime
+import gzip
+import os
+import re
+from django.db import connections, transaction
+from django.utils import timezone
+
+from notifications import settings as notifications_settings
+from notifications.models.models import Notification
+
+DEFAULT_PARTITION_NAME = 'notification_default'
+PARTITION_NAME_RE = re.compile(r'^notification_p(\d{4})_(\d{2})$')
+
+
+def month_start(dt):
+    """Return the first instant(in UTC) of the month of `dt`"""
+    dt = dt.astimezone(datetime.timezone.utc)
+    return datetime.datetime(dt.year, dt.month, 1, tzinfo=datetime.timezone.utc)
+
+
+def add_months(month, n):
+    year, month_index = divmod(month.year * 12 + month.month - 1 + n, 12)
+    return month.replace(year=year, month=month_index + 1)
+
+
+def get_schema_and_table():
+    schema, table = Notification._meta.db_table.split('"."')
+    return schema, table
+
+
+def get_partition_name(month):
+    return f'notification_p{month.year:04}_{month.month:02}'
+
+
+def get_partition_month(name):
+    """Return the month of a partition from its name, `None` for the default partition"""
+    match = PARTITION_NAME_RE.match(name)
+    if not match:
+        return None
+
+    return datetime.datetime(int(match[1]), int(match[2]), 1, tzinfo=datetime.timezone.utc)
+
+
+def get_partitions(using='default'):
+    """Return the names of the partitions of the notifications table"""
+    schema, table = get_schema_and_table()
+
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            '''
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            JOIN pg_namespace ON pg_namespace.oid = parent.relnamespace
+            WHERE pg_namespace.nspname = %s AND parent.relname = %s
+            ORDER BY child.relname
+            ''',
+            [schema, table]
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def create_partition(month, using='default'):
+    """
+    Create the partition of `month`, moving its rows out of the default partition.
+    The partition is created standalone then attached, since a partition
+    can't be created while the default partition holds rows in its range.
+    """
+    connection = connections[using]
+    qn = connection.ops.quote_name
+    schema, table = get_schema_and_table()
+    parent = f'{qn(schema)}.{qn(table)}'
+    partition = f'{qn(schema)}.{qn(get_partition_name(month))}'
+    default_partition = f'{qn(schema)}.{qn(DEFAULT_PARTITION_NAME)}'
+    # Partition bounds must be literals
+    bounds = [month.isoformat(), add_months(month, 1).isoformat()]
+
+    with transaction.atomic(using), connection.cursor() as cursor:
+        cursor.execute(f'CREATE TABLE {partition} (LIKE {parent} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)')
+        cursor.execute(
+            f'''
+            WITH moved AS (
+                DELETE FROM {default_partition}
+                WHERE "timestamp" >= %s AND "timestamp" < %s
+                RETURNING *
+            )
+            INSERT INTO {partition} SELECT * FROM moved
+            ''',
+            bounds
+        )
+        # Indexes and foreign keys of the parent are created on the partition
+        cursor.execute(f'ALTER TABLE {parent} ATTACH PARTITION {partition} FOR VALUES FROM (%s) TO (%s)', bounds)
+
+
+def get_missing_partition_months(since=None, months_ahead=None, using='default'):
+    """
+    Return the months(first instants) without partition from the month of `since`
+    (the current month by default) up to `months_ahead` months after the current month.
+    """
+    if months_ahead is None:
+        months_ahead = notifications_settings.get_config()['PARTITIONS_AHEAD']
+
+    current_month = month_start(timezone.now())
+    month = min(month_start(since), current_month) if since else current_month
+    existing_partitions = set(get_partitions(using))
+    missing = []
+
+    while month <= add_months(current_month, months_ahead):
+        if get_partition_name(month) not in existing_partitions:
+            missing.append(month)
+
+        month = add_months(month, 1)
+
+    return missing
+
+
+def ensure_partitions(since=None, months_ahead=None, using='default'):
+    """
+    Create the missing partitions(see `get_missing_partition_months()`).
+    Return the names of the created partitions.
+    """
+    created = []
+
+    for month in get_missing_partition_months(since, months_ahead, using):
+        create_partition(month, using)
+        created.append(get_partition_name(month))
+
+    return created
+
+
+def get_expired_partitions(retention_months=None, using='default'):
+    """Return the names of the partitions whose rows are all older than `retention_months` months"""
+    if retention_months is None:
+        retention_months = notifications_settings.get_config()['RETENTION_MONTHS']
+
+    oldest_month_kept = add_months(month_start(timezone.now()), -retention_months)
+    return [
+        name for name in get_partitions(using)
+        if (month := get_partition_month(name)) is not None and month < oldest_month_kept
+    ]
+
+
+def archive_partition(name, directory, using='default'):
+    """
+    Write the rows of a partition as gzipped JSON lines to `directory`
+    and return the path of the file.
+    """
+    connection = connections[using]
+    qn = connection.ops.quote_name
+    schema, _ = get_schema_and_table()
+    path = os.path.join(directory, f'{name}.jsonl.gz')
+    tmp_path = f'{path}.part'
+
+    os.makedirs(directory, exist_ok=True)
+    # Server side cursor, the partition may not fit in memory
+    with transaction.atomic(using), connection.chunked_cursor() as cursor, \
+            gzip.open(tmp_path, 'wt', encoding='utf-8') as archive:
+        cursor.execute(f'SELECT row_to_json(t)::text FROM {qn(schema)}.{qn(name)} t ORDER BY t.id')
+        for row in cursor:
+            archive.write(row[0])
+            archive.write('\n')
+
+    # The archive is only visible once complete
+    os.replace(tmp_path, path)
+    return path
+
+
+def drop_partition(name, using='default'):
+    connection = connections[using]
+    qn = connection.ops.quote_name
+    schema, table = get_schema_and_table()
+    partition = f'{qn(schema)}.{qn(name)}'
+
+    with transaction.atomic(using), connection.cursor() as cursor:
+        cursor.execute(f'ALTER TABLE {qn(schema)}.{qn(table)} DETACH PARTITION {partition}')
+        cursor.execute(f'DROP TABLE {partition}')
@@ -8,6 +8,10 @@ CONFIG_DEFAULTS = {
     'USE_JSONFIELD': False,
     'SOFT_DELETE': False,
     'NUM_TO_FETCH': 10,
+    # Notifications older than this number of months are dropped by `prune_notifications`
+    'RETENTION_MONTHS': 12,
+    # Number of monthly partitions created in advance, see notifications.partitions
+    'PARTITIONS_AHEAD': 3,
 }
 
 
@@ -7,6 +7,33 @@ from core.utils import get_content_type
 from notifications.models.models import Notification
 
 
+def build_notification(recipient, actor, verb, category, target=None, action_object=None,
+                       description='', timestamp=None, level=Notification.INFO):
+    """Return an unsaved Notification instance"""
+    notification = Notification(
+        recipient=recipient,
+        actor_content_type=get_content_type(actor),
+        actor_object_id=actor.pk,
+        verb=str(verb),
+        description=description,
+        timestamp=timestamp or timezone.now(),
+        level=level,
+        category=category,
+    )
+
+    # Set optional objects
+    for obj, opt in ((target, 'target'), (action_object, 'action_object')):
+        if obj is not None:
+            setattr(notification, '%s_object_id' % opt, obj.pk)
+            setattr(
+                notification, 
+                '%s_content_type' % opt,
+                get_content_type(obj)
+            )
+
+    return notification
+
+
 def notify_handler(verb, **kwargs):
     """
     Handler function to create Notification instance upon action signal call.
@@ -15,10 +42,8 @@ def notify_handler(verb, **kwargs):
     # kwargs.pop('signal', None)
     recipient = kwargs.pop('recipient')
     actor = kwargs.pop('sender')
-    optional_objs = [
-        (kwargs.pop(opt, None), opt)
-        for opt in ('target', 'action_object')
-    ]
+    target = kwargs.pop('target', None)
+    action_object = kwargs.pop('action_object', None)
     description = kwargs.pop('description', '')
     timestamp = kwargs.pop('timestamp', timezone.now())
     level = kwargs.pop('level', Notification.INFO)
@@ -33,34 +58,20 @@ def notify_handler(verb, **kwargs):
     else:
         recipients = [recipient]
 
-    new_notifications = []
-
-    for recipient in recipients:
-        newnotify = Notification(
-            recipient=recipient,
-            actor_content_type=get_content_type(actor),
-            actor_object_id=actor.pk,
-            verb=str(verb),
+    new_notifications = [
+        build_notification(
+            recipient, actor, verb, category,
+            target=target,
+            action_object=action_object,
             description=description,
             timestamp=timestamp,
-            level=level,
-            category=category,
+            level=level
         )
+        for recipient in recipients
+    ]
 
-        # Set optional objects
-        for obj, opt in optional_objs:
-            if obj is not None:
-                setattr(newnotify, '%s_object_id' % opt, obj.pk)
-                setattr(
-                    newnotify, 
-                    '%s_content_type' % opt,
-                    get_content_type(obj)
-                )
-
-        newnotify.save()
-        new_notifications.append(newnotify)
-
-    return new_notifications
+    # One query for all the recipients(eg. members of a group)
+    return Notification.objects.bulk_create(new_notifications)
 
 
 # Connect the signal
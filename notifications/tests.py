@@ -0,0 +1,66 @@
+import datetime
+import gzip
+import json
+import tempfile
+from django.test import TestCase
+from django.utils import timezone
+
+from accounts.tests.users.test_models import TestUtils
+from notifications.models.models import Notification
+from notifications.partitions import (
+    add_months, archive_partition, drop_partition, ensure_partitions,
+    get_expired_partitions, get_missing_partition_months, get_partition_name, get_partitions,
+    month_start
+)
+
+
+class PartitionTests(TestCase):
+    def setUp(self):
+        self.user = TestUtils.create_test_user(
+            'user1', 'email1@gmail.com', 'password', 'name name1',
+            datetime.datetime(year=2000, month=3, day=8), 'CM', is_active=True
+        )
+        self.old_month = add_months(month_start(timezone.now()), -24)
+
+    def create_notification(self, timestamp):
+        notification = Notification.objects.create(
+            recipient=self.user, actor=self.user, verb='followed', category=Notification.FOLLOW
+        )
+        # `timestamp` is set on creation, the row moves to the partition of its new timestamp
+        Notification.objects.filter(id=notification.id).update(timestamp=timestamp)
+        return notification
+
+    def test_add_months(self):
+        month = datetime.datetime(2022, 11, 1, tzinfo=datetime.timezone.utc)
+        self.assertEqual(add_months(month, 2), month.replace(year=2023, month=1))
+        self.assertEqual(add_months(month, -11), month.replace(month=12, year=2021))
+
+    def test_rows_are_moved_to_new_partitions(self):
+        notification = self.create_notification(self.old_month + datetime.timedelta(days=3))
+
+        self.assertIn(self.old_month, get_missing_partition_months(since=self.old_month))
+
+        created = ensure_partitions(since=self.old_month)
+        self.assertIn(get_partition_name(self.old_month), created)
+        self.assertIn(get_partition_name(add_months(self.old_month, 1)), created)
+        self.assertEqual(ensure_partitions(since=self.old_month), [])
+        self.assertEqual(get_missing_partition_months(since=self.old_month), [])
+        self.assertTrue(Notification.objects.filter(id=notification.id).exists())
+
+    def test_expired_partitions_are_archived_and_dropped(self):
+        notification = self.create_notification(self.old_month + datetime.timedelta(days=3))
+        recent_notification = self.create_notification(timezone.now())
+        ensure_partitions(since=self.old_month)
+
+        name = get_partition_name(self.old_month)
+        self.assertIn(name, get_expired_partitions(retention_months=12))
+
+        with tempfile.TemporaryDirectory() as directory:
+            with gzip.open(archive_partition(name, directory), 'rt') as archive:
+                rows = [json.loads(line) for line in archive]
+
+        drop_partition(name)
+        self.assertEqual([row['id'] for row in rows], [notification.id])
+        self.assertNotIn(name, get_partitions())
+        self.assertFalse(Notification.objects.filter(id=notification.id).exists())
+        self.assertTrue(Notification.objects.filter(id=recent_notification.id).exists())
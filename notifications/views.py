@@ -6,6 +6,7 @@ from django.utils.decorators import method_decorator
 from django.views.decorators.cache import never_cache
 from django.views.generic import ListView
 
+from core.routers import replica_reads
 from notifications.models.models import Notification
 from notifications.settings import get_config
 
@@ -16,6 +17,7 @@ class NotificationViewList(ListView):
 	paginate_by = get_config()['PAGINATE_BY']
 
 	@method_decorator(login_required)
+	@method_decorator(replica_reads)
 	def dispatch(self, request, *args, **kwargs):
 		return super(NotificationViewList, self).dispatch(
 			request, *args, **kwargs)
@@ -102,6 +104,7 @@ def delete(request, id):
 
 
 @never_cache
+@replica_reads
 def live_unread_notification_count(request):
 	user_is_authenticated = request.user.is_authenticated
 
@@ -117,6 +120,7 @@ def live_unread_notification_count(request):
 
 
 @never_cache
+@replica_reads
 def live_unread_notification_list(request):
 	''' Return a json with a unread notification list '''
 	user_is_authenticated = request.user.is_authenticated
@@ -162,6 +166,7 @@ def live_unread_notification_list(request):
 
 
 @never_cache
+@replica_reads
 def live_all_notification_list(request):
 	''' Return a json with a unread notification list '''
 	user_is_authenticated = request.user.is_authenticated
@@ -206,6 +211,7 @@ def live_all_notification_list(request):
 	return JsonResponse(data)
 
 
+@replica_reads
 def live_all_notification_count(request):
 	user_is_authenticated = request.user.is_authenticated
 
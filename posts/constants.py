@@ -15,6 +15,16 @@ MAX_COMMENT_LENGTH = 2000
 # Maximum number of photos per post
 MAX_NUM_PHOTOS = 4
 
+# Maximum size of videos(250mb)
+MAX_VIDEO_SIZE = 262144000
+
+## Resumable video uploads (see posts.uploads)
+# Maximum size of a chunk, under settings.FILE_UPLOAD_MAX_MEMORY_SIZE(2.5mb by default)
+# so that chunks are kept in memory instead of being written to a temporary file
+VIDEO_UPLOAD_CHUNK_SIZE = 2 * 1024 * 1024
+# Time(in seconds) after which unfinished uploads are dropped
+VIDEO_UPLOAD_TIMEOUT = 24 * 60 * 60
+
 # Audio cover image directory
 POST_COVER_IMG_NAME = 'POST_COVER_IMG.png'
 if settings.USE_S3:
@@ -51,3 +61,26 @@ FORM_AND_UPLOAD_DIR = {
 
 }
 
+
+## Comment threads (see posts.threads)
+# Replies deeper than this are attached to their deepest visible parent
+MAX_THREAD_DEPTH = 4
+# Maximum number of replies returned per comment
+MAX_THREAD_FAN_OUT = 20
+# Maximum number of comments loaded for a whole thread
+MAX_THREAD_SIZE = 500
+# Number of replies previewed under each ancestor comment of a page
+THREAD_PREVIEW_NUM_REPLIES = 3
+
+
+## Batched engagement actions (see posts.engagement)
+# Maximum number of actions per batch
+MAX_ENGAGEMENT_BATCH_SIZE = 100
+
+
+## Deferred post deletion (see posts.deletion)
+# Number of rows deleted per transaction
+POST_DELETION_CHUNK_SIZE = 1000
+# Number of media files deleted per storage request
+# (S3 deletes at most 1000 objects per request)
+MEDIA_DELETION_BATCH_SIZE = 1000
@@ -0,0 +1,279 @@
+"""
+Deferred deletion of posts.
+
+`post.delete()` makes django collect and delete the comments, likes, ratings,
+bookmarks... of the post row by row, which blocks the request for popular posts.
+Instead, posts are marked as deleted(`deleted_on`) by `mark_posts_deleted()` and
+hidden by the default manager, then `purge_deleted_posts()`(run by the
+`purge_deleted_posts` command) deletes them in the background:
+- the dependents are found from the foreign keys referencing each model, and deleted
+  with raw `DELETE ... WHERE id = ANY(...)` statements, `chunk_size` rows per transaction;
+- the flags of the deleted posts and comments are deleted as well;
+- the media files of the deleted rows are deleted from the storage in batches,
+  once the rows are gone(the shared content-addressed files are released instead);
+- the counters(see core.counters) counting the deleted rows are decremented with
+  one aggregated `UPDATE` per counter and chunk, except the `TRIGGER_COUNTERS`
+  in triggers mode which are maintained by the triggers.
+
+The counters of the posters and parent posts don't count the posts marked as deleted
+(see `Counter.soft_delete_column`), they are decremented as soon as the posts are
+marked, by `mark_posts_deleted()` in signals mode or by the triggers in triggers mode.
+"""
+
+import logging
+from dataclasses import dataclass, field
+from django.contrib.contenttypes.models import ContentType
+from django.db import DEFAULT_DB_ALIAS, connections, models, transaction
+from django.utils import timezone
+
+from core.constants import FILE_STORAGE_CLASS
+from core.counters import COUNTERS, TRIGGER_COUNTERS, counters_maintained_by_signals, quote_table
+from core.graphql.response_cache import bump_instance_tags
+from core.media import is_stored_media, release_media
+from flagging.mixins import FlagMixin
+from flagging.models.models import Flag
+from posts.constants import MEDIA_DELETION_BATCH_SIZE, POST_DELETION_CHUNK_SIZE
+from posts.models.artist_posts.models import ArtistPost
+from posts.models.non_artist_posts.models import NonArtistPost
+
+logger = logging.getLogger(__name__)
+
+POST_MODELS = [ArtistPost, NonArtistPost]
+
+
+@dataclass
+class PurgeResult:
+    num_posts: int = 0
+    # Number of deleted rows, posts included
+    num_rows: int = 0
+    num_files: int = 0
+    # Names of the media files of the deleted rows not yet deleted from the storage
+    pending_files: list = field(default_factory=list)
+
+
+def get_table_name(model):
+    """Return the table of `model` as named in core.counters, eg. 'posts.artist_post'"""
+    return model._meta.db_table.replace('"."', '.')
+
+
+def get_relations(model):
+    """
+    Return the foreign keys referencing `model` as tuples
+    `(referencing model, column, on_delete)`.
+    """
+    # Same as django's Collector, hidden relations(related_name='+') included
+    return [
+        (rel.related_model, rel.field.column, rel.on_delete)
+        for rel in model._meta.get_fields(include_hidden=True)
+        if rel.auto_created and not rel.concrete and (rel.one_to_one or rel.one_to_many)
+    ]
+
+
+def decrement_counters(cursor, model, ids):
+    """Decrement the counters counting the rows `ids` of `model`, with an UPDATE per counter"""
+    table = get_table_name(model)
+    counters = COUNTERS
+    if not counters_maintained_by_signals():
+        counters = [counter for counter in COUNTERS if counter not in TRIGGER_COUNTERS]
+
+    for counter in counters:
+        if counter.source_table != table:
+            continue
+
+        column = counter.column
+        cursor.execute(
+            f'''
+            UPDATE {quote_table(counter.table)} t
+            SET {column} = GREATEST(COALESCE(t.{column}, 0) - s.num, 0)
+            FROM (
+                SELECT src.{counter.source_column} AS ref_id, {counter.aggregate} AS num
+                FROM {quote_table(counter.source_table)} src
+                WHERE src.id = ANY(%s) AND {counter.source_condition_sql('src')}
+                GROUP BY src.{counter.source_column}
+            ) s
+            WHERE t.id = s.ref_id
+            ''',
+            [ids]
+        )
+
+
+def mark_posts_deleted(model, post_ids, using=DEFAULT_DB_ALIAS):
+    """
+    Mark the posts `post_ids` of `model` as deleted, they are purged later on.
+    Return the ids of the posts that were marked(posts already marked are skipped).
+    """
+    connection = connections[using]
+    table = connection.ops.quote_name(model._meta.db_table)
+
+    with transaction.atomic(using), connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT "id" FROM {table} WHERE "id" = ANY(%s) AND "deleted_on" IS NULL FOR UPDATE',
+            [list(post_ids)]
+        )
+        marked_ids = [row[0] for row in cursor.fetchall()]
+        if not marked_ids:
+            return marked_ids
+
+        # Before the posts are marked, marked posts aren't counted.
+        # In triggers mode, the counters are updated by the database as the posts are marked
+        if counters_maintained_by_signals():
+            decrement_counters(cursor, model, marked_ids)
+
+        cursor.execute(
+            f'UPDATE {table} SET "deleted_on" = %s WHERE "id" = ANY(%s)',
+            [timezone.now(), marked_ids]
+        )
+
+    for post_id in marked_ids:
+        bump_instance_tags(model(pk=post_id))
+
+    return marked_ids
+
+
+def delete_rows(model, column, ids, result, chunk_size=POST_DELETION_CHUNK_SIZE,
+                adjust_counters=True, using=DEFAULT_DB_ALIAS, on_chunk=None):
+    """
+    Delete the rows of `model` whose `column` is in `ids`, along with their dependents.
+    Rows are deleted newest first, `chunk_size` rows per transaction, after their dependents.
+    `on_chunk(result)` is called after each deleted chunk.
+    """
+    connection = connections[using]
+    qn = connection.ops.quote_name
+    table, pk = qn(model._meta.db_table), qn(model._meta.pk.column)
+    relations = get_relations(model)
+    file_columns = [
+        qn(model_field.column) for model_field in model._meta.concrete_fields
+        if isinstance(model_field, models.FileField)
+    ]
+    content_type = None
+    if issubclass(model, FlagMixin):
+        content_type = ContentType.objects.db_manager(using).get_for_model(model)
+
+    while True:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT {pk} FROM {table} WHERE {qn(column)} = ANY(%s) ORDER BY {pk} DESC LIMIT %s',
+                [list(ids), chunk_size]
+            )
+            chunk_ids = [row[0] for row in cursor.fetchall()]
+
+        if not chunk_ids:
+            return
+
+        for related_model, related_column, on_delete in relations:
+            # Includes rows of the same table, eg. the child comments of ancestor comments
+            if on_delete is models.CASCADE:
+                delete_rows(
+                    related_model, related_column, chunk_ids, result,
+                    chunk_size, using=using, on_chunk=on_chunk
+                )
+
+        if content_type is not None:
+            flag_ids = list(
+                Flag.objects.using(using)
+                .filter(content_type=content_type, object_id__in=chunk_ids)
+                .values_list('id', flat=True)
+            )
+            if flag_ids:
+                delete_rows(Flag, 'id', flag_ids, result, chunk_size, using=using, on_chunk=on_chunk)
+
+        with transaction.atomic(using), connection.cursor() as cursor:
+            # Before the referencing columns of the chunk are set to null
+            if adjust_counters:
+                decrement_counters(cursor, model, chunk_ids)
+
+            for related_model, related_column, on_delete in relations:
+                if on_delete is not models.SET_NULL:
+                    continue
+
+                related_table = qn(related_model._meta.db_table)
+                cursor.execute(
+                    f'UPDATE {related_table} SET {qn(related_column)} = NULL '
+                    f'WHERE {qn(related_column)} = ANY(%s)',
+                    [chunk_ids]
+                )
+
+            cursor.execute(
+                f'DELETE FROM {table} WHERE {pk} = ANY(%s) RETURNING {", ".join([pk, *file_columns])}',
+                [chunk_ids]
+            )
+            rows = cursor.fetchall()
+
+        result.num_rows += len(rows)
+        result.pending_files.extend(name for row in rows for name in row[1:] if name)
+        if on_chunk:
+            on_chunk(result)
+
+
+def delete_files(names, batch_size=MEDIA_DELETION_BATCH_SIZE):
+    """
+    Delete the files `names` from the storage, `batch_size` files per request
+    when the storage supports bulk deletion. Return the number of deleted files.
+    The references to the content-addressed files are released instead,
+    these are only deleted once unreferenced(see core.media).
+    """
+    num_deleted = 0
+    stored_names = [name for name in names if is_stored_media(name)]
+    if stored_names:
+        try:
+            num_deleted += release_media(stored_names, batch_size)
+        except Exception:
+            logger.exception('Could not release %s stored media files of deleted rows', len(stored_names))
+
+        names = [name for name in names if not is_stored_media(name)]
+
+    storage = FILE_STORAGE_CLASS()
+    bulk_delete = getattr(storage, 'bulk_delete', None)
+
+    for start in range(0, len(names), batch_size):
+        batch = names[start:start + batch_size]
+
+        try:
+            if bulk_delete:
+                bulk_delete(batch)
+            else:
+                for name in batch:
+                    storage.delete(name)
+        except Exception:
+            # The rows are already deleted, the files are just left over
+            logger.exception('Could not delete %s media files of deleted posts', len(batch))
+        else:
+            num_deleted += len(batch)
+
+    return num_deleted
+
+
+def get_num_posts_to_purge(using=DEFAULT_DB_ALIAS):
+    return sum(
+        model.all_objects.using(using).filter(deleted_on__isnull=False).count()
+        for model in POST_MODELS
+    )
+
+
+def purge_deleted_posts(chunk_size=POST_DELETION_CHUNK_SIZE,
+                        batch_size=MEDIA_DELETION_BATCH_SIZE, using=DEFAULT_DB_ALIAS):
+    """Delete the posts marked as deleted along with their dependents and media files"""
+    result = PurgeResult()
+
+    for model in POST_MODELS:
+        while True:
+            post_ids = list(
+                model.all_objects.using(using)
+                .filter(deleted_on__isnull=False)
+                .order_by('id')
+                .values_list('id', flat=True)[:chunk_size]
+            )
+            if not post_ids:
+                break
+
+            # The counters sourced from the posts were decremented when they were marked,
+            # the triggers skip the rows already marked as deleted
+            delete_rows(
+                model, 'id', post_ids, result, chunk_size,
+                adjust_counters=False, using=using
+            )
+            result.num_posts += len(post_ids)
+            result.num_files += delete_files(result.pending_files, batch_size)
+            result.pending_files = []
+
+    return result
@@ -0,0 +1,272 @@
+"""
+Batched engagement actions(comment likes, post ratings, bookmarks and reading
+notifications).
+
+All the actions of a batch are applied in one transaction: the targets of each
+kind of action are fetched and locked in one query, the new rows are inserted
+with one bulk insert per table and the counters of the targets are updated with
+one query per table, each target getting the sum of its deltas.
+Already applied actions(eg. liking a comment that's already liked) are ignored.
+"""
+
+from actstream import action
+from collections import defaultdict
+from dataclasses import dataclass
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.utils.translation import gettext_lazy as _
+
+from notifications.models.models import Notification
+from notifications.signals import build_notification
+from posts.constants import MAX_ENGAGEMENT_BATCH_SIZE
+from posts.models.artist_posts.models import (
+    ArtistPost, ArtistPostBookmark, ArtistPostComment,
+    ArtistPostCommentLike, ArtistPostRating
+)
+from posts.models.non_artist_posts.models import (
+    NonArtistPost, NonArtistPostBookmark, NonArtistPostComment,
+    NonArtistPostCommentLike, NonArtistPostRating
+)
+
+LIKE_ARTIST_POST_COMMENT = 'like_artist_post_comment'
+LIKE_NON_ARTIST_POST_COMMENT = 'like_non_artist_post_comment'
+RATE_ARTIST_POST = 'rate_artist_post'
+RATE_NON_ARTIST_POST = 'rate_non_artist_post'
+BOOKMARK_ARTIST_POST = 'bookmark_artist_post'
+BOOKMARK_NON_ARTIST_POST = 'bookmark_non_artist_post'
+MARK_NOTIFICATION_READ = 'mark_notification_read'
+
+VALID_NUM_STARS = (1, 3, 5)
+
+
+@dataclass(frozen=True)
+class Interaction:
+    """A kind of action creating a row that links the user to a target"""
+    target_model: type
+    through_model: type
+    # Names of the foreign keys of the through model
+    target_field: str
+    user_field: str
+    # Counter of the target incremented by each new row
+    counter: str
+    # Notification sent to the poster of the target, if any
+    verb: str = None
+    category: str = None
+
+    def get_delta(self, obj):
+        return obj.num_stars if self.counter == 'num_stars' else 1
+
+
+INTERACTIONS = {
+    LIKE_ARTIST_POST_COMMENT: Interaction(
+        ArtistPostComment, ArtistPostCommentLike, 'comment', 'liker', 'num_likes',
+        _('liked your comment'), Notification.COMMENT_LIKE
+    ),
+    LIKE_NON_ARTIST_POST_COMMENT: Interaction(
+        NonArtistPostComment, NonArtistPostCommentLike, 'comment', 'liker', 'num_likes',
+        _('liked your comment'), Notification.COMMENT_LIKE
+    ),
+    RATE_ARTIST_POST: Interaction(
+        ArtistPost, ArtistPostRating, 'post', 'rater', 'num_stars',
+        _('rated your post'), Notification.RATING
+    ),
+    RATE_NON_ARTIST_POST: Interaction(
+        NonArtistPost, NonArtistPostRating, 'post', 'rater', 'num_stars',
+        _('rated your post'), Notification.RATING
+    ),
+    BOOKMARK_ARTIST_POST: Interaction(
+        ArtistPost, ArtistPostBookmark, 'post', 'bookmarker', 'num_bookmarks'
+    ),
+    BOOKMARK_NON_ARTIST_POST: Interaction(
+        NonArtistPost, NonArtistPostBookmark, 'post', 'bookmarker', 'num_bookmarks'
+    ),
+}
+
+ACTION_KINDS = (*INTERACTIONS, MARK_NOTIFICATION_READ)
+
+
+@dataclass(frozen=True)
+class EngagementAction:
+    kind: str
+    target_id: int
+    # Only used by rating actions
+    num_stars: int = None
+
+
+@dataclass
+class EngagementResult:
+    """Number of rows created or updated per kind of action"""
+    num_applied: dict
+
+    @property
+    def total(self):
+        return sum(self.num_applied.values())
+
+
+def validate_engagement_actions(actions) -> dict[str, dict[int, EngagementAction]]:
+    """
+    Validate the actions and return them grouped by kind then by target id.
+    Duplicate actions are merged.
+    """
+    if len(actions) > MAX_ENGAGEMENT_BATCH_SIZE:
+        raise ValidationError(
+            _('A batch can contain at most %(max_size)s actions'),
+            code='batch_too_large',
+            params={'max_size': MAX_ENGAGEMENT_BATCH_SIZE}
+        )
+
+    grouped_actions = defaultdict(dict)
+
+    for engagement_action in actions:
+        if engagement_action.kind not in ACTION_KINDS:
+            raise ValidationError(
+                _('Invalid action %(kind)s'),
+                code='invalid_action',
+                params={'kind': engagement_action.kind}
+            )
+
+        is_rating = engagement_action.kind in (RATE_ARTIST_POST, RATE_NON_ARTIST_POST)
+        if is_rating and engagement_action.num_stars not in VALID_NUM_STARS:
+            raise ValidationError(
+                _('Invalid number of stars %(num_stars)s'),
+                code='invalid_num_stars',
+                params={'num_stars': engagement_action.num_stars}
+            )
+
+        actions_of_kind = grouped_actions[engagement_action.kind]
+        previous_action = actions_of_kind.get(engagement_action.target_id)
+
+        if previous_action and previous_action.num_stars != engagement_action.num_stars:
+            raise ValidationError(
+                _('Conflicting actions on %(target_id)s'),
+                code='conflicting_actions',
+                params={'target_id': engagement_action.target_id}
+            )
+
+        actions_of_kind[engagement_action.target_id] = engagement_action
+
+    return grouped_actions
+
+
+def _get_counter_update(counter, deltas: dict[int, int]):
+    """Return the expression adding its delta to the counter of each target"""
+    return F(counter) + Case(
+        *[When(id=target_id, then=Value(delta)) for target_id, delta in deltas.items()],
+        default=Value(0),
+        output_field=IntegerField()
+    )
+
+
+def _apply_interactions(user, kind, actions: dict[int, EngagementAction], notifications):
+    """
+    Apply the actions of kind `kind` and return the number of rows created or
+    updated. Notifications to send are appended to `notifications`.
+    """
+    interaction = INTERACTIONS[kind]
+    target_model, through_model = interaction.target_model, interaction.through_model
+    target_ids = sorted(actions)
+
+    # Lock the targets(in a consistent order to prevent deadlocks between batches)
+    # so that concurrent batches can't insert the same rows while we compute the deltas.
+    targets = target_model.objects \
+        .select_for_update(of=('self', )) \
+        .select_related('poster') \
+        .filter(id__in=target_ids) \
+        .order_by('id')
+    targets = {target.id: target for target in targets}
+
+    missing_ids = set(target_ids) - targets.keys()
+    if missing_ids:
+        raise ValidationError(
+            _('%(model)s not found: %(ids)s'),
+            code='not_found',
+            params={
+                'model': target_model._meta.verbose_name,
+                'ids': ', '.join(str(target_id) for target_id in sorted(missing_ids))
+            }
+        )
+
+    target_id_field = f'{interaction.target_field}_id'
+    existing_objs = {
+        getattr(obj, target_id_field): obj
+        for obj in through_model.objects.filter(**{
+            interaction.user_field: user,
+            f'{target_id_field}__in': target_ids
+        })
+    }
+
+    new_objs, updated_objs, deltas = [], [], {}
+    for target_id in target_ids:
+        num_stars = actions[target_id].num_stars
+        existing_obj = existing_objs.get(target_id)
+
+        if existing_obj is None:
+            obj = through_model(**{
+                interaction.target_field: targets[target_id],
+                interaction.user_field: user,
+            })
+            if num_stars is not None:
+                obj.num_stars = num_stars
+
+            new_objs.append(obj)
+            deltas[target_id] = interaction.get_delta(obj)
+        elif num_stars is not None and existing_obj.num_stars != num_stars:
+            # Rating changed
+            deltas[target_id] = num_stars - existing_obj.num_stars
+            existing_obj.num_stars = num_stars
+            updated_objs.append(existing_obj)
+
+    through_model.objects.bulk_create(new_objs)
+    if updated_objs:
+        through_model.objects.bulk_update(updated_objs, ['num_stars'])
+
+    if deltas:
+        target_model.objects.filter(id__in=deltas).update(**{
+            interaction.counter: _get_counter_update(interaction.counter, deltas)
+        })
+
+    for obj in new_objs:
+        target = getattr(obj, interaction.target_field)
+
+        if interaction.verb and target.poster_id != user.id:
+            notifications.append(
+                build_notification(
+                    target.poster, user, interaction.verb, interaction.category,
+                    target=target,
+                    action_object=obj
+                )
+            )
+
+        # Add good ratings to the activity stream, like RateArtistPost
+        if interaction.counter == 'num_stars' and obj.num_stars in (3, 5):
+            action.send(user, verb=_('rated'), target=target, action_object=obj)
+
+    return len(new_objs) + len(updated_objs)
+
+
+def apply_engagement_actions(user, actions) -> EngagementResult:
+    """
+    Validate and apply `actions`(list of `EngagementAction`) of `user` in one
+    transaction. Nothing is applied if any action is invalid.
+    """
+    grouped_actions = validate_engagement_actions(actions)
+    num_applied = {kind: 0 for kind in ACTION_KINDS}
+    notifications = []
+
+    with transaction.atomic():
+        for kind in INTERACTIONS:
+            if grouped_actions.get(kind):
+                num_applied[kind] = _apply_interactions(
+                    user, kind, grouped_actions[kind], notifications
+                )
+
+        notification_ids = grouped_actions.get(MARK_NOTIFICATION_READ)
+        if notification_ids:
+            num_applied[MARK_NOTIFICATION_READ] = Notification.objects \
+                .filter(id__in=notification_ids) \
+                .mark_all_as_read(user)
+
+        Notification.objects.bulk_create(notifications)
+
+    return EngagementResult(num_applied)
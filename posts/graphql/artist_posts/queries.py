@@ -7,8 +7,10 @@ from graphql_auth.decorators import login_required
 
 from accounts.models.artists.models import Artist
 from core.utils import get_int_id_or_none
+from posts.constants import MAX_THREAD_DEPTH, MAX_THREAD_FAN_OUT
 from posts.models.artist_posts.models import ArtistPost, ArtistPostComment
-from .types import ArtistPostNode, ArtistPostCommentNode
+from posts.threads import get_thread
+from .types import ArtistPostNode, ArtistPostCommentNode, ArtistPostCommentThreadNode
 
 
 class ArtistPostQuery(graphene.ObjectType):
@@ -82,6 +84,13 @@ class ArtistPostCommentQuery(graphene.ObjectType):
         post_id=graphene.ID(),
         post_uuid=graphene.String()
     )
+    artist_post_comment_thread = graphene.Field(
+        ArtistPostCommentThreadNode,
+        id=graphene.ID(),
+        uuid=graphene.String(),
+        max_depth=graphene.Int(default_value=MAX_THREAD_DEPTH),
+        max_fan_out=graphene.Int(default_value=MAX_THREAD_FAN_OUT)
+    )
 
     def resolve_artist_post_comment(root, info, id=None, uuid=None):
         id = get_int_id_or_none(id)
@@ -107,4 +116,27 @@ class ArtistPostCommentQuery(graphene.ObjectType):
 
         return gql_optimizer.query(post.ancestor_comments.all(), info)
 
+    def resolve_artist_post_comment_thread(
+        root, info, 
+        id=None, uuid=None, 
+        max_depth=MAX_THREAD_DEPTH, max_fan_out=MAX_THREAD_FAN_OUT
+    ):
+        """
+        Get the whole thread of an ancestor comment using either its id or uuid. 
+        The depth and fan-out of the thread can't exceed the default values.
+        """
+        id = get_int_id_or_none(id)
+
+        if id:
+            ancestor = ArtistPostComment.objects.get(id=id, ancestor__isnull=True)
+        elif uuid:
+            ancestor = ArtistPostComment.objects.get(uuid=uuid, ancestor__isnull=True)
+        else:
+            # If neither id nor uuid was passed, return None
+            return None
 
+        return get_thread(
+            ancestor,
+            max_depth=min(max_depth, MAX_THREAD_DEPTH),
+            max_fan_out=max(0, min(max_fan_out, MAX_THREAD_FAN_OUT))
+        )
@@ -1,13 +1,21 @@
 import graphene
 from graphene_django import DjangoObjectType
 
+from core.graphql.loaders import get_loader
 from core.mixins import GraphenePKMixin, GraphenePhotoMixin, GrapheneVideoMixin
 from posts.models.artist_posts.models import (
     ArtistPost, ArtistPostBookmark, ArtistPostComment, ArtistPostDownload, 
     ArtistPostRating, ArtistPostCommentLike, ArtistPostPhoto, ArtistPostVideo,
     ArtistParentPost, ArtistPostRepost
 )
-from ..common.types import CommentFilter, PostFilter
+from posts.constants import MAX_THREAD_FAN_OUT, THREAD_PREVIEW_NUM_REPLIES
+from ..common.loaders import (
+    FirstChildCommentsLoader, ViewerArtistPostCommentLikeLoader, 
+    ViewerArtistPostInteractionLoader
+)
+from ..common.types import (
+    CommentFilter, PostFilter, ViewerCommentStateMixin, ViewerPostStateMixin
+)
 
 
 class ArtistPostFilter(PostFilter):
@@ -20,33 +28,65 @@ class ArtistPostCommentFilter(CommentFilter):
         model = ArtistPostComment
 
 
-class ArtistPostNode(GraphenePKMixin, DjangoObjectType):
+class ArtistPostNode(GraphenePKMixin, ViewerPostStateMixin, DjangoObjectType):
+    viewer_interaction_loader = ViewerArtistPostInteractionLoader
+
     class Meta:
         model = ArtistPost
         filterset_class = ArtistPostFilter
         interfaces = [graphene.relay.Node, ]
 
 
-class ArtistPostRepostNode(GraphenePKMixin, DjangoObjectType):
+class ArtistPostRepostNode(GraphenePKMixin, ViewerPostStateMixin, DjangoObjectType):
+    viewer_interaction_loader = ViewerArtistPostInteractionLoader
+
     class Meta:
         model = ArtistPostRepost
         filterset_class = ArtistPostFilter
         interfaces = [graphene.relay.Node, ]
 
 
-class ArtistParentPostNode(GraphenePKMixin, DjangoObjectType):
+class ArtistParentPostNode(GraphenePKMixin, ViewerPostStateMixin, DjangoObjectType):
+    viewer_interaction_loader = ViewerArtistPostInteractionLoader
+
     class Meta:
         model = ArtistParentPost
         filterset_class = ArtistPostFilter
         interfaces = [graphene.relay.Node, ]
 
 
-class ArtistPostCommentNode(GraphenePKMixin, DjangoObjectType):
+class ArtistPostCommentNode(GraphenePKMixin, ViewerCommentStateMixin, DjangoObjectType):
+    viewer_like_loader = ViewerArtistPostCommentLikeLoader
+
+    # Oldest child comments of an ancestor comment, batch loaded for all the
+    # ancestor comments of a page.
+    first_child_comments = graphene.List(
+        lambda: ArtistPostCommentNode,
+        first=graphene.Int(default_value=THREAD_PREVIEW_NUM_REPLIES)
+    )
+
     class Meta:
         model = ArtistPostComment
         filterset_class = ArtistPostCommentFilter
         interfaces = [graphene.relay.Node, ]
 
+    def resolve_first_child_comments(root, info, first):
+        # Only ancestor comments have child comments
+        if root.ancestor_id is not None:
+            return []
+
+        first = max(0, min(first, MAX_THREAD_FAN_OUT))
+        loader = get_loader(info, FirstChildCommentsLoader, ArtistPostComment, first)
+        return loader.load(root.pk)
+
+
+class ArtistPostCommentThreadNode(graphene.ObjectType):
+    """A comment of a thread and its replies. See `posts.threads.ThreadNode`"""
+    comment = graphene.Field(ArtistPostCommentNode)
+    depth = graphene.Int()
+    replies = graphene.List(lambda: ArtistPostCommentThreadNode)
+    num_hidden_replies = graphene.Int()
+
 
 class ArtistPostPhotoNode(GraphenePKMixin, GraphenePhotoMixin, DjangoObjectType):
     class Meta:
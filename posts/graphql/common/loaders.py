@@ -0,0 +1,65 @@
+"""Dataloaders used to batch the loading of data related to posts and comments"""
+
+from promise import Promise
+from promise.dataloader import DataLoader
+
+from posts.threads import get_first_child_comments
+
+
+class ViewerArtistPostInteractionLoader(DataLoader):
+    """
+    Load the interactions(rating, bookmark, download) of a user with artist posts.
+    All the posts resolved in a request are fetched with one query per relation table.
+    """
+
+    def __init__(self, user):
+        super().__init__()
+        self.user = user
+
+    def batch_load_fn(self, post_ids):
+        interactions = self.user.get_artist_posts_interactions(post_ids)
+        return Promise.resolve([interactions[post_id] for post_id in post_ids])
+
+
+class ViewerNonArtistPostInteractionLoader(ViewerArtistPostInteractionLoader):
+    """Same as `ViewerArtistPostInteractionLoader` but for non artist posts"""
+
+    def batch_load_fn(self, post_ids):
+        interactions = self.user.get_non_artist_posts_interactions(post_ids)
+        return Promise.resolve([interactions[post_id] for post_id in post_ids])
+
+
+class ViewerArtistPostCommentLikeLoader(DataLoader):
+    """Load whether a user has liked each artist post comment"""
+
+    def __init__(self, user):
+        super().__init__()
+        self.user = user
+
+    def batch_load_fn(self, comment_ids):
+        liked_ids = self.user.get_liked_artist_post_comment_ids(comment_ids)
+        return Promise.resolve([comment_id in liked_ids for comment_id in comment_ids])
+
+
+class ViewerNonArtistPostCommentLikeLoader(ViewerArtistPostCommentLikeLoader):
+    """Same as `ViewerArtistPostCommentLikeLoader` but for non artist post comments"""
+
+    def batch_load_fn(self, comment_ids):
+        liked_ids = self.user.get_liked_non_artist_post_comment_ids(comment_ids)
+        return Promise.resolve([comment_id in liked_ids for comment_id in comment_ids])
+
+
+class FirstChildCommentsLoader(DataLoader):
+    """
+    Load the first `k` child comments of ancestor comments.
+    The child comments of all the ancestors of a page are fetched in one query.
+    """
+
+    def __init__(self, comment_model, k):
+        super().__init__()
+        self.comment_model = comment_model
+        self.k = k
+
+    def batch_load_fn(self, ancestor_ids):
+        child_comments = get_first_child_comments(self.comment_model, ancestor_ids, self.k)
+        return Promise.resolve([child_comments[ancestor_id] for ancestor_id in ancestor_ids])
@@ -1,4 +1,3 @@
-import base64
 import graphene
 import os
 import uuid
@@ -6,6 +5,7 @@ from django.conf import settings
 from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.utils.translation import gettext_lazy as _
+from graphene_django_cud.util import disambiguate_id
 from graphene_file_upload.scalars import Upload
 from graphql import GraphQLError
 from graphql_auth.bases import Output
@@ -16,15 +16,19 @@ from pydub import AudioSegment
 import subprocess
 
 from core.constants import FILE_STORAGE_CLASS
+from core.thumbnails import get_placeholder
 from core.utils import (
 	get_file_extension, get_user_cache_keys,
 	get_image_file_thumbnail_extension_and_type, get_file_path
 )
 from posts.constants import MAX_NUM_PHOTOS, TEMP_FILES_UPLOAD_DIR, POST_COVER_IMG_DIR
+from posts.engagement import EngagementAction, apply_engagement_actions
+from posts.uploads import append_video_chunk, complete_video_upload, init_video_upload
 from posts.validators import (
 	validate_post_photo_file, validate_cache_media,
 	validate_post_video_file, validate_post_audio_file
 )
+from .types import EngagementActionCount, EngagementActionInput, VideoUploadType, get_video_upload_type
 
 STORAGE = FILE_STORAGE_CLASS()
 USE_S3 = settings.USE_S3
@@ -39,7 +43,8 @@ class MultipleImageUploadMutation(Output, graphene.ClientIDMutation):
 		files = graphene.List(Upload, required=True)
 
 	filenames = graphene.List(graphene.String)
-	base64_strs = graphene.List(graphene.String)
+	# Low-quality previews of the photos, see core.thumbnails
+	placeholders = graphene.List(graphene.String)
 	mimetypes = graphene.List(graphene.String)
 	 
 	@classmethod
@@ -74,7 +79,7 @@ class MultipleImageUploadMutation(Output, graphene.ClientIDMutation):
 			)
 
 		# Get thumbnails of files and saved to cache
-		base64_strs, filenames, mimetypes = [], [], []
+		placeholders, filenames, mimetypes = [], [], []
 		for file in files:
 			# Get file extension and type to use with PIL
 			file_extension, ftype = get_image_file_thumbnail_extension_and_type(file)
@@ -88,10 +93,9 @@ class MultipleImageUploadMutation(Output, graphene.ClientIDMutation):
 			use_filename = str(uuid.uuid4()) + '.' + file_extension
 			mimetype = file.content_type
 			file_bytes = thumb_file.getvalue()
-			base64_bytes = base64.b64encode(file_bytes)
-			base64_str = base64_bytes.decode('utf-8')
+			placeholder = get_placeholder(image)
 
-			base64_strs.append(base64_str)
+			placeholders.append(placeholder)
 			filenames.append(use_filename)
 			mimetypes.append(mimetype)
 			thumb_file.close()
@@ -99,14 +103,15 @@ class MultipleImageUploadMutation(Output, graphene.ClientIDMutation):
 			user_photos_list.append({
 				'file_bytes': file_bytes,
 				'filename': use_filename,
-				'mimetype': mimetype
+				'mimetype': mimetype,
+				'placeholder': placeholder
 			})
 		
 		cache.set(cache_key, user_photos_list)
 
 		return MultipleImageUploadMutation(
 			filenames=filenames,
-			base64_strs=base64_strs,
+			placeholders=placeholders,
 			mimetypes=mimetypes
 		)
 	   
@@ -235,6 +240,93 @@ class VideoUploadMutation(Output, graphene.ClientIDMutation):
 		return VideoUploadMutation(**file_dict)
 	   
 
+def get_video_upload_error(err):
+	"""Return the GraphQLError of the ValidationError `err` of an upload, with its params"""
+	params = err.params or {}
+	return GraphQLError(err.message % params, extensions={'code': err.code, **params})
+
+
+class InitVideoUploadMutation(Output, graphene.ClientIDMutation):
+	"""
+	Start a resumable upload of a video(see posts.uploads).
+	Flow:
+		- Init the upload with the name, type and size of the video.
+		- Send the video in chunks of at most `chunk_size` bytes, in order. If the upload
+		  is interrupted, get its `offset` with the `videoUpload` query and resume from it.
+		- Complete the upload; the video is then staged like with `VideoUploadMutation`.
+	"""
+
+	class Input:
+		filename = graphene.String(required=True)
+		content_type = graphene.String(required=True)
+		# Float since videos may be larger than the max Int(2^31 - 1)
+		size = graphene.Float(required=True)
+
+	upload = graphene.Field(VideoUploadType)
+
+	@classmethod
+	@login_required
+	def mutate_and_get_payload(cls, root, info, filename, content_type, size):
+		user = info.context.user
+		user_cache_keys = get_user_cache_keys(user.username)
+		validate_cache_media(user_cache_keys['photos'], user_cache_keys['video'])
+
+		try:
+			upload = init_video_upload(user, filename, content_type, int(size))
+		except ValidationError as err:
+			raise get_video_upload_error(err)
+
+		return cls(upload=get_video_upload_type(upload))
+
+
+class AppendVideoChunkMutation(Output, graphene.ClientIDMutation):
+	"""Send a chunk of a video being uploaded, at `offset`"""
+
+	class Input:
+		upload_id = graphene.String(required=True)
+		offset = graphene.Float(required=True)
+		chunk = Upload(required=True)
+
+	upload = graphene.Field(VideoUploadType)
+
+	@classmethod
+	@login_required
+	def mutate_and_get_payload(cls, root, info, upload_id, offset, chunk):
+		try:
+			upload = append_video_chunk(info.context.user, upload_id, int(offset), chunk)
+		except ValidationError as err:
+			# On an invalid offset, the clients resume from the expected offset(in the params)
+			raise get_video_upload_error(err)
+
+		return cls(upload=get_video_upload_type(upload))
+
+
+class CompleteVideoUploadMutation(Output, graphene.ClientIDMutation):
+	"""Validate a fully uploaded video and stage it"""
+
+	class Input:
+		upload_id = graphene.String(required=True)
+
+	filename = graphene.String()
+	filepath = graphene.String()
+	mimetype = graphene.String()
+	was_audio = graphene.Boolean(default_value=False)
+
+	@classmethod
+	@login_required
+	def mutate_and_get_payload(cls, root, info, upload_id):
+		user = info.context.user
+		user_cache_keys = get_user_cache_keys(user.username)
+		validate_cache_media(user_cache_keys['photos'], user_cache_keys['video'])
+
+		try:
+			file_dict = complete_video_upload(user, upload_id)
+		except ValidationError as err:
+			raise get_video_upload_error(err)
+
+		return cls(**file_dict)
+
+
 class AudioUploadMutation(Output, graphene.ClientIDMutation):
 	"""
 	Upload an audio.
@@ -330,3 +422,44 @@ class DeleteUploadedVideoMutation(Output, graphene.ClientIDMutation):
 
 		return DeleteUploadedVideoMutation(success=True)
 
+
+class BatchEngage(Output, graphene.ClientIDMutation):
+	"""
+	Apply many engagement actions(likes, ratings, bookmarks, reading notifications)
+	in one transaction. Either all the actions are applied or none.
+	"""
+
+	class Input:
+		actions = graphene.List(graphene.NonNull(EngagementActionInput), required=True)
+
+	# Number of rows created or updated per kind of action
+	applied = graphene.List(EngagementActionCount)
+	num_applied = graphene.Int()
+
+	@classmethod
+	@login_required
+	def mutate_and_get_payload(cls, root, info, actions):
+		engagement_actions = [
+			EngagementAction(
+				kind=action.kind,
+				target_id=int(disambiguate_id(action.target_id)),
+				num_stars=action.num_stars
+			)
+			for action in actions
+		]
+
+		try:
+			result = apply_engagement_actions(info.context.user, engagement_actions)
+		except ValidationError as err:
+			raise GraphQLError(
+				err.message % (err.params or {}),
+				extensions={'code': err.code}
+			)
+
+		return cls(
+			applied=[
+				EngagementActionCount(kind=kind, count=count)
+				for kind, count in result.num_applied.items()
+			],
+			num_applied=result.total
+		)
@@ -0,0 +1,15 @@
+import graphene
+from graphql_auth.decorators import login_required
+
+from posts.uploads import get_video_upload
+from .types import VideoUploadType, get_video_upload_type
+
+
+class VideoUploadQuery(graphene.ObjectType):
+    video_upload = graphene.Field(VideoUploadType)
+
+    @login_required
+    def resolve_video_upload(root, info):
+        """The resumable video upload of the user, if any"""
+        upload = get_video_upload(info.context.user)
+        return get_video_upload_type(upload) if upload else None
@@ -1,6 +1,9 @@
 import django_filters
 import graphene
 
+from core.graphql.loaders import get_loader
+from posts import engagement
+
 
 class PostFilter(django_filters.FilterSet):
     is_parent = django_filters.BooleanFilter(method='filter_is_parent')
@@ -48,7 +51,110 @@ class RATING_STARS(graphene.Enum):
     FIVE = 5
 
 
+class ENGAGEMENT_ACTION(graphene.Enum):
+    LIKE_ARTIST_POST_COMMENT = engagement.LIKE_ARTIST_POST_COMMENT
+    LIKE_NON_ARTIST_POST_COMMENT = engagement.LIKE_NON_ARTIST_POST_COMMENT
+    RATE_ARTIST_POST = engagement.RATE_ARTIST_POST
+    RATE_NON_ARTIST_POST = engagement.RATE_NON_ARTIST_POST
+    BOOKMARK_ARTIST_POST = engagement.BOOKMARK_ARTIST_POST
+    BOOKMARK_NON_ARTIST_POST = engagement.BOOKMARK_NON_ARTIST_POST
+    MARK_NOTIFICATION_READ = engagement.MARK_NOTIFICATION_READ
+
+
+class EngagementActionInput(graphene.InputObjectType):
+    kind = ENGAGEMENT_ACTION(required=True)
+    # Id of the comment, post or notification
+    target_id = graphene.ID(required=True)
+    # Required when rating a post
+    num_stars = RATING_STARS()
+
+
+class EngagementActionCount(graphene.ObjectType):
+    kind = ENGAGEMENT_ACTION()
+    count = graphene.Int()
+
+
+class VideoUploadType(graphene.ObjectType):
+    """State of a resumable video upload, see posts.uploads"""
+    id = graphene.String()
+    filename = graphene.String()
+    size = graphene.Float()
+    # Number of bytes received, the next chunk should be sent from this offset
+    offset = graphene.Float()
+    chunk_size = graphene.Int()
+
+
+def get_video_upload_type(upload):
+    """`VideoUploadType` of the upload state `upload`"""
+    return VideoUploadType(**{key: upload[key] for key in VideoUploadType._meta.fields})
+
+
 class PostFormFor(graphene.Enum):
     ARTIST_POST = "artist_post"
     NON_ARTIST_POST = "non_artist_post"
 
+
+
+class ViewerPostStateMixin:
+    """
+    Used with DjangoObjectTypes that represent a post model.
+    Exposes the interactions of the current user with the post. The state of all the
+    posts resolved in a request is batch loaded by `viewer_interaction_loader`.
+    """
+    viewer_interaction_loader = None
+
+    viewer_has_rated = graphene.Boolean()
+    viewer_num_stars = graphene.Int()
+    viewer_has_bookmarked = graphene.Boolean()
+    viewer_has_downloaded = graphene.Boolean()
+
+    @classmethod
+    def _load_viewer_interaction(cls, root, info, key, default):
+        user = info.context.user
+
+        if not user.is_authenticated:
+            return default
+
+        loader = get_loader(info, cls.viewer_interaction_loader, user)
+        return loader.load(root.pk).then(lambda interaction: interaction[key])
+
+    @classmethod
+    def resolve_viewer_has_rated(cls, root, info):
+        return cls._load_viewer_interaction(root, info, 'has_rated', False)
+
+    @classmethod
+    def resolve_viewer_num_stars(cls, root, info):
+        return cls._load_viewer_interaction(root, info, 'num_stars', None)
+
+    @classmethod
+    def resolve_viewer_has_bookmarked(cls, root, info):
+        return cls._load_viewer_interaction(root, info, 'has_bookmarked', False)
+
+    @classmethod
+    def resolve_viewer_has_downloaded(cls, root, info):
+        return cls._load_viewer_interaction(root, info, 'has_downloaded', False)
+
+    def resolve_parent(root, info):
+        # Forward relations don't use the default manager, posts marked as deleted
+        # are still loaded until they are purged(see posts.deletion)
+        parent = root.parent
+        return None if parent is None or parent.is_deleted else parent
+
+
+class ViewerCommentStateMixin:
+    """
+    Used with DjangoObjectTypes that represent a comment model.
+    Tells whether the current user has liked the comment.
+    """
+    viewer_like_loader = None
+
+    viewer_has_liked = graphene.Boolean()
+
+    @classmethod
+    def resolve_viewer_has_liked(cls, root, info):
+        user = info.context.user
+
+        if not user.is_authenticated:
+            return False
+
+        return get_loader(info, cls.viewer_like_loader, user).load(root.pk)
@@ -1,14 +1,12 @@
 from django.core.cache import cache
 from django.core.files.base import ContentFile
 
-from core.constants import FILE_STORAGE_CLASS
+from core.media import store_media_batch
+from core.storage_writer import StorageBatchWriter
+from core.thumbnails import create_photo_variants
 from core.utils import get_user_cache_keys
-from posts.constants import ARTIST_POST_PHOTO_UPLOAD_DIR
-from posts.utils import get_post_media_upload_path
 from posts.models.artist_posts.models import ArtistPostPhoto, ArtistPostVideo, ArtistPost
 
-STORAGE = FILE_STORAGE_CLASS()
-
 
 def store_artist_post_cache_media(poster, post: ArtistPost):
     """
@@ -24,22 +22,28 @@ def store_artist_post_cache_media(poster, post: ArtistPost):
 
     # Bulk create photos. Note that one of its caveats is that custom save method 
     # is not called; but since we have no custom save method, no worries then.
-    post_photos = []
-    for photo_dict in user_photos_list:
-        img_file = ContentFile(photo_dict['file_bytes'])
-
-        # This is the upload directory of artist post photos. 
-        save_dir = get_post_media_upload_path(
-            poster.id, 
-            ARTIST_POST_PHOTO_UPLOAD_DIR,
-            photo_dict['filename']
+    with StorageBatchWriter() as writer:
+        # Identical photos are stored once, with their thumbnails, see core.media.
+        # The photos are uploaded concurrently.
+        saved_filenames = store_media_batch(
+            [
+                (ContentFile(photo_dict['file_bytes']), photo_dict['filename'])
+                for photo_dict in user_photos_list
+            ],
+            create_photo_variants,
+            writer
         )
-        saved_filename = STORAGE.save(save_dir, img_file)
-        print(saved_filename)
-        post_photos.append(ArtistPostPhoto(post=post, photo=saved_filename))
-
-    # If no photos were uploaded hence 'post_photos' is empty, there will be no prob
-    ArtistPostPhoto.objects.bulk_create(post_photos)
+        post_photos = [
+            ArtistPostPhoto(
+                post=post,
+                photo=saved_filename,
+                placeholder=photo_dict.get('placeholder', '')
+            )
+            for photo_dict, saved_filename in zip(user_photos_list, saved_filenames)
+        ]
+
+        # If no photos were uploaded hence 'post_photos' is empty, there will be no prob
+        ArtistPostPhoto.objects.bulk_create(post_photos)
 
     # Save videos that are in cache to post
     # TODO Call external api (aws elastic video encoder) to compress video
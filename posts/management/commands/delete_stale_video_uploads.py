@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from posts.uploads import delete_stale_video_uploads
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete the files of the resumable video uploads that were abandoned, '
+        'their state having expired. Meant to be run daily.'
+    )
+
+    def handle(self, *args, **options):
+        num_deleted = delete_stale_video_uploads()
+        self.stdout.write(self.style.SUCCESS(f'Deleted {num_deleted} stale uploads'))
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from posts.constants import MEDIA_DELETION_BATCH_SIZE, POST_DELETION_CHUNK_SIZE
+from posts.deletion import get_num_posts_to_purge, purge_deleted_posts
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete the posts marked as deleted along with their comments, ratings, '
+        'bookmarks... and media files. Meant to be run every few minutes.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size', type=int, default=POST_DELETION_CHUNK_SIZE,
+            help='Number of rows deleted per transaction.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=MEDIA_DELETION_BATCH_SIZE,
+            help='Number of media files deleted per storage request.'
+        )
+        parser.add_argument('--database', default='default')
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Only display the number of posts to purge.'
+        )
+
+    def handle(self, *args, **options):
+        using = options['database']
+
+        if options['dry_run']:
+            self.stdout.write(f'{get_num_posts_to_purge(using)} posts to purge')
+            return
+
+        result = purge_deleted_posts(options['chunk_size'], options['batch_size'], using)
+        self.stdout.write(self.style.SUCCESS(
+            f'Purged {result.num_posts} posts: {result.num_rows} rows '
+            f'and {result.num_files} media files deleted'
+        ))
@@ -1,13 +1,19 @@
 from django.db.models import Manager
 
 
-class PostRepostManager(Manager):
+class PostManager(Manager):
+    def get_queryset(self):
+        # Posts marked as deleted are hidden until they are purged(see posts.deletion)
+        return super().get_queryset().filter(deleted_on__isnull=True)
+
+
+class PostRepostManager(PostManager):
     def get_queryset(self):
         # Returns only posts that are reposts
         return super().get_queryset().filter(is_simple_repost__isnull=False)
 
 
-class ParentPostManager(Manager):
+class ParentPostManager(PostManager):
     def get_queryset(self):
         # Returns only parent posts
         return super().get_queryset().filter(is_simple_repost__isnull=True)
@@ -0,0 +1,19 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0014_auto_20220312_0541'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='artistpostcomment',
+            index=models.Index(fields=['ancestor', 'created_on'], name='artist_comment_thread_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='nonartistpostcomment',
+            index=models.Index(fields=['ancestor', 'created_on'], name='non_artist_comment_thread_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0015_comment_thread_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='artistpost',
+            name='deleted_on',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='nonartistpost',
+            name='deleted_on',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='artistpost',
+            index=models.Index(condition=models.Q(('deleted_on__isnull', False)), fields=['deleted_on'], name='artist_post_deleted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='nonartistpost',
+            index=models.Index(condition=models.Q(('deleted_on__isnull', False)), fields=['deleted_on'], name='non_artist_post_deleted_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0016_post_deleted_on'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='artistpostphoto',
+            name='placeholder',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='nonartistpostphoto',
+            name='placeholder',
+            field=models.TextField(blank=True, editable=False),
+        ),
+    ]
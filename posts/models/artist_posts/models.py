@@ -151,6 +151,12 @@ class ArtistPost(Post, ArtistPostOperations, FlagMixin, UsesCustomSignal):
 			models.Index(
 				fields=['is_simple_repost'],
 				name='artist_post_repost_idx'
+			),
+			# To find the posts to purge
+			models.Index(
+				fields=['deleted_on'],
+				name='artist_post_deleted_idx',
+				condition=Q(deleted_on__isnull=False)
 			)
 		]
 		# constraints = [
@@ -202,6 +208,8 @@ class ArtistPostPhoto(models.Model, PostMediaMixin):
 	)
 	photo_width = models.PositiveIntegerField()
 	photo_height = models.PositiveIntegerField()
+	# Base64 encoded low-quality preview, computed at upload(see core.thumbnails)
+	placeholder = models.TextField(blank=True, editable=False)
 
 	def __str__(self):
 		return f'Post {str(self.post)} photo'
@@ -461,6 +469,13 @@ class ArtistPostComment(Comment, FlagMixin, UsesCustomSignal):
 	class Meta: 
 		db_table = 'posts\".\"artist_post_comment'
 		ordering = ['-num_likes', '-created_on', '-num_child_comments']
+		indexes = [
+			# Used to load comment threads, see posts.threads
+			models.Index(
+				fields=['ancestor', 'created_on'],
+				name='artist_comment_thread_idx'
+			)
+		]
 
 
 class ArtistPostCommentLike(CommentLike):
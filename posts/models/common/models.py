@@ -9,6 +9,7 @@ from shortuuid.django_fields import ShortUUIDField
 from taggit.models import TagBase
 
 from posts.constants import MAX_COMMENT_LENGTH, MAX_POST_LENGTH
+from posts.managers import PostManager
 from .operations import PostOperations
 
 
@@ -79,12 +80,23 @@ class Post(models.Model, PostOperations):
 		default=0, 
 		editable=False
 	)
+	# Set when the post is deleted, the post and its dependents are then
+	# purged in the background(see posts.deletion)
+	deleted_on = models.DateTimeField(null=True, blank=True, editable=False)
+
+	# Posts marked as deleted are excluded
+	objects = PostManager()
+	all_objects = models.Manager()
 
 	def __str__(self):
 		if self.is_simple_repost:
 			return f'Repost with id {self.pk} and parent id {self.parent_id}'
 		return self.body
 
+	@property
+	def is_deleted(self):
+		return self.deleted_on is not None
+
 	@property
 	def is_parent(self):
 		return self.is_simple_repost is None
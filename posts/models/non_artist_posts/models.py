@@ -133,6 +133,12 @@ class NonArtistPost(Post, NonArtistPostOperations, FlagMixin, UsesCustomSignal):
 			models.Index(
 				fields=['is_simple_repost'],
 				name='non_artist_post_repost_idx'
+			),
+			# To find the posts to purge
+			models.Index(
+				fields=['deleted_on'],
+				name='non_artist_post_deleted_idx',
+				condition=Q(deleted_on__isnull=False)
 			)
 		]
 
@@ -175,6 +181,8 @@ class NonArtistPostPhoto(models.Model, PostMediaMixin):
 	)
 	photo_width = models.PositiveIntegerField()
 	photo_height = models.PositiveIntegerField()
+	# Base64 encoded low-quality preview, computed at upload(see core.thumbnails)
+	placeholder = models.TextField(blank=True, editable=False)
 
 	def __str__(self):
 		return f'Post {str(self.post)} photo'
@@ -416,6 +424,13 @@ class NonArtistPostComment(Comment, FlagMixin, UsesCustomSignal):
 	class Meta: 
 		db_table = 'posts\".\"non_artist_post_comment'
 		ordering = ['-num_likes', '-created_on', '-num_child_comments']
+		indexes = [
+			# Used to load comment threads, see posts.threads
+			models.Index(
+				fields=['ancestor', 'created_on'],
+				name='non_artist_comment_thread_idx'
+			)
+		]
 
 
 class NonArtistPostCommentLike(CommentLike):
@@ -3,6 +3,7 @@ from django.db.models import F
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 
+from core.counters import counters_maintained_by_signals
 from posts.models.artist_posts.models import ArtistPost, ArtistPostComment
 from posts.utils import extract_hashtags, extract_mentions
 
@@ -32,7 +33,7 @@ def set_post_attributes(sender, instance: ArtistPost, created: bool, **kwargs):
                 for username in extract_mentions(post_content)
             ])
         
-        if created:
+        if created and counters_maintained_by_signals():
             # Increment user repost count
             poster.num_artist_posts = F('num_artist_posts') + 1
             poster.save(update_fields=['num_artist_posts'])
@@ -40,7 +41,7 @@ def set_post_attributes(sender, instance: ArtistPost, created: bool, **kwargs):
     # Else If post is a repost
     else:
         # If repost is newly created (it isn't an update...)
-        if created:
+        if created and counters_maintained_by_signals():
             parent_post = post.parent
 
             if post.is_simple_repost:
@@ -74,7 +75,8 @@ def set_comment_attributes(sender, instance: ArtistPostComment, created, **kwarg
             for username in extract_mentions(comment.body)
         ])
 
-    if created:
+    # In triggers mode, the counters are updated by the database
+    if created and counters_maintained_by_signals():
         poster, post = comment.poster, comment.post_concerned
 
         # Update number of replies of comment's parent
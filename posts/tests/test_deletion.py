@@ -0,0 +1,97 @@
+import datetime
+from django.contrib.auth.models import AnonymousUser
+from django.test import RequestFactory, TestCase
+from graphene_django.settings import graphene_settings
+
+from accounts.tests.users.test_models import TestUtils
+from core.counters import get_counter, reconcile_counter
+from posts.deletion import mark_posts_deleted, purge_deleted_posts
+from posts.models.artist_posts.models import ArtistPost, ArtistPostComment, ArtistPostRating
+
+
+class PostDeletionTests(TestCase):
+    def setUp(self):
+        self.poster = TestUtils.create_test_user(
+            'user1', 'email1@gmail.com', 'password', 'name name1',
+            datetime.datetime(year=2000, month=3, day=8), 'CM', is_active=True
+        )
+        self.user = TestUtils.create_test_user(
+            'user2', 'email2@gmail.com', 'password', 'name name2',
+            datetime.datetime(year=2000, month=3, day=8), 'CM', is_active=True
+        )
+        artist = TestUtils.create_artist(
+            'artist name',
+            datetime.datetime(year=1996, month=8, day=8),
+            'US'
+        )
+        self.post = TestUtils.create_artist_post(artist, 'This is an #artist post', self.poster)
+        self.repost = TestUtils.create_artist_post(
+            artist, 'This is a repost', self.user, parent=self.post, is_simple_repost=False
+        )
+
+        ancestor = ArtistPostComment.objects.create(
+            body='comment', poster=self.user, post_concerned=self.post
+        )
+        for _ in range(3):
+            ArtistPostComment.objects.create(
+                body='reply', poster=self.user, post_concerned=self.post,
+                parent=ancestor, ancestor=ancestor
+            )
+        ArtistPostRating.objects.create(post=self.post, rater=self.user, num_stars=3)
+
+    def test_deleted_posts_are_hidden_then_purged(self):
+        self.assertEqual(mark_posts_deleted(ArtistPost, [self.post.id]), [self.post.id])
+        # Already marked
+        self.assertEqual(mark_posts_deleted(ArtistPost, [self.post.id]), [])
+
+        self.assertFalse(ArtistPost.objects.filter(id=self.post.id).exists())
+        self.assertTrue(ArtistPost.all_objects.filter(id=self.post.id).exists())
+
+        result = purge_deleted_posts(chunk_size=2)
+
+        self.assertEqual(result.num_posts, 1)
+        self.assertFalse(ArtistPost.all_objects.filter(id=self.post.id).exists())
+        self.assertFalse(ArtistPostComment.objects.filter(post_concerned_id=self.post.id).exists())
+        self.assertFalse(ArtistPostRating.objects.filter(post_id=self.post.id).exists())
+
+        # Reposts are kept without their parent
+        self.repost.refresh_from_db()
+        self.assertIsNone(self.repost.parent_id)
+
+        self.poster.refresh_from_db()
+        self.user.refresh_from_db()
+        self.assertEqual(self.poster.num_artist_posts, 0)
+        self.assertEqual(self.user.num_ancestor_artist_post_comments, 0)
+
+    def test_counters_reconciled_before_purge_stay_consistent(self):
+        mark_posts_deleted(ArtistPost, [self.repost.id])
+
+        # The marked repost isn't counted by the reconciliation
+        for name in ['user_num_artist_post_reposts', 'artist_post_num_non_simple_reposts']:
+            reconcile_counter(get_counter(name))
+
+        self.user.refresh_from_db()
+        self.post.refresh_from_db()
+        self.assertEqual(self.user.num_artist_post_reposts, 0)
+        self.assertEqual(self.post.num_non_simple_reposts, 0)
+
+        purge_deleted_posts(chunk_size=2)
+
+        self.user.refresh_from_db()
+        self.post.refresh_from_db()
+        self.assertEqual(self.user.num_artist_post_reposts, 0)
+        self.assertEqual(self.post.num_non_simple_reposts, 0)
+
+    def test_reposts_hide_marked_parent(self):
+        mark_posts_deleted(ArtistPost, [self.post.id])
+
+        request = RequestFactory().post('/graphql/')
+        request.user = AnonymousUser()
+        result = graphene_settings.SCHEMA.execute(
+            'query($id: ID) { artistPost(id: $id) { pk parent { body } } }',
+            variables={'id': str(self.repost.id)},
+            context_value=request
+        )
+
+        self.assertIsNone(result.errors)
+        self.assertEqual(result.data['artistPost'], {'pk': self.repost.id, 'parent': None})
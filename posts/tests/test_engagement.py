@@ -0,0 +1,84 @@
+import datetime
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+
+from accounts.tests.users.test_models import TestUtils
+from notifications.models.models import Notification
+from posts.engagement import (
+    EngagementAction, apply_engagement_actions,
+    LIKE_ARTIST_POST_COMMENT, RATE_ARTIST_POST, BOOKMARK_ARTIST_POST
+)
+from posts.models.artist_posts.models import ArtistPostComment, ArtistPostRating
+
+
+class EngagementTests(TestCase):
+    def setUp(self):
+        self.poster = TestUtils.create_test_user(
+            'user1', 'email1@gmail.com', 'password', 'name name1',
+            datetime.datetime(year=2000, month=3, day=8), 'CM', is_active=True
+        )
+        self.user = TestUtils.create_test_user(
+            'user2', 'email2@gmail.com', 'password', 'name name2',
+            datetime.datetime(year=2000, month=3, day=8), 'CM', is_active=True
+        )
+        artist = TestUtils.create_artist(
+            'artist name',
+            datetime.datetime(year=1996, month=8, day=8),
+            'US'
+        )
+        self.post = TestUtils.create_artist_post(artist, 'This is an artist post', self.poster)
+        self.comments = [
+            ArtistPostComment.objects.create(
+                body='comment', poster=self.poster, post_concerned=self.post
+            )
+            for _ in range(2)
+        ]
+
+    def test_actions_are_applied_with_counters(self):
+        actions = [
+            EngagementAction(LIKE_ARTIST_POST_COMMENT, comment.id) for comment in self.comments
+        ]
+        actions += [
+            EngagementAction(RATE_ARTIST_POST, self.post.id, num_stars=3),
+            EngagementAction(BOOKMARK_ARTIST_POST, self.post.id),
+        ]
+
+        result = apply_engagement_actions(self.user, actions)
+
+        self.assertEqual(result.total, 4)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.num_stars, 3)
+        self.assertEqual(self.post.num_bookmarks, 1)
+        for comment in self.comments:
+            comment.refresh_from_db()
+            self.assertEqual(comment.num_likes, 1)
+        # One notification per like and rating
+        self.assertEqual(Notification.objects.filter(recipient=self.poster).count(), 3)
+
+    def test_applied_actions_are_ignored_and_ratings_updated(self):
+        apply_engagement_actions(self.user, [
+            EngagementAction(LIKE_ARTIST_POST_COMMENT, self.comments[0].id),
+            EngagementAction(RATE_ARTIST_POST, self.post.id, num_stars=1),
+        ])
+        result = apply_engagement_actions(self.user, [
+            EngagementAction(LIKE_ARTIST_POST_COMMENT, self.comments[0].id),
+            EngagementAction(RATE_ARTIST_POST, self.post.id, num_stars=5),
+        ])
+
+        self.assertEqual(result.num_applied[LIKE_ARTIST_POST_COMMENT], 0)
+        self.assertEqual(result.num_applied[RATE_ARTIST_POST], 1)
+        self.comments[0].refresh_from_db()
+        self.assertEqual(self.comments[0].num_likes, 1)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.num_stars, 5)
+        self.assertEqual(ArtistPostRating.objects.get(post=self.post).num_stars, 5)
+
+    def test_invalid_batch_is_not_applied(self):
+        with self.assertRaises(ValidationError):
+            apply_engagement_actions(self.user, [
+                EngagementAction(LIKE_ARTIST_POST_COMMENT, self.comments[0].id),
+                EngagementAction(LIKE_ARTIST_POST_COMMENT, 0),
+            ])
+
+        self.comments[0].refresh_from_db()
+        self.assertEqual(self.comments[0].num_likes, 0)
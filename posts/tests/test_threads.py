@@ -0,0 +1,85 @@
+import datetime
+from django.test import TestCase
+
+from accounts.tests.users.test_models import TestUtils
+from posts.models.artist_posts.models import ArtistPostComment
+from posts.threads import get_first_child_comments, get_thread
+
+
+class CommentThreadTests(TestCase):
+    def setUp(self):
+        self.user = TestUtils.create_test_user(
+            'user1', 'email1@gmail.com', 'password', 'name name1', 
+            datetime.datetime(year=2000, month=3, day=8), 'CM', is_active=True
+        )
+        artist = TestUtils.create_artist(
+            'artist name', 
+            datetime.datetime(year=1996, month=8, day=8),
+            'US'
+        )
+        self.post = TestUtils.create_artist_post(artist, 'This is an artist post', self.user)
+
+    def create_comment(self, parent=None):
+        ancestor = None
+        if parent:
+            ancestor = parent.ancestor or parent
+
+        return ArtistPostComment.objects.create(
+            body='comment',
+            poster=self.user,
+            post_concerned=self.post,
+            parent=parent,
+            ancestor=ancestor
+        )
+
+    def test_deep_replies_are_flattened(self):
+        ancestor = self.create_comment()
+        reply = self.create_comment(ancestor)
+        reply_of_reply = self.create_comment(reply)
+        deep_reply = self.create_comment(reply_of_reply)
+
+        thread = get_thread(ancestor, max_depth=2)
+
+        self.assertEqual([node.comment for node in thread.replies], [reply])
+        reply_node = thread.replies[0]
+        # `deep_reply` is displayed at the same level as its parent
+        self.assertEqual(
+            [node.comment for node in reply_node.replies], 
+            [reply_of_reply, deep_reply]
+        )
+
+    def test_fan_out_is_bounded(self):
+        ancestor = self.create_comment()
+        for _ in range(3):
+            self.create_comment(ancestor)
+
+        thread = get_thread(ancestor, max_fan_out=2)
+
+        self.assertEqual(len(thread.replies), 2)
+        self.assertEqual(thread.num_hidden_replies, 1)
+
+    def test_replies_of_hidden_replies_are_counted(self):
+        ancestor = self.create_comment()
+        reply = self.create_comment(ancestor)
+        hidden_reply = self.create_comment(ancestor)
+        self.create_comment(self.create_comment(hidden_reply))
+
+        thread = get_thread(ancestor, max_fan_out=1)
+
+        self.assertEqual([node.comment for node in thread.replies], [reply])
+        # `hidden_reply` and its two descendants
+        self.assertEqual(thread.num_hidden_replies, 3)
+        self.assertEqual(thread.replies[0].num_hidden_replies, 0)
+
+    def test_first_child_comments(self):
+        ancestor1, ancestor2 = self.create_comment(), self.create_comment()
+        replies = [self.create_comment(ancestor1) for _ in range(3)]
+
+        child_comments = get_first_child_comments(
+            ArtistPostComment, 
+            [ancestor1.id, ancestor2.id], 
+            2
+        )
+
+        self.assertEqual(child_comments[ancestor1.id], replies[:2])
+        self.assertEqual(child_comments[ancestor2.id], [])
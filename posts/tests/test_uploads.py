@@ -0,0 +1,54 @@
+import tempfile
+from types import SimpleNamespace
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, override_settings
+
+from posts.uploads import append_video_chunk, complete_video_upload, get_video_upload, init_video_upload
+
+VIDEO_HEADER = b'\x00\x00\x00\x18ftypmp42'
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), USE_S3=False)
+class VideoUploadTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = SimpleNamespace(username='user1')
+        self.content = VIDEO_HEADER + b'0' * 100
+
+    def test_chunks_are_written_at_their_offset(self):
+        upload = init_video_upload(self.user, 'video.mp4', 'video/mp4', len(self.content))
+
+        append_video_chunk(self.user, upload['id'], 0, SimpleUploadedFile('chunk', self.content[:60]))
+        # Resent after a timeout
+        append_video_chunk(self.user, upload['id'], 50, SimpleUploadedFile('chunk', self.content[50:60]))
+        self.assertEqual(get_video_upload(self.user)['offset'], 60)
+
+        # Chunks can't leave gaps
+        with self.assertRaises(ValidationError) as cm:
+            append_video_chunk(self.user, upload['id'], 80, SimpleUploadedFile('chunk', self.content[80:]))
+        self.assertEqual(cm.exception.code, 'invalid_offset')
+
+        with self.assertRaises(ValidationError) as cm:
+            complete_video_upload(self.user, upload['id'])
+        self.assertEqual(cm.exception.code, 'incomplete_upload')
+
+        upload = append_video_chunk(self.user, upload['id'], 60, SimpleUploadedFile('chunk', self.content[60:]))
+        self.assertEqual(upload['offset'], upload['size'])
+
+        with open(upload['path'], 'rb') as file:
+            self.assertEqual(file.read(), self.content)
+
+    def test_invalid_videos_are_rejected_early(self):
+        with self.assertRaises(ValidationError):
+            init_video_upload(self.user, 'video.mp4', 'video/mp4', 300 * 1024 * 1024)
+        for size in [0, -1]:
+            with self.assertRaises(ValidationError) as cm:
+                init_video_upload(self.user, 'video.mp4', 'video/mp4', size)
+            self.assertEqual(cm.exception.code, 'empty_file')
+
+        upload = init_video_upload(self.user, 'video.mp4', 'video/mp4', len(self.content))
+        with self.assertRaises(ValidationError) as cm:
+            append_video_chunk(self.user, upload['id'], 0, SimpleUploadedFile('chunk', b'not a video'))
+        self.assertEqual(cm.exception.code, 'corrupt_file')
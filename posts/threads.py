@@ -0,0 +1,118 @@
+"""
+Loading of comment threads.
+
+A thread is an ancestor comment(direct comment on a post) and all of its child
+comments. Since every child comment stores its ancestor, a whole thread or the
+first replies of many threads can be fetched in one query using the
+(ancestor, created_on) index of the comment tables.
+"""
+
+from dataclasses import dataclass, field
+from django.db import connections
+
+from posts.constants import MAX_THREAD_DEPTH, MAX_THREAD_FAN_OUT, MAX_THREAD_SIZE
+
+
+@dataclass
+class ThreadNode:
+    """A comment of a thread and its (bounded) replies"""
+    comment: object
+    depth: int = 0
+    replies: list = field(default_factory=list)
+    # Number of replies that were not included due to the fan-out limit,
+    # the replies of these replies included
+    num_hidden_replies: int = 0
+    # Id of the comment under which this one is displayed
+    display_parent_id: int = None
+
+
+def get_first_child_comments(comment_model, ancestor_ids, k) -> dict[int, list]:
+    """
+    Return the first `k` child comments(oldest first) of each of the ancestor
+    comments in `ancestor_ids` as a dict `{ancestor_id: [comments]}`.
+    All the ancestors are handled in one query using a window function.
+    """
+    ancestor_ids = list(set(ancestor_ids))
+    if not ancestor_ids:
+        return {}
+
+    qn = connections[comment_model.objects.db].ops.quote_name
+    table = qn(comment_model._meta.db_table)
+    ancestor_column = qn(comment_model._meta.get_field('ancestor').column)
+
+    comments = comment_model.objects.raw(
+        f'''
+        SELECT * FROM (
+            SELECT c.*, ROW_NUMBER() OVER (
+                PARTITION BY c.{ancestor_column} ORDER BY c.created_on, c.id
+            ) AS thread_position
+            FROM {table} c
+            WHERE c.{ancestor_column} = ANY(%s)
+        ) ranked
+        WHERE thread_position <= %s
+        ORDER BY {ancestor_column}, thread_position
+        ''',
+        [ancestor_ids, k]
+    )
+
+    result = {ancestor_id: [] for ancestor_id in ancestor_ids}
+    for comment in comments:
+        result[comment.ancestor_id].append(comment)
+
+    return result
+
+
+def get_thread(
+    ancestor,
+    max_depth=MAX_THREAD_DEPTH,
+    max_fan_out=MAX_THREAD_FAN_OUT,
+    max_size=MAX_THREAD_SIZE
+) -> ThreadNode:
+    """
+    Load the thread of `ancestor` in one query and return it as a tree of `ThreadNode`s.
+
+    - Replies deeper than `max_depth` are attached to their deepest parent that is
+      within the limit, so the tree is flattened rather than truncated.
+    - Each comment has at most `max_fan_out` replies, the others and their own
+      replies are counted in `num_hidden_replies`.
+    - At most `max_size` child comments(oldest first) are loaded.
+    """
+    max_depth = max(max_depth, 1)
+    child_comments = ancestor.child_comments.order_by('created_on', 'id')[:max_size]
+
+    root = ThreadNode(ancestor)
+    nodes = {ancestor.id: root}
+    # Id of each hidden reply => node in which it is counted
+    hidden_in = {}
+
+    # Comments are ordered by creation date so a parent is always seen
+    # before its replies.
+    for comment in child_comments:
+        # The replies of a hidden reply are hidden with it
+        if comment.parent_id in hidden_in:
+            hidden_in[comment.id] = hidden_in[comment.parent_id]
+            hidden_in[comment.id].num_hidden_replies += 1
+            continue
+
+        # If the parent was deleted or wasn't loaded, attach comment to the ancestor
+        parent = nodes.get(comment.parent_id, root)
+
+        # The node under which the comment will be displayed
+        if parent.depth >= max_depth:
+            # `parent` is then already a reply attached to a shallower comment
+            parent = nodes[parent.display_parent_id]
+
+        if len(parent.replies) >= max_fan_out:
+            hidden_in[comment.id] = parent
+            parent.num_hidden_replies += 1
+            continue
+
+        node = ThreadNode(
+            comment,
+            depth=parent.depth + 1,
+            display_parent_id=parent.comment.id
+        )
+        nodes[comment.id] = node
+        parent.replies.append(node)
+
+    return root
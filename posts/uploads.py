@@ -0,0 +1,257 @@
+"""
+Resumable uploads of videos.
+
+Videos(up to 250mb) are uploaded in chunks so that an interrupted upload is resumed
+rather than restarted, and the video is never held in memory:
+- `init_video_upload()` validates the type and size of the video, then creates the
+  upload of the user(its state is in the cache, see `core.utils.get_user_cache_keys()`)
+  and its file;
+- `append_video_chunk()` writes a chunk at its offset(`os.pwrite`) directly into the
+  file. Chunks are sent in order; a chunk may be sent again, eg. after a timeout.
+  The first chunk is checked to be a video;
+- `get_video_upload()` returns the state of the upload, its `offset` being the
+  offset to resume from;
+- `complete_video_upload()` validates the video and stages it like `VideoUploadMutation`:
+  the file is moved to the temporary uploads directory, it isn't read or copied.
+
+A user has one upload at a time, initiating an upload drops the previous one.
+"""
+
+import os
+import tempfile
+import time
+import uuid
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.core.files.uploadedfile import UploadedFile
+from django.utils.translation import gettext_lazy as _
+
+from core.constants import FILE_STORAGE_CLASS
+from core.utils import get_user_cache_keys
+from posts.constants import TEMP_FILES_UPLOAD_DIR, VIDEO_UPLOAD_CHUNK_SIZE, VIDEO_UPLOAD_TIMEOUT
+from posts.validators import validate_post_video_file, validate_video_header, validate_video_upload_metadata
+
+# Maximum time(in seconds) to write a chunk, another chunk can't be written meanwhile
+CHUNK_LOCK_TIMEOUT = 60
+
+
+class UploadedVideo(UploadedFile):
+    """The file of a complete upload, already on disk"""
+
+    def __init__(self, path, name, content_type, size):
+        super().__init__(None, name, content_type, size)
+        self.path_on_disk = path
+
+    def temporary_file_path(self):
+        return self.path_on_disk
+
+
+def get_upload_directory():
+    """Directory of the files being uploaded, on the same disk as the staged videos if possible"""
+    if settings.USE_S3:
+        return os.path.join(tempfile.gettempdir(), 'video_uploads')
+
+    return os.path.join(settings.MEDIA_ROOT, TEMP_FILES_UPLOAD_DIR)
+
+
+def _get_cache_key(user):
+    return get_user_cache_keys(user.username)['video_upload']
+
+
+def _get_upload(user, upload_id):
+    upload = cache.get(_get_cache_key(user))
+    if upload is None or upload['id'] != upload_id:
+        raise ValidationError(_('Upload not found, it may have expired'), code='not_found')
+
+    return upload
+
+
+def _lock_upload(user):
+    if not cache.add(f'{_get_cache_key(user)}-lock', True, CHUNK_LOCK_TIMEOUT):
+        raise ValidationError(_('A chunk of this upload is already being written'), code='upload_in_progress')
+
+
+def _unlock_upload(user):
+    cache.delete(f'{_get_cache_key(user)}-lock')
+
+
+def _remove_file(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def get_video_upload(user):
+    """Return the state of the upload of `user`, None if there's none"""
+    return cache.get(_get_cache_key(user))
+
+
+def abort_video_upload(user):
+    """Drop the upload of `user`, if any"""
+    upload = get_video_upload(user)
+    if upload:
+        _remove_file(upload['path'])
+        cache.delete(_get_cache_key(user))
+
+
+def init_video_upload(user, filename, content_type, size):
+    """Validate the video to upload and create its upload, return its state"""
+    validate_video_upload_metadata(filename, content_type, size)
+    abort_video_upload(user)
+
+    upload_id = uuid.uuid4().hex
+    directory = get_upload_directory()
+    path = os.path.join(directory, f'{upload_id}.part')
+    os.makedirs(directory, exist_ok=True)
+
+    # The file is allocated(sparse) with the size of the video, chunks are written in place
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    try:
+        os.ftruncate(fd, size)
+    except OSError:
+        # Eg. no space left on the device
+        _remove_file(path)
+        raise
+    finally:
+        os.close(fd)
+
+    upload = {
+        'id': upload_id,
+        'filename': filename,
+        'content_type': content_type,
+        'size': size,
+        # Number of bytes received
+        'offset': 0,
+        'chunk_size': VIDEO_UPLOAD_CHUNK_SIZE,
+        'path': path,
+        'created_on': time.time(),
+    }
+    cache.set(_get_cache_key(user), upload, VIDEO_UPLOAD_TIMEOUT)
+
+    return upload
+
+
+def append_video_chunk(user, upload_id, offset, chunk):
+    """
+    Write the uploaded file `chunk` at `offset` in the video, return the state of the upload.
+    `offset` shouldn't be after the bytes received so far.
+    """
+    _lock_upload(user)
+
+    try:
+        upload = _get_upload(user, upload_id)
+
+        if offset < 0 or offset > upload['offset']:
+            raise ValidationError(
+                _('Expected a chunk at offset %(offset)s'),
+                code='invalid_offset',
+                params={'offset': upload['offset']}
+            )
+
+        if chunk.size > VIDEO_UPLOAD_CHUNK_SIZE:
+            raise ValidationError(
+                _('Chunks should be at most %(chunk_size)s bytes'),
+                code='large_chunk',
+                params={'chunk_size': VIDEO_UPLOAD_CHUNK_SIZE}
+            )
+
+        if offset + chunk.size > upload['size']:
+            raise ValidationError(
+                _('The chunk exceeds the size of the video'),
+                code='large_file'
+            )
+
+        position = offset
+        fd = os.open(upload['path'], os.O_WRONLY)
+        try:
+            for data in chunk.chunks():
+                if position == 0:
+                    validate_video_header(data)
+
+                os.pwrite(fd, data, position)
+                position += len(data)
+        finally:
+            os.close(fd)
+
+        upload['offset'] = max(upload['offset'], position)
+        cache.set(_get_cache_key(user), upload, VIDEO_UPLOAD_TIMEOUT)
+    finally:
+        _unlock_upload(user)
+
+    return upload
+
+
+def complete_video_upload(user, upload_id):
+    """
+    Validate the uploaded video and stage it as the unposted video of `user`,
+    return the video dict stored in the cache(see `VideoUploadMutation`).
+    """
+    _lock_upload(user)
+
+    try:
+        upload = _get_upload(user, upload_id)
+
+        if upload['offset'] < upload['size']:
+            raise ValidationError(
+                _('Upload incomplete, %(offset)s of %(size)s bytes received'),
+                code='incomplete_upload',
+                params={'offset': upload['offset'], 'size': upload['size']}
+            )
+
+        path = upload['path']
+        try:
+            validate_post_video_file(
+                UploadedVideo(path, upload['filename'], upload['content_type'], upload['size'])
+            )
+        except ValidationError:
+            abort_video_upload(user)
+            raise
+
+        use_filename = str(uuid.uuid4()) + '.' + upload['filename'].split('.')[-1].lower()
+        save_path = TEMP_FILES_UPLOAD_DIR + use_filename
+
+        if settings.USE_S3:
+            storage = FILE_STORAGE_CLASS()
+            with open(path, 'rb') as file:
+                saved_filename = storage.save(save_path, File(file))
+
+            _remove_file(path)
+            filepath = storage.url(saved_filename)
+        else:
+            # Same directory, the file is just renamed
+            os.rename(path, os.path.join(settings.MEDIA_ROOT, save_path))
+            filepath = save_path
+
+        file_dict = {
+            'filename': use_filename,
+            'mimetype': upload['content_type'],
+            'filepath': filepath,
+            'was_audio': False
+        }
+        cache.set(get_user_cache_keys(user.username)['video'], file_dict, None)
+        cache.delete(_get_cache_key(user))
+    finally:
+        _unlock_upload(user)
+
+    return file_dict
+
+
+def delete_stale_video_uploads():
+    """
+    Delete the files of the uploads without chunk for `VIDEO_UPLOAD_TIMEOUT`,
+    their state has expired. Return the number of deleted files.
+    """
+    directory = get_upload_directory()
+    if not os.path.isdir(directory):
+        return 0
+
+    num_deleted = 0
+    for entry in os.scandir(directory):
+        if entry.name.endswith('.part') and entry.stat().st_mtime < time.time() - VIDEO_UPLOAD_TIMEOUT:
+            _remove_file(entry.path)
+            num_deleted += 1
+
+    return num_deleted
@@ -5,7 +5,7 @@ from django.utils.translation import gettext_lazy as _
 from graphql import GraphQLError
 
 from core.utils import get_file_extension
-from posts.constants import MAX_NUM_PHOTOS, MAX_COMMENT_LENGTH
+from posts.constants import MAX_NUM_PHOTOS, MAX_COMMENT_LENGTH, MAX_VIDEO_SIZE
 from .utils import get_video_duration, get_audio_duration, get_video_resolution
 
 '''
@@ -138,40 +138,32 @@ def validate_post_audio_file(audio_file):
         )
 
 
-def validate_post_video_file(video_file):
+def validate_video_upload_metadata(filename, content_type, size):
     """
-    Validate video file
-    - Max size: 250mb
-    - Max length: 6minutes(360s)
-    - Min resolution: 32 x 32 px
-    - Max resolution: 1920 x 1920 px
-    - Types: mp4, mov
-
-    :param `video_file`: File object
+    Validate the type and size of a video before it's uploaded(or while it is).
+    Also used by `validate_post_video_file()`.
     """
-
-    MAX_VIDEO_SIZE, MAX_DURATION = 262144000, 360
-    MIN_RESOLUTION, MAX_RESOLUTION = [32, 32], [1920, 1920]
     VALID_CONTENT_TYPES = ['video/mp4', 'video/mov']
-    video = video_file
-    
-    content_type = video.content_type
+
     if content_type in VALID_CONTENT_TYPES:
         # Ensure content type matches extension
         ctype_ext = content_type.split('/')[-1].lower()
-        if ctype_ext != get_file_extension(video):
+        if ctype_ext != filename.split('.')[-1].lower():
             raise ValidationError(
                 _("Corrupt file, content type doesn't match with extension"),
                 code='corrupt_file'
             )
 
-        if (file_size := video.size) > MAX_VIDEO_SIZE:
+        if size <= 0:
+            raise ValidationError(_('The file is empty'), code='empty_file')
+
+        if size > MAX_VIDEO_SIZE:
             raise ValidationError(
                 _('Please keep filesize under %(max_video_size)s. Current filesize %(video_size)s'),
                 code='large_file',
                 params={
                     'max_video_size': filesizeformat(MAX_VIDEO_SIZE),
-                    'video_size': filesizeformat(file_size)
+                    'video_size': filesizeformat(size)
                 }
             )
     else:
@@ -181,6 +173,37 @@ def validate_post_video_file(video_file):
             params={'ctype': content_type}
         )
 
+
+def validate_video_header(header: bytes):
+    """
+    Validate the first bytes of a video; mp4 and mov files start with an `ftyp` box
+    (4 bytes of size then `ftyp`)
+    """
+    if header[4:8] != b'ftyp':
+        raise ValidationError(
+            _("Corrupt file, the content isn't a video"),
+            code='corrupt_file'
+        )
+
+
+def validate_post_video_file(video_file):
+    """
+    Validate video file
+    - Max size: 250mb
+    - Max length: 6minutes(360s)
+    - Min resolution: 32 x 32 px
+    - Max resolution: 1920 x 1920 px
+    - Types: mp4, mov
+
+    :param `video_file`: File object
+    """
+
+    MAX_DURATION = 360
+    MIN_RESOLUTION, MAX_RESOLUTION = [32, 32], [1920, 1920]
+    video = video_file
+    
+    validate_video_upload_metadata(video.name, video.content_type, video.size)
+
     # Validate resolution
     resolution = get_video_resolution(video)
     if resolution < MIN_RESOLUTION or resolution > MAX_RESOLUTION:
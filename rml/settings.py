@@ -47,84 +47,86 @@ CONTENT_IS_FLAGGED_COUNT = config('CONTENT_IS_FLAGGED_COUNT', cast=int)
 USER_IS_FLAGGED_COUNT = config('USER_IS_FLAGGED_COUNT', cast=int)
 AUTO_DELETE_FLAGS_COUNT = config('AUTO_DELETE_FLAGS_COUNT', cast=int)
 AUTO_SUSPEND_USER_ACCOUNT_FLAGS_COUNT = config('AUTO_SUSPEND_USER_ACCOUNT_FLAGS_COUNT', cast=int)
+# How denormalized counters are maintained, either 'signals' or 'triggers'(see core.counters)
+COUNTER_MAINTENANCE_MODE = config('COUNTER_MAINTENANCE_MODE', default='signals')
 
 
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
 
+# Connections come from a pool per process, see core.db.pool. A connection
+# returned to the pool is reused by the next request, so connections are
+# returned at the end of each request(`CONN_MAX_AGE` 0) unless pooling is disabled.
+DB_POOL_ENABLED = config('DB_POOL_ENABLED', default=True, cast=bool)
+DB_POOL = {
+	'ENABLED': DB_POOL_ENABLED,
+	'MAX_SIZE': config('DB_POOL_MAX_SIZE', default=20, cast=int),
+	'MAX_IDLE': config('DB_POOL_MAX_IDLE', default=5, cast=int),
+	'TIMEOUT': config('DB_POOL_TIMEOUT', default=10, cast=int),
+	'MAX_LIFETIME': 30 * 60,
+	'HEALTH_CHECK_INTERVAL': 30,
+	# The schema aliases share connections, setting their search path
+	'SHARED': config('DB_POOL_SHARED', default=True, cast=bool),
+}
+DB_CONN_MAX_AGE = config('DB_CONN_MAX_AGE', default=0 if DB_POOL_ENABLED else 60, cast=int)
+
+
+def get_database_settings(schema):
+	"""Settings of the alias of a schema, its tables being first in the search path"""
+	return {
+		'ENGINE': 'core.db.backends.postgresql',
+		'OPTIONS': {
+			'options': f'-c search_path={schema},public'
+		},
+		'NAME': DB_NAME,
+		'USER': DB_USER,
+		'PASSWORD': DB_PASSWORD,
+		'HOST': DB_HOST,
+		'PORT': DB_PORT,
+		'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+		'POOL': DB_POOL,
+	}
+
+
 if USE_PROD_DB:
 	pass
 else:
 	DATABASES = {
 		# Configure database with schemas
-		'default': {
-			'ENGINE': 'django.db.backends.postgresql_psycopg2',
-			'OPTIONS': {
-				# Use `django` schema so as not to polute public schema
-				'options': '-c search_path=django,public'
-			},
-			'NAME': DB_NAME,
-			'USER': DB_USER,
-			'PASSWORD': DB_PASSWORD,
-			'HOST': DB_HOST,
-			'PORT': DB_PORT,
-		},
-		'accounts': {
-			'ENGINE': 'django.db.backends.postgresql_psycopg2',
-			'OPTIONS': {
-				'options': '-c search_path=accounts,public'
-			},
-			'NAME': DB_NAME,
-			'USER': DB_USER,
-			'PASSWORD': DB_PASSWORD,
-			'HOST': DB_HOST,
-			'PORT': DB_PORT,
-		},
-		'posts': {
-			'ENGINE': 'django.db.backends.postgresql_psycopg2',
-			'OPTIONS': {
-				'options': '-c search_path=posts,public'
-			},
-			'NAME': DB_NAME,
-			'USER': DB_USER,
-			'PASSWORD': DB_PASSWORD,
-			'HOST': DB_HOST,
-			'PORT': DB_PORT,
-		},
-		'notifications': {
-			'ENGINE': 'django.db.backends.postgresql_psycopg2',
-			'OPTIONS': {
-				'options': '-c search_path=notifications,public'
-			},
-			'NAME': DB_NAME,
-			'USER': DB_USER,
-			'PASSWORD': DB_PASSWORD,
-			'HOST': DB_HOST,
-			'PORT': DB_PORT,
-		},
-		'flagging': {
-			'ENGINE': 'django.db.backends.postgresql_psycopg2',
-			'OPTIONS': {
-				'options': '-c search_path=flagging,public'
-			},
-			'NAME': DB_NAME,
-			'USER': DB_USER,
-			'PASSWORD': DB_PASSWORD,
-			'HOST': DB_HOST,
-			'PORT': DB_PORT,
-		},
-		'subscriptions': {
-			'ENGINE': 'django.db.backends.postgresql_psycopg2',
-			'OPTIONS': {
-				'options': '-c search_path=subscriptions,public'
-			},
-			'NAME': DB_NAME,
-			'USER': DB_USER,
-			'PASSWORD': DB_PASSWORD,
-			'HOST': DB_HOST,
-			'PORT': DB_PORT,
-		}
+		# Use `django` schema so as not to polute public schema
+		'default': get_database_settings('django'),
+		'accounts': get_database_settings('accounts'),
+		'posts': get_database_settings('posts'),
+		'notifications': get_database_settings('notifications'),
+		'flagging': get_database_settings('flagging'),
+		'subscriptions': get_database_settings('subscriptions'),
+	}
+
+# Read replicas of the default database as `host:port` values, see core.routers.
+# In tests, replicas mirror the default database.
+REPLICA_DB_HOSTS = config('REPLICA_DB_HOSTS', default='', cast=Csv())
+DATABASE_REPLICAS = []
+
+for i, replica_host in enumerate(REPLICA_DB_HOSTS):
+	replica_host, *replica_port = replica_host.split(':')
+	DATABASES[f'replica_{i}'] = {
+		**DATABASES['default'],
+		'HOST': replica_host,
+		'PORT': replica_port[0] if replica_port else DATABASES['default']['PORT'],
+		'TEST': {'MIRROR': 'default'},
 	}
+	DATABASE_REPLICAS.append(f'replica_{i}')
+
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+
+REPLICA_ROUTING = {
+	# Clients read from the primary for this number of seconds after they wrote,
+	# it should exceed the usual replication lag.
+	'PIN_SECONDS': config('REPLICA_PIN_SECONDS', default=10, cast=int),
+	'PIN_COOKIE_NAME': 'primary_pin',
+	'MAX_LAG': config('REPLICA_MAX_LAG', default=5, cast=int),
+	'LAG_CHECK_INTERVAL': 2,
+}
 
 # EMAIL_HOST = config('EMAIL_HOST', default='localhost')
 # EMAIL_PORT = config('EMAIL_PORT', default=25, cast=int)
@@ -181,6 +183,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
 	'django.middleware.security.SecurityMiddleware',
+	# Route reads to the replicas, see core.routers
+	'core.middleware.PrimaryPinMiddleware',
 	'django.contrib.sessions.middleware.SessionMiddleware',
 	'django.middleware.common.CommonMiddleware',
 	'django.middleware.csrf.CsrfViewMiddleware',
@@ -289,6 +293,8 @@ if USE_S3:
 	AWS_S3_FILE_OVERWRITE = False
 	AWS_DEFAULT_ACL = None
 	AWS_S3_VERIFY = True
+	# Endpoint of an S3-compatible stand-in(eg. minio) used instead of AWS, eg. locally
+	AWS_S3_ENDPOINT_URL = config('AWS_S3_ENDPOINT_URL', default=None)
 
 	## Note: Variables ending in '_' are user-defined, not required or used by a package
 	AWS_S3_CUSTOM_DOMAIN_ = f'{AWS_STORAGE_BUCKET_NAME}.s3.amazonaws.com'
@@ -311,6 +317,9 @@ if USE_S3:
 	# This var is also used in core.storages to set the location of media files
 	PUBLIC_MEDIA_LOCATION_ = 'media'
 	MEDIA_URL = f'https://{AWS_S3_CUSTOM_DOMAIN_}/{PUBLIC_MEDIA_LOCATION_}/'
+	if AWS_S3_ENDPOINT_URL:
+		AWS_S3_ADDRESSING_STYLE = 'path'
+		MEDIA_URL = f'{AWS_S3_ENDPOINT_URL.rstrip("/")}/{AWS_STORAGE_BUCKET_NAME}/{PUBLIC_MEDIA_LOCATION_}/'
 	MEDIA_ROOT = MEDIA_URL
 	DEFAULT_FILE_STORAGE = 'core.storages.PublicMediaStorage'
 
@@ -329,6 +338,10 @@ else:
 	MEDIA_URL = 'media/'
 	MEDIA_ROOT = BASE_DIR / 'media'
 
+# Base url of the content-addressed media files(see core.media), eg. a CDN
+# in front of the media storage. Defaults to MEDIA_URL
+MEDIA_CDN_URL = config('MEDIA_CDN_URL', default=None)
+
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
@@ -425,15 +438,69 @@ GRAPHENE = {
     'SCHEMA': 'core.graphql.schema.schema',
 	'ATOMIC_MUTATION': True,
 	'MIDDLEWARE': [
+		# Time the resolvers of sampled operations, see INSTRUMENTATION
+		'core.graphql.middleware.InstrumentationMiddleware',
         'graphql_jwt.middleware.JSONWebTokenMiddleware',
-		# For debugging
-		'graphene_django.debug.DjangoDebugMiddleware'
+		# Reject expensive queries, see GRAPHQL_QUERY_COST
+		'core.graphql.middleware.QueryCostMiddleware',
+		# Collect the tags of cached responses, see GRAPHQL_RESPONSE_CACHE
+		'core.graphql.response_cache.ResponseCacheTagMiddleware',
     ],
 	'DJANGO_CHOICE_FIELD_ENUM_V3_NAMING': True,
+	# Maximum number of items that can be requested on a connection
+	'RELAY_CONNECTION_MAX_LIMIT': 100,
 	# 'DJANGO_CHOICE_FIELD_ENUM_CUSTOM_NAME': 'core.utils.graphene_enum_naming',
 
 }
 
+# For debugging; it records every query of every operation, too costly in production
+if DEBUG:
+	GRAPHENE['MIDDLEWARE'].append('graphene_django.debug.DjangoDebugMiddleware')
+
+# Sampling of the time and SQL queries of graphql operations, see core.instrumentation
+INSTRUMENTATION = {
+	'ENABLED': config('INSTRUMENTATION_ENABLED', default=True, cast=bool),
+	'SAMPLE_RATE': config('INSTRUMENTATION_SAMPLE_RATE', default=0.05, cast=float),
+	'SLOW_OPERATION_MS': config('SLOW_OPERATION_MS', default=1000, cast=int),
+	'FLUSH_INTERVAL': 30,
+	'METRICS_TOKEN': config('METRICS_TOKEN', default=None),
+}
+
+
+# Number of parsed and validated queries kept in memory, see core.graphql.backend
+GRAPHQL_DOCUMENT_CACHE_SIZE = 1000
+# Time(in seconds) for which automatic persisted queries are kept
+GRAPHQL_PERSISTED_QUERY_TIMEOUT = 60 * 60 * 24 * 7
+
+# Cache of anonymous read queries, see core.graphql.response_cache.
+# Root field => (maximum staleness in seconds, collection tags)
+GRAPHQL_RESPONSE_CACHE = {
+	'ENABLED': config('GRAPHQL_RESPONSE_CACHE_ENABLED', default=True, cast=bool),
+	'FIELDS': {
+		'artist': (60, []),
+		'allArtists': (30, ['artist']),
+		'artistPost': (60, []),
+		'artistArtistPosts': (30, ['artist_post']),
+		'allArtistPosts': (15, ['artist_post']),
+	},
+}
+
+# Query cost limits, see core.graphql.cost
+GRAPHQL_QUERY_COST = {
+	'MAX_COST': config('GRAPHQL_MAX_QUERY_COST', default=10000, cast=int),
+	'MAX_DEPTH': 10,
+	'FIELD_COSTS': {
+		'allArtistPosts': 5,
+		'artistArtistPosts': 5,
+		'allNonArtistPosts': 5,
+		'artistPostAncestorComments': 5,
+		'artistPostCommentThread': 20,
+	},
+	'THROTTLE_BUDGET': config('GRAPHQL_QUERY_COST_BUDGET', default=200000, cast=int),
+	'THROTTLE_PERIOD': 60,
+	'NUM_TRUSTED_PROXIES': config('NUM_TRUSTED_PROXIES', default=0, cast=int),
+}
+
 
 ## graphql_auth ##
 GRAPHQL_AUTH = {